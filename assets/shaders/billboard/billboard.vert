@@ -4,8 +4,14 @@
 layout(location = 0) in vec3 vertex;
 
 uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
+
+// per frame data, shared by every shader (UniformBufferManager)
+layout (std140) uniform FrameData {
+    mat4 view;
+    mat4 projection;
+    vec3 eye;
+    float time;
+};
 
 void main() {
     vec3 camera_right = vec3(view[0][0], view[1][0], view[2][0]);
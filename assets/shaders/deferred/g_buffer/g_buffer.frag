@@ -1,4 +1,4 @@
-#version 330 core
+#version 430 core
 layout (location = 0) out vec3 g_position;
 layout (location = 1) out vec3 g_normal;
 layout (location = 2) out vec4 g_albedo_spec;
@@ -10,9 +10,37 @@ in vec2 frag_uv;
 
 // uniform sampler2D texture_diffuse1;
 // uniform sampler2D texture_specular1;
-uniform vec3 albedo;
-uniform float metallic;
-uniform float roughness;
+
+// parameters of every material, shared by every shader (MaterialBufferManager)
+struct Material {
+    vec3 ambient;
+    float shininess;
+    vec3 diffuse;
+    float roughness;
+    vec3 specular;
+    float metallic;
+};
+
+layout (std430) readonly buffer MaterialData {
+    Material materials[];
+};
+
+// row of the material of the model in the material table
+uniform int material_index;
+
+// textures of the models, packed as layers of texture arrays (set by TextureArrayManager.bind)
+uniform sampler2DArray textures;
+// layer of the texture of the model, negative when the model has no texture
+uniform int texture_layer;
+// offset and scale of the UVs of the texture inside its layer
+uniform vec4 texture_rect;
+
+vec4 sample_texture(vec2 uv) {
+    // repeat the texture inside its rect, with the derivatives of the continuous UVs to select the right mip
+    vec2 scale = texture_rect.zw;
+    vec2 layer_uv = texture_rect.xy + fract(uv) * scale;
+    return textureGrad(textures, vec3(layer_uv, texture_layer), dFdx(uv) * scale, dFdy(uv) * scale);
+}
 
 void main()
 {    
@@ -20,10 +48,13 @@ void main()
     g_position = frag_position;
     // also store the per-fragment normals into the gbuffer
     g_normal = normalize(frag_normal);
+    // read the parameters of the material of the model from the material table
+    Material material = materials[material_index];
     // and the diffuse per-fragment color
-    g_albedo_spec.rgb = albedo;
+    vec3 albedo = material.diffuse;
+    g_albedo_spec.rgb = texture_layer < 0 ? albedo : albedo * sample_texture(frag_uv).rgb;
     // store specular intensity in gAlbedoSpec's alpha component
     // gAlbedoSpec.a = texture(texture_specular1, TexCoords).r;
-    g_pbr = vec2(metallic, roughness);
+    g_pbr = vec2(material.metallic, material.roughness);
     
 }  
\ No newline at end of file
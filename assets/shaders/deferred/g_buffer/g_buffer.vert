@@ -1,4 +1,4 @@
-#version 330 core
+#version 430 core
 
 layout (location = 0) in vec3 vertex;
 layout (location = 1) in vec3 normal;
@@ -9,16 +9,46 @@ out vec3 frag_normal;
 out vec2 frag_uv;
 
 uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
+
+// per frame data, shared by every shader (UniformBufferManager)
+layout (std140) uniform FrameData {
+    mat4 view;
+    mat4 projection;
+    vec3 eye;
+    float time;
+};
+
+// decoding of the compressed vertex format: positions quantized inside the bounding box of the mesh and octahedral
+// normals (set by MeshManager.bind_vertex_format)
+uniform bool compressed_vertices;
+uniform vec3 position_offset;
+uniform vec3 position_scale;
+
+vec3 decode_position(vec3 position) {
+    return compressed_vertices ? position_offset + position * position_scale : position;
+}
+
+vec3 decode_normal(vec3 normal) {
+    if (!compressed_vertices) {
+        return normal;
+    }
+
+    // unfold the lower half of the octahedron
+    vec3 decoded = vec3(normal.xy, 1.0 - abs(normal.x) - abs(normal.y));
+    float fold = max(-decoded.z, 0.0);
+    decoded.x += decoded.x >= 0.0 ? -fold : fold;
+    decoded.y += decoded.y >= 0.0 ? -fold : fold;
+
+    return normalize(decoded);
+}
 
 void main() {
-    vec4 world_position = model * vec4(vertex, 1.0);
+    vec4 world_position = model * vec4(decode_position(vertex), 1.0);
     frag_position = world_position.xyz;
     frag_uv = uv;
 
     mat3 normal_matrix = transpose(inverse(mat3(model)));
-    frag_normal = normal_matrix * normal;
+    frag_normal = normal_matrix * decode_normal(normal);
 
     gl_Position = projection * view * world_position;
 }
\ No newline at end of file
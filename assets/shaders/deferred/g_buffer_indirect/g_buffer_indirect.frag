@@ -0,0 +1,65 @@
+#version 430 core
+layout (location = 0) out vec3 g_position;
+layout (location = 1) out vec3 g_normal;
+layout (location = 2) out vec4 g_albedo_spec;
+layout (location = 3) out vec2 g_pbr;
+
+in vec3 frag_position;
+in vec3 frag_normal;
+in vec2 frag_uv;
+flat in uint frag_draw_id;
+
+// parameters of every material, shared by every shader (MaterialBufferManager)
+struct Material {
+    vec3 ambient;
+    float shininess;
+    vec3 diffuse;
+    float roughness;
+    vec3 specular;
+    float metallic;
+};
+
+layout (std430) readonly buffer MaterialData {
+    Material materials[];
+};
+
+// data of every model submitted with indirect draws (IndirectDrawManager)
+struct Draw {
+    mat4 model;
+    vec4 texture_rect;
+    vec3 position_offset;
+    int material_index;
+    vec3 position_scale;
+    int texture_layer;
+    int compressed_vertices;
+};
+
+layout (std430) readonly buffer DrawData {
+    Draw draws[];
+};
+
+// textures of the models, packed as layers of texture arrays (the array of the draw is bound by IndirectDrawManager)
+uniform sampler2DArray textures;
+
+vec4 sample_texture(Draw draw, vec2 uv) {
+    // repeat the texture inside its rect, with the derivatives of the continuous UVs to select the right mip
+    vec2 scale = draw.texture_rect.zw;
+    vec2 layer_uv = draw.texture_rect.xy + fract(uv) * scale;
+    return textureGrad(textures, vec3(layer_uv, draw.texture_layer), dFdx(uv) * scale, dFdy(uv) * scale);
+}
+
+void main()
+{
+    // read the data of the model and the parameters of its material
+    Draw draw = draws[frag_draw_id];
+    Material material = materials[draw.material_index];
+
+    // store the fragment position vector in the first gbuffer texture
+    g_position = frag_position;
+    // also store the per-fragment normals into the gbuffer
+    g_normal = normalize(frag_normal);
+    // and the diffuse per-fragment color
+    vec3 albedo = material.diffuse;
+    g_albedo_spec.rgb = draw.texture_layer < 0 ? albedo : albedo * sample_texture(draw, frag_uv).rgb;
+    g_pbr = vec2(material.metallic, material.roughness);
+}
@@ -0,0 +1,69 @@
+#version 430 core
+
+layout (location = 0) in vec3 vertex;
+layout (location = 1) in vec3 normal;
+layout (location = 2) in vec2 uv;
+// index of the draw, starting at the base instance of the draw command (set by IndirectDrawManager)
+layout (location = 15) in uint draw_id;
+
+out vec3 frag_position;
+out vec3 frag_normal;
+out vec2 frag_uv;
+flat out uint frag_draw_id;
+
+// per frame data, shared by every shader (UniformBufferManager)
+layout (std140) uniform FrameData {
+    mat4 view;
+    mat4 projection;
+    vec3 eye;
+    float time;
+};
+
+// data of every model submitted with indirect draws (IndirectDrawManager)
+struct Draw {
+    mat4 model;
+    vec4 texture_rect;
+    vec3 position_offset;
+    int material_index;
+    vec3 position_scale;
+    int texture_layer;
+    int compressed_vertices;
+};
+
+layout (std430) readonly buffer DrawData {
+    Draw draws[];
+};
+
+// decoding of the compressed vertex format: positions quantized inside the bounding box of the mesh and octahedral
+// normals
+vec3 decode_position(Draw draw, vec3 position) {
+    return draw.compressed_vertices != 0 ? draw.position_offset + position * draw.position_scale : position;
+}
+
+vec3 decode_normal(Draw draw, vec3 normal) {
+    if (draw.compressed_vertices == 0) {
+        return normal;
+    }
+
+    // unfold the lower half of the octahedron
+    vec3 decoded = vec3(normal.xy, 1.0 - abs(normal.x) - abs(normal.y));
+    float fold = max(-decoded.z, 0.0);
+    decoded.x += decoded.x >= 0.0 ? -fold : fold;
+    decoded.y += decoded.y >= 0.0 ? -fold : fold;
+
+    return normalize(decoded);
+}
+
+void main() {
+    Draw draw = draws[draw_id];
+
+    vec4 world_position = draw.model * vec4(decode_position(draw, vertex), 1.0);
+    frag_position = world_position.xyz;
+    frag_uv = uv;
+    frag_draw_id = draw_id;
+
+    mat3 normal_matrix = transpose(inverse(mat3(draw.model)));
+    frag_normal = normal_matrix * decode_normal(draw, normal);
+
+    gl_Position = projection * view * world_position;
+}
@@ -0,0 +1,53 @@
+#version 430 core
+layout (location = 0) out vec3 g_position;
+layout (location = 1) out vec3 g_normal;
+layout (location = 2) out vec4 g_albedo_spec;
+layout (location = 3) out vec2 g_pbr;
+
+in vec3 frag_position;
+in vec3 frag_normal;
+in vec2 frag_uv;
+// data of the instance (set by InstanceBatchManager)
+flat in vec4 frag_texture_rect;
+flat in int frag_material_index;
+flat in int frag_texture_layer;
+
+// parameters of every material, shared by every shader (MaterialBufferManager)
+struct Material {
+    vec3 ambient;
+    float shininess;
+    vec3 diffuse;
+    float roughness;
+    vec3 specular;
+    float metallic;
+};
+
+layout (std430) readonly buffer MaterialData {
+    Material materials[];
+};
+
+// textures of the models, packed as layers of texture arrays (the array of the batch is bound by
+// InstanceBatchManager)
+uniform sampler2DArray textures;
+
+vec4 sample_texture(vec2 uv) {
+    // repeat the texture inside its rect, with the derivatives of the continuous UVs to select the right mip
+    vec2 scale = frag_texture_rect.zw;
+    vec2 layer_uv = frag_texture_rect.xy + fract(uv) * scale;
+    return textureGrad(textures, vec3(layer_uv, frag_texture_layer), dFdx(uv) * scale, dFdy(uv) * scale);
+}
+
+void main()
+{
+    // read the parameters of the material of the instance
+    Material material = materials[frag_material_index];
+
+    // store the fragment position vector in the first gbuffer texture
+    g_position = frag_position;
+    // also store the per-fragment normals into the gbuffer
+    g_normal = normalize(frag_normal);
+    // and the diffuse per-fragment color
+    vec3 albedo = material.diffuse;
+    g_albedo_spec.rgb = frag_texture_layer < 0 ? albedo : albedo * sample_texture(frag_uv).rgb;
+    g_pbr = vec2(material.metallic, material.roughness);
+}
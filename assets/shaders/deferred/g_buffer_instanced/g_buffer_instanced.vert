@@ -0,0 +1,63 @@
+#version 430 core
+
+layout (location = 0) in vec3 vertex;
+layout (location = 1) in vec3 normal;
+layout (location = 2) in vec2 uv;
+// data of the instance, from the instance buffer of its batch (set by InstanceBatchManager)
+layout (location = 3) in mat4 model;
+layout (location = 7) in vec4 texture_rect;
+layout (location = 8) in int material_index;
+layout (location = 9) in int texture_layer;
+
+out vec3 frag_position;
+out vec3 frag_normal;
+out vec2 frag_uv;
+flat out vec4 frag_texture_rect;
+flat out int frag_material_index;
+flat out int frag_texture_layer;
+
+// per frame data, shared by every shader (UniformBufferManager)
+layout (std140) uniform FrameData {
+    mat4 view;
+    mat4 projection;
+    vec3 eye;
+    float time;
+};
+
+// decoding of the compressed vertex format: positions quantized inside the bounding box of the mesh and octahedral
+// normals (set by MeshManager.bind_vertex_format)
+uniform bool compressed_vertices;
+uniform vec3 position_offset;
+uniform vec3 position_scale;
+
+vec3 decode_position(vec3 position) {
+    return compressed_vertices ? position_offset + position * position_scale : position;
+}
+
+vec3 decode_normal(vec3 normal) {
+    if (!compressed_vertices) {
+        return normal;
+    }
+
+    // unfold the lower half of the octahedron
+    vec3 decoded = vec3(normal.xy, 1.0 - abs(normal.x) - abs(normal.y));
+    float fold = max(-decoded.z, 0.0);
+    decoded.x += decoded.x >= 0.0 ? -fold : fold;
+    decoded.y += decoded.y >= 0.0 ? -fold : fold;
+
+    return normalize(decoded);
+}
+
+void main() {
+    vec4 world_position = model * vec4(decode_position(vertex), 1.0);
+    frag_position = world_position.xyz;
+    frag_uv = uv;
+    frag_texture_rect = texture_rect;
+    frag_material_index = material_index;
+    frag_texture_layer = texture_layer;
+
+    mat3 normal_matrix = transpose(inverse(mat3(model)));
+    frag_normal = normal_matrix * decode_normal(normal);
+
+    gl_Position = projection * view * world_position;
+}
@@ -4,20 +4,36 @@
 // in vec3 frag_normal;
 in vec2 frag_uv;
 
-uniform vec3 lights[100];
-uniform vec3 eye;
+// per frame data, shared by every shader (UniformBufferManager)
+layout (std140) uniform FrameData {
+    mat4 view;
+    mat4 projection;
+    vec3 eye;
+    float time;
+};
+
+// lights of the scene, shared by every shader (UniformBufferManager)
+layout (std140) uniform LightData {
+    vec3 lights[100];
+    vec3 light_colors[100];
+    float light_strengths[100];
+    vec3 light_ambient;
+    float lights_count;
+    vec3 light_diffuse;
+    vec3 light_specular;
+};
+
+// light casting the shadows and its cubemap, shared by every shader (UniformBufferManager)
+layout (std140) uniform ShadowData {
+    mat4 cube_matrices[6];
+    vec3 light;
+    float far_plane;
+};
 
 // uniform vec3 albedo;
 // uniform float roughness;
 // uniform float metallic;
 
-uniform vec3 light_colors[100];
-uniform float light_strengths[100];
-uniform float lights_count;
-
-uniform float far_plane;
-uniform vec3 light;
-
 layout (binding = 0) uniform sampler2D position;
 layout (binding = 1) uniform sampler2D normal;
 layout (binding = 2) uniform sampler2D albedo_spec;
@@ -27,6 +43,10 @@ layout (binding = 4) uniform samplerCube irradiance_map;
 layout (binding = 5) uniform samplerCube reflection_map;
 layout (binding = 6) uniform sampler2D brdf_integration;
 
+// irradiance of the environment as 9 L2 spherical harmonics coefficients, replacing the irradiance map when set
+uniform vec3 irradiance_sh[9];
+uniform bool use_irradiance_sh;
+
 out vec4 frag_color;
 
 const float e = 2.71828;
@@ -45,6 +65,21 @@ vec3 fresnel_schlick_roughness(float cosTheta, vec3 F0, float roughness) {
     return F0 + (max(vec3(1.0 - roughness), F0) - F0) * pow(clamp(1.0 - cosTheta, 0.0, 1.0), 5.0);
 }  
 
+vec3 sh_irradiance(vec3 n) {
+    // same constants and order as utils.spherical_harmonics.SH_BASIS
+    vec3 irradiance = irradiance_sh[0] * 0.282095
+        + irradiance_sh[1] * 0.488603 * n.y
+        + irradiance_sh[2] * 0.488603 * n.z
+        + irradiance_sh[3] * 0.488603 * n.x
+        + irradiance_sh[4] * 1.092548 * n.x * n.y
+        + irradiance_sh[5] * 1.092548 * n.y * n.z
+        + irradiance_sh[6] * 0.315392 * (3.0 * n.z * n.z - 1.0)
+        + irradiance_sh[7] * 1.092548 * n.x * n.z
+        + irradiance_sh[8] * 0.546274 * (n.x * n.x - n.y * n.y);
+
+    return max(irradiance, vec3(0.0));
+}
+
 float DistributionGGX(vec3 N, vec3 H, float roughness) {
     float a      = roughness*roughness;
     float a2     = a*a;
@@ -150,7 +185,7 @@ void main() {
     vec3 diffuse_energy = 1.0 - specular_energy;
     diffuse_energy *= 1.0 - metallic;
 
-    vec3 irradiance = texture(irradiance_map, normal).rgb;
+    vec3 irradiance = use_irradiance_sh ? sh_irradiance(normal) : texture(irradiance_map, normal).rgb;
     vec3 diffuse = irradiance * albedo;
 
     const float MAX_REFLECTION_LOD = 4.0;
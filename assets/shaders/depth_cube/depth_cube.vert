@@ -3,6 +3,16 @@ layout (location = 0) in vec3 vertex;
 
 uniform mat4 model;
 
+// decoding of the compressed vertex format: positions quantized inside the bounding box of the mesh and octahedral
+// normals (set by MeshManager.bind_vertex_format)
+uniform bool compressed_vertices;
+uniform vec3 position_offset;
+uniform vec3 position_scale;
+
+vec3 decode_position(vec3 position) {
+    return compressed_vertices ? position_offset + position * position_scale : position;
+}
+
 void main() {
-    gl_Position = model * vec4(vertex, 1.0);
+    gl_Position = model * vec4(decode_position(vertex), 1.0);
 }  
\ No newline at end of file
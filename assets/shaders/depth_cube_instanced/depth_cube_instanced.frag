@@ -2,8 +2,12 @@
 
 in vec4 FragPos;
 
-uniform vec3 light;
-uniform float far_plane;
+// light casting the shadows and its cubemap, shared by every shader (UniformBufferManager)
+layout (std140) uniform ShadowData {
+    mat4 cube_matrices[6];
+    vec3 light;
+    float far_plane;
+};
 
 void main() {
     // get distance between fragment and light source
@@ -10,20 +10,38 @@ layout(location = 9) in vec3 specular;
 layout(location = 10) in float shininess;
 
 // uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
-uniform vec3 light;
-uniform vec3 eye;
+
+// per frame data, shared by every shader (UniformBufferManager)
+layout (std140) uniform FrameData {
+    mat4 view;
+    mat4 projection;
+    vec3 eye;
+    float time;
+};
+
+// lights of the scene, shared by every shader (UniformBufferManager)
+layout (std140) uniform LightData {
+    vec3 lights[100];
+    vec3 light_colors[100];
+    float light_strengths[100];
+    vec3 light_ambient;
+    float lights_count;
+    vec3 light_diffuse;
+    vec3 light_specular;
+};
+
+// light casting the shadows and its cubemap, shared by every shader (UniformBufferManager)
+layout (std140) uniform ShadowData {
+    mat4 cube_matrices[6];
+    vec3 light;
+    float far_plane;
+};
 
 // uniform vec3 ambient;
 // uniform vec3 diffuse;
 // uniform vec3 specular;
 // uniform float shininess;
 
-uniform vec3 light_ambient;
-uniform vec3 light_diffuse;
-uniform vec3 light_specular;
-
 out vec3 frag_position;
 out vec3 frag_normal;
 out vec3 frag_light;
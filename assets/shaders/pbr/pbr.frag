@@ -2,20 +2,38 @@
 
 in vec3 frag_position;
 in vec3 frag_normal;
-uniform vec3 lights[100];
-uniform vec3 eye;
+
+// per frame data, shared by every shader (UniformBufferManager)
+layout (std140) uniform FrameData {
+    mat4 view;
+    mat4 projection;
+    vec3 eye;
+    float time;
+};
+
+// lights of the scene, shared by every shader (UniformBufferManager)
+layout (std140) uniform LightData {
+    vec3 lights[100];
+    vec3 light_colors[100];
+    float light_strengths[100];
+    vec3 light_ambient;
+    float lights_count;
+    vec3 light_diffuse;
+    vec3 light_specular;
+};
+
+// light casting the shadows and its cubemap, shared by every shader (UniformBufferManager)
+layout (std140) uniform ShadowData {
+    mat4 cube_matrices[6];
+    vec3 light;
+    float far_plane;
+};
 
 uniform vec3 albedo;
 uniform float roughness;
 uniform float metallic;
 
-uniform vec3 light_colors[100];
-uniform float light_strengths[100];
-uniform float lights_count;
-
-uniform float far_plane;
 layout (binding = 3) uniform samplerCube depth_map;
-uniform vec3 light;
 
 layout (binding = 4) uniform samplerCube irradiance_map;
 layout (binding = 5) uniform samplerCube reflection_map;
@@ -5,15 +5,46 @@ layout(location = 1) in vec3 normal;
 layout(location = 2) in vec2 uv;
 
 uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
+
+// per frame data, shared by every shader (UniformBufferManager)
+layout (std140) uniform FrameData {
+    mat4 view;
+    mat4 projection;
+    vec3 eye;
+    float time;
+};
+
+// decoding of the compressed vertex format: positions quantized inside the bounding box of the mesh and octahedral
+// normals (set by MeshManager.bind_vertex_format)
+uniform bool compressed_vertices;
+uniform vec3 position_offset;
+uniform vec3 position_scale;
+
+vec3 decode_position(vec3 position) {
+    return compressed_vertices ? position_offset + position * position_scale : position;
+}
+
+vec3 decode_normal(vec3 normal) {
+    if (!compressed_vertices) {
+        return normal;
+    }
+
+    // unfold the lower half of the octahedron
+    vec3 decoded = vec3(normal.xy, 1.0 - abs(normal.x) - abs(normal.y));
+    float fold = max(-decoded.z, 0.0);
+    decoded.x += decoded.x >= 0.0 ? -fold : fold;
+    decoded.y += decoded.y >= 0.0 ? -fold : fold;
+
+    return normalize(decoded);
+}
 
 out vec3 frag_position;
 out vec3 frag_normal;
 
 void main() {
     mat4 mvp = projection * view * model;
-    gl_Position = mvp * vec4(vertex, 1.0);
-    frag_position = vec3(model * vec4(vertex, 1.0));
-    frag_normal = mat3(transpose(inverse(model))) * normal;
+    vec3 position = decode_position(vertex);
+    gl_Position = mvp * vec4(position, 1.0);
+    frag_position = vec3(model * vec4(position, 1.0));
+    frag_normal = mat3(transpose(inverse(model))) * decode_normal(normal);
 }
\ No newline at end of file
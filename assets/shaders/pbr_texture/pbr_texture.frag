@@ -3,19 +3,37 @@
 in vec3 frag_position;
 in vec3 frag_normal;
 in vec2 frag_uv;
-uniform vec3 lights[100];
+
+// lights of the scene, shared by every shader (UniformBufferManager)
+layout (std140) uniform LightData {
+    vec3 lights[100];
+    vec3 light_colors[100];
+    float light_strengths[100];
+    vec3 light_ambient;
+    float lights_count;
+    vec3 light_diffuse;
+    vec3 light_specular;
+};
+
 in vec3 frag_eye;
 
 in vec3 frag_albedo;
 in float frag_roughness;
 in float frag_metallic;
 
-uniform vec3 light_colors[100];
-uniform float light_strengths[100];
-
-uniform float lights_count;
-
-uniform sampler2D color_texture;
+// textures of the models, packed as layers of texture arrays (set by TextureArrayManager.bind)
+uniform sampler2DArray textures;
+// layer of the texture of the model, negative when the model has no texture
+uniform int texture_layer;
+// offset and scale of the UVs of the texture inside its layer
+uniform vec4 texture_rect;
+
+vec4 sample_texture(vec2 uv) {
+    // repeat the texture inside its rect, with the derivatives of the continuous UVs to select the right mip
+    vec2 scale = texture_rect.zw;
+    vec2 layer_uv = texture_rect.xy + fract(uv) * scale;
+    return textureGrad(textures, vec3(layer_uv, texture_layer), dFdx(uv) * scale, dFdy(uv) * scale);
+}
 
 out vec4 frag_color;
 
@@ -65,7 +83,7 @@ float GeometrySmith(vec3 N, vec3 V, vec3 L, float roughness)
 void main() {
     float ao = 1.0;
     
-    vec4 tex_color = texture(color_texture, frag_uv);
+    vec4 tex_color = texture_layer < 0 ? vec4(1.0) : sample_texture(frag_uv);
     vec3 albedo = vec3(tex_color.x, tex_color.y, tex_color.z);
 
     // float light_strength = frag_light_strength;
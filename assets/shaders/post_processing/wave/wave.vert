@@ -2,7 +2,13 @@
 layout (location = 0) in vec2 vertex;
 layout (location = 2) in vec2 uv;
 
-uniform float time;
+// per frame data, shared by every shader (UniformBufferManager)
+layout (std140) uniform FrameData {
+    mat4 view;
+    mat4 projection;
+    vec3 eye;
+    float time;
+};
 
 out vec2 frag_uv;
 out float frag_time;
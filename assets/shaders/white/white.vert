@@ -3,8 +3,14 @@
 layout (location = 0) in vec3 vertex;
 
 uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
+
+// per frame data, shared by every shader (UniformBufferManager)
+layout (std140) uniform FrameData {
+    mat4 view;
+    mat4 projection;
+    vec3 eye;
+    float time;
+};
 
 void main() {
     gl_Position = projection * view * model * vec4(vertex, 1.0);
@@ -0,0 +1,75 @@
+"""Asset pipeline command line.
+
+Run from the root of the repository:
+    python src/assets.py bake [--force] [--workers N] [--[no-]optimize] [--[no-]overdraw] [--lods N]
+    python src/assets.py compress [--force] [--workers N] [--format auto|bc1|bc3]
+"""
+
+import argparse
+
+from utils import messages
+from utils.asset_baker import ASSETS_DIRECTORY, bake_assets, compress_textures
+from utils.bc_encoder import ENCODED_COMPRESSIONS
+
+
+def main() -> None:
+    """Parse the command line and run the selected command."""
+    parser = argparse.ArgumentParser(description='Pyllium3D asset pipeline')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    bake_parser = subparsers.add_parser('bake', help='convert the source assets into their runtime formats')
+    bake_parser.add_argument('--assets', default=ASSETS_DIRECTORY, help='root folder of the assets')
+    bake_parser.add_argument('--force', action='store_true', help='bake every asset, even the unchanged ones')
+    bake_parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    bake_parser.add_argument(
+        '--optimize',
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help='optimize the meshes for the vertex cache (defaults to the meshes settings)',
+    )
+    bake_parser.add_argument(
+        '--overdraw',
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help='sort the triangles of the meshes to reduce overdraw (defaults to the meshes settings)',
+    )
+    bake_parser.add_argument(
+        '--lods',
+        type=int,
+        default=None,
+        help='number of levels of detail generated for every mesh (defaults to the meshes settings)',
+    )
+
+    compress_parser = subparsers.add_parser(
+        'compress', help='block compress the textures into DDS files, loaded instead of the images'
+    )
+    compress_parser.add_argument('--assets', default=ASSETS_DIRECTORY, help='root folder of the assets')
+    compress_parser.add_argument('--force', action='store_true', help='compress every texture, even the unchanged ones')
+    compress_parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    compress_parser.add_argument(
+        '--format',
+        choices=('auto', *ENCODED_COMPRESSIONS),
+        default='auto',
+        help='block compression, auto uses BC1 for the opaque textures and BC3 for the others',
+    )
+
+    arguments = parser.parse_args()
+
+    # there is no glfw context to take the timestamps from
+    messages.verbose = False
+
+    if arguments.command == 'bake':
+        bake_assets(
+            arguments.assets,
+            arguments.force,
+            arguments.workers,
+            arguments.optimize,
+            arguments.overdraw,
+            arguments.lods,
+        )
+    elif arguments.command == 'compress':
+        compress_textures(arguments.assets, arguments.format, arguments.force, arguments.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+"""Benchmarks module.
+
+Every benchmark is a standalone script, run from the root of the repository with:
+`PYTHONPATH=src python -m benchmarks.<benchmark_name>`
+"""
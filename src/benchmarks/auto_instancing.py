@@ -0,0 +1,139 @@
+"""Benchmark of the g-buffer pass of the 2000 spheres scene, drawn model by model and with automatic instancing.
+
+Run from the root of the repository:
+    PYTHONPATH=src python -m benchmarks.auto_instancing [--frames N] [--models N] [--moving N]
+"""
+
+# ruff: noqa: F403, F405
+
+import argparse
+import random
+
+import glm
+import numpy as np
+from OpenGL.GL import *
+
+from benchmarks.gl_context import create_hidden_context
+from benchmarks.indirect_draws import render_loop, time_frames
+from renderer.material.material import Material
+from renderer.model.model import Model
+from renderer.renderer_manager.managers.instance_batch_manager import InstanceBatchManager
+from renderer.renderer_manager.managers.material_buffer_manager import MaterialBufferManager
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from renderer.renderer_manager.managers.texture_array_manager import TextureArrayManager
+from renderer.renderer_manager.managers.uniform_buffer_manager import UniformBufferManager
+from renderer.shader.shader import Shader
+from utils import create_g_buffer, get_ogl_matrix
+
+
+def render_instanced(
+    shader: Shader,
+    mesh_manager: MeshManager,
+    instance_batch_manager: InstanceBatchManager,
+    visible: list[tuple[Model, str]],
+    materials: dict[str, Material],
+    model_matrices: dict[str, np.ndarray],
+    moving: int,
+) -> None:
+    """Draw the models with the instanced draws of InstanceBatchManager, moving some of them before every frame."""
+    # move the first models a little, their instances are the only ones uploaded again
+    for model, _ in visible[:moving]:
+        model_matrices[model.name] = model_matrices[model.name].copy()
+        model_matrices[model.name][3, 1] += random.uniform(-0.01, 0.01)
+
+    shader.use()
+    instance_batch_manager.begin_frame()
+    instance_batch_manager.draw(
+        'deferred', visible, shader, mesh_manager, TextureArrayManager(), materials, model_matrices
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mesh', default='assets/models/default/sphere.json')
+    parser.add_argument('--models', type=int, default=2000)
+    parser.add_argument('--moving', type=int, default=0, help='models moved before every frame')
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    arguments = parser.parse_args()
+
+    if create_hidden_context(arguments.width, arguments.height) is None:
+        return
+
+    mesh_manager = MeshManager()
+    mesh_manager.upload_mesh('sphere', MeshManager.read_mesh(arguments.mesh))
+
+    g_buffer = create_g_buffer(arguments.width, arguments.height)[0]
+    glViewport(0, 0, arguments.width, arguments.height)
+    glEnable(GL_DEPTH_TEST)
+
+    loop_shader = Shader(
+        './assets/shaders/deferred/g_buffer/g_buffer.vert', './assets/shaders/deferred/g_buffer/g_buffer.frag'
+    )
+    instanced_shader = Shader(
+        './assets/shaders/deferred/g_buffer_instanced/g_buffer_instanced.vert',
+        './assets/shaders/deferred/g_buffer_instanced/g_buffer_instanced.frag',
+    )
+
+    # same camera and placement of the spheres as the default scene, with a material for every sphere
+    view = glm.lookAt(glm.vec3(0, 20, 45), glm.vec3(0, 20, 0), glm.vec3(0, 1, 0))
+    projection = glm.perspective(glm.radians(60.0), arguments.width / arguments.height, 0.1, 10000.0)
+    UniformBufferManager().update_frame(view, projection, glm.vec3(0, 20, 45), 0.0)
+
+    random.seed(0)
+    material_buffer_manager = MaterialBufferManager()
+    models = []
+    visible = []
+    materials = {}
+    model_matrices = {}
+    for i in range(arguments.models):
+        material = materials[f'material_{i}'] = Material(
+            f'material_{i}', diffuse=[random.random(), random.random(), random.random()]
+        )
+        material_buffer_manager.add(material)
+        model_matrix = model_matrices[f'sphere_{i}'] = get_ogl_matrix(
+            glm.translate(
+                glm.mat4(1.0),
+                glm.vec3((random.random() - 0.5) * 40, (random.random() - 0.5) * 40 + 20, (random.random() - 0.5) * 40),
+            )
+        )
+        models.append((model_matrix, material))
+        visible.append((Model(f'sphere_{i}', mesh='sphere', material=material.name), 'sphere'))
+
+    material_buffer_manager.upload()
+    instance_batch_manager = InstanceBatchManager()
+
+    print(f'{arguments.models} x {arguments.mesh}, {arguments.moving} moving, {arguments.frames} frames')
+    print(f'{"submission":>10} | {"GPU (ms)":>9} | {"CPU (ms)":>9}')
+
+    results = {}
+    for name, render in (
+        ('loop', lambda: render_loop(loop_shader, mesh_manager, models)),
+        (
+            'instanced',
+            lambda: render_instanced(
+                instanced_shader,
+                mesh_manager,
+                instance_batch_manager,
+                visible,
+                materials,
+                model_matrices,
+                arguments.moving,
+            ),
+        ),
+    ):
+        gpu_time, cpu_time = time_frames(render, g_buffer, arguments.frames)
+        results[name] = cpu_time
+
+        print(f'{name:>10} | {gpu_time:>9.3f} | {cpu_time:>9.3f}')
+
+    instance_batch_manager.begin_frame()
+    stats = instance_batch_manager.stats.get('deferred', {})
+    print(f'instances uploaded in the last frame: {stats.get("uploaded_instances", 0):,}')
+    print(f'instancing speedup (CPU): {results["loop"] / max(results["instanced"], 1e-9):.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Hidden OpenGL context for the benchmarks that need the GPU."""
+
+import glfw
+
+from utils import print_error
+
+
+def create_hidden_context(width: int = 800, height: int = 600, major: int = 4, minor: int = 5) -> any:
+    """Create an invisible GLFW window and make its OpenGL context current.
+
+    Args:
+        width (int, optional): Width of the framebuffer. Defaults to 800.
+        height (int, optional): Height of the framebuffer. Defaults to 600.
+        major (int, optional): Major OpenGL version. Defaults to 4.
+        minor (int, optional): Minor OpenGL version. Defaults to 5.
+
+    Returns:
+        any: GLFW window handle, None if the context couldn't be created
+
+    """
+    if not glfw.init():
+        print_error('Could not start GLFW')
+        return None
+
+    glfw.window_hint(glfw.VISIBLE, glfw.FALSE)
+    glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, major)
+    glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, minor)
+
+    window = glfw.create_window(width, height, 'benchmark', None, None)
+
+    if not window:
+        print_error('Could not create an OpenGL context')
+        glfw.terminate()
+        return None
+
+    glfw.make_context_current(window)
+
+    return window
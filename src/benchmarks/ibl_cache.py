@@ -0,0 +1,90 @@
+"""Benchmark of the startup of the skybox, precomputing its image based lighting maps or reading them from the cache,
+with the irradiance as spherical harmonics and as a cubemap.
+
+Run from the root of the repository:
+    PYTHONPATH=src python -m benchmarks.ibl_cache [--skybox PATH] [--repeat N]
+"""
+
+# ruff: noqa: F403, F405
+
+import argparse
+import tempfile
+
+import numpy as np
+from OpenGL.GL import *
+
+import utils.ibl_cache
+from benchmarks.gl_context import create_hidden_context
+from renderer.raster_renderer.raster_renderer_modules import RasterSkyboxRenderer
+
+# corners and triangles of the unit cube the skybox shaders draw
+CUBE_VERTICES = np.array(
+    [[x, y, z] for x in (-1.0, 1.0) for y in (-1.0, 1.0) for z in (-1.0, 1.0)],
+    dtype=np.float32,
+)
+CUBE_INDICES = np.array(
+    [
+        [0, 1, 3, 0, 3, 2],
+        [4, 6, 7, 4, 7, 5],
+        [0, 4, 5, 0, 5, 1],
+        [2, 3, 7, 2, 7, 6],
+        [0, 2, 6, 0, 6, 4],
+        [1, 5, 7, 1, 7, 3],
+    ],
+    dtype=np.uint32,
+)
+
+
+def bind_cube() -> None:
+    """Upload the cube and bind its vertex array, like RasterRenderer binds the default mesh."""
+    vao = glGenVertexArrays(1)
+    glBindVertexArray(vao)
+
+    vbo, ebo = glGenBuffers(2)
+    glBindBuffer(GL_ARRAY_BUFFER, vbo)
+    glBufferData(GL_ARRAY_BUFFER, CUBE_VERTICES.nbytes, CUBE_VERTICES, GL_STATIC_DRAW)
+    glEnableVertexAttribArray(0)
+    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
+
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
+    glBufferData(GL_ELEMENT_ARRAY_BUFFER, CUBE_INDICES.nbytes, CUBE_INDICES, GL_STATIC_DRAW)
+
+
+def best_load_time(path: str, cache: bool, irradiance: str, repeat: int) -> float:
+    """Create the skybox renderer several times, keeping the fastest load of its maps, in seconds."""
+    return min(RasterSkyboxRenderer(path, cache=cache, irradiance=irradiance).load_time for _ in range(repeat))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--skybox', default='assets/textures/skybox/dark/')
+    parser.add_argument('--repeat', type=int, default=3)
+    arguments = parser.parse_args()
+
+    if create_hidden_context() is None:
+        return
+
+    bind_cube()
+
+    print(f'{"irradiance":>10} | {"precomputed (ms)":>16} | {"first run (ms)":>14} | {"cached (ms)":>11} | speedup')
+
+    for irradiance in ('sh', 'cubemap'):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # keep the cache of the benchmark away from the one of the application
+            utils.ibl_cache.IBL_CACHE_DIRECTORY = tmp_dir
+
+            precomputed_time = best_load_time(arguments.skybox, False, irradiance, arguments.repeat)
+
+            # the first cached load misses and writes the cache, the next ones read it
+            miss_time = RasterSkyboxRenderer(arguments.skybox, cache=True, irradiance=irradiance).load_time
+            cached_time = best_load_time(arguments.skybox, True, irradiance, arguments.repeat)
+
+        print(
+            f'{irradiance:>10} | {precomputed_time * 1000:>16.3f} | {miss_time * 1000:>14.3f} | '
+            f'{cached_time * 1000:>11.3f} | {precomputed_time / max(cached_time, 1e-9):>6.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
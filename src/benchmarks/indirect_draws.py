@@ -0,0 +1,154 @@
+"""Benchmark of the g-buffer pass of the 2000 spheres scene, drawn model by model and with indirect draws.
+
+Run from the root of the repository:
+    PYTHONPATH=src python -m benchmarks.indirect_draws [--frames N] [--models N]
+"""
+
+# ruff: noqa: F403, F405
+
+import argparse
+import random
+import statistics
+import time
+
+import glm
+from OpenGL.GL import *
+
+from benchmarks.gl_context import create_hidden_context
+from renderer.material.material import Material
+from renderer.renderer_manager.managers.indirect_draw_manager import IndirectDrawManager
+from renderer.renderer_manager.managers.material_buffer_manager import MaterialBufferManager
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from renderer.renderer_manager.managers.uniform_buffer_manager import UniformBufferManager
+from renderer.shader.shader import Shader
+from utils import create_g_buffer, get_ogl_matrix, get_query_time
+
+
+def render_loop(shader: Shader, mesh_manager: MeshManager, models: list[tuple[any, Material]]) -> None:
+    """Draw every model with its own draw call, like the loop of RasterDeferredRenderer.render."""
+    shader.use()
+    set_material_index = shader.setter('material_index')
+    set_model = shader.setter('model')
+
+    glBindVertexArray(mesh_manager.vao('sphere'))
+    mesh_manager.bind_vertex_format(shader, 'sphere')
+    shader.bind_uniform('texture_layer', -1)
+
+    for model_matrix, material in models:
+        set_material_index(material.index)
+        set_model(model_matrix)
+        mesh_manager.draw('sphere')
+
+
+def render_indirect(
+    shader: Shader, mesh_manager: MeshManager, indirect_draw_manager: IndirectDrawManager, models: list
+) -> None:
+    """Collect every model and draw them with indirect draws, like RasterDeferredRenderer.render does."""
+    shader.use()
+    indirect_draw_manager.begin_pass('deferred')
+
+    for model_matrix, material in models:
+        indirect_draw_manager.add('sphere', mesh_manager, model_matrix, material.index, None)
+
+    indirect_draw_manager.submit()
+
+
+def time_frames(render: callable, g_buffer: int, frames: int) -> tuple[float, float]:
+    """Render the g-buffer pass several times.
+
+    Returns:
+        tuple[float, float]: Median GPU time and median CPU time of a frame in ms
+
+    """
+    query = glGenQueries(1)[0]
+
+    def frame() -> None:
+        glBindFramebuffer(GL_FRAMEBUFFER, g_buffer)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        render()
+
+    # warm up the driver before timing
+    frame()
+    glFinish()
+
+    gpu_times = []
+    cpu_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        glBeginQuery(GL_TIME_ELAPSED, query)
+        frame()
+        glEndQuery(GL_TIME_ELAPSED)
+        cpu_times.append((time.perf_counter() - start) * 1000)
+        gpu_times.append(get_query_time(query))
+
+    return statistics.median(gpu_times), statistics.median(cpu_times)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mesh', default='assets/models/default/sphere.json')
+    parser.add_argument('--models', type=int, default=2000)
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    arguments = parser.parse_args()
+
+    if create_hidden_context(arguments.width, arguments.height) is None:
+        return
+
+    mesh_manager = MeshManager()
+    mesh_manager.upload_mesh('sphere', MeshManager.read_mesh(arguments.mesh))
+
+    g_buffer = create_g_buffer(arguments.width, arguments.height)[0]
+    glViewport(0, 0, arguments.width, arguments.height)
+    glEnable(GL_DEPTH_TEST)
+
+    loop_shader = Shader(
+        './assets/shaders/deferred/g_buffer/g_buffer.vert', './assets/shaders/deferred/g_buffer/g_buffer.frag'
+    )
+    indirect_shader = Shader(
+        './assets/shaders/deferred/g_buffer_indirect/g_buffer_indirect.vert',
+        './assets/shaders/deferred/g_buffer_indirect/g_buffer_indirect.frag',
+    )
+
+    # same camera and placement of the spheres as the default scene, with a material for every sphere
+    view = glm.lookAt(glm.vec3(0, 20, 45), glm.vec3(0, 20, 0), glm.vec3(0, 1, 0))
+    projection = glm.perspective(glm.radians(60.0), arguments.width / arguments.height, 0.1, 10000.0)
+    UniformBufferManager().update_frame(view, projection, glm.vec3(0, 20, 45), 0.0)
+
+    random.seed(0)
+    material_buffer_manager = MaterialBufferManager()
+    models = []
+    for i in range(arguments.models):
+        material = Material(f'material_{i}', diffuse=[random.random(), random.random(), random.random()])
+        material_buffer_manager.add(material)
+        model_matrix = get_ogl_matrix(
+            glm.translate(
+                glm.mat4(1.0),
+                glm.vec3((random.random() - 0.5) * 40, (random.random() - 0.5) * 40 + 20, (random.random() - 0.5) * 40),
+            )
+        )
+        models.append((model_matrix, material))
+
+    material_buffer_manager.upload()
+    indirect_draw_manager = IndirectDrawManager()
+
+    print(f'{arguments.models} x {arguments.mesh}, {arguments.frames} frames')
+    print(f'{"submission":>10} | {"GPU (ms)":>9} | {"CPU (ms)":>9}')
+
+    results = {}
+    for name, render in (
+        ('loop', lambda: render_loop(loop_shader, mesh_manager, models)),
+        ('indirect', lambda: render_indirect(indirect_shader, mesh_manager, indirect_draw_manager, models)),
+    ):
+        gpu_time, cpu_time = time_frames(render, g_buffer, arguments.frames)
+        results[name] = cpu_time
+
+        print(f'{name:>10} | {gpu_time:>9.3f} | {cpu_time:>9.3f}')
+
+    print(f'indirect speedup (CPU): {results["loop"] / max(results["indirect"], 1e-9):.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Benchmark of the JSON and binary mesh loaders on every mesh in assets/models/default.
+
+Only the --gl mode times a startup load (reading the file and uploading a new mesh). Without it, the JSON side is
+parsed in full while the binary side is only mapped and read, so its column is a map time, not a load time.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from utils.mesh_file import MESH_FILE_EXTENSION, read_binary_mesh, write_binary_mesh
+
+
+def read_json_mesh(file_path: str) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Do the CPU side work of MeshManager.new_json_mesh."""
+    with open(file_path) as f:
+        data = json.load(f)
+
+    return (
+        np.array(data['indices'], dtype=np.uint32),
+        np.array(data['vertices'], dtype=np.float32),
+        np.array(data['normals'], dtype=np.float32),
+        np.array(data['uvs'], dtype=np.float32),
+    )
+
+
+def read_mapped_mesh(file_path: str) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Do the CPU side work of MeshManager.new_binary_mesh, touching every mapped page like glBufferData would."""
+    mesh = read_binary_mesh(file_path)
+
+    for block in (mesh.indices, mesh.vertices, mesh.normals, mesh.uvs):
+        block.max(initial=0)
+
+    return (mesh.indices, mesh.vertices, mesh.normals, mesh.uvs)
+
+
+def best_of(repeat: int, function: callable, *args: any) -> float:
+    """Run a function several times and return the fastest execution time in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--path', default='assets/models/default')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--gl', action='store_true', help='also time the GPU upload through MeshManager')
+    arguments = parser.parse_args()
+
+    json_files = sorted(file for file in os.listdir(arguments.path) if file.endswith('.json'))
+
+    mesh_manager = None
+    if arguments.gl:
+        from benchmarks.gl_context import create_hidden_context
+        from renderer.renderer_manager.managers.mesh_manager import MeshManager
+
+        from utils.asset_baker import AssetManifest
+        from utils.config import Config
+
+        if create_hidden_context() is not None:
+            # every repeat loads a new mesh, that mustn't reuse the data of the meshes already resident
+            mesh_manager = MeshManager(deduplicate=False)
+            # compare the source formats, ignoring the baked assets and without optimizing, simplifying (and caching)
+            # the meshes
+            AssetManifest().entries = {}
+            Config().setup.setdefault('meshes', {}).update(optimize=False, lod_levels=0)
+
+    # the binary column only times mapping the file without --gl
+    binary_column = 'binary (ms)' if mesh_manager is not None else 'map (ms)'
+    names = itertools.count()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(
+            f'{"mesh":>12} | {"json size":>10} | {"bin size":>10} | {"json (ms)":>10} | {binary_column:>11} | speedup'
+        )
+
+        total_json = 0.0
+        total_binary = 0.0
+
+        for file in json_files:
+            json_path = os.path.join(arguments.path, file)
+            binary_path = os.path.join(tmp_dir, os.path.splitext(file)[0] + MESH_FILE_EXTENSION)
+
+            # convert the JSON mesh to the binary format
+            write_binary_mesh(binary_path, *read_json_mesh(json_path))
+
+            if mesh_manager is not None:
+                from OpenGL.GL import glFinish
+
+                loaded = []
+
+                # a new name on every repeat, so that every load creates a mesh like at startup
+                def load_json(path: str) -> None:
+                    loaded.append(f'json_{next(names)}')
+                    mesh_manager.new_json_mesh(loaded[-1], path, stream=False)
+                    glFinish()
+
+                def load_binary(path: str) -> None:
+                    loaded.append(f'binary_{next(names)}')
+                    mesh_manager.new_binary_mesh(loaded[-1], path, stream=False)
+                    glFinish()
+
+                json_time = best_of(arguments.repeat, load_json, json_path)
+                binary_time = best_of(arguments.repeat, load_binary, binary_path)
+
+                for name in loaded:
+                    mesh_manager.remove_mesh(name)
+            else:
+                json_time = best_of(arguments.repeat, read_json_mesh, json_path)
+                binary_time = best_of(arguments.repeat, read_mapped_mesh, binary_path)
+
+            total_json += json_time
+            total_binary += binary_time
+
+            print(
+                f'{os.path.splitext(file)[0]:>12} | '
+                f'{os.path.getsize(json_path) / 1024:>8.1f}kB | '
+                f'{os.path.getsize(binary_path) / 1024:>8.1f}kB | '
+                f'{json_time * 1000:>10.3f} | '
+                f'{binary_time * 1000:>11.3f} | '
+                f'{json_time / max(binary_time, 1e-9):>6.1f}x'
+            )
+
+        print(
+            f'{"total":>12} | {"":>10} | {"":>10} | {total_json * 1000:>10.3f} | {total_binary * 1000:>11.3f} | '
+            f'{total_json / max(total_binary, 1e-9):>6.1f}x'
+        )
+
+    if mesh_manager is None:
+        print('binary files only mapped and read, run with --gl to compare the load times of both formats')
+
+
+if __name__ == '__main__':
+    main()
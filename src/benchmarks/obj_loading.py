@@ -0,0 +1,79 @@
+"""Benchmark of the NumPy OBJ reader against pywavefront on every OBJ file in assets/models/default."""
+
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pywavefront
+
+from utils.obj_loader import read_obj
+from utils.vbo_indexer import index_vertices_vectorized
+
+
+def read_pywavefront(file_path: str) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Read and index an OBJ file the way MeshManager.new_mesh did with pywavefront."""
+    scene = pywavefront.Wavefront(file_path, collect_faces=True)
+
+    formatted_vertices = []
+    formatted_normals = []
+    formatted_uvs = []
+
+    for material in scene.materials.values():
+        for i in range(0, len(material.vertices), 8):
+            formatted_uvs.extend(material.vertices[i : i + 2])
+            formatted_normals.extend(material.vertices[i + 2 : i + 5])
+            formatted_vertices.extend(material.vertices[i + 5 : i + 8])
+
+    return index_vertices_vectorized(
+        np.array(formatted_vertices, dtype=np.float32),
+        np.array(formatted_normals, dtype=np.float32),
+        np.array(formatted_uvs, dtype=np.float32),
+    )
+
+
+def best_of(repeat: int, function: callable, *args: any) -> float:
+    """Run a function several times and return the fastest execution time in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--path', default='assets/models/default')
+    parser.add_argument('--repeat', type=int, default=3)
+    arguments = parser.parse_args()
+
+    # pywavefront logs every unsupported statement
+    logging.disable(logging.WARNING)
+
+    obj_files = sorted(file for file in os.listdir(arguments.path) if file.endswith('.obj'))
+
+    print(f'{"mesh":>12} | {"size":>10} | {"pywavefront":>15} | {"numpy":>15} | speedup | submeshes')
+
+    for file in obj_files:
+        path = os.path.join(arguments.path, file)
+        size = os.path.getsize(path) / 1_000_000
+
+        pywavefront_time = best_of(arguments.repeat, read_pywavefront, path)
+        numpy_time = best_of(arguments.repeat, read_obj, path)
+
+        print(
+            f'{os.path.splitext(file)[0]:>12} | '
+            f'{size * 1000:>8.1f}kB | '
+            f'{size / pywavefront_time:>10.1f}MB/s | '
+            f'{size / numpy_time:>10.1f}MB/s | '
+            f'{pywavefront_time / numpy_time:>6.1f}x | '
+            f'{len(read_obj(path).mesh.submeshes)}'
+        )
+
+
+if __name__ == '__main__':
+    main()
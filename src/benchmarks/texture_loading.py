@@ -0,0 +1,163 @@
+"""Benchmark of the cold (decoded), cached (mapped) and compressed (BC1/BC3 DDS) texture loads on every image in
+assets/textures, with the GPU memory of the RGBA8 and compressed textures.
+
+Run from the root of the repository:
+    PYTHONPATH=src python -m benchmarks.texture_loading [--repeat N] [--gl]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mesh_loading import best_of
+from utils.asset_baker import TEXTURE_SOURCES
+from utils.bc_encoder import compress_texture
+from utils.dds_file import DDS_FILE_EXTENSION, read_dds, write_dds
+from utils.texture_file import (
+    TEXTURE_FILE_EXTENSION,
+    TextureData,
+    read_binary_texture,
+    read_image_texture,
+    write_texture_data,
+)
+
+
+def read_cached_texture(file_path: str) -> TextureData:
+    """Do the CPU side work of a cached load, touching every mapped page like glTexSubImage2D would."""
+    return touch_texture(read_binary_texture(file_path))
+
+
+def read_compressed_texture(file_path: str) -> TextureData:
+    """Do the CPU side work of a compressed load, touching every mapped page like glCompressedTexSubImage2D would."""
+    return touch_texture(read_dds(file_path))
+
+
+def touch_texture(texture: TextureData) -> TextureData:
+    """Read every byte of every level of a texture."""
+    for _, _, data in texture.levels:
+        data.max(initial=0)
+
+    return texture
+
+
+def texture_bytes(texture: TextureData) -> int:
+    """Bytes of texel data of every level of a texture."""
+    return sum(data.nbytes for _, _, data in texture.levels)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--path', default='assets/textures')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--gl', action='store_true', help='also time the GPU upload through TextureManager')
+    arguments = parser.parse_args()
+
+    image_paths = [
+        os.path.join(arguments.path, file)
+        for file in sorted(os.listdir(arguments.path))
+        if file.lower().endswith(TEXTURE_SOURCES['textures'])
+    ]
+
+    texture_manager = None
+    if arguments.gl:
+        from benchmarks.gl_context import create_hidden_context
+        from renderer.renderer_manager.managers.texture_manager import TextureManager
+
+        if create_hidden_context() is not None:
+            texture_manager = TextureManager()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(
+            f'{"texture":>20} | {"size":>9} | {"levels":>6} | {"no mips (ms)":>12} | {"cold (ms)":>9} | '
+            f'{"cached (ms)":>11} | speedup | {"dds (ms)":>9} | {"dds size":>9} | {"saved":>6}'
+        )
+
+        total_cold = 0.0
+        total_cached = 0.0
+        total_compressed = 0.0
+        total_size = 0
+        total_compressed_size = 0
+
+        for image_path in image_paths:
+            cached_path = os.path.join(tmp_dir, os.path.basename(image_path) + TEXTURE_FILE_EXTENSION)
+
+            # store the decoded image with its mip chain, like the texture cache does
+            texture = read_image_texture(image_path, flip=True, mipmaps=True)
+            write_texture_data(cached_path, texture)
+
+            # and its block compressed version, like `python src/assets.py compress` does
+            compressed_path = os.path.join(tmp_dir, os.path.basename(image_path) + DDS_FILE_EXTENSION)
+            compressed = compress_texture(texture)
+            write_dds(compressed_path, compressed)
+
+            if texture_manager is not None:
+                from OpenGL.GL import glFinish
+
+                def load(read: callable, path: str) -> None:
+                    texture_manager.upload_texture('benchmark', read(path))
+                    glFinish()
+
+                def read_mipmapped(path: str) -> TextureData:
+                    return read_image_texture(path, True, True)
+
+                single_time = best_of(arguments.repeat, load, read_image_texture, image_path)
+                cold_time = best_of(arguments.repeat, load, read_mipmapped, image_path)
+                cached_time = best_of(arguments.repeat, load, read_binary_texture, cached_path)
+                compressed_time = best_of(arguments.repeat, load, read_dds, compressed_path)
+            else:
+                single_time = best_of(arguments.repeat, read_image_texture, image_path)
+                cold_time = best_of(arguments.repeat, read_image_texture, image_path, True, True)
+                cached_time = best_of(arguments.repeat, read_cached_texture, cached_path)
+                compressed_time = best_of(arguments.repeat, read_compressed_texture, compressed_path)
+
+            total_cold += cold_time
+            total_cached += cached_time
+            total_compressed += compressed_time
+            total_size += texture_bytes(texture)
+            total_compressed_size += texture_bytes(compressed)
+
+            print(
+                f'{os.path.basename(image_path):>20} | '
+                f'{texture_bytes(texture) / 1024:>7.0f}kB | '
+                f'{len(texture.levels):>6} | '
+                f'{single_time * 1000:>12.3f} | '
+                f'{cold_time * 1000:>9.3f} | '
+                f'{cached_time * 1000:>11.3f} | '
+                f'{cold_time / max(cached_time, 1e-9):>6.1f}x | '
+                f'{compressed_time * 1000:>9.3f} | '
+                f'{texture_bytes(compressed) / 1024:>7.0f}kB | '
+                f'{1.0 - texture_bytes(compressed) / texture_bytes(texture):>6.1%}'
+            )
+
+        print(
+            f'{"total":>20} | {total_size / 1024:>7.0f}kB | {"":>6} | {"":>12} | {total_cold * 1000:>9.3f} | '
+            f'{total_cached * 1000:>11.3f} | {total_cold / max(total_cached, 1e-9):>6.1f}x | '
+            f'{total_compressed * 1000:>9.3f} | {total_compressed_size / 1024:>7.0f}kB | '
+            f'{1.0 - total_compressed_size / max(total_size, 1):>6.1%}'
+        )
+
+    # decode every image at once on the thread pool, the decoders release the GIL
+    def decode(path: str) -> TextureData:
+        return read_image_texture(path, True, True)
+
+    start = time.perf_counter()
+    for image_path in image_paths:
+        decode(image_path)
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(image_paths) or 1) as executor:
+        list(executor.map(decode, image_paths))
+    parallel_time = time.perf_counter() - start
+
+    print(
+        f'cold decode of {len(image_paths)} images: {sequential_time * 1000:.3f}ms sequential, '
+        f'{parallel_time * 1000:.3f}ms on a thread pool ({sequential_time / max(parallel_time, 1e-9):.2f}x)'
+    )
+
+
+if __name__ == '__main__':
+    main()
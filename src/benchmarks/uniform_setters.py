@@ -0,0 +1,132 @@
+"""Benchmark of the binding of uniforms, through the previous isinstance dispatch, Shader.bind_uniform and the setters.
+
+Run from the root of the repository:
+    PYTHONPATH=src python -m benchmarks.uniform_setters [--calls N]
+"""
+
+# ruff: noqa: F403, F405
+
+import argparse
+import random
+import time
+
+import glm
+import numpy as np
+from OpenGL.GL import *
+
+from benchmarks.gl_context import create_hidden_context
+from renderer.shader.shader import Shader
+from utils import get_ogl_matrix
+
+
+def legacy_bind_uniform(shader: Shader, uniform: str, value: any, count: int = None) -> None:
+    """Bind a uniform like Shader.bind_uniform did before the setters, dispatching on the type of the value."""
+    uniform_location: int = shader.uniforms.get(uniform)
+
+    if uniform_location is None:
+        return
+
+    if isinstance(value, int):
+        glUniform1i(uniform_location, value)
+    elif isinstance(value, float):
+        glUniform1f(uniform_location, value)
+    elif isinstance(value, np.ndarray):
+        if value.shape == (2,):
+            glUniform2fv(uniform_location, 1, value)
+        elif value.shape == (3,):
+            glUniform3fv(uniform_location, 1, value)
+        elif value.shape == (4,):
+            glUniform4fv(uniform_location, 1, value)
+        elif value.shape == (3, 3):
+            glUniformMatrix3fv(uniform_location, 1, GL_FALSE, value)
+        elif value.shape == (4, 4):
+            glUniformMatrix4fv(uniform_location, 1, GL_FALSE, value)
+    elif isinstance(value, (list, tuple)) and len(value) == 2:
+        glUniform2f(uniform_location, value[0], value[1])
+    elif isinstance(value, (list, tuple)) and len(value) == 3:
+        glUniform3f(uniform_location, value[0], value[1], value[2])
+    elif isinstance(value, glm.vec2):
+        glUniform2fv(uniform_location, count if count else 1, glm.value_ptr(value))
+    elif isinstance(value, glm.vec3):
+        glUniform3fv(uniform_location, count if count else 1, glm.value_ptr(value))
+    elif isinstance(value, glm.vec4):
+        glUniform4fv(uniform_location, count if count else 1, glm.value_ptr(value))
+    elif isinstance(value, glm.mat3):
+        glUniformMatrix3fv(uniform_location, count if count else 1, GL_FALSE, glm.value_ptr(value))
+    elif isinstance(value, glm.mat4):
+        glUniformMatrix4fv(uniform_location, count if count else 1, GL_FALSE, glm.value_ptr(value))
+
+
+def calls_per_second(shader: Shader, path: str, uniform: str, values: list, calls: int) -> float:
+    """Bind the values to a uniform in turn, through one of the paths.
+
+    Returns:
+        float: Bindings per second
+
+    """
+    setter = shader.setter(uniform)
+    count = len(values)
+
+    glFinish()
+    start = time.perf_counter()
+
+    if path == 'isinstance':
+        for i in range(calls):
+            legacy_bind_uniform(shader, uniform, values[i % count])
+    elif path == 'bind_uniform':
+        for i in range(calls):
+            shader.bind_uniform(uniform, values[i % count])
+    else:
+        for i in range(calls):
+            setter(values[i % count])
+
+    glFinish()
+
+    return calls / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=100000)
+    arguments = parser.parse_args()
+
+    if create_hidden_context() is None:
+        return
+
+    # the forward PBR shader still gets the material parameters through uniforms
+    shader = Shader('./assets/shaders/pbr/pbr.vert', './assets/shaders/pbr/pbr.frag')
+    shader.use()
+
+    # model matrices of different models, like the model loops bind them, and values repeated by the materials
+    random.seed(0)
+    model_matrices = [
+        get_ogl_matrix(glm.translate(glm.mat4(1.0), glm.vec3(random.random(), random.random(), random.random())))
+        for _ in range(1000)
+    ]
+    cases = {
+        'model (changing)': ('model', model_matrices),
+        'model (repeated)': ('model', model_matrices[:1]),
+        'albedo (changing)': ('albedo', [glm.vec3(random.random()) for _ in range(1000)]),
+        'albedo (repeated)': ('albedo', [glm.vec3(0.5)]),
+        'roughness (changing)': ('roughness', [random.random() for _ in range(1000)]),
+        'roughness (repeated)': ('roughness', [0.5]),
+    }
+
+    print(f'{arguments.calls} calls per case, in calls per second')
+    print(f'{"uniform":>20} | {"isinstance":>10} | {"bind_uniform":>12} | {"setter":>10} | speedup')
+
+    for name, (uniform, values) in cases.items():
+        results = [
+            calls_per_second(shader, path, uniform, values, arguments.calls)
+            for path in ('isinstance', 'bind_uniform', 'setter')
+        ]
+
+        print(
+            f'{name:>20} | {results[0]:>10.0f} | {results[1]:>12.0f} | {results[2]:>10.0f} | '
+            f'{results[2] / max(results[0], 1e-9):>6.2f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
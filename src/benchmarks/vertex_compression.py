@@ -0,0 +1,145 @@
+"""Benchmark of the compressed vertex and index formats on the 2000 spheres scene.
+
+Prints the GPU memory used by the vertex and index data of the mesh with every layout, the vertex and index data
+fetched by the g-buffer pass in a frame, and the GPU time of the pass when an OpenGL context can be created.
+
+Run from the root of the repository:
+    PYTHONPATH=src python -m benchmarks.vertex_compression [--frames N] [--models N] [--no-gpu]
+"""
+
+# ruff: noqa: F403, F405
+
+import argparse
+import random
+
+import glm
+import numpy as np
+from OpenGL.GL import *
+
+from benchmarks.gl_context import create_hidden_context
+from benchmarks.vertex_layout import time_layout
+from renderer.material.material import Material
+from renderer.renderer_manager.managers.material_buffer_manager import MaterialBufferManager
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from renderer.renderer_manager.managers.uniform_buffer_manager import UniformBufferManager
+from renderer.shader.shader import Shader
+from utils import create_g_buffer, get_ogl_matrix
+from utils.mesh_file import MeshData
+from utils.mesh_optimizer import analyze_vertex_cache
+from utils.vertex_layout import COMPRESSED_LAYOUT, INTERLEAVED_LAYOUT, SPLIT_LAYOUT, VertexLayout
+
+MIB = 1024 * 1024
+
+
+def layout_memory(layout: VertexLayout, mesh: MeshData, index_size: int) -> tuple[int, int]:
+    """Size of the vertex and index data of a mesh with the given formats.
+
+    Returns:
+        tuple[int, int]: Bytes of vertex data and bytes of index data
+
+    """
+    return len(mesh.vertices) // 3 * layout.stride, len(mesh.indices) * index_size
+
+
+def frame_traffic(layout: VertexLayout, mesh: MeshData, index_size: int, models: int) -> int:
+    """Estimate the bytes of vertex and index data fetched to draw the mesh once for every model.
+
+    Every index is read once, and the vertices are read once for every miss of the post transform cache.
+    """
+    stats = analyze_vertex_cache(mesh.indices, len(mesh.vertices) // 3)
+    fetched_vertices = stats.acmr * len(mesh.indices) // 3
+
+    return int(models * (fetched_vertices * layout.stride + len(mesh.indices) * index_size))
+
+
+def print_memory(mesh: MeshData, models: int) -> None:
+    """Print the memory and bandwidth used by every combination of vertex layout and index size."""
+    small_indices = len(mesh.vertices) // 3 <= np.iinfo(np.uint16).max + 1
+    formats = [(SPLIT_LAYOUT, 4), (INTERLEAVED_LAYOUT, 4), (COMPRESSED_LAYOUT, 4)]
+    if small_indices:
+        formats.append((COMPRESSED_LAYOUT, 2))
+
+    print(
+        f'{"layout":>12} | {"indices":>7} | {"vertices":>10} | {"indices":>10} | {"saved":>6} | {"fetched/frame":>13}'
+    )
+
+    reference = None
+    for layout, index_size in formats:
+        vertex_bytes, index_bytes = layout_memory(layout, mesh, index_size)
+        traffic = frame_traffic(layout, mesh, index_size, models)
+        if reference is None:
+            reference = vertex_bytes + index_bytes
+
+        saved = 1.0 - (vertex_bytes + index_bytes) / reference
+        print(
+            f'{layout.name:>12} | {f"uint{index_size * 8}":>7} | {vertex_bytes / 1024:>8.1f}KB | '
+            f'{index_bytes / 1024:>8.1f}KB | {saved:>6.1%} | {traffic / MIB:>10.1f}MiB'
+        )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mesh', default='assets/models/default/sphere.json')
+    parser.add_argument('--models', type=int, default=2000)
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--no-gpu', action='store_true', help='only print the memory and bandwidth estimates')
+    arguments = parser.parse_args()
+
+    mesh = MeshManager.read_mesh(arguments.mesh)
+
+    print(f'{arguments.models} x {arguments.mesh} ({len(mesh.indices) // 3} triangles)')
+    print_memory(mesh, arguments.models)
+
+    if arguments.no_gpu or create_hidden_context(arguments.width, arguments.height) is None:
+        return
+
+    g_buffer = create_g_buffer(arguments.width, arguments.height)[0]
+    glViewport(0, 0, arguments.width, arguments.height)
+    glEnable(GL_DEPTH_TEST)
+
+    shader = Shader(
+        './assets/shaders/deferred/g_buffer/g_buffer.vert', './assets/shaders/deferred/g_buffer/g_buffer.frag'
+    )
+    shader.use()
+    # every model uses the first material of the material table
+    material_buffer_manager = MaterialBufferManager()
+    material_buffer_manager.add(Material('default', diffuse=[1.0, 1.0, 1.0], roughness=0.5, metallic=0.5))
+    material_buffer_manager.upload()
+    shader.bind_uniform('material_index', 0)
+
+    # same camera and placement of the spheres as the default scene
+    view = glm.lookAt(glm.vec3(0, 20, 45), glm.vec3(0, 20, 0), glm.vec3(0, 1, 0))
+    projection = glm.perspective(glm.radians(60.0), arguments.width / arguments.height, 0.1, 10000.0)
+    # the g-buffer shader reads the camera from the frame data
+    UniformBufferManager().update_frame(view, projection, glm.vec3(0, 20, 45), 0.0)
+
+    random.seed(0)
+    model_matrices = [
+        get_ogl_matrix(
+            glm.translate(
+                glm.mat4(1.0),
+                glm.vec3((random.random() - 0.5) * 40, (random.random() - 0.5) * 40 + 20, (random.random() - 0.5) * 40),
+            )
+        )
+        for _ in range(arguments.models)
+    ]
+
+    print(f'\n{arguments.frames} frames of the g-buffer pass')
+    print(f'{"layout":>12} | {"indices":>7} | {"GPU (ms)":>9} | {"CPU (ms)":>9}')
+
+    results = {}
+    for layout in (SPLIT_LAYOUT, INTERLEAVED_LAYOUT, COMPRESSED_LAYOUT):
+        gpu_time, cpu_time = time_layout(layout, mesh, shader, model_matrices, g_buffer, arguments.frames)
+        results[layout.name] = gpu_time
+
+        index_type = 'uint16' if MeshManager().index_type(layout.name) == GL_UNSIGNED_SHORT else 'uint32'
+        print(f'{layout.name:>12} | {index_type:>7} | {gpu_time:>9.3f} | {cpu_time:>9.3f}')
+
+    print(f'compressed speedup (GPU): {results["split"] / max(results["compressed"], 1e-9):.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark of the vertex indexing engines on sphere.obj."""
+
+import argparse
+import time
+
+import numpy as np
+import pywavefront
+
+from utils.vbo_indexer import index_vertices, index_vertices_vectorized
+
+
+def load_obj_vertices(file_path: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Load the flat (non indexed) vertex data of an OBJ file.
+
+    Args:
+        file_path (str): Path to the OBJ file
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: positions, normals and uvs
+
+    """
+    scene = pywavefront.Wavefront(file_path, collect_faces=True)
+
+    # the interleaved format of pywavefront is (u, v, n.x, n.y, n.z, v.x, v.y, v.z)
+    data = np.concatenate(
+        [np.array(material.vertices, dtype=np.float32).reshape(-1, 8) for material in scene.materials.values()]
+    )
+
+    return (data[:, 5:8].ravel(), data[:, 2:5].ravel(), data[:, 0:2].ravel())
+
+
+def time_function(function: callable, *args: any, **kwargs: any) -> tuple[float, any]:
+    """Time the execution of a function.
+
+    Returns:
+        tuple[float, any]: elapsed time in seconds and the result of the function
+
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return (time.perf_counter() - start, result)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--path', default='assets/models/default/sphere.obj')
+    parser.add_argument('--legacy-limit', type=int, default=8192, help='max vertices to run the O(n^2) indexer on')
+    arguments = parser.parse_args()
+
+    vertices, normals, uvs = load_obj_vertices(arguments.path)
+    total = len(vertices) // 3
+
+    # sizes of the prefixes of the mesh to index, doubling every step
+    sizes = [size for size in (1024, 2048, 4096, 8192, 16384, 32768, 65536) if size < total] + [total]
+
+    print(f'{arguments.path}: {total} input vertices')
+    print(f'{"vertices":>10} | {"legacy (s)":>11} | {"vectorized (s)":>14} | {"weld (s)":>9} | {"unique":>7}')
+
+    for size in sizes:
+        # cut the mesh at a triangle boundary
+        size -= size % 3
+
+        chunk = (vertices[: size * 3], normals[: size * 3], uvs[: size * 2])
+
+        vectorized_time, result = time_function(index_vertices_vectorized, *chunk)
+        weld_time, _ = time_function(index_vertices_vectorized, *chunk, weld=True)
+
+        legacy_time = '-'
+        if size <= arguments.legacy_limit:
+            elapsed, legacy_result = time_function(index_vertices, *chunk)
+            legacy_time = f'{elapsed:.4f}'
+
+            # make sure the two engines agree
+            if not np.array_equal(np.array(legacy_result[0], dtype=np.uint32), result[0]):
+                print('Mismatch between the legacy and vectorized indices')
+
+        print(
+            f'{size:>10} | {legacy_time:>11} | {vectorized_time:>14.4f} | {weld_time:>9.4f} | {len(result[1]) // 3:>7}'
+        )
+
+
+if __name__ == '__main__':
+    main()
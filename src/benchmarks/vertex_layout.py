@@ -0,0 +1,138 @@
+"""Benchmark of the g-buffer pass of the 2000 spheres scene with the split and interleaved vertex layouts.
+
+Run from the root of the repository:
+    PYTHONPATH=src python -m benchmarks.vertex_layout [--frames N] [--models N]
+"""
+
+# ruff: noqa: F403, F405
+
+import argparse
+import random
+import statistics
+import time
+
+import glm
+from OpenGL.GL import *
+
+from benchmarks.gl_context import create_hidden_context
+from renderer.material.material import Material
+from renderer.renderer_manager.managers.material_buffer_manager import MaterialBufferManager
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from renderer.renderer_manager.managers.uniform_buffer_manager import UniformBufferManager
+from renderer.shader.shader import Shader
+from utils import create_g_buffer, get_ogl_matrix, get_query_time
+from utils.vertex_layout import INTERLEAVED_LAYOUT, SPLIT_LAYOUT, VertexLayout
+
+
+def render_g_buffer(
+    shader: any, vao: int, indices_count: int, index_type: int, model_matrices: list, g_buffer: int
+) -> None:
+    """Draw every model in the g-buffer, like RasterDeferredRenderer.render does."""
+    glBindFramebuffer(GL_FRAMEBUFFER, g_buffer)
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+
+    for model_matrix in model_matrices:
+        shader.bind_uniform('model', model_matrix)
+        glBindVertexArray(vao)
+        glDrawElements(GL_TRIANGLES, indices_count, index_type, None)
+
+
+def time_layout(
+    layout: VertexLayout, mesh: any, shader: any, model_matrices: list, g_buffer: int, frames: int
+) -> tuple[float, float]:
+    """Render the g-buffer pass several times with the given layout.
+
+    Returns:
+        tuple[float, float]: Median GPU time and median CPU time of a frame in ms
+
+    """
+    mesh_manager = MeshManager()
+    mesh_manager.upload_mesh(layout.name, mesh, layout)
+    mesh_manager.bind_vertex_format(shader, layout.name)
+
+    vao = mesh_manager.vao(layout.name)
+    indices_count = len(mesh.indices)
+    index_type = mesh_manager.index_type(layout.name)
+
+    query = glGenQueries(1)[0]
+
+    # warm up the driver before timing
+    render_g_buffer(shader, vao, indices_count, index_type, model_matrices, g_buffer)
+    glFinish()
+
+    gpu_times = []
+    cpu_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        glBeginQuery(GL_TIME_ELAPSED, query)
+        render_g_buffer(shader, vao, indices_count, index_type, model_matrices, g_buffer)
+        glEndQuery(GL_TIME_ELAPSED)
+        cpu_times.append((time.perf_counter() - start) * 1000)
+        gpu_times.append(get_query_time(query))
+
+    return statistics.median(gpu_times), statistics.median(cpu_times)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mesh', default='assets/models/default/sphere.json')
+    parser.add_argument('--models', type=int, default=2000)
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    arguments = parser.parse_args()
+
+    if create_hidden_context(arguments.width, arguments.height) is None:
+        return
+
+    mesh = MeshManager.read_mesh(arguments.mesh)
+
+    g_buffer = create_g_buffer(arguments.width, arguments.height)[0]
+    glViewport(0, 0, arguments.width, arguments.height)
+    glEnable(GL_DEPTH_TEST)
+
+    shader = Shader(
+        './assets/shaders/deferred/g_buffer/g_buffer.vert', './assets/shaders/deferred/g_buffer/g_buffer.frag'
+    )
+    shader.use()
+    # every model uses the first material of the material table
+    material_buffer_manager = MaterialBufferManager()
+    material_buffer_manager.add(Material('default', diffuse=[1.0, 1.0, 1.0], roughness=0.5, metallic=0.5))
+    material_buffer_manager.upload()
+    shader.bind_uniform('material_index', 0)
+
+    # same camera and placement of the spheres as the default scene
+    view = glm.lookAt(glm.vec3(0, 20, 45), glm.vec3(0, 20, 0), glm.vec3(0, 1, 0))
+    projection = glm.perspective(glm.radians(60.0), arguments.width / arguments.height, 0.1, 10000.0)
+    # the g-buffer shader reads the camera from the frame data
+    UniformBufferManager().update_frame(view, projection, glm.vec3(0, 20, 45), 0.0)
+
+    random.seed(0)
+    model_matrices = [
+        get_ogl_matrix(
+            glm.translate(
+                glm.mat4(1.0),
+                glm.vec3((random.random() - 0.5) * 40, (random.random() - 0.5) * 40 + 20, (random.random() - 0.5) * 40),
+            )
+        )
+        for _ in range(arguments.models)
+    ]
+
+    print(f'{arguments.models} x {arguments.mesh} ({len(mesh.indices) // 3} triangles), {arguments.frames} frames')
+    print(f'{"layout":>12} | {"stride":>6} | {"buffers":>7} | {"GPU (ms)":>9} | {"CPU (ms)":>9}')
+
+    results = {}
+    for layout in (SPLIT_LAYOUT, INTERLEAVED_LAYOUT):
+        gpu_time, cpu_time = time_layout(layout, mesh, shader, model_matrices, g_buffer, arguments.frames)
+        results[layout.name] = gpu_time
+
+        print(
+            f'{layout.name:>12} | {layout.stride:>5}B | {layout.buffer_count:>7} | {gpu_time:>9.3f} | {cpu_time:>9.3f}'
+        )
+
+    print(f'interleaved speedup (GPU): {results["split"] / max(results["interleaved"], 1e-9):.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -219,6 +219,11 @@ class Frustum:
         self._position = value
 
     # ------------------------------ Public methods ------------------------------ #
+    @property
+    def planes(self) -> tuple[Plane, ...]:
+        """Planes of the frustum: near, bottom, far, left, right and top."""
+        return (self._near, self._bottom, self._far, self._left, self._right, self._top)
+
     def calculate_frustum(self) -> None:
         """Calculate the frustum planes."""
         # if any required value is not properly set, return an error.
@@ -279,6 +284,34 @@ class Frustum:
 
         return True
 
+    def check_box_visibility(self, aabb_min: glm.vec3, aabb_max: glm.vec3) -> bool:
+        """Check if an axis aligned bounding box is inside the the Frustum.
+
+        Args:
+            aabb_min (glm.vec3): Minimum corner of the box to check.
+            aabb_max (glm.vec3): Maximum corner of the box to check.
+
+        Returns:
+            bool: True or False depending on if the box is inside the Frustum.
+
+        """
+        for plane in self.planes:
+            if not self._is_box_on_forward_plane(plane, aabb_min, aabb_max):
+                return False
+
+        return True
+
     # ------------------------------ Private methods ----------------------------- #
     def _is_on_forward_plane(self, plane: Plane, center: glm.vec3, radius: float) -> any:
         return glm.dot(plane.normal, center) - plane.distance > -radius
+
+    def _is_box_on_forward_plane(self, plane: Plane, aabb_min: glm.vec3, aabb_max: glm.vec3) -> any:
+        # the corner of the box the furthest along the normal of the plane
+        normal = plane.normal
+        corner = glm.vec3(
+            aabb_max.x if normal.x >= 0 else aabb_min.x,
+            aabb_max.y if normal.y >= 0 else aabb_min.y,
+            aabb_max.z if normal.z >= 0 else aabb_min.z,
+        )
+
+        return glm.dot(normal, corner) - plane.distance > 0
@@ -46,9 +46,11 @@ class Instance:
         # vao to interpret the instance informations
         self.vao = None
 
-        self.vertex_vbo = None
-        self.normal_vbo = None
-        self.uv_vbo = None
+        # vertex buffers of the mesh and the layout of their data
+        self.vbos = []
+        self.layout = None
+        # generation of the mesh buffers linked to the VAO, the VAO is linked again when the mesh arena is compacted
+        self.buffers_generation = 0
 
         # dictionary to keep track of what to update in the instance every cycle
         self.to_update = {}
@@ -66,35 +68,15 @@ class Instance:
         self.changed_models = set()
 
     # method to set the mesh in the instance
-    def set_mesh(self, mesh, vertex_vbo, normal_vbo, uv_vbo) -> None:
+    def set_mesh(self, mesh, layout, vbos) -> None:
         # keep track of the new mesh in the instance
         self.mesh = mesh
-        self.vertex_vbo = vertex_vbo
-        self.normal_vbo = normal_vbo
-        self.uv_vbo = uv_vbo
-
-        # set the buffers in the instance VAO for the mesh
-
-        # bind the vertex vbo of the mesh of the instance
-        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_vbo)
-        # enable the index 0 of the VAO
-        glEnableVertexAttribArray(0)
-        # link the VBO to the index 0 of the VAO and interpret it as 3 floats
-        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-
-        # bind the normals vbo of the mesh of the instance
-        glBindBuffer(GL_ARRAY_BUFFER, self.normal_vbo)
-        # enable the index 1 of the VAO
-        glEnableVertexAttribArray(1)
-        # link the VBO to the index 1 of the VAO and interpret it as 3 floats
-        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-
-        # bind the uv vbo of the mesh of the instance
-        glBindBuffer(GL_ARRAY_BUFFER, self.uv_vbo)
-        # enable the index 2 of the VAO
-        glEnableVertexAttribArray(2)
-        # link the VBO to the index 2 of the VAO and interpret it as 2 floats
-        glVertexAttribPointer(2, 2, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+        self.layout = layout
+        self.vbos = vbos
+
+        # set the buffers in the instance VAO for the mesh, as described by the vertex layout of the mesh
+        glBindVertexArray(self.vao)
+        self.layout.bind(self.vbos)
 
     # method to change the model matrix of a model in the instance
     def change_model_matrix(self, model, model_matrix) -> None:
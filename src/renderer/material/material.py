@@ -11,6 +11,8 @@ class Material:
     roughness: float = field(default=0.5)
     metallic: float = field(default=0.5)
     models: list = field(default_factory=lambda: [])
+    # row of the material in the material table (MaterialBufferManager), -1 until it's added to the table
+    index: int = field(default=-1)
 
     def add_model(self, model) -> None:
         self.models.append(model)
@@ -10,3 +10,11 @@ class Model:
     shader: str = field(default='default')
     material: str = field(default='default')
     in_instance: str = field(default='')
+    # meshes drawn at increasing distances, starting from the full detail one (empty to use the levels of detail
+    # generated for the mesh)
+    lods: list[str] = field(default_factory=list)
+    # level of detail selected for the current frame, and its mesh
+    lod: int = field(default=0)
+    lod_mesh: str = field(default='')
+    # slot of the texture in the texture arrays (layer and rect), -1 to draw without a texture
+    texture_slot: int = field(default=-1)
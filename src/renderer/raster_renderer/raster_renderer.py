@@ -2,7 +2,10 @@
 
 # ruff: noqa: F403, F405
 
+import time
+
 import glfw
+import numpy as np
 from OpenGL.GL import *
 
 from renderer.raster_renderer.raster_renderer_modules import (
@@ -15,9 +18,31 @@ from renderer.raster_renderer.raster_renderer_modules import (
 from renderer.raster_renderer.raster_renderer_modules.raster_deferred_renderer import RasterDeferredRenderer
 from renderer.renderer_manager.renderer_manager import MeshManager, RendererManager
 from renderer.shader.shader import Shader
-from utils import Singleton, get_ogl_matrix, timeit
+from utils import (
+    Singleton,
+    download_texture_levels,
+    get_ogl_matrix,
+    print_info,
+    print_warning,
+    timeit,
+    upload_texture_levels,
+)
+from utils.ibl_cache import ibl_cache_key, ibl_settings, read_ibl_cache, write_ibl_cache
 from utils.opengl import get_query_time
 
+# width and height of the brdf integration LUT
+BRDF_INTEGRATION_SIZE = 512
+
+# user uniforms of the post processing effects bound every frame
+USER_PARAMETERS = (
+    'user_distance',
+    'user_range',
+    'user_parameter_0',
+    'user_parameter_1',
+    'user_parameter_2',
+    'user_parameter_3',
+)
+
 
 # class to render 3D models
 class RasterRenderer(metaclass=Singleton):
@@ -89,12 +114,16 @@ class RasterRenderer(metaclass=Singleton):
 
     def _setup_textures(self) -> None:
         """Set the necessary textures for rendering."""
-        # get a reference to the RendererManager
-        rm: RendererManager = RendererManager()
-
         # method to render the brdf integration texture for light calculation
         self._render_brdf_integration_map()
 
+        self._bind_textures()
+
+    def _bind_textures(self) -> None:
+        """Bind the shadow and image based lighting textures to their texture slots."""
+        # get a reference to the RendererManager
+        rm: RendererManager = RendererManager()
+
         # assign texture slot 3 for the depth cubemap
         glActiveTexture(GL_TEXTURE0 + 3)
         glBindTexture(GL_TEXTURE_CUBE_MAP, rm.depth_cubemap)
@@ -128,6 +157,25 @@ class RasterRenderer(metaclass=Singleton):
         """
         return self._timers
 
+    def set_skybox(self, path: str) -> None:
+        """Replace the skybox while running, without creating the skybox renderer again.
+
+        Args:
+            path (str): Path to the skybox images, an equirect image or the folder of the faces of a cubemap
+                (ending with /)
+
+        """
+        rm: RendererManager = RendererManager()
+
+        # the maps are drawn with the default mesh (cube), and loaded on the first texture slot
+        glBindVertexArray(rm.mesh_manager._vaos['default'])
+        glActiveTexture(GL_TEXTURE0)
+
+        self._skybox_renderer.set_skybox(path)
+
+        # the skybox loading binds its textures on the active slot, bind the lighting textures again
+        self._bind_textures()
+
     # ---------------------------- Render methods ---------------------------
     # method to render the 3D models
     # @timeit(print=False)
@@ -149,6 +197,10 @@ class RasterRenderer(metaclass=Singleton):
         rm: RendererManager = RendererManager()
 
         # -------------------- Pre-rendering --------------------------
+        # upload the frame, light and shadow data read by the shaders
+        self._update_uniform_buffers()
+        # and the materials changed since the last frame
+        rm.material_buffer_manager.upload()
         # render the shadow cubemap
         self._render_shadow_map()
 
@@ -173,21 +225,21 @@ class RasterRenderer(metaclass=Singleton):
 
         self._timers.get('deferred')['cpu'] = self._deferred_renderer.render(
             rm.single_render_models,
-            rm.mesh_manager._vaos,
-            rm.mesh_manager._indices_count,
+            rm.mesh_manager,
+            rm.lod_manager,
+            rm.cluster_manager,
+            rm.texture_array_manager,
             rm.materials,
             rm.ogl_model_matrices,
-            rm.projection_matrix,
-            [rm.light_positions[0], rm.light_positions[1], rm.light_positions[2]],
-            rm.light_positions,
-            rm.light_colors,
-            rm.light_strengths,
-            rm.lights_count,
-            rm.shadow_far_plane,
             rm.camera,
             rm.model_bounding_sphere_center,
             rm.model_bounding_sphere_radius,
+            rm.model_aabb_mins,
+            rm.model_aabb_maxs,
+            self._skybox_renderer.irradiance_sh,
             True,
+            rm.indirect_draw_manager if rm.render_states['indirect_draws'] else None,
+            rm.instance_batch_manager if rm.render_states['auto_instancing'] else None,
         )
 
         # render the skybox
@@ -242,11 +294,12 @@ class RasterRenderer(metaclass=Singleton):
 
         # variables to keep track of the last used shader and mesh
         last_shader: str = ''
+        last_vao: int = None
         last_mesh: str = ''
         last_material: str = ''
-        last_texture: str = ''
-        last_mesh_indices_count: int = 0
         rendered_models: int = 0
+        # the textures of the models are layers of a few texture arrays, bound only when the array changes
+        rm.texture_array_manager.begin_pass()
 
         # THIS LOOP WILL CHANGE WHEN THE MODELS WILL BE GROUPED BY SHADER, SO THAT THERE ISN'T SO MUCH CONTEXT SWITCHING
         # for every model in the renderer manager
@@ -262,6 +315,8 @@ class RasterRenderer(metaclass=Singleton):
                 self._link_shader_uniforms(rm.shaders[model.shader])
                 # keep track of the last set shader
                 last_shader = model.shader
+                # the vertex format has to be bound again for the new shader
+                last_mesh = ''
 
             # check if the new model has a different material
             if last_material != model.material:
@@ -270,23 +325,30 @@ class RasterRenderer(metaclass=Singleton):
                 # keep track of the last used material
                 last_material = model.material
 
-            if last_texture != model.texture and model.texture is None:
-                glBindTexture(GL_TEXTURE_2D, rm.textures[model.texture])
-                last_texture = model.texture
+            # point the shader to the texture of the model
+            rm.texture_array_manager.bind('models', rm.shaders[model.shader], model.texture_slot)
 
             # link the model specific uniforms
             self._link_model_uniforms(rm.shaders[model.shader], model.name)
 
-            # check if the new model has a different mesh
-            if last_mesh != model.mesh:
+            # get the mesh of the level of detail selected for the model
+            mesh = rm.lod_manager.submit('models', model, mm)
+
+            # bind how to decode the vertices of the mesh if it changed
+            if last_mesh != mesh:
+                mm.bind_vertex_format(rm.shaders[model.shader], mesh)
+                last_mesh = mesh
+
+            # check if the new model uses a different VAO (the meshes in the arena share the same one)
+            if last_vao != mm.vao(mesh):
                 # if it does, bind the new VAO
-                last_mesh = model.mesh
-                last_mesh_indices_count = mm.bind_mesh(model.mesh)
+                last_vao = mm.vao(mesh)
+                glBindVertexArray(last_vao)
 
             # draw the mesh
             # glDrawArrays(GL_TRIANGLES, 0, int(rm.vertices_count[model.mesh]))
             # glBindTexture(GL_TEXTURE_CUBE_MAP, rm.depth_cubemap)
-            glDrawElements(GL_TRIANGLES, last_mesh_indices_count, GL_UNSIGNED_INT, None)
+            mm.draw(mesh)
             rendered_models += 1
 
         if rm.render_states['profile']:
@@ -315,16 +377,11 @@ class RasterRenderer(metaclass=Singleton):
 
                 last_shader = instance.shader
 
-            # bind the VAO and index buffer of the mesh of the instance
+            # bind the VAO and index buffer of the mesh of the instance, and how to decode its vertices
             glBindVertexArray(instance.vao)
+            rm.mesh_manager.bind_vertex_format(rm.shaders[instance.shader], instance.mesh)
             # draw the indexed models in the instance
-            glDrawElementsInstanced(
-                GL_TRIANGLES,
-                rm.indices_count[instance.mesh],
-                GL_UNSIGNED_INT,
-                None,
-                len(instance.models_to_render),
-            )
+            rm.mesh_manager.draw(instance.mesh, len(instance.models_to_render))
 
         if rm.render_states['profile']:
             glEndQuery(GL_TIME_ELAPSED)
@@ -356,7 +413,8 @@ class RasterRenderer(metaclass=Singleton):
         # link the shader uniforms
         self._link_shader_uniforms(rm.shaders['depth_cube'])
 
-        # keep track of the last bound mesh
+        # keep track of the last bound VAO and mesh
+        last_vao: int = None
         last_mesh: str = ''
 
         # iterate through all the models for single pass rendering
@@ -364,16 +422,33 @@ class RasterRenderer(metaclass=Singleton):
             # link the model specific uniforms
             self._link_model_uniforms(rm.shaders['depth_cube'], model.name)
 
-            # check if the new model has a different mesh
-            if last_mesh != model.mesh:
-                # if it does, bind the new VAO
-                glBindVertexArray(rm.mesh_manager._vaos[model.mesh])
+            # draw the shadow with the level of detail selected from the camera
+            mesh = rm.lod_manager.submit('shadow_map', model, rm.mesh_manager)
 
-                # and keep track of the last used mesh
-                last_mesh = model.mesh
+            # bind how to decode the vertices of the mesh if it changed
+            if last_mesh != mesh:
+                rm.mesh_manager.bind_vertex_format(rm.shaders['depth_cube'], mesh)
+                last_mesh = mesh
 
-            # draw the mesh
-            glDrawElements(GL_TRIANGLES, rm.mesh_manager._indices_count[model.mesh], GL_UNSIGNED_INT, None)
+            # check if the new model uses a different VAO
+            if last_vao != rm.mesh_manager.vao(mesh):
+                # if it does, bind the new VAO
+                last_vao = rm.mesh_manager.vao(mesh)
+                glBindVertexArray(last_vao)
+
+            # draw the meshlets of the mesh that can cast a shadow, or the whole mesh
+            ranges = rm.cluster_manager.cull_light(
+                'shadow_map',
+                mesh,
+                rm.mesh_manager,
+                rm.ogl_model_matrices[model.name],
+                rm.light_positions[0:3],
+                rm.shadow_far_plane,
+            )
+            if ranges is None:
+                rm.mesh_manager.draw(mesh)
+            else:
+                rm.mesh_manager.draw_ranges(mesh, *ranges)
 
         # use the instance specific shader
         rm.shaders['depth_cube_instanced'].use()
@@ -382,16 +457,11 @@ class RasterRenderer(metaclass=Singleton):
 
         # for every instance in the renderer manager
         for instance in rm.instances.values():
-            # bind the VAO and index buffer of the mesh of the instance
+            # bind the VAO and index buffer of the mesh of the instance, and how to decode its vertices
             glBindVertexArray(instance.vao)
+            rm.mesh_manager.bind_vertex_format(rm.shaders['depth_cube_instanced'], instance.mesh)
             # draw the indexed models in the instance
-            glDrawElementsInstanced(
-                GL_TRIANGLES,
-                rm.indices_count[instance.mesh],
-                GL_UNSIGNED_INT,
-                None,
-                len(instance.models),
-            )
+            rm.mesh_manager.draw(instance.mesh, len(instance.models))
 
         # reset the viewport back to the rendering dimensions
         glViewport(0, 0, rm.width, rm.height)
@@ -523,7 +593,9 @@ class RasterRenderer(metaclass=Singleton):
 
         glBindTexture(GL_TEXTURE_2D, rm.get_back_texture())
 
-        glDrawElements(GL_TRIANGLES, rm.indices_count['screen_quad'], GL_UNSIGNED_INT, None)
+        glDrawElements(
+            GL_TRIANGLES, rm.indices_count['screen_quad'], rm.mesh_manager.index_type('screen_quad'), None
+        )
 
         glBindFramebuffer(GL_FRAMEBUFFER, 0)
 
@@ -549,7 +621,9 @@ class RasterRenderer(metaclass=Singleton):
         # bind the render framebuffer color texture
         glBindTexture(GL_TEXTURE_2D, rm.get_front_texture())
 
-        glDrawElements(GL_TRIANGLES, rm.indices_count['screen_quad'], GL_UNSIGNED_INT, None)
+        glDrawElements(
+            GL_TRIANGLES, rm.indices_count['screen_quad'], rm.mesh_manager.index_type('screen_quad'), None
+        )
 
         # re-enable depth testing and cull face
         glEnable(GL_DEPTH_TEST)
@@ -589,9 +663,7 @@ class RasterRenderer(metaclass=Singleton):
 
             # use the current post processing effect
             rm.post_processing_shaders[i].use()
-            # link the post processing uniforms
-            self._link_post_processing_uniforms(rm.post_processing_shaders[i])
-            # link the shader specific uniforms
+            # link the shader specific uniforms (the time is read from the frame data)
             self._link_shader_uniforms(rm.post_processing_shaders[i])
             # link the user specific uniforms
             self._link_user_uniforms(rm.post_processing_shaders[i])
@@ -610,7 +682,9 @@ class RasterRenderer(metaclass=Singleton):
             glActiveTexture(GL_TEXTURE0)
 
             # render the effect
-            glDrawElements(GL_TRIANGLES, rm.indices_count['screen_quad'], GL_UNSIGNED_INT, None)
+            glDrawElements(
+                GL_TRIANGLES, rm.indices_count['screen_quad'], rm.mesh_manager.index_type('screen_quad'), None
+            )
 
         if i % 2 == 0:
             glBindFramebuffer(GL_FRAMEBUFFER, rm.solved_framebuffer)
@@ -619,7 +693,7 @@ class RasterRenderer(metaclass=Singleton):
             glDrawElements(
                 GL_TRIANGLES,
                 int(rm.indices_count['screen_quad']),
-                GL_UNSIGNED_INT,
+                rm.mesh_manager.index_type('screen_quad'),
                 None,
             )
 
@@ -631,218 +705,146 @@ class RasterRenderer(metaclass=Singleton):
         # reference to the renderer manager
         rm = RendererManager()
 
-        # set the viewport to the resolution of the brdf integration texture
-        glViewport(0, 0, 512, 512)
-
-        # bind the bdrf integration framebuffer
-        glBindFramebuffer(GL_FRAMEBUFFER, rm.brdf_integration_framebuffer)
+        start = time.perf_counter()
 
         # use the brdf integration shader
         shader = rm.shaders['brdf_integration']
-        shader.use()
 
-        # clear the texture
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        # the LUT only depends on its size and on the shader drawing it, read it from the cache if it was drawn before
+        key = None
+        lut = None
+        cache, _ = ibl_settings()
+        if cache:
+            key = ibl_cache_key([shader.vertex_path, shader.frag_path], brdf_integration_size=BRDF_INTEGRATION_SIZE)
+            try:
+                lut = (read_ibl_cache(key) or {}).get('brdf_integration')
+            except ValueError as e:
+                print_warning(f'Ignoring the IBL cache: {e}')
+
+        cached = lut is not None
+        if cached:
+            upload_texture_levels(GL_TEXTURE_2D, rm.brdf_integration_LUT, lut)
+        else:
+            # set the viewport to the resolution of the brdf integration texture
+            glViewport(0, 0, BRDF_INTEGRATION_SIZE, BRDF_INTEGRATION_SIZE)
+
+            # bind the bdrf integration framebuffer
+            glBindFramebuffer(GL_FRAMEBUFFER, rm.brdf_integration_framebuffer)
+
+            shader.use()
+
+            # clear the texture
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+
+            # draw the quad
+            glBindVertexArray(rm.mesh_manager._vaos['screen_quad'])
+            glDrawElements(
+                GL_TRIANGLES,
+                rm.mesh_manager._indices_count['screen_quad'],
+                rm.mesh_manager.index_type('screen_quad'),
+                None,
+            )
 
-        # draw the quad
-        glBindVertexArray(rm.mesh_manager._vaos['screen_quad'])
-        glDrawElements(GL_TRIANGLES, rm.mesh_manager._indices_count['screen_quad'], GL_UNSIGNED_INT, None)
+            # set the viewport back to its original dimensions
+            glViewport(0, 0, rm.width, rm.height)
 
-        # set the viewport back to its original dimensions
-        glViewport(0, 0, rm.width, rm.height)
+        if key is not None and not cached:
+            # the LUT is stored as 32 bit floats, like its texture
+            lut = download_texture_levels(
+                GL_TEXTURE_2D, rm.brdf_integration_LUT, BRDF_INTEGRATION_SIZE, BRDF_INTEGRATION_SIZE, 1, np.float32
+            )
+            try:
+                write_ibl_cache(key, {'brdf_integration': lut})
+            except OSError as e:
+                print_warning(f'Could not write the IBL cache: {e}')
+
+        # wait for the GPU, so that the reported time covers the whole work
+        glFinish()
+        load_time = time.perf_counter() - start
+
+        print_info(
+            f'BRDF integration LUT {"read from the cache" if cached else "precomputed"} '
+            f'in {load_time * 1000:.1f}ms'
+        )
 
     # ---------------------------- Link methods ----------------------------
+    # method to upload the data shared by the shaders, once per frame and only the blocks that changed
+    def _update_uniform_buffers(self) -> None:
+        rm = RendererManager()
+
+        rm.uniform_buffer_manager.update_frame(
+            rm.camera.view_matrix, rm.projection_matrix, rm.camera.position, glfw.get_time() * 10
+        )
+
+        light_material = rm.light_material()
+        rm.uniform_buffer_manager.update_lights(
+            rm.light_positions,
+            rm.light_colors,
+            rm.light_strengths,
+            rm.lights_count,
+            light_material.ambient,
+            light_material.diffuse,
+            light_material.specular,
+        )
+
+        rm.uniform_buffer_manager.update_shadow(rm.shadow_transforms, rm.light_positions[0:3], rm.shadow_far_plane)
+
     # method to link static uniforms to the shader (static meaning they don't change between meshes)
     def _link_shader_uniforms(self, shader: Shader) -> None:
         # get a reference to the renderer manager
         rm = RendererManager()
 
-        if 'view' in shader.uniforms:
-            glUniformMatrix4fv(shader.uniforms['view'], 1, GL_FALSE, get_ogl_matrix(rm.camera.view_matrix))
-        if 'projection' in shader.uniforms:
-            glUniformMatrix4fv(
-                shader.uniforms['projection'],
-                1,
-                GL_FALSE,
-                rm.get_ogl_projection_matrix(),
-            )
-        if 'light' in shader.uniforms:
-            glUniform3f(
-                shader.uniforms['light'],
-                rm.light_positions[0],
-                rm.light_positions[1],
-                rm.light_positions[2],
-            )
-        if 'eye' in shader.uniforms:
-            glUniform3f(
-                shader.uniforms['eye'],
-                rm.camera.position.x,
-                rm.camera.position.y,
-                rm.camera.position.z,
-            )
-
         if 'skybox_view' in shader.uniforms:
-            glUniformMatrix4fv(
-                shader.uniforms['skybox_view'],
-                1,
-                GL_FALSE,
-                rm.camera.get_skybox_ogl_matrix(),
-            )
+            shader.bind_uniform('skybox_view', rm.camera.get_skybox_ogl_matrix())
 
         light_material = rm.light_material()
 
-        if 'light_ambient' in shader.uniforms:
-            glUniform3f(
-                shader.uniforms['light_ambient'],
-                light_material.ambient[0],
-                light_material.ambient[1],
-                light_material.ambient[2],
-            )
-        if 'light_diffuse' in shader.uniforms:
-            glUniform3f(
-                shader.uniforms['light_diffuse'],
-                light_material.diffuse[0],
-                light_material.diffuse[1],
-                light_material.diffuse[2],
-            )
-        if 'light_specular' in shader.uniforms:
-            glUniform3f(
-                shader.uniforms['light_specular'],
-                light_material.specular[0],
-                light_material.specular[1],
-                light_material.specular[2],
-            )
         if 'light_color' in shader.uniforms:
-            glUniform3f(
-                shader.uniforms['light_color'],
-                light_material.diffuse[0],
-                light_material.diffuse[1],
-                light_material.diffuse[2],
-            )
+            shader.bind_uniform('light_color', light_material.diffuse)
         if 'light_strength' in shader.uniforms:
-            glUniform1f(shader.uniforms['light_strength'], rm.light_strengths[0])
-
-        if 'lights' in shader.uniforms:
-            glUniform3fv(shader.uniforms['lights'], rm.lights_count, rm.light_positions)
-
-        if 'light_colors' in shader.uniforms:
-            glUniform3fv(shader.uniforms['light_colors'], rm.lights_count, rm.light_colors)
-
-        if 'light_strengths' in shader.uniforms:
-            glUniform1fv(shader.uniforms['light_strengths'], rm.lights_count, rm.light_strengths)
-
-        if 'lights_count' in shader.uniforms:
-            glUniform1f(shader.uniforms['lights_count'], rm.lights_count)
+            shader.bind_uniform('light_strength', rm.light_strengths[0])
 
         if 'screen_texture' in shader.uniforms:
-            glUniform1i(shader.uniforms['screen_texture'], 0)
+            shader.bind_uniform('screen_texture', 0)
         if 'blurred_texture' in shader.uniforms:
-            glUniform1i(shader.uniforms['blurred_texture'], 1)
+            shader.bind_uniform('blurred_texture', 1)
         if 'depth_texture' in shader.uniforms:
-            glUniform1i(shader.uniforms['depth_texture'], 2)
+            shader.bind_uniform('depth_texture', 2)
 
         if 'depth_map' in shader.uniforms:
-            glUniform1i(shader.uniforms['depth_map'], 3)
+            shader.bind_uniform('depth_map', 3)
         if 'irradiance_map' in shader.uniforms:
-            glUniform1i(shader.uniforms['irradiance_map'], 4)
+            shader.bind_uniform('irradiance_map', 4)
         if 'reflection_map' in shader.uniforms:
-            glUniform1i(shader.uniforms['reflection_map'], 5)
+            shader.bind_uniform('reflection_map', 5)
         if 'brdf_integration' in shader.uniforms:
-            glUniform1i(shader.uniforms['brdf_integration'], 6)
+            shader.bind_uniform('brdf_integration', 6)
 
         if 'samples' in shader.uniforms:
-            glUniform1i(shader.uniforms['samples'], rm.samples)
-
-        if 'cube_matrices' in shader.uniforms:
-            shadow_matrices = rm.get_ogl_shadow_matrices()
-            for i in range(6):
-                glUniformMatrix4fv(
-                    shader.uniforms['cube_matrices'] + i,
-                    1,
-                    GL_FALSE,
-                    shadow_matrices[i],
-                )
-
-        if 'far_plane' in shader.uniforms:
-            glUniform1f(shader.uniforms['far_plane'], rm.shadow_far_plane)
-        # if "cube_matrices" in shader.uniforms:
-        #     glUniformMatrix4fv(shader.uniforms["cube_matrices[0]"], rm.)
+            shader.bind_uniform('samples', rm.samples)
 
     # method to link dynamic uniforms to the shader (dynamic meaning they change between meshes)
     def _link_model_uniforms(self, shader, name) -> None:
         rm = RendererManager()
 
-        if 'model' in shader.uniforms:
-            glUniformMatrix4fv(shader.uniforms['model'], 1, GL_FALSE, rm.get_ogl_matrix(name))
+        shader.bind_uniform('model', rm.model_matrices[name])
 
     def _link_material_uniforms(self, shader, name) -> None:
         rm = RendererManager()
-        model = rm.models[name]
-
-        if 'ambient' in shader.uniforms:
-            glUniform3f(
-                shader.uniforms['ambient'],
-                rm.materials[model.material].ambient[0],
-                rm.materials[model.material].ambient[1],
-                rm.materials[model.material].ambient[2],
-            )
-        if 'diffuse' in shader.uniforms:
-            glUniform3f(
-                shader.uniforms['diffuse'],
-                rm.materials[model.material].diffuse[0],
-                rm.materials[model.material].diffuse[1],
-                rm.materials[model.material].diffuse[2],
-            )
-        if 'specular' in shader.uniforms:
-            glUniform3f(
-                shader.uniforms['specular'],
-                rm.materials[model.material].specular[0],
-                rm.materials[model.material].specular[1],
-                rm.materials[model.material].specular[2],
-            )
-        if 'shininess' in shader.uniforms:
-            glUniform1f(shader.uniforms['shininess'], rm.materials[model.material].shininess)
-        if 'albedo' in shader.uniforms:
-            glUniform3f(
-                shader.uniforms['albedo'],
-                rm.materials[model.material].diffuse[0],
-                rm.materials[model.material].diffuse[1],
-                rm.materials[model.material].diffuse[2],
-            )
-        if 'roughness' in shader.uniforms:
-            glUniform1f(shader.uniforms['roughness'], rm.materials[model.material].roughness)
-        if 'metallic' in shader.uniforms:
-            glUniform1f(shader.uniforms['metallic'], rm.materials[model.material].metallic)
+        material = rm.materials[rm.models[name].material]
 
-    def _link_post_processing_uniforms(self, shader) -> None:
-        if 'time' in shader.uniforms:
-            glUniform1f(shader.uniforms['time'], glfw.get_time() * 10)
+        shader.bind_uniform('ambient', material.ambient)
+        shader.bind_uniform('diffuse', material.diffuse)
+        shader.bind_uniform('specular', material.specular)
+        shader.bind_uniform('shininess', material.shininess)
+        shader.bind_uniform('albedo', material.diffuse)
+        shader.bind_uniform('roughness', material.roughness)
+        shader.bind_uniform('metallic', material.metallic)
 
     def _link_user_uniforms(self, shader) -> None:
-        if 'user_distance' in shader.uniforms:
-            glUniform1f(shader.uniforms['user_distance'], shader.user_uniforms['user_distance'])
-        if 'user_range' in shader.uniforms:
-            glUniform1f(shader.uniforms['user_range'], shader.user_uniforms['user_range'])
-        if 'user_parameter_0' in shader.uniforms:
-            glUniform1f(
-                shader.uniforms['user_parameter_0'],
-                shader.user_uniforms['user_parameter_0'],
-            )
-        if 'user_parameter_1' in shader.uniforms:
-            glUniform1f(
-                shader.uniforms['user_parameter_1'],
-                shader.user_uniforms['user_parameter_1'],
-            )
-        if 'user_parameter_2' in shader.uniforms:
-            glUniform1f(
-                shader.uniforms['user_parameter_2'],
-                shader.user_uniforms['user_parameter_2'],
-            )
-        if 'user_parameter_3' in shader.uniforms:
-            glUniform1f(
-                shader.uniforms['user_parameter_3'],
-                shader.user_uniforms['user_parameter_3'],
-            )
+        for name in USER_PARAMETERS:
+            if name in shader.uniforms:
+                shader.bind_uniform(name, shader.user_uniforms[name])
 
     def _calculate_render_times(self) -> None:
         for item in self._timers.values():
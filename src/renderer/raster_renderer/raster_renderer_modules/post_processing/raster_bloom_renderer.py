@@ -7,6 +7,7 @@ from OpenGL.GL import *
 from renderer.raster_renderer.raster_renderer_modules.post_processing.post_processing_renderer import (
     PostProcessingRenderer,
 )
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
 from renderer.shader.shader import Shader
 from utils import check_framebuffer_status
 
@@ -145,7 +146,7 @@ class RasterBloomRenderer(PostProcessingRenderer):
             # set the mipmap level in the shader
             self._downsample_shader.bind_uniform_float('mip_level', i)
             # draw the screen
-            glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_INT, None)
+            glDrawElements(GL_TRIANGLES, 6, MeshManager().index_type('screen_quad'), None)
             # pass the sizes of the mipmaps to the shader
             self._downsample_shader.bind_uniform_float(
                 'src_resolution', [self._bloom_mips_sizes[i][0], self._bloom_mips_sizes[i][1]]
@@ -177,7 +178,7 @@ class RasterBloomRenderer(PostProcessingRenderer):
             glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, next_mip, 0)
 
             # render the screen
-            glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_INT, None)
+            glDrawElements(GL_TRIANGLES, 6, MeshManager().index_type('screen_quad'), None)
 
         # reset the viewport size
         glViewport(0, 0, self._width, self._height)
@@ -199,7 +200,7 @@ class RasterBloomRenderer(PostProcessingRenderer):
         glBindTexture(GL_TEXTURE_2D, self._bloom_mips[0])
 
         # draw the screen
-        glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_INT, None)
+        glDrawElements(GL_TRIANGLES, 6, MeshManager().index_type('screen_quad'), None)
 
         # set the active texture back to texture slot 0
         glActiveTexture(GL_TEXTURE0)
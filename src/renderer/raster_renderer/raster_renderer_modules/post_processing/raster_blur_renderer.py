@@ -7,6 +7,7 @@ from OpenGL.GL import *
 from renderer.raster_renderer.raster_renderer_modules.post_processing.post_processing_renderer import (
     PostProcessingRenderer,
 )
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
 from renderer.shader.shader import Shader
 from utils import create_framebuffer
 
@@ -58,7 +59,7 @@ class RasterBlurRenderer(PostProcessingRenderer):
         # bind the source texture as input, containing the image to blur
         glBindTexture(GL_TEXTURE_2D, self._source_texture)
         # render the horizontally blurred image
-        glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_INT, None)
+        glDrawElements(GL_TRIANGLES, 6, MeshManager().index_type('screen_quad'), None)
 
         # --------- SECOND PASS (VERTICAL) ----------
         # bind the framebuffer to render the vertically blurred image to
@@ -68,7 +69,7 @@ class RasterBlurRenderer(PostProcessingRenderer):
         # bind the horizontally blurred image as input
         glBindTexture(GL_TEXTURE_2D, self._horizontal_blurred_texture)
         # render the vertically blurred image
-        glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_INT, None)
+        glDrawElements(GL_TRIANGLES, 6, MeshManager().index_type('screen_quad'), None)
 
         if time:
             glEndQuery(GL_TIME_ELAPSED)
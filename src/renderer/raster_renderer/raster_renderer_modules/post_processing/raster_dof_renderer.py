@@ -7,6 +7,7 @@ from OpenGL.GL import *
 from renderer.raster_renderer.raster_renderer_modules.post_processing.post_processing_renderer import (
     PostProcessingRenderer,
 )
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
 from renderer.shader.shader import Shader
 
 
@@ -87,7 +88,7 @@ class RasterDOFRenderer(PostProcessingRenderer):
         glBindTexture(GL_TEXTURE_2D, self._depth_texture)
 
         # draw the scene with depth of field
-        glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_INT, None)
+        glDrawElements(GL_TRIANGLES, 6, MeshManager().index_type('screen_quad'), None)
         # set back the active texture slot to index 0
         glActiveTexture(GL_TEXTURE0)
 
@@ -7,6 +7,7 @@ from OpenGL.GL import *
 from renderer.raster_renderer.raster_renderer_modules.post_processing.post_processing_renderer import (
     PostProcessingRenderer,
 )
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
 from renderer.shader.shader import Shader
 
 
@@ -84,7 +85,7 @@ class RasterMSAARenderer(PostProcessingRenderer):
         # bind the samples uniform
         self._msaa_shader.bind_uniform('samples', self._samples)
         # render the MSAA texture
-        glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_INT, None)
+        glDrawElements(GL_TRIANGLES, 6, MeshManager().index_type('screen_quad'), None)
 
         # resolve the depth buffer through nearest filtering
         glBindFramebuffer(GL_READ_FRAMEBUFFER, self._source_framebuffer)
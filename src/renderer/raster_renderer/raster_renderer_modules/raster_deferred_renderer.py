@@ -3,13 +3,20 @@
 # ruff: noqa: F403, F405
 
 import glm
+import numpy as np
 from OpenGL.GL import *
 
 from renderer.camera.camera import Camera
 from renderer.material.material import Material
 from renderer.model.model import Model
+from renderer.renderer_manager.managers.cluster_manager import ClusterManager
+from renderer.renderer_manager.managers.indirect_draw_manager import IndirectDrawManager
+from renderer.renderer_manager.managers.instance_batch_manager import InstanceBatchManager
+from renderer.renderer_manager.managers.lod_manager import LodManager
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from renderer.renderer_manager.managers.texture_array_manager import TextureArrayManager
 from renderer.shader.shader import Shader
-from utils import Timer, create_g_buffer, get_ogl_matrix, get_query_time
+from utils import Timer, create_g_buffer, get_query_time
 from utils.framebuffer import create_framebuffer
 
 
@@ -43,6 +50,8 @@ class RasterDeferredRenderer:
 
         # rendering shaders
         self._g_buffer_shader: Shader
+        self._g_buffer_indirect_shader: Shader
+        self._g_buffer_instanced_shader: Shader
         self._render_shader: Shader
 
         # track the rendering time
@@ -75,6 +84,16 @@ class RasterDeferredRenderer:
         self._g_buffer_shader = Shader(
             './assets/shaders/deferred/g_buffer/g_buffer.vert', './assets/shaders/deferred/g_buffer/g_buffer.frag'
         )
+        # and for creating it with indirect draws
+        self._g_buffer_indirect_shader = Shader(
+            './assets/shaders/deferred/g_buffer_indirect/g_buffer_indirect.vert',
+            './assets/shaders/deferred/g_buffer_indirect/g_buffer_indirect.frag',
+        )
+        # and for creating it with the instanced draws of the models sharing their mesh
+        self._g_buffer_instanced_shader = Shader(
+            './assets/shaders/deferred/g_buffer_instanced/g_buffer_instanced.vert',
+            './assets/shaders/deferred/g_buffer_instanced/g_buffer_instanced.frag',
+        )
 
         # shader for doing the lighting calculation
         self._render_shader = Shader(
@@ -175,43 +194,45 @@ class RasterDeferredRenderer:
     def render(
         self,
         models: dict[str, Model],
-        vaos: dict[str, int],
-        indices_counts: dict[str, int],
+        mesh_manager: MeshManager,
+        lod_manager: LodManager,
+        cluster_manager: ClusterManager,
+        texture_array_manager: TextureArrayManager,
         materials: dict[str, Material],
         model_matrices: dict[str, any],
-        projection_matrix: any,
-        light: any,
-        lights: any,
-        light_colors: any,
-        light_strengths: any,
-        lights_count: any,
-        far_plane: any,
         camera: Camera,
         bounding_sphere_centers: dict[str, glm.vec3],
         bounding_sphere_radiuses: dict[str, float],
+        bounding_box_mins: dict[str, glm.vec3],
+        bounding_box_maxs: dict[str, glm.vec3],
+        irradiance_sh: np.ndarray = None,
         time: bool = False,
+        indirect_draw_manager: IndirectDrawManager = None,
+        instance_batch_manager: InstanceBatchManager = None,
     ) -> float:
         """Render in deferred rendering.
 
         Args:
             models (dict[str, Model]): Dictionary of models
-            vaos (dict[str, int]): Dictionary of VAOs
-            indices_counts (dict[str, int]): Dictionary of indices counts of meshes
+            mesh_manager (MeshManager): Manager storing the meshes of the models
+            lod_manager (LodManager): Manager selecting the level of detail of the models
+            cluster_manager (ClusterManager): Manager culling the meshlets of the full detail meshes
+            texture_array_manager (TextureArrayManager): Manager of the texture arrays holding the model textures
             materials (dict[str, Material]): Dictionary of materials
             model_matrices (dict[str, any]): Dictionary of model matrices
-            view_matrix (any): View matrix
-            projection_matrix (any): Projection matrix
-            eye (any): Position of the camera
-            light (any): Position of the light casting shadow
-            lights (any): List of light positions
-            light_colors (any): List of light colors
-            light_strengths (any): List of light strengths
-            lights_count (any): Number of lights in the scene
-            far_plane (any): Far plane of the shadow
             camera (Camera): Camera object
             bounding_sphere_centers (dict[str, glm.vec3]): Dictionary containing the center of all the bounding spheres
             bounding_sphere_radiuses: (dict[str, float]): Dictionary containing the radius of all the bounding spheres
+            bounding_box_mins (dict[str, glm.vec3]): Dictionary containing the minimum corner of all the bounding boxes
+            bounding_box_maxs (dict[str, glm.vec3]): Dictionary containing the maximum corner of all the bounding boxes
+            irradiance_sh (np.ndarray, optional): 9 RGB spherical harmonics coefficients of the irradiance, None to
+                sample the irradiance cubemap instead. Defaults to None.
             time (bool, optional): Optional parameter to keep track of the rendering time. Defaults to False.
+            indirect_draw_manager (IndirectDrawManager, optional): Manager submitting the visible models with
+                indirect draws, None to draw them one by one. Defaults to None.
+            instance_batch_manager (InstanceBatchManager, optional): Manager drawing the visible models sharing their
+                mesh with instanced draws, None to draw them one by one. Not used with indirect draws. Defaults to
+                None.
 
         Returns:
             float: CPU Rendering time. 0 if time is set to False
@@ -226,14 +247,8 @@ class RasterDeferredRenderer:
         glBindFramebuffer(GL_FRAMEBUFFER, self._g_buffer)
         # clear its content
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        # use the gbuffer shader
-        self._g_buffer_shader.use()
-        # setup the gbuffer shader uniforms
-        self._g_buffer_shader.bind_uniform('view', camera.ogl_view_matrix)
-        self._g_buffer_shader.bind_uniform('projection', get_ogl_matrix(projection_matrix))
-
-        current_material_name: str = ''
-        current_material: Material = None
+        # the visible models, with the mesh of the level of detail selected for them
+        visible: list[tuple[Model, str]] = []
 
         # iterate through the models in the scene
         for model in models:
@@ -243,37 +258,106 @@ class RasterDeferredRenderer:
             ):
                 continue
 
-            # if the model is using a new material, bind the necessary material parameters
+            # then against its bounding box, tighter for elongated models
+            if not camera.frustum.check_box_visibility(
+                bounding_box_mins.get(model.name), bounding_box_maxs.get(model.name)
+            ):
+                continue
+
+            # get the mesh of the level of detail selected for the model
+            visible.append((model, lod_manager.submit('deferred', model, mesh_manager)))
+
+        # the models sharing their mesh with enough other models are drawn with instanced draws, the others are left
+        # to the loop (the indirect draws already submit all the models together)
+        if instance_batch_manager is not None and indirect_draw_manager is None:
+            self._g_buffer_instanced_shader.use()
+            visible = instance_batch_manager.draw(
+                'deferred',
+                visible,
+                self._g_buffer_instanced_shader,
+                mesh_manager,
+                texture_array_manager,
+                materials,
+                model_matrices,
+            )
+
+        # use the gbuffer shader (the view and projection matrices are read from the frame data), or the one reading
+        # the data of the models from the draw data when they are submitted with indirect draws
+        if indirect_draw_manager is not None:
+            self._g_buffer_indirect_shader.use()
+            indirect_draw_manager.begin_pass('deferred')
+        else:
+            self._g_buffer_shader.use()
+
+        # setters of the uniforms bound for every model, called directly in the loop
+        set_material_index = self._g_buffer_shader.setter('material_index')
+        set_model = self._g_buffer_shader.setter('model')
+
+        current_material_name: str = ''
+        # the meshes stored in the arena share the same VAO, it's only bound again for the other meshes
+        current_vao: int = None
+        current_mesh: str = None
+        # the textures of the models are layers of a few texture arrays, bound only when the array changes
+        texture_array_manager.begin_pass()
+
+        for model, mesh in visible:
+            # get the meshlets of the mesh that survived the cluster culling, or None for the whole mesh
+            ranges = cluster_manager.cull('deferred', mesh, mesh_manager, model_matrices.get(model.name))
+
+            # collect the model, to submit it with the other visible models
+            if indirect_draw_manager is not None:
+                indirect_draw_manager.add(
+                    mesh,
+                    mesh_manager,
+                    model_matrices.get(model.name),
+                    materials.get(model.material).index,
+                    texture_array_manager.slot(model.texture_slot),
+                    ranges,
+                )
+                continue
+
+            # if the model is using a new material, point the shader to its row in the material table
             if model.material != current_material_name:
                 current_material_name = model.material
-                current_material = materials.get(current_material_name)
-                self._g_buffer_shader.bind_uniform_float('albedo', current_material.diffuse)
-                self._g_buffer_shader.bind_uniform_float('roughness', current_material.roughness)
-                self._g_buffer_shader.bind_uniform_float('metallic', current_material.metallic)
+                set_material_index(materials.get(current_material_name).index)
 
             # bind the model information to be processed and saved in the gbuffer
-            self._g_buffer_shader.bind_uniform('model', model_matrices.get(model.name))
-            # bind the mesh VAO
-            glBindVertexArray(vaos.get(model.mesh))
-            # draw the element
-            glDrawElements(GL_TRIANGLES, int(indices_counts.get(model.mesh)), GL_UNSIGNED_INT, None)
+            set_model(model_matrices.get(model.name))
+            texture_array_manager.bind('deferred', self._g_buffer_shader, model.texture_slot)
+            # bind the mesh VAO if it changed
+            vao = mesh_manager.vao(mesh)
+            if vao != current_vao:
+                glBindVertexArray(vao)
+                current_vao = vao
+
+            # bind how to decode the vertices of the mesh if it changed
+            if mesh != current_mesh:
+                mesh_manager.bind_vertex_format(self._g_buffer_shader, mesh)
+                current_mesh = mesh
+
+            # draw the meshlets of the mesh that survived the cluster culling, or the whole mesh
+            if ranges is None:
+                mesh_manager.draw(mesh)
+            else:
+                mesh_manager.draw_ranges(mesh, *ranges)
+
+        # draw the collected models, with one indirect draw per VAO and texture array
+        if indirect_draw_manager is not None:
+            indirect_draw_manager.submit()
 
         # bind the output framebuffer
         glBindFramebuffer(GL_FRAMEBUFFER, self._output_framebuffer)
         # clear its content
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         # bind the screen quad VAO
-        glBindVertexArray(vaos.get('screen_quad'))
+        glBindVertexArray(mesh_manager.vao('screen_quad'))
         # use the PBR shader
         self._render_shader.use()
-        # bind the necessary shader uniforms
-        self._render_shader.bind_uniform('eye', camera.position)
-        self._render_shader.bind_uniform('light', light)
-        glUniform3fv(self._render_shader.uniforms.get('lights'), lights_count, lights)
-        glUniform3fv(self._render_shader.uniforms.get('light_colors'), lights_count, light_colors)
-        glUniform1fv(self._render_shader.uniforms.get('light_strengths'), lights_count, light_strengths)
-        self._render_shader.bind_uniform_float('lights_count', lights_count)
-        self._render_shader.bind_uniform('far_plane', far_plane)
+        # the camera, the lights and the shadow are read from the frame, light and shadow data
+        # evaluate the irradiance from its spherical harmonics, without sampling the irradiance cubemap
+        self._render_shader.bind_uniform('use_irradiance_sh', irradiance_sh is not None)
+        if irradiance_sh is not None:
+            self._render_shader.bind_uniform('irradiance_sh', irradiance_sh)
 
         # assign texture slot 3 for the depth cubemap
         glActiveTexture(GL_TEXTURE0)
@@ -289,7 +373,7 @@ class RasterDeferredRenderer:
         glBindTexture(GL_TEXTURE_2D, self._pbr_texture)
 
         # draw the screen quad
-        glDrawElements(GL_TRIANGLES, 6, GL_UNSIGNED_INT, None)
+        glDrawElements(GL_TRIANGLES, 6, mesh_manager.index_type('screen_quad'), None)
 
         # blit the depth information from the gbuffer to the output framebuffer
         glBindFramebuffer(GL_READ_FRAMEBUFFER, self._g_buffer)
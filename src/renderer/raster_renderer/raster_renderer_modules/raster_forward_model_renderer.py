@@ -6,6 +6,7 @@ from OpenGL.GL import *
 
 from renderer.material.material import Material
 from renderer.model.model import Model
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
 from renderer.shader.shader import Shader
 
 
@@ -24,8 +25,6 @@ class RasterForwardModelRenderer:
         indices_counts: dict[str, int],
         textures: dict[str, int],
         shaders: dict[str, Shader],
-        view_matrix: any,
-        projection_matrix: any,
     ) -> None:
         """Render the models.
 
@@ -60,11 +59,14 @@ class RasterForwardModelRenderer:
                 shader.use()
                 # link the static uniforms (that don't change between meshes)
                 # self._link_shader_uniforms(shaders[model.shader])
-                shader.bind_uniform('view', view_matrix)
-                shader.bind_uniform('projection', projection_matrix)
+                # (the view and projection matrices are read from the frame data)
+                # setter of the model matrix, called directly for every model
+                set_model = shader.setter('model')
 
                 # keep track of the last set shader
                 last_shader = model.shader
+                # the vertex format of the mesh is bound again for the new shader
+                last_mesh = ''
 
             # check if the new model has a different material
             if last_material != model.material:
@@ -78,17 +80,18 @@ class RasterForwardModelRenderer:
                 last_texture = model.texture
 
             # link the model specific uniforms
-            shader.bind_uniform('model', model_matrices.get(model.name))
+            set_model(model_matrices.get(model.name))
 
             # check if the new model has a different mesh
             if last_mesh != model.mesh:
-                # if it does, bind the new VAO
+                # if it does, bind the new VAO and how to decode its vertices
                 glBindVertexArray(meshes[model.mesh])
+                MeshManager().bind_vertex_format(shader, model.mesh)
                 # and keep track of the last used mesh
                 last_mesh = model.mesh
 
-            # draw the mesh
+            # draw the mesh, at its range of the buffers when it's stored in the mesh arena
             # glDrawArrays(GL_TRIANGLES, 0, int(rm.vertices_count[model.mesh]))
             # glBindTexture(GL_TEXTURE_CUBE_MAP, rm.depth_cubemap)
-            glDrawElements(GL_TRIANGLES, int(indices_counts[model.mesh]), GL_UNSIGNED_INT, None)
+            MeshManager().draw(model.mesh)
             # rendered_models += 1
@@ -1,12 +1,36 @@
 """Raster skybox renderer."""
 
 # ruff: noqa: F403, F405
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import numpy as np
 from OpenGL.GL import *
 from PIL import Image
 
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from renderer.renderer_manager.managers.texture_manager import COMPRESSED_FORMATS, TextureManager
 from renderer.shader.shader import Shader
-from utils import create_cubemap_framebuffer, create_projection_matrix, create_view_cubemap_matrices, get_ogl_matrix
+from utils import (
+    create_cubemap_framebuffer,
+    create_projection_matrix,
+    create_view_cubemap_matrices,
+    download_texture_levels,
+    get_ogl_matrix,
+    print_info,
+    print_warning,
+    upload_texture_levels,
+)
+from utils.asset_baker import AssetManifest
+from utils.dds_file import find_compressed_sibling, read_dds
+from utils.ibl_cache import ibl_cache_key, ibl_settings, read_ibl_cache, write_ibl_cache
+from utils.spherical_harmonics import project_cubemap
+from utils.texture_file import read_binary_texture
+
+# number of levels of the reflection cubemap, prefiltered with an increasing roughness (MAX_REFLECTION_LOD + 1)
+REFLECTION_LEVELS = 5
+# faces of a cubemap skybox, in the order of the faces of the OpenGL cubemap
+SKYBOX_FACES = ('left', 'right', 'top', 'bottom', 'back', 'front')
 
 
 class RasterSkyboxRenderer:
@@ -21,6 +45,8 @@ class RasterSkyboxRenderer:
         irradiance_size: int = 8,
         reflection_size: int = 128,
         fov: int = 60,
+        cache: bool = None,
+        irradiance: str = None,
     ) -> None:
         """Set the required parameters to render the skybox.
 
@@ -32,6 +58,11 @@ class RasterSkyboxRenderer:
             irradiance_size (int, optional): Size of the irradiance texture. Defaults to 32
             reflection_size (int, optional): Size of the reflection texture. Defaults to 128
             fov (int, optional): Field of View of the renderer. Defaults to 60.
+            cache (bool, optional): Read the precomputed maps from the IBL cache, and store them there after
+                rendering them. Defaults to the cache setting of the ibl section of the configuration.
+            irradiance (str, optional): Representation of the diffuse irradiance, 'sh' for 9 spherical harmonics
+                coefficients projected from the skybox, 'cubemap' for the irradiance cubemap. Defaults to the
+                irradiance setting of the ibl section of the configuration.
 
         """
         # incoming arguments
@@ -41,6 +72,9 @@ class RasterSkyboxRenderer:
         self._irradiance_size: int = irradiance_size
         self._reflection_size: int = reflection_size
         self._fov: int = fov
+        default_cache, default_irradiance = ibl_settings()
+        self._cache: bool = default_cache if cache is None else cache
+        self._irradiance: str = irradiance or default_irradiance
 
         # matrices
         self._projection_matrix: any
@@ -58,9 +92,13 @@ class RasterSkyboxRenderer:
 
         # framebuffers
         self._skybox_framebuffer: int
-        self._skybox_cubemap: int
+        self._skybox_render_cubemap: int
         self._skybox_renderbuffer: int
 
+        # cubemap of the current skybox: the render cubemap for equirect skyboxes, the cubemap of the faces otherwise
+        self._skybox_cubemap: int = None
+        self._faces_cubemap: int = None
+
         self._reflection_framebuffer: int
         self._reflection_cubemap: int
         self._reflection_renderbuffer: int
@@ -69,6 +107,13 @@ class RasterSkyboxRenderer:
         self._irradiance_cubemap: int
         self._irradiance_renderbuffer: int
 
+        # 9 RGB coefficients of the irradiance, when it's represented by spherical harmonics
+        self._irradiance_sh: np.ndarray = None
+
+        # time spent loading the skybox and getting its maps, and if they were read from the cache
+        self._load_time: float = 0.0
+        self._cached: bool = False
+
         self._ogl_timer: int = glGenQueries(1)[0]
 
         # setup
@@ -110,8 +155,8 @@ class RasterSkyboxRenderer:
 
     def _setup_framebuffers(self) -> None:
         """Create the required framebuffers, shaders and renderbuffers required for rendering the skybox."""
-        self._skybox_framebuffer, self._skybox_cubemap, self._skybox_renderbuffer = create_cubemap_framebuffer(
-            self._skybox_size
+        self._skybox_framebuffer, self._skybox_render_cubemap, self._skybox_renderbuffer = (
+            create_cubemap_framebuffer(self._skybox_size)
         )
 
         self._irradiance_framebuffer, self._irradiance_cubemap, self._irradiance_renderbuffer = (
@@ -123,6 +168,8 @@ class RasterSkyboxRenderer:
         )
 
     def _load_skybox(self, filepath: str) -> None:
+        start = time.perf_counter()
+
         # set the equirect skybox texture to None
         self._equirect_skybox = None
 
@@ -130,31 +177,96 @@ class RasterSkyboxRenderer:
         components: list[str] = filepath.split('/')
         equirect: bool = '.' in components[-1]
 
+        # the cubemap of the faces of the previous skybox is replaced by the one of the new skybox
+        if self._faces_cubemap is not None:
+            glDeleteTextures(1, [self._faces_cubemap])
+            self._faces_cubemap = None
+
+        self._skybox_cubemap = self._skybox_render_cubemap
+
+        # the maps precomputed by a previous run, the skybox cubemap included for equirect skyboxes
+        key = self._cache_key(filepath, equirect) if self._cache else None
+        maps = self._read_cache(key, equirect) if key is not None else None
+
+        if maps is None or not equirect:
+            self._load_skybox_source(filepath, equirect)
+
+        # bind the skybox cubemap
+        glBindTexture(GL_TEXTURE_CUBE_MAP, self._skybox_cubemap)
+
+        # set the texture behaviour
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        # glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_R, GL_CLAMP_TO_EDGE)
+
+        if maps is not None:
+            if equirect:
+                upload_texture_levels(GL_TEXTURE_CUBE_MAP, self._skybox_cubemap, maps['skybox'])
+            if self._irradiance == 'sh':
+                self._irradiance_sh = np.array(maps['irradiance_sh'][0]).reshape(9, 3)
+            else:
+                upload_texture_levels(GL_TEXTURE_CUBE_MAP, self._irradiance_cubemap, maps['irradiance'])
+            upload_texture_levels(GL_TEXTURE_CUBE_MAP, self._reflection_cubemap, maps['reflection'])
+        else:
+            # method to render the skybox from an equirect to a cubemap
+            self._render_equirectangular_skybox()
+            # project the skybox on spherical harmonics, or render the irradiance cubemap for light calculation
+            if self._irradiance == 'sh':
+                self._project_irradiance()
+            else:
+                self._render_irradiance_map()
+            # method to render the reflection cubemap
+            self._render_reflection_map()
+
+        # the equirect image is only needed to draw the skybox cubemap
+        if self._equirect_skybox is not None:
+            glDeleteTextures(1, [self._equirect_skybox])
+            self._equirect_skybox = None
+
+        if key is not None and maps is None:
+            self._write_cache(key, equirect)
+
+        # wait for the GPU, so that the reported time covers the whole work
+        glFinish()
+        self._load_time = time.perf_counter() - start
+        self._cached = maps is not None
+
+        print_info(
+            f'IBL maps of {components[-1] or components[-2]} '
+            f'{"read from the cache" if self._cached else "precomputed"} in {self._load_time * 1000:.1f}ms'
+        )
+
+    def _load_skybox_source(self, filepath: str, equirect: bool) -> None:
+        """Load the source images of the skybox, into the equirect texture or the skybox cubemap.
+
+        Args:
+            filepath (str): Path of the equirect image, or of the folder of the faces of the cubemap
+            equirect (bool): If the skybox is an equirect image
+
+        """
         # if it's an equirect skybox
         if equirect:
             # create a 2d texture to hold the equirect image
             self._equirect_skybox = glGenTextures(1)
             glBindTexture(GL_TEXTURE_2D, self._equirect_skybox)
 
-            # open the image and extract its data
-            im = Image.open(filepath)
-            im = im.convert('RGB')
-            im = im.transpose(Image.FLIP_TOP_BOTTOM)
-            imdata = np.fromstring(im.tobytes(), np.uint8)
-
-            # store the pixel data into the OpenGL texture
-            glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
-            glTexImage2D(
-                GL_TEXTURE_2D,
-                0,
-                GL_RGB,
-                im.size[0],
-                im.size[1],
-                0,
-                GL_RGB,
-                GL_UNSIGNED_BYTE,
-                imdata,
-            )
+            # store the blocks of the compressed version of the image as they are if there is one
+            compressed = self._read_compressed_skybox_image(filepath, flip=True)
+            if compressed is not None:
+                width, height, internal_format, imdata = compressed
+                glTexStorage2D(GL_TEXTURE_2D, 1, internal_format, width, height)
+                # PyOpenGL computes the image size from the data
+                glCompressedTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height, internal_format, imdata)
+            else:
+                # open the image and extract its data
+                width, height, data_format, imdata = self._read_skybox_image(filepath, flip=True)
+
+                # store the pixel data into the OpenGL texture
+                glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+                glTexStorage2D(GL_TEXTURE_2D, 1, GL_RGB8, width, height)
+                glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height, data_format, GL_UNSIGNED_BYTE, imdata)
 
             # set the necessary texture parameters for the equirect 2d texture
             glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
@@ -162,56 +274,200 @@ class RasterSkyboxRenderer:
             glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
             glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
 
-        else:
-            # bind the skybox cubemap directly
-            glBindTexture(GL_TEXTURE_CUBE_MAP, self._skybox_cubemap)
-
-            # list of faces
-            texture_faces: list[str] = []
-            texture_faces.append(filepath + 'left.png')
-            texture_faces.append(filepath + 'right.png')
-            texture_faces.append(filepath + 'top.png')
-            texture_faces.append(filepath + 'bottom.png')
-            texture_faces.append(filepath + 'back.png')
-            texture_faces.append(filepath + 'front.png')
-
-            # iterate through the faces, load the image and store it in the right face of the cubemap
-            for i in range(len(texture_faces)):
-                # open the current image and get its pixel data
-                im = Image.open(texture_faces[i])
-                im = im.convert('RGB')
-                # get the data of the loaded face image
-                imdata = np.fromstring(im.tobytes(), np.uint8)
-
-                # store the data of the image in the cubemap texture
-                glTexImage2D(
-                    GL_TEXTURE_CUBE_MAP_POSITIVE_X + i,
+            return
+
+        # the faces get a cubemap of their own, allocated once with the size and format of the faces
+        self._faces_cubemap = glGenTextures(1)
+        self._skybox_cubemap = self._faces_cubemap
+        glBindTexture(GL_TEXTURE_CUBE_MAP, self._faces_cubemap)
+        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+
+        # list of faces
+        texture_faces: list[str] = [filepath + face + '.png' for face in SKYBOX_FACES]
+
+        with ThreadPoolExecutor(max_workers=len(texture_faces)) as executor:
+            # map the compressed version of the faces, all the faces must share the same format
+            faces = list(
+                executor.map(lambda face: self._read_compressed_skybox_image(face, flip=False), texture_faces)
+            )
+
+            if all(face is not None for face in faces) and len({face[:3] for face in faces}) == 1:
+                width, height, internal_format, _ = faces[0]
+                glTexStorage2D(GL_TEXTURE_CUBE_MAP, 1, internal_format, width, height)
+
+                for i, (width, height, internal_format, imdata) in enumerate(faces):
+                    glCompressedTexSubImage2D(
+                        GL_TEXTURE_CUBE_MAP_POSITIVE_X + i, 0, 0, 0, width, height, internal_format, imdata
+                    )
+
+                return
+
+            # decode the faces in parallel, and upload every face as soon as it's decoded
+            futures = {
+                executor.submit(self._read_skybox_image, face, False): i for i, face in enumerate(texture_faces)
+            }
+
+            allocated = False
+            glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+
+            for future in as_completed(futures):
+                width, height, data_format, imdata = future.result()
+
+                # the faces of a cubemap share the same size, the first decoded face gives it
+                if not allocated:
+                    glTexStorage2D(GL_TEXTURE_CUBE_MAP, 1, GL_RGB8, width, height)
+                    allocated = True
+
+                # store the data of the image in the right face of the cubemap
+                glTexSubImage2D(
+                    GL_TEXTURE_CUBE_MAP_POSITIVE_X + futures[future],
+                    0,
                     0,
-                    GL_RGB,
-                    im.size[0],
-                    im.size[1],
                     0,
-                    GL_RGB,
+                    width,
+                    height,
+                    data_format,
                     GL_UNSIGNED_BYTE,
                     imdata,
                 )
 
-        # bind the skybox cubemap
-        glBindTexture(GL_TEXTURE_CUBE_MAP, self._skybox_cubemap)
+    def _source_file(self, filepath: str) -> str:
+        # file the pixels of a skybox image are actually read from
+        compressed_path = find_compressed_sibling(filepath) if TextureManager().compressed else None
+        return compressed_path or filepath
 
-        # set the texture behaviour
-        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        # glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
-        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
-        glTexParameteri(GL_TEXTURE_CUBE_MAP, GL_TEXTURE_WRAP_R, GL_CLAMP_TO_EDGE)
+    def _cache_key(self, filepath: str, equirect: bool) -> str | None:
+        """Key of the maps of a skybox in the IBL cache.
+
+        Args:
+            filepath (str): Path of the equirect image, or of the folder of the faces of the cubemap
+            equirect (bool): If the skybox is an equirect image
+
+        Returns:
+            str | None: Key of the maps, None if a source can't be read
+
+        """
+        if equirect:
+            sources = [self._source_file(filepath)]
+            shaders = [self._equirect_shader, self._reflection_shader]
+        else:
+            sources = [self._source_file(filepath + face + '.png') for face in SKYBOX_FACES]
+            shaders = [self._reflection_shader]
+
+        if self._irradiance != 'sh':
+            shaders.append(self._irradiance_shader)
+
+        # the maps change with the shaders drawing them too
+        for shader in shaders:
+            sources.extend(path for path in (shader.vertex_path, shader.frag_path, shader.geom_path) if path)
+
+        try:
+            return ibl_cache_key(
+                sources,
+                skybox_size=self._skybox_size if equirect else 0,
+                irradiance=self._irradiance,
+                irradiance_size=self._irradiance_size if self._irradiance != 'sh' else 0,
+                reflection_size=self._reflection_size,
+                reflection_levels=REFLECTION_LEVELS,
+            )
+        except OSError as e:
+            print_warning(f'Could not hash the sources of the skybox {filepath}: {e}')
+            return None
+
+    def _read_cache(self, key: str, equirect: bool) -> dict[str, list[np.ndarray]] | None:
+        try:
+            maps = read_ibl_cache(key)
+        except ValueError as e:
+            print_warning(f'Ignoring the IBL cache: {e}')
+            return None
+
+        # a cache file written with other maps is treated as a miss
+        expected = {'irradiance_sh' if self._irradiance == 'sh' else 'irradiance', 'reflection'}
+        if equirect:
+            expected.add('skybox')
+
+        if maps is None or not expected <= maps.keys():
+            return None
+
+        return maps
+
+    def _write_cache(self, key: str, equirect: bool) -> None:
+        # read the rendered maps back from the GPU, the cubemap of the faces is already on disk as the faces
+        maps = {}
+        if equirect:
+            maps['skybox'] = download_texture_levels(
+                GL_TEXTURE_CUBE_MAP, self._skybox_cubemap, self._skybox_size, self._skybox_size, 1
+            )
+        if self._irradiance == 'sh':
+            maps['irradiance_sh'] = [self._irradiance_sh.reshape(1, 1, 9, 3)]
+        else:
+            maps['irradiance'] = download_texture_levels(
+                GL_TEXTURE_CUBE_MAP, self._irradiance_cubemap, self._irradiance_size, self._irradiance_size, 1
+            )
+        maps['reflection'] = download_texture_levels(
+            GL_TEXTURE_CUBE_MAP,
+            self._reflection_cubemap,
+            self._reflection_size,
+            self._reflection_size,
+            REFLECTION_LEVELS,
+        )
+
+        try:
+            write_ibl_cache(key, maps)
+        except OSError as e:
+            print_warning(f'Could not write the IBL cache: {e}')
+
+    def _read_compressed_skybox_image(self, filepath: str, flip: bool) -> tuple[int, int, int, np.ndarray] | None:
+        """Read the base level of the block compressed version of a skybox image, if there is one.
+
+        Args:
+            filepath (str): Path of the source image
+            flip (bool): Flip the image vertically
+
+        Returns:
+            tuple[int, int, int, np.ndarray] | None: width, height, OpenGL internal format and compressed blocks of
+                the image, None if there is no usable compressed version
+
+        """
+        compressed_path = find_compressed_sibling(filepath) if TextureManager().compressed else None
+        if compressed_path is None:
+            return None
+
+        try:
+            texture = read_dds(compressed_path, flip)
+        except ValueError:
+            return None
+
+        if texture.flipped != flip:
+            return None
 
-        # method to render the skybox from an equirect to a cubemap
-        self._render_equirectangular_skybox()
-        # method to render the irradiance cubemap for light calculation
-        self._render_irradiance_map()
-        # method to render the reflection cubemap
-        self._render_reflection_map()
+        width, height, data = texture.levels[0]
+        return (width, height, COMPRESSED_FORMATS[texture.compression], data)
+
+    def _read_skybox_image(self, filepath: str, flip: bool) -> tuple[int, int, int, np.ndarray]:
+        """Read the pixel data of a skybox image, from its baked version if it's available.
+
+        Args:
+            filepath (str): Path of the source image
+            flip (bool): Flip the image vertically (ignored for baked images, that are stored already oriented)
+
+        Returns:
+            tuple[int, int, int, np.ndarray]: width, height, OpenGL format and pixel data of the image
+
+        """
+        baked_path = AssetManifest().baked_path(filepath)
+        if baked_path is not None:
+            width, height, data = read_binary_texture(baked_path).levels[0]
+            return (width, height, GL_RGBA, data)
+
+        im = Image.open(filepath)
+        if im.mode != 'RGB':
+            im = im.convert('RGB')
+        if flip:
+            im = im.transpose(Image.FLIP_TOP_BOTTOM)
+
+        # expose the pixels of the image through its array interface, without another buffer in between
+        return (im.size[0], im.size[1], GL_RGB, np.asarray(im))
 
     def _render_equirectangular_skybox(self) -> None:
         """Render the skybox from an equirectangular image to a cubemap."""
@@ -262,13 +518,22 @@ class RasterSkyboxRenderer:
             glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
             # draw the face to the cubemap
-            glDrawElements(GL_TRIANGLES, 36, GL_UNSIGNED_INT, None)
+            glDrawElements(GL_TRIANGLES, 36, MeshManager().index_type('default'), None)
 
         # re-enable backface culling
         glEnable(GL_CULL_FACE)
         # set the viewport back to the render size
         glViewport(0, 0, self._width, self._height)
 
+    def _project_irradiance(self) -> None:
+        """Project the skybox cubemap on the spherical harmonics of the irradiance."""
+        # the faces of a cubemap skybox keep the size of their images
+        glBindTexture(GL_TEXTURE_CUBE_MAP, self._skybox_cubemap)
+        size = int(glGetTexLevelParameteriv(GL_TEXTURE_CUBE_MAP_POSITIVE_X, 0, GL_TEXTURE_WIDTH))
+
+        faces = download_texture_levels(GL_TEXTURE_CUBE_MAP, self._skybox_cubemap, size, size, 1)[0]
+        self._irradiance_sh = project_cubemap(faces)
+
     def _render_irradiance_map(self) -> None:
         # set the viewport to the dimensions of the irradiance map size
         glViewport(0, 0, self._irradiance_size, self._irradiance_size)
@@ -312,7 +577,7 @@ class RasterSkyboxRenderer:
             # clear the texture
             glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
             # draw the irradiance texture
-            glDrawElements(GL_TRIANGLES, 36, GL_UNSIGNED_INT, None)
+            glDrawElements(GL_TRIANGLES, 36, MeshManager().index_type('default'), None)
 
         # re-enable backface culling
         glEnable(GL_CULL_FACE)
@@ -342,7 +607,7 @@ class RasterSkyboxRenderer:
         glDisable(GL_CULL_FACE)
 
         # set the max level of mipmaps
-        max_mip_levels = 5
+        max_mip_levels = REFLECTION_LEVELS
 
         # iterate through every mipmap level
         for mip in range(max_mip_levels):
@@ -383,7 +648,7 @@ class RasterSkyboxRenderer:
                 glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
                 # draw the blurred reflection map
-                glDrawElements(GL_TRIANGLES, 36, GL_UNSIGNED_INT, None)
+                glDrawElements(GL_TRIANGLES, 36, MeshManager().index_type('default'), None)
 
         # re-enable backface culling
         glEnable(GL_CULL_FACE)
@@ -414,11 +679,26 @@ class RasterSkyboxRenderer:
         """Get the irradiance cubemap."""
         return self._irradiance_cubemap
 
+    @property
+    def irradiance_sh(self) -> np.ndarray | None:
+        """Get the 9 RGB spherical harmonics coefficients of the irradiance, None if it's an irradiance cubemap."""
+        return self._irradiance_sh
+
     @property
     def reflection_cubemap(self) -> int:
         """Get the reflection cubemap."""
         return self._reflection_cubemap
 
+    @property
+    def load_time(self) -> float:
+        """Get the time spent loading the skybox and getting its maps, in seconds."""
+        return self._load_time
+
+    @property
+    def cached(self) -> bool:
+        """Get if the maps of the skybox were read from the IBL cache."""
+        return self._cached
+
     @property
     def ogl_timer(self) -> int:
         """OpenGL Query timer.
@@ -453,6 +733,21 @@ class RasterSkyboxRenderer:
         self._skybox_shader.use()
         self._skybox_shader.bind_uniform('projection', self._projection_matrix)
 
+    def set_skybox(self, path: str) -> None:
+        """Replace the skybox, loading its images and getting its maps again, from the IBL cache when possible.
+
+        The irradiance and reflection cubemaps are updated in place, so the textures bound to them stay valid. The
+        cube drawn by the skybox must be bound, like when rendering it.
+
+        Args:
+            path (str): Path to the skybox images, an equirect image or the folder of the faces of a cubemap
+
+        """
+        self._load_skybox(path)
+
+        # leave the last framebuffer the maps were drawn to
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+
     def render(self, time: bool = False) -> None:
         """Render the skybox.
 
@@ -476,7 +771,7 @@ class RasterSkyboxRenderer:
         # disable cull facing
         glDisable(GL_CULL_FACE)
         # render the cube
-        glDrawElements(GL_TRIANGLES, 36, GL_UNSIGNED_INT, None)
+        glDrawElements(GL_TRIANGLES, 36, MeshManager().index_type('default'), None)
         # re-enable face culling
         glEnable(GL_CULL_FACE)
 
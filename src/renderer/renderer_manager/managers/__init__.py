@@ -6,14 +6,32 @@ from renderer.renderer_manager.managers import (
     shader_manager,
     texture_manager,
 )
+from renderer.renderer_manager.managers.cluster_manager import ClusterManager
+from renderer.renderer_manager.managers.indirect_draw_manager import IndirectDrawManager
+from renderer.renderer_manager.managers.instance_batch_manager import InstanceBatchManager
+from renderer.renderer_manager.managers.lod_manager import LodManager
+from renderer.renderer_manager.managers.material_buffer_manager import MaterialBufferManager
 from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from renderer.renderer_manager.managers.streaming_manager import StreamingManager
+from renderer.renderer_manager.managers.texture_array_manager import TextureArrayManager
+from renderer.renderer_manager.managers.texture_manager import TextureManager
+from renderer.renderer_manager.managers.uniform_buffer_manager import UniformBufferManager
 
 __all__ = [
+    'ClusterManager',
+    'IndirectDrawManager',
+    'InstanceBatchManager',
     'instance_manager',
     'light_manager',
+    'LodManager',
+    'MaterialBufferManager',
     'material_manager',
     'MeshManager',
     'model_manager',
     'shader_manager',
+    'StreamingManager',
+    'TextureArrayManager',
+    'TextureManager',
     'texture_manager',
+    'UniformBufferManager',
 ]
@@ -0,0 +1,233 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from renderer.camera.camera import Camera
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from utils import Singleton
+from utils.config import Config
+from utils.meshlet_builder import CONE_DISABLED
+
+
+@dataclass
+class _MeshletBounds:
+    """Bounds of the meshlets of a mesh, in contiguous arrays ready for the culling."""
+
+    # meshlets the bounds were extracted from
+    meshlets: np.ndarray
+    # homogeneous centers of the bounding spheres (x, y, z, 1)
+    centers: np.ndarray
+    radiuses: np.ndarray
+    # homogeneous apexes of the normal cones (x, y, z, 1)
+    apexes: np.ndarray
+    axes: np.ndarray
+    cutoffs: np.ndarray
+    # meshlets whose normal cone can be used for back-face culling
+    cones: np.ndarray
+    first_indices: np.ndarray
+    index_counts: np.ndarray
+
+    @classmethod
+    def from_meshlets(cls, meshlets: np.ndarray) -> '_MeshletBounds':
+        ones = np.ones((len(meshlets), 1))
+
+        return cls(
+            meshlets,
+            np.hstack((meshlets['center'], ones)),
+            meshlets['radius'].astype(np.float64),
+            np.hstack((meshlets['cone_apex'], ones)),
+            meshlets['cone_axis'].astype(np.float64),
+            meshlets['cone_cutoff'].astype(np.float64),
+            meshlets['cone_cutoff'] < CONE_DISABLED,
+            meshlets['first_index'].astype(np.int64),
+            meshlets['index_count'].astype(np.int64),
+        )
+
+
+def _determinant(linear: np.ndarray) -> float:
+    # determinant of a 3x3 matrix, negative when the matrix mirrors the model
+    (a, b, c), (d, e, f), (g, h, i) = linear.tolist()
+    return a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+
+class ClusterManager(metaclass=Singleton):
+    def __init__(self, enabled: bool = None, backface_culling: bool = None, min_meshlets: int = None) -> None:
+        """Culling of the meshlets of the full detail meshes on the CPU, before their submission.
+
+        The meshlets of a model are rejected when their bounding sphere is outside of the camera frustum, or when
+        their normal cone faces away from the camera, and only the surviving ones are drawn. The meshlets are tested
+        all at once with NumPy, and the runs of consecutive surviving meshlets are merged into a single range of
+        indices.
+
+        Args:
+            enabled (bool, optional): Cull the meshlets, otherwise the whole meshes are drawn. Defaults to True.
+            backface_culling (bool, optional): Also cull the meshlets facing away from the camera. Defaults to True.
+            min_meshlets (int, optional): Meshes with fewer meshlets are always drawn whole. Defaults to 8.
+
+        """
+        default_config = {
+            'enabled': True,
+            'backface_culling': True,
+            'min_meshlets': 8,
+        }
+
+        Config().initialize_parameters(
+            self,
+            'clusters',
+            default_config,
+            enabled=enabled,
+            backface_culling=backface_culling,
+            min_meshlets=min_meshlets,
+        )
+
+        # planes of the camera frustum (normal, -distance) and position of the camera for the frame being drawn
+        self._planes: np.ndarray = np.zeros((0, 4))
+        self._eye: np.ndarray = np.zeros(3)
+
+        # bounds of the meshlets of every mesh
+        self._bounds: dict[str, _MeshletBounds] = {}
+
+        # meshlets and triangles culled by every pass in the frame being drawn
+        self._frame_stats: dict[str, dict[str, int]] = {}
+        # meshlets and triangles culled by every pass in the last complete frame
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def begin_frame(self, camera: Camera) -> None:
+        """Store the camera of the next frame, and start counting the culled meshlets.
+
+        Args:
+            camera (Camera): Camera the frame is drawn from
+
+        """
+        self.stats = self._frame_stats
+        self._frame_stats = {}
+
+        self._planes = np.array([[*plane.normal, -plane.distance] for plane in camera.frustum.planes])
+        self._eye = np.array(camera.position, dtype=np.float64)
+
+    def cull(
+        self, render_pass: str, mesh: str, mesh_manager: MeshManager, model_matrix: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        """Cull the meshlets of a model outside of the camera frustum or facing away from the camera.
+
+        Args:
+            render_pass (str): Name of the pass drawing the model
+            mesh (str): Name of the mesh drawn
+            mesh_manager (MeshManager): Manager storing the meshes
+            model_matrix (np.ndarray): OpenGL model matrix of the model
+
+        Returns:
+            tuple[np.ndarray, np.ndarray] | None: First index and number of indices of the ranges to draw, None if
+                the whole mesh has to be drawn
+
+        """
+        return self._cull(render_pass, mesh, mesh_manager, model_matrix, self._eye, self._planes, None)
+
+    def cull_light(
+        self,
+        render_pass: str,
+        mesh: str,
+        mesh_manager: MeshManager,
+        model_matrix: np.ndarray,
+        light: any,
+        far_plane: float,
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        """Cull the meshlets of a model out of the range of a point light or facing away from it.
+
+        Args:
+            render_pass (str): Name of the pass drawing the model
+            mesh (str): Name of the mesh drawn
+            mesh_manager (MeshManager): Manager storing the meshes
+            model_matrix (np.ndarray): OpenGL model matrix of the model
+            light (any): Position of the light
+            far_plane (float): Far plane of the shadow of the light
+
+        Returns:
+            tuple[np.ndarray, np.ndarray] | None: First index and number of indices of the ranges to draw, None if
+                the whole mesh has to be drawn
+
+        """
+        eye = np.array(light, dtype=np.float64)[:3]
+        return self._cull(render_pass, mesh, mesh_manager, model_matrix, eye, None, far_plane)
+
+    def _cull(
+        self,
+        render_pass: str,
+        mesh: str,
+        mesh_manager: MeshManager,
+        model_matrix: np.ndarray,
+        eye: np.ndarray,
+        planes: np.ndarray | None,
+        max_distance: float | None,
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        meshlets = mesh_manager.meshlets(mesh)
+        if not self.enabled or meshlets is None or len(meshlets) < self.min_meshlets:
+            return None
+
+        # extract the bounds of the meshlets again when the mesh got new data
+        bounds = self._bounds.get(mesh)
+        if bounds is None or bounds.meshlets is not meshlets:
+            bounds = self._bounds[mesh] = _MeshletBounds.from_meshlets(meshlets)
+
+        # the rows of the OpenGL matrix are the columns of the model matrix, the last one being the translation
+        transform = np.asarray(model_matrix, dtype=np.float64)[:, :3]
+        linear = transform[:3]
+        scales = np.sqrt((linear * linear).sum(axis=1))
+
+        # bounding spheres of the meshlets in world space
+        centers = bounds.centers @ transform
+        radiuses = bounds.radiuses * scales.max()
+
+        if planes is not None:
+            visible = np.all(centers @ planes[:, :3].T + planes[:, 3] > -radiuses[:, None], axis=1)
+        else:
+            visible = np.ones(len(radiuses), dtype=bool)
+
+        if max_distance is not None:
+            offsets = centers - eye
+            visible &= np.sqrt((offsets * offsets).sum(axis=1)) - radiuses < max_distance
+
+        # the normal cones stay valid under rotations and uniform scales only, without mirroring
+        uniform = scales.max() - scales.min() <= 1e-4 * scales.max()
+        if self.backface_culling and uniform and _determinant(linear) > 0:
+            directions = bounds.apexes @ transform - eye
+            axes = bounds.axes @ linear
+            distances = np.sqrt((directions * directions).sum(axis=1)) * scales[0]
+
+            back_facing = (directions * axes).sum(axis=1) >= bounds.cutoffs * distances
+            visible &= ~(back_facing & bounds.cones)
+
+        self._count(render_pass, bounds, visible)
+
+        if visible.all():
+            return None
+
+        # merge the runs of consecutive visible meshlets, which are contiguous in the index buffer
+        padded = np.concatenate(([False], visible, [False]))
+        runs = np.flatnonzero(padded[1:] != padded[:-1]).reshape(-1, 2)
+        run_starts = runs[:, 0]
+        run_ends = runs[:, 1] - 1
+
+        first_indices = bounds.first_indices[run_starts]
+        index_counts = bounds.first_indices[run_ends] + bounds.index_counts[run_ends] - first_indices
+
+        return first_indices, index_counts
+
+    def _count(self, render_pass: str, bounds: _MeshletBounds, visible: np.ndarray) -> None:
+        stats = self._frame_stats.get(render_pass)
+        if stats is None:
+            stats = self._frame_stats[render_pass] = {
+                'models': 0,
+                'meshlets': 0,
+                'culled_meshlets': 0,
+                'triangles': 0,
+                'culled_triangles': 0,
+            }
+
+        culled_indices = bounds.index_counts.sum() - bounds.index_counts @ visible
+
+        stats['models'] += 1
+        stats['meshlets'] += len(visible)
+        stats['culled_meshlets'] += len(visible) - int(np.count_nonzero(visible))
+        stats['triangles'] += int(bounds.index_counts.sum()) // 3
+        stats['culled_triangles'] += int(culled_indices) // 3
@@ -0,0 +1,188 @@
+# ruff: noqa: F403, F405
+
+import ctypes
+
+import numpy as np
+from OpenGL.GL import *
+
+from renderer.renderer_manager.managers.mesh_arena import DRAW_COMMAND_DTYPE
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from renderer.renderer_manager.managers.texture_array_manager import NO_TEXTURE, TextureSlot
+from utils import Singleton
+from utils.uniform_blocks import DRAW_DATA_DTYPE, STORAGE_BLOCK_BINDINGS
+
+# location of the instanced attribute giving the shaders the index of their draw (the base instance of the command)
+DRAW_ID_LOCATION = 15
+
+
+class IndirectDrawManager(metaclass=Singleton):
+    def __init__(self) -> None:
+        """Submission of the models of a pass with glMultiDrawElementsIndirect.
+
+        The models of a pass are collected during the pass: the data of every model (model matrix, material index,
+        texture slot and vertex format) goes to the DrawData shader storage buffer, and the ranges of indices to draw
+        become indirect draw commands (DRAW_COMMAND_DTYPE) whose base instance is the index of the data of the model.
+        The commands are then drawn with one glMultiDrawElementsIndirect per VAO and texture array.
+
+        gl_DrawID and gl_BaseInstance need GLSL 4.60, so the shaders read the index of their draw from an instanced
+        attribute (DRAW_ID_LOCATION) of consecutive integers, which starts at the base instance of the command.
+        """
+        # OpenGL buffers of the commands, of the data of the draws, and of the draw indices read by the attribute
+        self._command_buffer: int = glGenBuffers(1)
+        self._draw_buffer: int = glGenBuffers(1)
+        self._draw_id_buffer: int = glGenBuffers(1)
+        # number of draw indices stored in the draw index buffer
+        self._draw_id_capacity: int = 0
+
+        glBindBufferBase(GL_SHADER_STORAGE_BUFFER, STORAGE_BLOCK_BINDINGS['DrawData'], self._draw_buffer)
+
+        # pass being collected
+        self._render_pass: str = None
+        # data of every draw of the pass
+        self._model_matrices: list[np.ndarray] = []
+        self._material_indices: list[int] = []
+        self._texture_layers: list[int] = []
+        self._texture_rects: list[tuple[float, float, float, float]] = []
+        self._quantizations: list[tuple[tuple[float, float, float], tuple[float, float, float]]] = []
+        # commands of the pass, for every VAO, index type and texture array drawn with
+        self._commands: dict[tuple[int, int, int], list[tuple[int, int, int, int, int]]] = {}
+
+        # models, commands and indirect draw calls of every pass in the frame being drawn
+        self._frame_stats: dict[str, dict[str, int]] = {}
+        # models, commands and indirect draw calls of every pass in the last complete frame
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def begin_pass(self, render_pass: str) -> None:
+        """Start collecting the models of a pass.
+
+        Args:
+            render_pass (str): Name of the pass
+
+        """
+        self._render_pass = render_pass
+        self._model_matrices = []
+        self._material_indices = []
+        self._texture_layers = []
+        self._texture_rects = []
+        self._quantizations = []
+        self._commands = {}
+
+    def add(
+        self,
+        mesh: str,
+        mesh_manager: MeshManager,
+        model_matrix: np.ndarray,
+        material_index: int,
+        slot: TextureSlot | None,
+        ranges: tuple[np.ndarray, np.ndarray] | None = None,
+    ) -> None:
+        """Add a model to the pass.
+
+        Args:
+            mesh (str): Name of the mesh drawn
+            mesh_manager (MeshManager): Manager storing the meshes
+            model_matrix (np.ndarray): OpenGL model matrix of the model
+            material_index (int): Index of the material of the model in the material table
+            slot (TextureSlot | None): Place of the texture of the model in the texture arrays, None without texture
+            ranges (tuple[np.ndarray, np.ndarray] | None, optional): First index and number of indices of the ranges
+                of the mesh to draw (see ClusterManager.cull). Defaults to None to draw the whole mesh.
+
+        """
+        draw_index = len(self._model_matrices)
+
+        self._model_matrices.append(model_matrix)
+        self._material_indices.append(material_index)
+        self._texture_layers.append(NO_TEXTURE if slot is None else slot.layer)
+        self._texture_rects.append((0.0, 0.0, 1.0, 1.0) if slot is None else slot.rect)
+
+        quantization = mesh_manager.quantization(mesh)
+        self._quantizations.append(None if quantization is None else (tuple(quantization[0]), tuple(quantization[1])))
+
+        # the commands drawn with the same VAO and texture array are submitted together
+        key = (mesh_manager.vao(mesh), mesh_manager.index_type(mesh), 0 if slot is None else slot.array)
+        commands = self._commands.get(key)
+        if commands is None:
+            commands = self._commands[key] = []
+
+        if ranges is None:
+            commands.extend(mesh_manager.draw_commands(mesh, draw_index))
+        else:
+            commands.extend(mesh_manager.draw_commands(mesh, draw_index, *ranges))
+
+    def submit(self) -> None:
+        """Upload the data and the commands of the models of the pass, and draw them with the shader in use."""
+        draw_count = len(self._model_matrices)
+        if draw_count == 0:
+            return
+
+        # data of the draws, in the layout of DrawData
+        draws = np.zeros(draw_count, DRAW_DATA_DTYPE)
+        draws['model'] = np.asarray(self._model_matrices, dtype=np.float32).reshape(draw_count, 4, 4)
+        draws['material_index'] = self._material_indices
+        draws['texture_layer'] = self._texture_layers
+        draws['texture_rect'] = self._texture_rects
+
+        for i, quantization in enumerate(self._quantizations):
+            if quantization is not None:
+                draws['position_offset'][i] = quantization[0]
+                draws['position_scale'][i] = quantization[1]
+                draws['compressed_vertices'][i] = 1
+
+        glBindBuffer(GL_SHADER_STORAGE_BUFFER, self._draw_buffer)
+        glBufferData(GL_SHADER_STORAGE_BUFFER, draws.nbytes, draws.tobytes(), GL_STREAM_DRAW)
+        glBindBuffer(GL_SHADER_STORAGE_BUFFER, 0)
+
+        # commands of every group one after the other (the groups of models whose meshlets were all culled are empty)
+        groups = [(key, group) for key, group in self._commands.items() if group]
+        commands = np.array([command for _, group in groups for command in group], dtype=DRAW_COMMAND_DTYPE)
+
+        glBindBuffer(GL_DRAW_INDIRECT_BUFFER, self._command_buffer)
+        glBufferData(GL_DRAW_INDIRECT_BUFFER, commands.nbytes, commands.tobytes(), GL_STREAM_DRAW)
+
+        self._reserve_draw_ids(draw_count)
+
+        offset = 0
+        for (vao, index_type, array), group in groups:
+            glBindVertexArray(vao)
+
+            # the draw index starts at the base instance of every command, and advances once per instance
+            glBindBuffer(GL_ARRAY_BUFFER, self._draw_id_buffer)
+            glEnableVertexAttribArray(DRAW_ID_LOCATION)
+            glVertexAttribIPointer(DRAW_ID_LOCATION, 1, GL_UNSIGNED_INT, 0, None)
+            glVertexAttribDivisor(DRAW_ID_LOCATION, 1)
+
+            if array:
+                glActiveTexture(GL_TEXTURE0)
+                glBindTexture(GL_TEXTURE_2D_ARRAY, array)
+
+            glMultiDrawElementsIndirect(
+                GL_TRIANGLES, index_type, ctypes.c_void_p(offset * DRAW_COMMAND_DTYPE.itemsize), len(group), 0
+            )
+            offset += len(group)
+
+        glBindBuffer(GL_DRAW_INDIRECT_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        stats = self._frame_stats.get(self._render_pass)
+        if stats is None:
+            stats = self._frame_stats[self._render_pass] = {'models': 0, 'commands': 0, 'calls': 0}
+
+        stats['models'] += draw_count
+        stats['commands'] += len(commands)
+        stats['calls'] += len(groups)
+
+    def _reserve_draw_ids(self, draw_count: int) -> None:
+        # the draw index buffer holds the integers from 0, double its size when there are more draws
+        if draw_count <= self._draw_id_capacity:
+            return
+
+        self._draw_id_capacity = max(self._draw_id_capacity * 2, draw_count, 1024)
+        draw_ids = np.arange(self._draw_id_capacity, dtype=np.uint32)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self._draw_id_buffer)
+        glBufferData(GL_ARRAY_BUFFER, draw_ids.nbytes, draw_ids, GL_STATIC_DRAW)
+
+    def begin_frame(self) -> None:
+        """Start counting the models and the draw calls of the next frame."""
+        self.stats = self._frame_stats
+        self._frame_stats = {}
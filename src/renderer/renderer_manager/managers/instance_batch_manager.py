@@ -0,0 +1,249 @@
+# ruff: noqa: F403, F405
+
+import ctypes
+from dataclasses import dataclass
+
+import numpy as np
+from OpenGL.GL import *
+
+from renderer.material.material import Material
+from renderer.model.model import Model
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from renderer.renderer_manager.managers.texture_array_manager import NO_TEXTURE, TextureArrayManager, TextureSlot
+from renderer.shader.shader import Shader
+from utils import Singleton
+from utils.config import Config
+
+# data of every instance of a batch, read by the shaders as instanced attributes
+INSTANCE_DTYPE = np.dtype(
+    {
+        'names': ['model', 'texture_rect', 'material_index', 'texture_layer'],
+        'formats': [(np.float32, (4, 4)), (np.float32, 4), np.int32, np.int32],
+        'offsets': [0, 64, 80, 84],
+        'itemsize': 88,
+    }
+)
+
+# location of the first instanced attribute (the model matrix takes the locations 3 to 6, after the vertex, normal
+# and uv of the meshes)
+INSTANCE_LOCATION = 3
+
+
+@dataclass
+class _InstanceBatch:
+    """Instance buffer of a group of models sharing their mesh, kept from one frame to the next."""
+
+    # OpenGL buffer of the instances
+    buffer: int
+    # data of the instances, as uploaded in the buffer (its length is the capacity of the buffer)
+    rows: np.ndarray
+    # whether the batch was drawn in the frame being drawn, the batches left undrawn for a frame are released
+    drawn: bool = True
+
+
+class InstanceBatchManager(metaclass=Singleton):
+    def __init__(self, min_instances: int = None) -> None:
+        """Automatic instancing of the visible models sharing their mesh and their shader.
+
+        The visible models of a pass are grouped by mesh (of their level of detail), shader and texture array, and the
+        groups of at least min_instances models are drawn with a single glDrawElementsInstanced. The model matrix,
+        material index and texture slot of every model of a group are instanced attributes, read from the instance
+        buffer of the group. The buffers are kept from one frame to the next: the instances are compared with the
+        ones already uploaded, and only the range of instances that changed is uploaded again.
+
+        The smaller groups are left to the caller, to draw their models one by one.
+
+        Args:
+            min_instances (int, optional): Groups with fewer models are drawn one by one. Defaults to 8.
+
+        """
+        default_config = {
+            'min_instances': 8,
+        }
+
+        Config().initialize_parameters(self, 'instancing', default_config, min_instances=min_instances)
+
+        # instance buffer of every pass, mesh, shader and texture array
+        self._batches: dict[tuple[str, str, str, int], _InstanceBatch] = {}
+
+        # models, instanced draws and uploads of every pass in the frame being drawn
+        self._frame_stats: dict[str, dict[str, int]] = {}
+        # models, instanced draws and uploads of every pass in the last complete frame
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def draw(
+        self,
+        render_pass: str,
+        visible: list[tuple[Model, str]],
+        shader: Shader,
+        mesh_manager: MeshManager,
+        texture_array_manager: TextureArrayManager,
+        materials: dict[str, Material],
+        model_matrices: dict[str, np.ndarray],
+    ) -> list[tuple[Model, str]]:
+        """Draw the groups of visible models sharing their mesh and their shader with instanced draws.
+
+        Args:
+            render_pass (str): Name of the pass
+            visible (list[tuple[Model, str]]): Visible models, with the mesh of their level of detail
+            shader (Shader): Shader in use, reading the instanced attributes
+            mesh_manager (MeshManager): Manager storing the meshes
+            texture_array_manager (TextureArrayManager): Manager of the texture arrays holding the model textures
+            materials (dict[str, Material]): Dictionary of materials
+            model_matrices (dict[str, np.ndarray]): Dictionary of OpenGL model matrices
+
+        Returns:
+            list[tuple[Model, str]]: Models of the groups too small to be instanced, to draw one by one
+
+        """
+        stats = self._frame_stats.get(render_pass)
+        if stats is None:
+            stats = self._frame_stats[render_pass] = {
+                'models': 0,
+                'instanced_models': 0,
+                'draws': 0,
+                'uploaded_instances': 0,
+                'uploaded_bytes': 0,
+            }
+
+        # group the models by mesh, shader and texture array, in the order they were given
+        keys = []
+        groups: dict[tuple[str, str, int], list[tuple[Model, TextureSlot | None]]] = {}
+        for model, mesh in visible:
+            slot = texture_array_manager.slot(model.texture_slot)
+            key = (mesh, model.shader, 0 if slot is None else slot.array)
+            keys.append(key)
+
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = []
+            group.append((model, slot))
+
+        for key, group in groups.items():
+            if len(group) >= self.min_instances:
+                self._draw_batch(render_pass, key, group, shader, mesh_manager, materials, model_matrices, stats)
+
+        stats['models'] += len(visible)
+
+        return [entry for entry, key in zip(visible, keys) if len(groups[key]) < self.min_instances]
+
+    def _draw_batch(
+        self,
+        render_pass: str,
+        key: tuple[str, str, int],
+        group: list[tuple[Model, TextureSlot | None]],
+        shader: Shader,
+        mesh_manager: MeshManager,
+        materials: dict[str, Material],
+        model_matrices: dict[str, np.ndarray],
+        stats: dict[str, int],
+    ) -> None:
+        mesh, _, array = key
+        count = len(group)
+
+        # data of the instances, in the layout of the instance buffer
+        rows = np.zeros(count, INSTANCE_DTYPE)
+        matrices = [model_matrices.get(model.name) for model, _ in group]
+        rows['model'] = np.asarray(matrices, dtype=np.float32).reshape(count, 4, 4)
+        rows['material_index'] = [materials.get(model.material).index for model, _ in group]
+        rows['texture_layer'] = [NO_TEXTURE if slot is None else slot.layer for _, slot in group]
+        rows['texture_rect'] = [(0.0, 0.0, 1.0, 1.0) if slot is None else slot.rect for _, slot in group]
+
+        batch = self._batches.get((render_pass, *key))
+        if batch is None:
+            batch = self._batches[(render_pass, *key)] = _InstanceBatch(glGenBuffers(1), np.zeros(0, INSTANCE_DTYPE))
+
+        batch.drawn = True
+        uploaded = self._upload(batch, rows)
+        stats['uploaded_instances'] += uploaded
+        stats['uploaded_bytes'] += uploaded * INSTANCE_DTYPE.itemsize
+
+        # the instanced attributes are added to the VAO of the mesh, and point to the buffer of the batch
+        glBindVertexArray(mesh_manager.vao(mesh))
+        self._bind_attributes(batch.buffer)
+        mesh_manager.bind_vertex_format(shader, mesh)
+
+        if array:
+            glActiveTexture(GL_TEXTURE0)
+            glBindTexture(GL_TEXTURE_2D_ARRAY, array)
+
+        mesh_manager.draw(mesh, count)
+
+        stats['instanced_models'] += count
+        stats['draws'] += 1
+
+    @staticmethod
+    def _upload(batch: _InstanceBatch, rows: np.ndarray) -> int:
+        # upload the instances that changed since the last frame, returns the number of instances uploaded
+        count = len(rows)
+        glBindBuffer(GL_ARRAY_BUFFER, batch.buffer)
+
+        # double the capacity of the buffer when the group doesn't fit anymore, and upload it whole
+        if count > len(batch.rows):
+            batch.rows = np.zeros(max(len(batch.rows) * 2, count), INSTANCE_DTYPE)
+            batch.rows[:count] = rows
+
+            glBufferData(GL_ARRAY_BUFFER, batch.rows.nbytes, None, GL_DYNAMIC_DRAW)
+            glBufferSubData(GL_ARRAY_BUFFER, 0, rows.nbytes, rows.tobytes())
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            return count
+
+        # compare the bytes of every instance with the uploaded ones, and upload the range between the first and the
+        # last instance that changed
+        uploaded = batch.rows[:count]
+        changed = np.flatnonzero(
+            np.any(rows.view(np.uint8).reshape(count, -1) != uploaded.view(np.uint8).reshape(count, -1), axis=1)
+        )
+
+        if len(changed) == 0:
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            return 0
+
+        first, last = int(changed[0]), int(changed[-1]) + 1
+        batch.rows[first:last] = rows[first:last]
+
+        glBufferSubData(
+            GL_ARRAY_BUFFER, first * INSTANCE_DTYPE.itemsize, rows[first:last].nbytes, rows[first:last].tobytes()
+        )
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        return last - first
+
+    @staticmethod
+    def _bind_attributes(buffer: int) -> None:
+        stride = INSTANCE_DTYPE.itemsize
+        model_offset = INSTANCE_DTYPE.fields['model'][1]
+
+        glBindBuffer(GL_ARRAY_BUFFER, buffer)
+
+        # one location for every column of the model matrix
+        for column in range(4):
+            location = INSTANCE_LOCATION + column
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(model_offset + column * 16))
+            glVertexAttribDivisor(location, 1)
+
+        location = INSTANCE_LOCATION + 4
+        glEnableVertexAttribArray(location)
+        glVertexAttribPointer(
+            location, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(INSTANCE_DTYPE.fields['texture_rect'][1])
+        )
+        glVertexAttribDivisor(location, 1)
+
+        # the material index and the texture layer stay integers
+        for location, field_name in enumerate(('material_index', 'texture_layer'), INSTANCE_LOCATION + 5):
+            glEnableVertexAttribArray(location)
+            glVertexAttribIPointer(location, 1, GL_INT, stride, ctypes.c_void_p(INSTANCE_DTYPE.fields[field_name][1]))
+            glVertexAttribDivisor(location, 1)
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def begin_frame(self) -> None:
+        """Release the instance buffers of the groups that weren't drawn, and start counting the next frame."""
+        for key in [key for key, batch in self._batches.items() if not batch.drawn]:
+            glDeleteBuffers(1, [self._batches.pop(key).buffer])
+
+        for batch in self._batches.values():
+            batch.drawn = False
+
+        self.stats = self._frame_stats
+        self._frame_stats = {}
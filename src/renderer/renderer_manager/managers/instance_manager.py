@@ -25,6 +25,8 @@ def new_instance(self, name, mesh, shader) -> None:
     # set the instance constants
     instance.mesh = mesh
     instance.shader = shader
+    # the instance VAO references the buffers of the mesh, keep them resident
+    self.mesh_manager.acquire_mesh(mesh, pin=True)
 
     # intialize the instance
     self._initialize_instance(name)
@@ -89,11 +91,29 @@ def remove_model_from_instance(self, model, instance) -> None:
 
 def set_instance_mesh(self, instance, mesh) -> None:
     if mesh != self.instances[instance].mesh:
-        self.instances[instance].set_mesh(mesh, self.vertex_vbos[mesh], self.normal_vbos[mesh], self.uv_vbo[mesh])
+        self.mesh_manager.release_mesh(self.instances[instance].mesh, pin=True)
+        self.mesh_manager.acquire_mesh(mesh, pin=True)
+        _bind_instance_mesh(self, self.instances[instance], mesh)
     # self.instances[instance].mesh = mesh
     # self.instances[instance].to_update = True
 
 
+def update_instance_buffers(self) -> None:
+    # the mesh arena replaces its buffers when it's compacted, link the instance VAOs reading them to the new ones
+    for instance in self.instances.values():
+        if instance.buffers_generation != self.mesh_manager.buffers_generation(instance.mesh):
+            _bind_instance_mesh(self, instance, instance.mesh)
+
+
+def _bind_instance_mesh(self, instance, mesh) -> None:
+    # set the vertex buffers of the mesh in the instance VAO, then its element buffer
+    instance.set_mesh(mesh, self.mesh_manager.layout(mesh), self.mesh_manager.vbos(mesh))
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.mesh_manager.ebo(mesh))
+    glBindVertexArray(0)
+
+    instance.buffers_generation = self.mesh_manager.buffers_generation(mesh)
+
+
 def set_instance_shader(self, instance, shader) -> None:
     self.instances[instance].shader = shader
     # self.instances[instance].to_update = True
@@ -234,28 +254,13 @@ def initialize_instance(self, name) -> None:
     instance.vao = glGenVertexArrays(1)
     # bind the newly created VAO
     glBindVertexArray(instance.vao)
-    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebos[instance.mesh])
-
-    # bind the vertex vbo of the mesh of the instance
-    glBindBuffer(GL_ARRAY_BUFFER, self.vertex_vbos[instance.mesh])
-    # enable the index 0 of the VAO
-    glEnableVertexAttribArray(0)
-    # link the VBO to the index 0 of the VAO and interpret it as 3 floats
-    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-
-    # bind the normals vbo of the mesh of the instance
-    glBindBuffer(GL_ARRAY_BUFFER, self.normal_vbos[instance.mesh])
-    # enable the index 1 of the VAO
-    glEnableVertexAttribArray(1)
-    # link the VBO to the index 1 of the VAO and interpret it as 3 floats
-    glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-
-    # bind the uv vbo of the mesh of the instance
-    glBindBuffer(GL_ARRAY_BUFFER, self.uv_vbos[instance.mesh])
-    # enable the index 2 of the VAO
-    glEnableVertexAttribArray(2)
-    # link the VBO to the index 2 of the VAO and interpret it as 2 floats
-    glVertexAttribPointer(2, 2, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+    glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.mesh_manager.ebo(instance.mesh))
+
+    # link the vertex attributes of the mesh of the instance (locations 0, 1 and 2)
+    instance.layout = self.mesh_manager.layout(instance.mesh)
+    instance.vbos = self.mesh_manager.vbos(instance.mesh)
+    instance.layout.bind(instance.vbos)
+    instance.buffers_generation = self.mesh_manager.buffers_generation(instance.mesh)
 
     # bind the matrices vbo of the models of the instance
     glBindBuffer(GL_ARRAY_BUFFER, instance.model_matrices_vbo)
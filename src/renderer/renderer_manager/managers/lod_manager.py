@@ -0,0 +1,124 @@
+import math
+
+import glm
+
+from renderer.camera.camera import Camera
+from renderer.model.model import Model
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from utils import Singleton
+from utils.config import Config
+
+
+class LodManager(metaclass=Singleton):
+    def __init__(self, enabled: bool = None, thresholds: list[float] = None, hysteresis: float = None) -> None:
+        """Selection of the level of detail drawn for every model, from the size of the model on the screen.
+
+        The size of a model is the diameter of its bounding sphere projected on the screen, as a fraction of the
+        height of the screen. A model is drawn with level i + 1 once its size goes below thresholds[i], and the
+        hysteresis keeps it there until its size goes back over the threshold by the same margin, so that models
+        at the boundary between two levels don't switch every frame.
+
+        Args:
+            enabled (bool, optional): Select the levels of detail, otherwise the full detail meshes are always drawn.
+                Defaults to True.
+            thresholds (list[float], optional): Screen size under which every level switches to the next one.
+                Defaults to [0.25, 0.12, 0.06].
+            hysteresis (float, optional): Relative margin around the thresholds. Defaults to 0.1.
+
+        """
+        default_config = {
+            'enabled': True,
+            'thresholds': [0.25, 0.12, 0.06],
+            'hysteresis': 0.1,
+        }
+
+        Config().initialize_parameters(
+            self, 'lod', default_config, enabled=enabled, thresholds=thresholds, hysteresis=hysteresis
+        )
+
+        # triangles submitted by every pass in the frame being drawn, with the full detail meshes and the selected
+        # levels of detail
+        self._frame_stats: dict[str, dict[str, int]] = {}
+        # triangles submitted by every pass in the last complete frame
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def select(
+        self,
+        models: list[Model],
+        mesh_manager: MeshManager,
+        camera: Camera,
+        bounding_sphere_centers: dict[str, glm.vec3],
+        bounding_sphere_radiuses: dict[str, float],
+        fov_y: float,
+    ) -> None:
+        """Select the level of detail of every model for the next frame, and start counting its triangles.
+
+        Args:
+            models (list[Model]): Models to select the level of detail of
+            mesh_manager (MeshManager): Manager storing the levels of detail of the meshes
+            camera (Camera): Camera the frame is drawn from
+            bounding_sphere_centers (dict[str, glm.vec3]): Center of the bounding sphere of every model
+            bounding_sphere_radiuses (dict[str, float]): Radius of the bounding sphere of every model
+            fov_y (float): Vertical field of view in radians
+
+        """
+        self.stats = self._frame_stats
+        self._frame_stats = {}
+
+        # size on the screen of a sphere of radius 1 at a distance of 1
+        screen_scale = 1.0 / math.tan(fov_y * 0.5)
+        eye = camera.position
+
+        for model in models:
+            chain = model.lods or mesh_manager.lods(model.mesh)
+
+            if not self.enabled or len(chain) == 1:
+                model.lod = 0
+                model.lod_mesh = chain[0]
+                continue
+
+            radius = bounding_sphere_radiuses.get(model.name, 0.0)
+            distance = glm.distance(bounding_sphere_centers.get(model.name, eye), eye)
+
+            # the camera is inside the bounding sphere, the model covers the whole screen
+            size = math.inf if distance <= radius else radius * screen_scale / distance
+
+            model.lod = self._select_level(size, model.lod, min(len(chain) - 1, len(self.thresholds)))
+            model.lod_mesh = chain[model.lod]
+
+    def _select_level(self, size: float, level: int, last_level: int) -> int:
+        level = min(level, last_level)
+
+        # move to coarser levels while the model is smaller than their threshold, minus the margin
+        while level < last_level and size < self.thresholds[level] * (1.0 - self.hysteresis):
+            level += 1
+
+        # move back to finer levels while the model is bigger than their threshold, plus the margin
+        while level > 0 and size > self.thresholds[level - 1] * (1.0 + self.hysteresis):
+            level -= 1
+
+        return level
+
+    def submit(self, render_pass: str, model: Model, mesh_manager: MeshManager) -> str:
+        """Get the mesh to draw a model with, counting its triangles in the statistics of the pass.
+
+        Args:
+            render_pass (str): Name of the pass drawing the model
+            model (Model): Model being drawn
+            mesh_manager (MeshManager): Manager storing the meshes
+
+        Returns:
+            str: Name of the mesh of the selected level of detail
+
+        """
+        mesh = model.lod_mesh or model.mesh
+
+        stats = self._frame_stats.get(render_pass)
+        if stats is None:
+            stats = self._frame_stats[render_pass] = {'models': 0, 'triangles': 0, 'lod_triangles': 0}
+
+        stats['models'] += 1
+        stats['triangles'] += mesh_manager.triangle_count(model.mesh)
+        stats['lod_triangles'] += mesh_manager.triangle_count(mesh)
+
+        return mesh
@@ -0,0 +1,118 @@
+# ruff: noqa: F403, F405
+
+import numpy as np
+from OpenGL.GL import *
+
+from renderer.material.material import Material
+from utils import Singleton
+from utils.uniform_blocks import MATERIAL_DTYPE, STORAGE_BLOCK_BINDINGS
+
+
+class MaterialBufferManager(metaclass=Singleton):
+    def __init__(self, capacity: int = 64) -> None:
+        """Table of every material in a shader storage buffer (MaterialData, see utils.uniform_blocks).
+
+        Every material gets the index of its row in the table (Material.index), the shaders read the parameters of a
+        model from the row of its material instead of getting them through uniforms. The rows changed since the last
+        upload form a dirty range, uploaded once before the frame is drawn. The table doubles its capacity when it's
+        full, and is then uploaded whole.
+
+        Args:
+            capacity (int, optional): Number of materials the table is allocated for. Defaults to 64.
+
+        """
+        # parameters of every material, in the layout of the shader storage buffer
+        self.table: np.ndarray = np.zeros(capacity, MATERIAL_DTYPE)
+        # index of every material name, a material created again with the same name keeps its row
+        self._indices: dict[str, int] = {}
+
+        # first and last rows changed since the last upload, None when the buffer holds the table
+        self._dirty_first: int = None
+        self._dirty_last: int = None
+        # whether the buffer has to be allocated again for the capacity of the table
+        self._resized: bool = True
+
+        # OpenGL buffer of the table, bound to the binding point of its block
+        self.buffer: int = glGenBuffers(1)
+        glBindBufferBase(GL_SHADER_STORAGE_BUFFER, STORAGE_BLOCK_BINDINGS['MaterialData'], self.buffer)
+
+        # rows and bytes uploaded in the frame being drawn
+        self._frame_stats: dict[str, int] = {'uploads': 0, 'uploaded_materials': 0, 'uploaded_bytes': 0}
+        # materials in the table, and rows and bytes uploaded in the last frame
+        self.stats: dict[str, int] = {}
+
+    @property
+    def count(self) -> int:
+        """Number of materials in the table."""
+        return len(self._indices)
+
+    def add(self, material: Material) -> None:
+        """Give a material its row in the table and write its parameters.
+
+        Args:
+            material (Material): Material to add
+
+        """
+        index = self._indices.get(material.name)
+        if index is None:
+            index = self._indices[material.name] = len(self._indices)
+
+            # double the capacity of the table when it's full
+            if index >= len(self.table):
+                table = np.zeros(len(self.table) * 2, MATERIAL_DTYPE)
+                table[: len(self.table)] = self.table
+                self.table = table
+                self._resized = True
+
+        material.index = index
+        self.update(material)
+
+    def update(self, material: Material) -> None:
+        """Write the parameters of a material in its row, to upload with the next dirty range.
+
+        Args:
+            material (Material): Material that changed
+
+        """
+        row = self.table[material.index]
+        row['ambient'] = material.ambient
+        row['shininess'] = material.shininess
+        row['diffuse'] = material.diffuse
+        row['roughness'] = material.roughness
+        row['specular'] = material.specular
+        row['metallic'] = material.metallic
+
+        if self._dirty_first is None:
+            self._dirty_first = self._dirty_last = material.index
+        else:
+            self._dirty_first = min(self._dirty_first, material.index)
+            self._dirty_last = max(self._dirty_last, material.index)
+
+    def upload(self) -> None:
+        """Upload the rows changed since the last upload, or the whole table if its capacity changed."""
+        if self._dirty_first is None and not self._resized:
+            return
+
+        glBindBuffer(GL_SHADER_STORAGE_BUFFER, self.buffer)
+
+        if self._resized:
+            rows = self.table[: self.count]
+            glBufferData(GL_SHADER_STORAGE_BUFFER, self.table.nbytes, None, GL_DYNAMIC_DRAW)
+            glBufferSubData(GL_SHADER_STORAGE_BUFFER, 0, rows.nbytes, rows.tobytes())
+            self._resized = False
+        else:
+            rows = self.table[self._dirty_first : self._dirty_last + 1]
+            offset = self._dirty_first * MATERIAL_DTYPE.itemsize
+            glBufferSubData(GL_SHADER_STORAGE_BUFFER, offset, rows.nbytes, rows.tobytes())
+
+        glBindBuffer(GL_SHADER_STORAGE_BUFFER, 0)
+
+        self._dirty_first = self._dirty_last = None
+        self._frame_stats['uploads'] += 1
+        self._frame_stats['uploaded_materials'] += len(rows)
+        self._frame_stats['uploaded_bytes'] += rows.nbytes
+
+    def begin_frame(self) -> None:
+        """Start counting the uploads of the next frame."""
+        self.stats = {'materials': self.count, **self._frame_stats}
+        self._frame_stats = {'uploads': 0, 'uploaded_materials': 0, 'uploaded_bytes': 0}
@@ -0,0 +1,406 @@
+# ruff: noqa: F403, F405
+
+import ctypes
+from dataclasses import dataclass
+
+import numpy as np
+from OpenGL.GL import *
+
+from utils import print_info
+from utils.mesh_file import MeshData
+from utils.vertex_layout import VertexLayout
+
+# size in bytes of the indices of every OpenGL index type
+INDEX_SIZES = {GL_UNSIGNED_SHORT: 2, GL_UNSIGNED_INT: 4}
+
+# command of glMultiDrawElementsIndirect (DrawElementsIndirectCommand), drawing a range of the buffers like
+# glDrawElementsBaseVertex
+DRAW_COMMAND_DTYPE = np.dtype(
+    [
+        ('count', '<u4'),
+        ('instance_count', '<u4'),
+        ('first_index', '<u4'),
+        ('base_vertex', '<i4'),
+        ('base_instance', '<u4'),
+    ]
+)
+
+
+@dataclass
+class MeshRange:
+    """Range of the shared buffers storing a mesh, as passed to glDrawElementsBaseVertex.
+
+    The indices of the mesh are relative to its first vertex, so the same range object stays valid after the arena
+    moves the mesh around, as long as its fields are updated.
+    """
+
+    # position of the first index of the mesh in the index buffer
+    first_index: int
+    # number of indices of the mesh
+    index_count: int
+    # position of the first vertex of the mesh in the vertex buffers, added to every index
+    base_vertex: int = 0
+    # number of vertices of the mesh
+    vertex_count: int = 0
+    # OpenGL type of the indices
+    index_type: int = GL_UNSIGNED_INT
+    # True if the mesh is stored in the mesh arena
+    in_arena: bool = False
+
+    @property
+    def index_offset(self) -> ctypes.c_void_p:
+        """Byte offset of the first index in the index buffer."""
+        return ctypes.c_void_p(self.first_index * INDEX_SIZES[self.index_type])
+
+
+class FreeListAllocator:
+    """First fit allocator of ranges of elements, keeping a sorted list of free blocks."""
+
+    def __init__(self, capacity: int) -> None:
+        """Create an allocator with a single free block.
+
+        Args:
+            capacity (int): Number of elements that can be allocated
+
+        """
+        self.capacity: int = capacity
+        # sorted list of [offset, size] free blocks, adjacent blocks are always merged
+        self._free: list[list[int]] = [[0, capacity]] if capacity > 0 else []
+
+    @property
+    def free_space(self) -> int:
+        """Total number of free elements."""
+        return sum(size for _, size in self._free)
+
+    @property
+    def largest_block(self) -> int:
+        """Size of the biggest free block."""
+        return max((size for _, size in self._free), default=0)
+
+    @property
+    def fragmentation(self) -> float:
+        """Fraction of the free space that can't be used by a single allocation, from 0 to 1."""
+        free_space = self.free_space
+        return 1.0 - self.largest_block / free_space if free_space else 0.0
+
+    def allocate(self, size: int) -> int | None:
+        """Allocate a range of elements.
+
+        Args:
+            size (int): Number of elements
+
+        Returns:
+            int | None: Offset of the first element, None if there isn't a free block big enough
+
+        """
+        # empty ranges don't take any space
+        if size <= 0:
+            return 0
+
+        for i, (offset, block_size) in enumerate(self._free):
+            if block_size < size:
+                continue
+
+            # take the beginning of the block
+            if block_size == size:
+                self._free.pop(i)
+            else:
+                self._free[i] = [offset + size, block_size - size]
+
+            return offset
+
+        return None
+
+    def free(self, offset: int, size: int) -> None:
+        """Give a range of elements back to the allocator.
+
+        Args:
+            offset (int): Offset of the first element, as returned by allocate
+            size (int): Number of elements
+
+        """
+        if size <= 0:
+            return
+
+        # find the position of the block in the sorted list
+        i = 0
+        while i < len(self._free) and self._free[i][0] < offset:
+            i += 1
+
+        self._free.insert(i, [offset, size])
+
+        # merge with the following block
+        if i + 1 < len(self._free) and self._free[i][0] + self._free[i][1] == self._free[i + 1][0]:
+            self._free[i][1] += self._free.pop(i + 1)[1]
+
+        # merge with the previous block
+        if i > 0 and self._free[i - 1][0] + self._free[i - 1][1] == self._free[i][0]:
+            self._free[i - 1][1] += self._free.pop(i)[1]
+
+    def reset(self, capacity: int, used: int) -> None:
+        """Mark the first elements as allocated and the rest as free, after compacting the allocations.
+
+        Args:
+            capacity (int): New number of elements that can be allocated
+            used (int): Number of allocated elements at the beginning of the range
+
+        """
+        self.capacity = capacity
+        self._free = [[used, capacity - used]] if capacity > used else []
+
+
+class MeshArena:
+    def __init__(
+        self, layout: VertexLayout, vertex_capacity: int, index_capacity: int, index_type: int = GL_UNSIGNED_INT
+    ) -> None:
+        """Set of large buffers storing the data of many meshes, drawn through a single VAO.
+
+        Every mesh gets a range of vertices and a range of indices from free list allocators, the indices are stored
+        relative to the first vertex of the mesh and drawn with glDrawElementsBaseVertex. When an allocation doesn't
+        fit, the live meshes are compacted to the beginning of new buffers, growing them if needed.
+
+        Args:
+            layout (VertexLayout): Layout of the vertex data of every mesh in the arena
+            vertex_capacity (int): Initial number of vertices
+            index_capacity (int): Initial number of indices
+            index_type (int, optional): OpenGL type of the indices, with GL_UNSIGNED_SHORT only the meshes of up to
+                65536 vertices can be stored. Defaults to GL_UNSIGNED_INT.
+
+        """
+        self.layout: VertexLayout = layout
+        self._index_type: int = index_type
+        # size in bytes of an index
+        self.index_size: int = INDEX_SIZES[index_type]
+
+        self._vertices: FreeListAllocator = FreeListAllocator(vertex_capacity)
+        self._indices: FreeListAllocator = FreeListAllocator(index_capacity)
+
+        # ranges of the meshes stored in the arena
+        self._ranges: dict[str, MeshRange] = {}
+
+        # size in bytes of a vertex in each vertex buffer
+        self._vertex_sizes: list[int] = (
+            [layout.stride] if layout.interleaved else [attribute.nbytes for attribute in layout.attributes]
+        )
+
+        # OpenGL buffers, the VAO is never recreated so it can be stored by the users of the arena
+        self.vbos: list[int] = self._create_buffers(vertex_capacity, index_capacity)
+        self.ebo: int = self.vbos.pop()
+        self.vao: int = glGenVertexArrays(1)
+        # number of times the buffers were replaced by a compaction, the VAOs of the users of the arena reading its
+        # buffers must be linked to the new ones when it changes
+        self.generation: int = 0
+
+        self._bind_buffers()
+
+    @property
+    def index_type(self) -> int:
+        """OpenGL type of the indices in the arena."""
+        return self._index_type
+
+    def accepts(self, mesh: MeshData) -> bool:
+        """Check if the indices of a mesh, relative to its first vertex, fit in the index type of the arena."""
+        return self._index_type == GL_UNSIGNED_INT or len(mesh.vertices) // 3 <= np.iinfo(np.uint16).max + 1
+
+    @property
+    def vertex_capacity(self) -> int:
+        return self._vertices.capacity
+
+    @property
+    def index_capacity(self) -> int:
+        return self._indices.capacity
+
+    @property
+    def stats(self) -> dict[str, any]:
+        """Usage of the arena buffers."""
+        return {
+            'meshes': len(self._ranges),
+            'vertices': self._vertices.capacity - self._vertices.free_space,
+            'vertex_capacity': self._vertices.capacity,
+            'indices': self._indices.capacity - self._indices.free_space,
+            'index_capacity': self._indices.capacity,
+            'fragmentation': max(self._vertices.fragmentation, self._indices.fragmentation),
+        }
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ranges
+
+    def range(self, name: str) -> MeshRange | None:
+        return self._ranges.get(name)
+
+    def add(self, name: str, mesh: MeshData) -> MeshRange:
+        """Store a mesh in the arena, replacing the mesh with the same name.
+
+        Args:
+            name (str): Name of the mesh
+            mesh (MeshData): Mesh data
+
+        Raises:
+            ValueError: In case the mesh has too many vertices for the index type of the arena
+
+        Returns:
+            MeshRange: Range of the mesh in the arena buffers
+
+        """
+        if not self.accepts(mesh):
+            raise ValueError(f'{name} has too many vertices for the 16 bit indices of the mesh arena')
+
+        self.remove(name)
+
+        vertex_count = len(mesh.vertices) // 3
+        index_count = len(mesh.indices)
+
+        base_vertex, first_index = self._allocate(vertex_count, index_count)
+
+        # upload the vertex data and the indices in their ranges
+        for vbo, size, data in zip(self.vbos, self._vertex_sizes, self.layout.pack(mesh)):
+            glBindBuffer(GL_COPY_WRITE_BUFFER, vbo)
+            glBufferSubData(GL_COPY_WRITE_BUFFER, base_vertex * size, data.nbytes, data)
+
+        indices = np.ascontiguousarray(mesh.indices, dtype=np.uint16 if self.index_size == 2 else np.uint32)
+        glBindBuffer(GL_COPY_WRITE_BUFFER, self.ebo)
+        glBufferSubData(GL_COPY_WRITE_BUFFER, first_index * self.index_size, indices.nbytes, indices)
+
+        self._ranges[name] = MeshRange(first_index, index_count, base_vertex, vertex_count, self.index_type, True)
+
+        return self._ranges[name]
+
+    def remove(self, name: str) -> None:
+        """Free the ranges of a mesh (the data stays in the buffers until it's overwritten).
+
+        Args:
+            name (str): Name of the mesh
+
+        """
+        mesh_range = self._ranges.pop(name, None)
+        if mesh_range is None:
+            return
+
+        self._vertices.free(mesh_range.base_vertex, mesh_range.vertex_count)
+        self._indices.free(mesh_range.first_index, mesh_range.index_count)
+
+        # the range isn't valid anymore
+        mesh_range.in_arena = False
+
+    def rename(self, name: str, new_name: str) -> None:
+        """Move the ranges of a mesh to a new name, keeping its data in place.
+
+        Args:
+            name (str): Current name of the mesh
+            new_name (str): New name of the mesh
+
+        """
+        if name in self._ranges:
+            self._ranges[new_name] = self._ranges.pop(name)
+
+    def compact(self, vertex_capacity: int = None, index_capacity: int = None) -> None:
+        """Move every mesh to the beginning of new buffers, removing the holes left by the removed meshes.
+
+        Args:
+            vertex_capacity (int, optional): Number of vertices of the new buffers. Defaults to the current capacity.
+            index_capacity (int, optional): Number of indices of the new buffers. Defaults to the current capacity.
+
+        """
+        vertex_capacity = vertex_capacity or self._vertices.capacity
+        index_capacity = index_capacity or self._indices.capacity
+
+        buffers = self._create_buffers(vertex_capacity, index_capacity)
+        ebo = buffers.pop()
+
+        vertex_offset = 0
+        index_offset = 0
+
+        # copy the meshes one after the other, in the order they are stored
+        for mesh_range in sorted(self._ranges.values(), key=lambda mesh_range: mesh_range.base_vertex):
+            for old_vbo, new_vbo, size in zip(self.vbos, buffers, self._vertex_sizes):
+                self._copy(
+                    old_vbo,
+                    new_vbo,
+                    mesh_range.base_vertex * size,
+                    vertex_offset * size,
+                    mesh_range.vertex_count * size,
+                )
+
+            self._copy(
+                self.ebo,
+                ebo,
+                mesh_range.first_index * self.index_size,
+                index_offset * self.index_size,
+                mesh_range.index_count * self.index_size,
+            )
+
+            # the indices are relative to the first vertex, only the offsets change
+            mesh_range.base_vertex = vertex_offset
+            mesh_range.first_index = index_offset
+
+            vertex_offset += mesh_range.vertex_count
+            index_offset += mesh_range.index_count
+
+        glDeleteBuffers(len(self.vbos) + 1, [*self.vbos, self.ebo])
+
+        self.vbos = buffers
+        self.ebo = ebo
+        self.generation += 1
+
+        self._vertices.reset(vertex_capacity, vertex_offset)
+        self._indices.reset(index_capacity, index_offset)
+
+        self._bind_buffers()
+
+        print_info(
+            f'Compacted the mesh arena: {vertex_offset}/{vertex_capacity} vertices, {index_offset}/{index_capacity} '
+            'indices'
+        )
+
+    def _allocate(self, vertex_count: int, index_count: int) -> tuple[int, int]:
+        base_vertex = self._vertices.allocate(vertex_count)
+        first_index = self._indices.allocate(index_count)
+
+        if base_vertex is not None and first_index is not None:
+            return base_vertex, first_index
+
+        # give back the part of the allocation that succeeded
+        if base_vertex is not None:
+            self._vertices.free(base_vertex, vertex_count)
+        if first_index is not None:
+            self._indices.free(first_index, index_count)
+
+        # grow the buffers if compacting them isn't enough to make the mesh fit
+        vertex_capacity = self._vertices.capacity
+        if self._vertices.free_space < vertex_count:
+            vertex_capacity = max(vertex_capacity * 2, vertex_capacity - self._vertices.free_space + vertex_count)
+
+        index_capacity = self._indices.capacity
+        if self._indices.free_space < index_count:
+            index_capacity = max(index_capacity * 2, index_capacity - self._indices.free_space + index_count)
+
+        self.compact(vertex_capacity, index_capacity)
+
+        return self._vertices.allocate(vertex_count), self._indices.allocate(index_count)
+
+    def _create_buffers(self, vertex_capacity: int, index_capacity: int) -> list[int]:
+        # allocate the vertex buffers followed by the index buffer, without initializing them
+        buffers = []
+        for size in [vertex_capacity * size for size in self._vertex_sizes] + [index_capacity * self.index_size]:
+            buffer = glGenBuffers(1)
+            glBindBuffer(GL_COPY_WRITE_BUFFER, buffer)
+            glBufferData(GL_COPY_WRITE_BUFFER, max(size, 1), None, GL_STATIC_DRAW)
+            buffers.append(buffer)
+
+        return buffers
+
+    def _bind_buffers(self) -> None:
+        # link the attributes and the index buffer of the shared VAO to the current buffers
+        glBindVertexArray(self.vao)
+        self.layout.bind(self.vbos)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ebo)
+        glBindVertexArray(0)
+
+    @staticmethod
+    def _copy(source: int, destination: int, read_offset: int, write_offset: int, size: int) -> None:
+        if size <= 0:
+            return
+
+        glBindBuffer(GL_COPY_READ_BUFFER, source)
+        glBindBuffer(GL_COPY_WRITE_BUFFER, destination)
+        glCopyBufferSubData(GL_COPY_READ_BUFFER, GL_COPY_WRITE_BUFFER, read_offset, write_offset, size)
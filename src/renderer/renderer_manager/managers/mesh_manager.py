@@ -1,21 +1,115 @@
 # ruff: noqa: F403, F405
 
+import ctypes
+import hashlib
 import json
+import os
+from collections.abc import Generator
 
 import glm
 import numpy as np
-import pywavefront
 from OpenGL.GL import *
 
+from renderer.renderer_manager.managers.mesh_arena import INDEX_SIZES, MeshArena, MeshRange
+from renderer.renderer_manager.managers.streaming_manager import StreamingManager
+from renderer.shader.shader import Shader
 from utils import *
+from utils.asset_baker import (
+    AssetManifest,
+    add_mesh_lods,
+    add_mesh_meshlets,
+    cache_optimized_mesh,
+    mesh_lod_settings,
+    mesh_meshlet_settings,
+    mesh_optimization_settings,
+)
+from utils.bounds import (
+    OrientedBox,
+    calculate_bounds,
+    calculate_oriented_box,
+    transform_aabb,
+    transform_oriented_box,
+    transform_sphere,
+)
+from utils.config import Config
+from utils.mesh_file import MESH_FILE_EXTENSION, MeshData, Submesh, read_binary_mesh
+from utils.mesh_optimizer import optimize_mesh
+from utils.mesh_simplifier import extract_lod
+from utils.obj_loader import read_obj
+from utils.vertex_layout import SPLIT_LAYOUT, VertexLayout, get_vertex_layout
+
+# meshes drawn directly with glDrawElements by the full screen passes and the skybox, always kept in their own buffers
+# and with float attributes (the shaders of these passes never dequantize the vertices)
+DEDICATED_MESHES = ('default', 'screen_quad')
+
+# size in bytes of a vertex and of an index without any compression (float32 attributes, uint32 indices)
+UNCOMPRESSED_VERTEX_SIZE = 32
+UNCOMPRESSED_INDEX_SIZE = 4
 
 
 class MeshManager(metaclass=Singleton):
-    def __init__(self):
-        # dictionaries of OpenGL VBOs for vertex data (vertex, normal, uv)
-        self._vertex_vbos: dict[str, int] = {}
-        self._normal_vbos: dict[str, int] = {}
-        self._uv_vbos: dict[str, int] = {}
+    def __init__(
+        self,
+        vertex_layout: str = None,
+        use_arena: bool = None,
+        arena_vertices: int = None,
+        arena_indices: int = None,
+        small_indices: bool = None,
+        deduplicate: bool = None,
+        vram_budget: int = None,
+        eviction_frames: int = None,
+    ):
+        """Manager of the meshes uploaded to the GPU.
+
+        Args:
+            vertex_layout (str, optional): Layout of the vertex data of new meshes ('split' for a VBO per attribute,
+                'interleaved' for a single VBO, 'compressed' for quantized vertices). Defaults to 'split'.
+            use_arena (bool, optional): Store the meshes uploaded in a single step in the shared buffers of the mesh
+                arena, so that they are all drawn through the same VAO. Defaults to True.
+            arena_vertices (int, optional): Initial vertex capacity of the mesh arena. Defaults to 262144.
+            arena_indices (int, optional): Initial index capacity of the mesh arena. Defaults to 1048576.
+            small_indices (bool, optional): Store the indices in 16 bits whenever the vertices of a mesh can be
+                addressed with them (the meshes with more vertices are then kept out of the arena). Defaults to True.
+            deduplicate (bool, optional): Upload the meshes with the same data (or loaded from the same file) once,
+                and share the data between their names. Defaults to True.
+            vram_budget (int, optional): Bytes of vertex and index data above which the least recently used meshes
+                are evicted from the GPU, 0 to never evict meshes. Defaults to 256MB.
+            eviction_frames (int, optional): Number of frames a mesh must go without being drawn before it can be
+                evicted. Defaults to 300.
+
+        """
+        default_config = {
+            'vertex_layout': 'split',
+            'use_arena': True,
+            'arena_vertices': 262144,
+            'arena_indices': 1048576,
+            'small_indices': True,
+            'deduplicate': True,
+            'vram_budget': 256 * 1024 * 1024,
+            'eviction_frames': 300,
+        }
+
+        Config().initialize_parameters(
+            self,
+            'meshes',
+            default_config,
+            vertex_layout=vertex_layout,
+            use_arena=use_arena,
+            arena_vertices=arena_vertices,
+            arena_indices=arena_indices,
+            small_indices=small_indices,
+            deduplicate=deduplicate,
+            vram_budget=vram_budget,
+            eviction_frames=eviction_frames,
+        )
+
+        # layout used by the meshes uploaded without an explicit one
+        self.default_layout: VertexLayout = get_vertex_layout(self.vertex_layout)
+
+        # dictionary of OpenGL VBOs for vertex data, as described by the vertex layout of each mesh
+        self._vbos: dict[str, list[int]] = {}
+        # dictionary of the vertex layouts of the meshes
+        self._layouts: dict[str, VertexLayout] = {}
         # dictionary of OpenGL EBOs for index data
         self._ebos: dict[str, int] = {}
         # dictionary of OpenGL VAO for vertex data
@@ -24,6 +118,8 @@ class MeshManager(metaclass=Singleton):
         self._vertices_count: dict[str, int] = {}
         # dictionary of number of indices per mesh
         self._indices_count: dict[str, int] = {}
+        # dictionary of OpenGL types of the indices per mesh (GL_UNSIGNED_SHORT or GL_UNSIGNED_INT)
+        self._index_types: dict[str, int] = {}
 
         # bounding box and sphere data
         self._aabb_mins: dict[str, glm.vec3] = {}
@@ -32,111 +128,432 @@ class MeshManager(metaclass=Singleton):
         self._bounding_sphere_radius: dict[str, float] = {}
         self._bounding_sphere_center: dict[str, glm.vec3] = {}
 
+        # oriented bounding boxes, aligned to the principal axes of the meshes
+        self._obbs: dict[str, OrientedBox] = {}
+
         self._indices: dict[str, int] = {}
 
+        # dictionary of the ranges of indices drawn with each material, per mesh
+        self._submeshes: dict[str, list[Submesh]] = {}
+        # dictionary of meshlets (MESHLET_DTYPE) of the full detail meshes, for cluster culling
+        self._meshlets: dict[str, np.ndarray] = {}
+
+        # dictionary of the ranges of the buffers storing each mesh (the whole buffers for the dedicated meshes)
+        self._ranges: dict[str, MeshRange] = {}
+        # shared buffers of the static meshes, created with the first mesh stored in it
+        self.arena: MeshArena = None
+
+        # dictionary of the names of the levels of detail of every mesh, starting from the mesh itself
+        self._lods: dict[str, list[str]] = {}
+
+        # dictionary of the offset and scale turning the quantized positions of the compressed meshes back into
+        # positions, bound to the shaders by bind_vertex_format
+        self._quantization: dict[str, tuple[glm.vec3, glm.vec3]] = {}
+        # dictionary of the bytes of vertex and index data of every mesh, and of the same data without compression
+        self._memory: dict[str, tuple[int, int]] = {}
+
+        # dictionary of the mesh owning the data used by the meshes sharing it (same file or same content)
+        self._owners: dict[str, str] = {}
+        # content hash of the data of every mesh owning its data, and owner of the data of every hash
+        self._content_keys: dict[str, bytes] = {}
+        self._content_owners: dict[bytes, str] = {}
+
+        # dictionary of the file of every mesh, to load it again after it's evicted
+        self._sources: dict[str, str] = {}
+        # dictionary of the number of models and instances using every mesh, and of the instances alone (the
+        # instance VAOs reference the buffers of their mesh, so these meshes are never evicted)
+        self._references: dict[str, int] = {}
+        self._pinned: dict[str, int] = {}
+
+        # number of frames since the start, and frame every mesh was last drawn in
+        self._frame: int = 0
+        self._last_used: dict[str, int] = {}
+        # dictionary of the bytes of vertex and index data of the evicted meshes, until they are streamed back in
+        self._evicted: dict[str, int] = {}
+
     def vao(self, name: str) -> int:
         return self._vaos.get(name)
 
-    def new_mesh(self, name: str, file_path: str) -> None:
-        # empty lists to contain the vertices data taken from the file
-        formatted_vertices = []
-        formatted_normals = []
-        formatted_uvs = []
-
-        # load the mesh from the file path
-        scene = pywavefront.Wavefront(file_path, collect_faces=True)
-
-        # iterate through all the meshes in the file
-        for _, material in scene.materials.items():
-            # scroll through the vertices data by increments of 8 (u, v, n.x, n.y, n.z, v.x, v.y, v.z)
-            for i in range(0, len(material.vertices), 8):
-                # u
-                formatted_uvs.append(material.vertices[i])
-                # v
-                formatted_uvs.append(material.vertices[i + 1])
-
-                # n.x
-                formatted_normals.append(material.vertices[i + 2])
-                # n.y
-                formatted_normals.append(material.vertices[i + 3])
-                # n.z
-                formatted_normals.append(material.vertices[i + 4])
-
-                # v.x
-                formatted_vertices.append(material.vertices[i + 5])
-                # v.y
-                formatted_vertices.append(material.vertices[i + 6])
-                # v.z
-                formatted_vertices.append(material.vertices[i + 7])
-
-        # format the lists into np.arrays of type float 32bit
-        formatted_vertices = np.array(formatted_vertices, dtype=np.float32)
-        formatted_normals = np.array(formatted_normals, dtype=np.float32)
-        formatted_uvs = np.array(formatted_uvs, dtype=np.float32)
-
-        # convert the lists into indiced lists and obtain an indices list for indexed rendering
-        indices, indiced_vertices, indiced_normals, indiced_uvs = index_vertices(
-            formatted_vertices, formatted_normals, formatted_uvs
+    def vbos(self, name: str) -> list[int]:
+        # the arena buffers change when it's compacted, always get the current ones
+        if self.in_arena(name):
+            return self.arena.vbos
+
+        return self._vbos.get(name, [])
+
+    def ebo(self, name: str) -> int:
+        if self.in_arena(name):
+            return self.arena.ebo
+
+        return self._ebos.get(name)
+
+    def buffers_generation(self, name: str) -> int:
+        # changes every time the buffers returned by vbos and ebo for the mesh are replaced by a compaction
+        return self.arena.generation if self.in_arena(name) else 0
+
+    def range(self, name: str) -> MeshRange | None:
+        return self._ranges.get(name)
+
+    def in_arena(self, name: str) -> bool:
+        mesh_range = self._ranges.get(name)
+        return mesh_range is not None and mesh_range.in_arena
+
+    def layout(self, name: str) -> VertexLayout:
+        return self._layouts.get(name, self.default_layout)
+
+    def lods(self, name: str) -> list[str]:
+        return self._lods.get(name, [name])
+
+    def triangle_count(self, name: str) -> int:
+        return self._indices_count.get(name, 0) // 3
+
+    def saved_bytes(self, name: str) -> int:
+        """Bytes of GPU memory saved by the vertex and index formats of a mesh, compared to float32 and uint32 data."""
+        size, uncompressed_size = self._memory.get(name, (0, 0))
+        return uncompressed_size - size
+
+    @property
+    def memory_stats(self) -> dict[str, int]:
+        """GPU memory used by the vertex and index data of every mesh."""
+        size = sum(memory[0] for memory in self._memory.values())
+        uncompressed_size = sum(memory[1] for memory in self._memory.values())
+
+        return {
+            'bytes': size,
+            'uncompressed_bytes': uncompressed_size,
+            'saved_bytes': uncompressed_size - size,
+            'resident_bytes': size,
+            'evicted_bytes': self.evicted_bytes,
+            'evicted_meshes': len(self._evicted),
+            'shared_meshes': len(self._owners),
+        }
+
+    @property
+    def resident_bytes(self) -> int:
+        """Bytes of vertex and index data currently stored on the GPU, counting the shared data once."""
+        return sum(memory[0] for memory in self._memory.values())
+
+    @property
+    def evicted_bytes(self) -> int:
+        """Bytes of vertex and index data of the meshes evicted from the GPU, until they are streamed back in."""
+        return sum(self._evicted.values())
+
+    def is_evicted(self, name: str) -> bool:
+        return name in self._evicted
+
+    def references(self, name: str) -> int:
+        return self._references.get(name, 0)
+
+    def acquire_mesh(self, name: str, pin: bool = False) -> None:
+        """Count a new user of a mesh (a model or an instance), the meshes in use are only unloaded when forced.
+
+        Args:
+            name (str): Name of the mesh
+            pin (bool, optional): Never evict the mesh while this user holds it. Defaults to False.
+
+        """
+        self._references[name] = self._references.get(name, 0) + 1
+        if pin:
+            self._pinned[name] = self._pinned.get(name, 0) + 1
+
+    def release_mesh(self, name: str, pin: bool = False) -> None:
+        """Remove a user of a mesh, counted by acquire_mesh (the mesh stays loaded until it's unloaded).
+
+        Args:
+            name (str): Name of the mesh
+            pin (bool, optional): The user pinned the mesh when acquiring it. Defaults to False.
+
+        """
+        for dictionary, counted in ((self._references, True), (self._pinned, pin)):
+            if counted and name in dictionary:
+                dictionary[name] -= 1
+                if dictionary[name] <= 0:
+                    del dictionary[name]
+
+    def unload_mesh(self, name: str, force: bool = False) -> bool:
+        """Remove a mesh that isn't used anymore, together with everything known about it.
+
+        Args:
+            name (str): Name of the mesh
+            force (bool, optional): Remove the mesh even if models or instances still use it. Defaults to False.
+
+        Returns:
+            bool: True if the mesh was unloaded
+
+        """
+        references = self._references.get(name, 0)
+        if references > 0 and not force:
+            print_warning(f"Mesh {name} wasn't unloaded, it's still used by {references} models or instances")
+            return False
+
+        self.remove_mesh(name)
+
+        for dictionary in (self._sources, self._evicted, self._last_used, self._references, self._pinned):
+            dictionary.pop(name, None)
+
+        return True
+
+    def update(self) -> None:
+        """Start a new frame, evicting the least recently drawn meshes while the VRAM budget is exceeded.
+
+        The evicted meshes keep their bounds and render with the placeholder mesh, until they are drawn again and
+        streamed back in from their file.
+        """
+        self._frame += 1
+
+        if self.vram_budget <= 0:
+            return
+
+        resident = self.resident_bytes
+        if resident <= self.vram_budget:
+            return
+
+        for name in self._eviction_candidates():
+            if resident <= self.vram_budget:
+                break
+
+            resident -= self._evict(name)
+
+    def _eviction_candidates(self) -> list[str]:
+        # levels of detail are evicted together with their mesh
+        lods = {lod for chain in self._lods.values() for lod in chain[1:]}
+
+        candidates = []
+        for name in self._memory:
+            if name in DEDICATED_MESHES or name in lods:
+                continue
+
+            # every mesh using the data must be pinned by none of its users and be loadable again from its file
+            users = [name, *(other for other, owner in self._owners.items() if owner == name)]
+            if any(user not in self._sources or user in self._pinned for user in users):
+                continue
+
+            # the meshes sharing the data mark their owner when they are drawn
+            last_used = max(self._last_used.get(lod, self._frame) for lod in self.lods(name))
+            if self._frame - last_used >= self.eviction_frames:
+                candidates.append((last_used, name))
+
+        return [name for _, name in sorted(candidates)]
+
+    def _evict(self, name: str) -> int:
+        # release the data of the mesh and of its levels of detail, returning the bytes freed
+        size = sum(self._memory.get(lod, (0, 0))[0] for lod in self.lods(name))
+
+        for sharer in [other for other, owner in self._owners.items() if owner == name]:
+            self._evict_mesh(sharer, 0)
+        self._evict_mesh(name, size)
+
+        print_info(f'Evicted mesh {name} ({size / 1024:.1f}KB)')
+        return size
+
+    def _evict_mesh(self, name: str, size: int) -> None:
+        # keep the bounds, so that the models using the mesh are still culled before it's needed again
+        bounds = [
+            (dictionary, dictionary[name])
+            for dictionary in (
+                self._aabb_mins,
+                self._aabb_maxs,
+                self._bounding_sphere_radius,
+                self._bounding_sphere_center,
+                self._obbs,
+            )
+            if name in dictionary
+        ]
+
+        self.remove_mesh(name)
+        self.alias_mesh(name, 'default')
+
+        for dictionary, value in bounds:
+            dictionary[name] = value
+
+        self._evicted[name] = size
+
+    def _restream(self, name: str) -> None:
+        # load an evicted mesh back, from a resident mesh using the same file or in the background
+        file_path = self._sources[name]
+        if not self._share_source(name, file_path):
+            self._stream_mesh(name, file_path, True)
+
+    def quantization(self, name: str) -> tuple[glm.vec3, glm.vec3] | None:
+        """Offset and scale decoding the positions of a compressed mesh, None if its vertices are not compressed."""
+        return self._quantization.get(name)
+
+    def bind_vertex_format(self, shader: Shader, name: str) -> None:
+        """Bind the uniforms telling the vertex shader how to decode the vertices of a mesh.
+
+        Args:
+            shader (Shader): Shader currently in use
+            name (str): Name of the mesh about to be drawn
+
+        """
+        quantization = self._quantization.get(name)
+        shader.bind_uniform('compressed_vertices', int(quantization is not None))
+
+        if quantization is not None:
+            shader.bind_uniform('position_offset', quantization[0])
+            shader.bind_uniform('position_scale', quantization[1])
+
+    def new_mesh(self, name: str, file_path: str, stream: bool = None) -> None:
+        if self._share_source(name, file_path) or self._stream_mesh(name, file_path, stream):
+            return
+
+        self.upload_mesh(
+            name, self._read_baked_mesh(file_path) or self._optimize_mesh(file_path, self._read_obj_mesh(file_path))
         )
 
-        # keep track of the indices count
-        self._indices_count[name] = len(indices)
+    def new_json_mesh(self, name: str, file_path: str, stream: bool = None) -> None:
+        if self._share_source(name, file_path) or self._stream_mesh(name, file_path, stream):
+            return
 
-        # convert the indexed lists into indexed arrays of type float 32bit
-        indiced_vertices = np.array(indiced_vertices, dtype=np.float32)
-        indiced_normals = np.array(indiced_normals, dtype=np.float32)
-        indiced_uvs = np.array(indiced_uvs, dtype=np.float32)
+        self.upload_mesh(
+            name, self._read_baked_mesh(file_path) or self._optimize_mesh(file_path, self._read_json_mesh(file_path))
+        )
 
-        # convert the list of indices into an array of indices of type unsigned int 32bit
-        indices = np.array(indices, dtype=np.uint32)
+    def new_binary_mesh(self, name: str, file_path: str, stream: bool = None) -> None:
+        if self._share_source(name, file_path) or self._stream_mesh(name, file_path, stream):
+            return
 
-        # generate the OpenGL buffers (VBO) for each data type
-        self._vertex_vbos[name] = glGenBuffers(1)
-        self._normal_vbos[name] = glGenBuffers(1)
-        self._uv_vbos[name] = glGenBuffers(1)
-        self._ebos[name] = glGenBuffers(1)
-        # generate the OpenGL buffer (VAO) to store all the data
-        self._vaos[name] = glGenVertexArrays(1)
+        # the mapped blocks are already in the GPU format, they are passed to OpenGL without copying them
+        self.upload_mesh(name, read_binary_mesh(file_path))
 
-        # store the vertices count
-        self._vertices_count[name] = len(formatted_vertices) / 3
+    def load_mesh(self, name: str, file_path: str, stream: bool = None) -> None:
+        if self._share_source(name, file_path) or self._stream_mesh(name, file_path, stream):
+            return
 
-        # bind the VAO
-        glBindVertexArray(self._vaos[name])
+        self.upload_mesh(name, self.read_mesh(file_path))
 
-        # bind the vertex VBO
-        glBindBuffer(GL_ARRAY_BUFFER, self._vertex_vbos[name])
-        # store the data into the VBO
-        glBufferData(GL_ARRAY_BUFFER, indiced_vertices.nbytes, indiced_vertices, GL_STATIC_DRAW)
-        # enable the index 0 of the VAO
-        glEnableVertexAttribArray(0)
-        # store the data from the VBO in the VAO
-        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-
-        # repeat for normals
-        glBindBuffer(GL_ARRAY_BUFFER, self._normal_vbos[name])
-        glBufferData(GL_ARRAY_BUFFER, indiced_normals.nbytes, indiced_normals, GL_STATIC_DRAW)
-        glEnableVertexAttribArray(1)
-        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-
-        # and UVs
-        glBindBuffer(GL_ARRAY_BUFFER, self._uv_vbos[name])
-        glBufferData(GL_ARRAY_BUFFER, indiced_uvs.nbytes, indiced_uvs, GL_STATIC_DRAW)
-        glEnableVertexAttribArray(2)
-        glVertexAttribPointer(2, 2, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-
-        # pass the data for the element array buffer of indices
-        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self._ebos[name])
-        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+    def track_source(self, name: str, file_path: str) -> None:
+        """Keep track of the file of a mesh uploaded directly with upload_mesh, so that it can be evicted.
+
+        Args:
+            name (str): Name of the mesh
+            file_path (str): Path of the mesh file
+
+        """
+        self._sources[name] = file_path
+
+    def _share_source(self, name: str, file_path: str) -> bool:
+        # keep track of the file of the mesh, to load it again after it's evicted
+        self._sources[name] = file_path
+        self._evicted.pop(name, None)
+
+        if not self.deduplicate:
+            return False
+
+        # use the data of a resident mesh loaded from the same file instead of reading it again
+        path = os.path.realpath(file_path)
+        for other, source in self._sources.items():
+            owner = self._owners.get(other, other)
+            if owner != name and owner in self._content_keys and os.path.realpath(source) == path:
+                self._share_data(name, owner)
+                return True
+
+        return False
+
+    def _stream_mesh(self, name: str, file_path: str, stream: bool) -> bool:
+        # check if the mesh should be streamed in the background (following the streaming settings if not specified)
+        streaming_manager = StreamingManager()
+        if not (streaming_manager.enabled if stream is None else stream):
+            return False
+
+        # render the mesh with the placeholder until its data is resident
+        if name not in self._vaos:
+            self.alias_mesh(name, 'default')
+
+        streaming_manager.request('mesh', name, file_path, self.read_mesh, self.upload_mesh_steps)
+        return True
+
+    @staticmethod
+    def read_mesh(file_path: str) -> MeshData:
+        """Read a mesh file of any supported format, without touching OpenGL (safe to call from worker threads).
+
+        Args:
+            file_path (str): Path of the mesh file (.pmesh, .obj or .json)
+
+        Returns:
+            MeshData: Indexed mesh data, ready to be passed to upload_mesh
+
+        """
+        # pick the loader according to the extension of the mesh file
+        extension = os.path.splitext(file_path)[1].lower()
+
+        if extension == MESH_FILE_EXTENSION:
+            return read_binary_mesh(file_path)
+
+        # load the baked version of the mesh if it's available
+        mesh = MeshManager._read_baked_mesh(file_path)
+        if mesh is not None:
+            return mesh
+
+        if extension == '.obj':
+            return MeshManager._optimize_mesh(file_path, MeshManager._read_obj_mesh(file_path))
+
+        return MeshManager._optimize_mesh(file_path, MeshManager._read_json_mesh(file_path))
+
+    @staticmethod
+    def _read_baked_mesh(file_path: str) -> MeshData | None:
+        # look for an up to date baked version of the source file in the asset manifest
+        baked_path = AssetManifest().baked_path(file_path)
+
+        if baked_path is None:
+            return None
+
+        try:
+            return read_binary_mesh(baked_path)
+        except ValueError as e:
+            # baked with an older version of the format, fall back to the source file
+            print_warning(f'{e}, loading {file_path} instead')
+            return None
+
+    @staticmethod
+    def _optimize_mesh(file_path: str, mesh: MeshData) -> MeshData:
+        # reorder the mesh for the vertex cache, generate its levels of detail and split it into meshlets, following
+        # the meshes settings
+        optimize, overdraw = mesh_optimization_settings()
+        lod_levels, lod_ratio = mesh_lod_settings()
+        meshlets, max_vertices, max_triangles = mesh_meshlet_settings()
+        if not optimize and lod_levels <= 0 and not meshlets:
+            return mesh
+
+        if optimize:
+            mesh, report = optimize_mesh(mesh, overdraw=overdraw)
+            print_info(f'Optimized {file_path.split("/")[-1]}: {report}')
+
+        mesh, lod_report = add_mesh_lods(mesh, lod_levels, lod_ratio)
+        if lod_report:
+            print_info(f'Simplified {file_path.split("/")[-1]}: {lod_report}')
+
+        if meshlets:
+            mesh, meshlet_report = add_mesh_meshlets(mesh, max_vertices, max_triangles)
+            if meshlet_report:
+                print_info(f'Split {file_path.split("/")[-1]} into {meshlet_report}')
+
+        # store the result as the baked version of the source, so that it's only optimized once
+        try:
+            cache_optimized_mesh(file_path, mesh)
+        except OSError as e:
+            print_warning(f'Could not cache the optimized version of {file_path}: {e}')
+
+        return mesh
+
+    @staticmethod
+    def _read_obj_mesh(file_path: str) -> MeshData:
+        # parse the OBJ file directly into indexed buffers
+        obj = read_obj(file_path)
+
+        print_info(
+            f'Parsed {file_path.split("/")[-1]}: {obj.file_size / 1_000_000:.2f}MB in {obj.parse_time:.4f}s '
+            f'({obj.throughput:.1f}MB/s)'
+        )
+
+        return obj.mesh
 
-    def new_json_mesh(self, name: str, file_path: str) -> None:
+    @staticmethod
+    def _read_json_mesh(file_path: str) -> MeshData:
         # open the json model
         with open(file_path) as f:
             data = json.load(f)
 
-        # keep track of the indices count
-        self._indices_count[name] = len(data['indices'])
-
         # convert the indexed lists into indexed arrays of type float 32bit
         indiced_vertices = np.array(data['vertices'], dtype=np.float32)
         indiced_normals = np.array(data['normals'], dtype=np.float32)
@@ -145,54 +562,527 @@ class MeshManager(metaclass=Singleton):
         # convert the list of indices into an array of indices of type unsigned int 32bit
         indices = np.array(data['indices'], dtype=np.uint32)
 
-        # generate the OpenGL buffers (VBO) for each data type
-        self._vertex_vbos[name] = glGenBuffers(1)
-        self._normal_vbos[name] = glGenBuffers(1)
-        self._uv_vbos[name] = glGenBuffers(1)
-        self._ebos[name] = glGenBuffers(1)
-        # generate the OpenGL buffer (VAO) to store all the data
-        self._vaos[name] = glGenVertexArrays(1)
+        # calculate the bounds from the vertices, the center and max distance of the json file are not tight
+        return MeshData(
+            indices,
+            indiced_vertices,
+            indiced_normals,
+            indiced_uvs,
+            *calculate_bounds(indiced_vertices),
+            obb=calculate_oriented_box(indiced_vertices),
+        )
+
+    def _mesh_layout(self, name: str, layout: VertexLayout | None) -> VertexLayout:
+        # the dedicated meshes keep float attributes whatever the layout of the settings
+        if name in DEDICATED_MESHES:
+            return SPLIT_LAYOUT
+
+        return layout or self.default_layout
+
+    def upload_mesh(self, name: str, mesh: MeshData, layout: VertexLayout = None) -> None:
+        """Upload mesh data to the GPU (must be called from the thread owning the OpenGL context).
+
+        Args:
+            name (str): Name of the mesh
+            mesh (MeshData): Mesh data, as returned by read_mesh
+            layout (VertexLayout, optional): Layout of the vertex data. Defaults to the layout of the settings.
+
+        """
+        layout = self._mesh_layout(name, layout)
+
+        if self._share_content(name, mesh, layout):
+            return
+
+        # stop sharing data with other meshes before getting new data
+        self._detach_data(name)
 
         # store the vertices count
-        self._vertices_count[name] = len(indiced_vertices) / 3
+        self._vertices_count[name] = len(mesh.vertices) / 3
+
+        # upload the mesh data to the GPU, in the shared buffers when possible
+        if self.use_arena and name not in DEDICATED_MESHES and layout is self.default_layout and self._fits_arena(mesh):
+            self._upload_arena_mesh(name, mesh)
+        else:
+            self._upload_mesh(name, mesh, layout)
+
+        self._set_bounds(name, mesh)
+        self._set_vertex_format(name, mesh, layout)
+        self._set_content(name, mesh, layout)
+
+        # every level of detail is uploaded as a mesh of its own
+        self._remove_lods(name)
+        for level in range(1, len(mesh.lods) + 1):
+            self.upload_mesh(f'{name}_lod{level}', extract_lod(mesh, level), layout)
+
+        if mesh.lods:
+            self._lods[name] = [name] + [f'{name}_lod{level}' for level in range(1, len(mesh.lods) + 1)]
+
+    def upload_mesh_steps(
+        self, name: str, mesh: MeshData, chunk_size: int, layout: VertexLayout = None
+    ) -> Generator[int, None, None]:
+        """Upload mesh data to the GPU a chunk at a time, replacing the mesh only once every buffer is complete.
+
+        Args:
+            name (str): Name of the mesh
+            mesh (MeshData): Mesh data, as returned by read_mesh
+            chunk_size (int): Maximum number of bytes uploaded in a single step
+            layout (VertexLayout, optional): Layout of the vertex data. Defaults to the layout of the settings.
+
+        Yields:
+            int: Number of bytes uploaded by the last step
+
+        """
+        layout = self._mesh_layout(name, layout)
+        buffers = []
+
+        if self._share_content(name, mesh, layout):
+            return
+
+        # allocate every buffer and fill it in chunks (streamed meshes keep their own buffers, so that the arena is
+        # never compacted in the middle of an upload spread over several frames)
+        indices = self._pack_indices(mesh)
+        for data in (*layout.pack(mesh), indices):
+            buffer = glGenBuffers(1)
+            glBindBuffer(GL_COPY_WRITE_BUFFER, buffer)
+            glBufferData(GL_COPY_WRITE_BUFFER, data.nbytes, None, GL_STATIC_DRAW)
+            buffers.append(buffer)
+
+            yield from upload_buffer_chunks(buffer, data, chunk_size)
+
+        # swap the complete buffers in
+        self._detach_data(name)
+        self._vertices_count[name] = len(mesh.vertices) / 3
+        self._attach_buffers(name, indices, layout, buffers[:-1], buffers[-1])
+        self._set_bounds(name, mesh)
+        self._set_vertex_format(name, mesh, layout)
+        self._set_content(name, mesh, layout)
+
+        # then stream the levels of detail, the full detail mesh is drawn until they are all complete
+        self._remove_lods(name)
+        for level in range(1, len(mesh.lods) + 1):
+            yield from self.upload_mesh_steps(f'{name}_lod{level}', extract_lod(mesh, level), chunk_size, layout)
+
+        if mesh.lods:
+            self._lods[name] = [name] + [f'{name}_lod{level}' for level in range(1, len(mesh.lods) + 1)]
+
+    def alias_mesh(self, name: str, target: str) -> None:
+        """Make a mesh name render with the data of another mesh, until the mesh gets its own data.
+
+        Args:
+            name (str): Name of the aliased mesh
+            target (str): Name of the mesh to use the data of
+
+        """
+        for dictionary in (
+            self._vbos,
+            self._layouts,
+            self._ebos,
+            self._ranges,
+            self._vaos,
+            self._vertices_count,
+            self._indices_count,
+            self._index_types,
+            self._aabb_mins,
+            self._aabb_maxs,
+            self._bounding_sphere_radius,
+            self._bounding_sphere_center,
+            self._obbs,
+            self._meshlets,
+            self._quantization,
+        ):
+            if target in dictionary:
+                dictionary[name] = dictionary[target]
+
+    @staticmethod
+    def _content_key(mesh: MeshData, layout: VertexLayout) -> bytes:
+        # hash of everything uploaded for the mesh, meshes with the same hash can share their data
+        digest = hashlib.blake2b(layout.name.encode(), digest_size=16)
+        for data in (mesh.indices, mesh.vertices, mesh.normals, mesh.uvs, *mesh.lods):
+            digest.update(np.ascontiguousarray(data))
+
+        digest.update(repr(mesh.submeshes).encode())
+        return digest.digest()
+
+    def _set_content(self, name: str, mesh: MeshData, layout: VertexLayout) -> None:
+        # keep track of the data of the mesh, for the meshes uploaded later with the same data
+        self._forget_content(name)
+        self._last_used[name] = self._frame
+
+        if self.deduplicate:
+            key = self._content_key(mesh, layout)
+            self._content_keys[name] = key
+            self._content_owners[key] = name
+
+    def _forget_content(self, name: str) -> None:
+        key = self._content_keys.pop(name, None)
+        if key is not None and self._content_owners.get(key) == name:
+            del self._content_owners[key]
+
+    def _share_content(self, name: str, mesh: MeshData, layout: VertexLayout) -> bool:
+        # use the data of a resident mesh with the same content instead of uploading it again
+        if not self.deduplicate:
+            return False
+
+        owner = self._content_owners.get(self._content_key(mesh, layout))
+        if owner is None:
+            return False
+
+        # the mesh already has this data
+        if owner != name:
+            self._share_data(name, owner)
+
+        return True
+
+    def _share_data(self, name: str, owner: str) -> None:
+        self.remove_mesh(name)
+        self.alias_mesh(name, owner)
+        self._submeshes[name] = self._submeshes.get(owner, [])
+        self._owners[name] = owner
+        self._last_used[name] = self._frame
+
+        # the levels of detail of the owner are drawn for the mesh too
+        if owner in self._lods:
+            self._lods[name] = [name, *self._lods[owner][1:]]
+
+        print_info(f'Mesh {name} shares the data of {owner}')
+
+    def _detach_data(self, name: str) -> bool:
+        # stop using the data of another mesh, or hand the data of the mesh over to the meshes sharing it, returns
+        # True if the data is still used by other meshes
+        if self._owners.pop(name, None) is not None:
+            self._lods.pop(name, None)
+            return True
+
+        sharers = [other for other, owner in self._owners.items() if owner == name]
+        if not sharers:
+            return False
+
+        heir = sharers[0]
+        del self._owners[heir]
+        for other in sharers[1:]:
+            self._owners[other] = heir
+
+        # the heir already references the buffers and levels of detail of the mesh, only the ownership moves
+        if self.arena is not None and name in self.arena:
+            self.arena.rename(name, heir)
+
+        self._memory[heir] = self._memory.pop(name, (0, 0))
+        self._last_used[heir] = max(self._last_used.get(heir, 0), self._last_used.get(name, 0))
+        self._lods.pop(name, None)
+
+        key = self._content_keys.pop(name, None)
+        if key is not None:
+            self._content_keys[heir] = key
+            self._content_owners[key] = heir
+
+        return True
+
+    def _set_bounds(self, name: str, mesh: MeshData) -> None:
+        self._submeshes[name] = mesh.submeshes
+
+        # copy the meshlets out of the mapped file, they are read every frame by the cluster culling
+        if mesh.meshlets is None:
+            self._meshlets.pop(name, None)
+        else:
+            self._meshlets[name] = np.array(mesh.meshlets)
+
+        self._aabb_mins[name] = glm.vec3(*mesh.aabb_min)
+        self._aabb_maxs[name] = glm.vec3(*mesh.aabb_max)
+
+        self._bounding_sphere_radius[name] = mesh.radius
+        self._bounding_sphere_center[name] = glm.vec3(*mesh.center)
+
+        # fall back to the bounding box for meshes without an oriented box
+        if mesh.obb is None:
+            self._obbs[name] = OrientedBox(
+                (np.asarray(mesh.aabb_min) + np.asarray(mesh.aabb_max)) * 0.5,
+                np.eye(3, dtype=np.float32),
+                (np.asarray(mesh.aabb_max) - np.asarray(mesh.aabb_min)) * 0.5,
+            )
+        else:
+            self._obbs[name] = mesh.obb
+
+    def transform_bounds(self, name: str, matrix: glm.mat4) -> tuple[glm.vec3, float, glm.vec3, glm.vec3]:
+        """Calculate the world space bounds of a model from the bounds of its mesh.
+
+        Args:
+            name (str): Name of the mesh of the model
+            matrix (glm.mat4): Model matrix of the model
+
+        Returns:
+            tuple[glm.vec3, float, glm.vec3, glm.vec3]: Center and radius of the bounding sphere, minimum and maximum
+                corners of the bounding box
+
+        """
+        center, radius = transform_sphere(
+            self._bounding_sphere_center[name], self._bounding_sphere_radius[name], matrix
+        )
+
+        # both the transformed bounding box and oriented box contain the model, and so does their intersection
+        aabb_min, aabb_max = transform_aabb(self._aabb_mins[name], self._aabb_maxs[name], matrix)
+        obb_min, obb_max = transform_oriented_box(self._obbs[name], matrix)
+        aabb_min = glm.max(aabb_min, obb_min)
+        aabb_max = glm.min(aabb_max, obb_max)
+
+        # the sphere around the box is smaller than the transformed sphere under strong non uniform scales
+        box_center = (aabb_min + aabb_max) * 0.5
+        box_radius = glm.length(aabb_max - aabb_min) * 0.5
+        if box_radius < radius:
+            center, radius = box_center, box_radius
+
+        return (center, radius, aabb_min, aabb_max)
+
+    def _set_vertex_format(self, name: str, mesh: MeshData, layout: VertexLayout) -> None:
+        # keep track of how to decode the vertices of the mesh
+        if layout.compressed:
+            offset, scale = layout.quantization(mesh)
+            self._quantization[name] = (glm.vec3(*offset), glm.vec3(*scale))
+        else:
+            self._quantization.pop(name, None)
+
+        # and of the memory saved by its formats
+        vertex_count = len(mesh.vertices) // 3
+        index_size = 2 if self._index_types[name] == GL_UNSIGNED_SHORT else 4
+        self._memory[name] = (
+            vertex_count * layout.stride + len(mesh.indices) * index_size,
+            vertex_count * UNCOMPRESSED_VERTEX_SIZE + len(mesh.indices) * UNCOMPRESSED_INDEX_SIZE,
+        )
+
+    def _fits_arena(self, mesh: MeshData) -> bool:
+        # the 16 bit indices of the arena can only address 65536 vertices after the first vertex of a mesh
+        return not self.small_indices or len(mesh.vertices) // 3 <= np.iinfo(np.uint16).max + 1
+
+    def _pack_indices(self, mesh: MeshData) -> np.ndarray:
+        # use 16 bit indices whenever every vertex can be addressed with them
+        if self.small_indices and len(mesh.vertices) // 3 <= np.iinfo(np.uint16).max + 1:
+            return np.ascontiguousarray(mesh.indices, dtype=np.uint16)
+
+        return np.ascontiguousarray(mesh.indices, dtype=np.uint32)
+
+    def _upload_arena_mesh(self, name: str, mesh: MeshData) -> None:
+        # create the arena with the first mesh, once the OpenGL context is available
+        if self.arena is None:
+            self.arena = MeshArena(
+                self.default_layout,
+                self.arena_vertices,
+                self.arena_indices,
+                GL_UNSIGNED_SHORT if self.small_indices else GL_UNSIGNED_INT,
+            )
+
+        self._release_buffers(name)
+
+        self._ranges[name] = self.arena.add(name, mesh)
+
+        # every mesh in the arena is drawn through the same VAO
+        self._vaos[name] = self.arena.vao
+        self._layouts[name] = self.arena.layout
+        self._indices_count[name] = len(mesh.indices)
+        self._index_types[name] = self.arena.index_type
+
+    def _upload_mesh(self, name: str, mesh: MeshData, layout: VertexLayout) -> None:
+        # generate the OpenGL buffers (VBO) for the vertex data and the buffer for the indices (EBO)
+        indices = self._pack_indices(mesh)
+        buffers = []
+        for data in (*layout.pack(mesh), indices):
+            buffer = glGenBuffers(1)
+            # store the data into the buffer
+            glBindBuffer(GL_COPY_WRITE_BUFFER, buffer)
+            glBufferData(GL_COPY_WRITE_BUFFER, data.nbytes, data, GL_STATIC_DRAW)
+            buffers.append(buffer)
+
+        self._attach_buffers(name, indices, layout, buffers[:-1], buffers[-1])
+
+    def _attach_buffers(self, name: str, indices: np.ndarray, layout: VertexLayout, vbos: list[int], ebo: int) -> None:
+        self._release_buffers(name)
+
+        # keep track of the indices count and type
+        self._indices_count[name] = len(indices)
+        self._index_types[name] = GL_UNSIGNED_SHORT if indices.dtype == np.uint16 else GL_UNSIGNED_INT
+        # the mesh is drawn from the beginning of its own buffers
+        self._ranges[name] = MeshRange(0, len(indices), 0, int(self._vertices_count[name]), self._index_types[name])
+
+        # keep track of the buffers of the mesh and how to read them
+        self._vbos[name] = vbos
+        self._layouts[name] = layout
+        self._ebos[name] = ebo
+        # generate the OpenGL buffer (VAO) to store all the data
+        self._vaos[name] = glGenVertexArrays(1)
 
         # bind the VAO
         glBindVertexArray(self._vaos[name])
 
-        # bind the vertex VBO
-        glBindBuffer(GL_ARRAY_BUFFER, self._vertex_vbos[name])
-        # store the data into the VBO
-        glBufferData(GL_ARRAY_BUFFER, indiced_vertices.nbytes, indiced_vertices, GL_STATIC_DRAW)
-        # enable the index 0 of the VAO
-        glEnableVertexAttribArray(0)
-        # store the data from the VBO in the VAO
-        glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-
-        # repeat for normals
-        glBindBuffer(GL_ARRAY_BUFFER, self._normal_vbos[name])
-        glBufferData(GL_ARRAY_BUFFER, indiced_normals.nbytes, indiced_normals, GL_STATIC_DRAW)
-        glEnableVertexAttribArray(1)
-        glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-
-        # and UVs
-        glBindBuffer(GL_ARRAY_BUFFER, self._uv_vbos[name])
-        glBufferData(GL_ARRAY_BUFFER, indiced_uvs.nbytes, indiced_uvs, GL_STATIC_DRAW)
-        glEnableVertexAttribArray(2)
-        glVertexAttribPointer(2, 2, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
-
-        # pass the data for the element array buffer of indices
+        # link the vertex attributes to the VBOs
+        layout.bind(vbos)
+
+        # bind the element array buffer of indices to the VAO
         glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self._ebos[name])
-        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
 
-        center = data['center']
-        max_distance = data['max_distance']
+    def submeshes(self, name: str) -> list[Submesh]:
+        return self._submeshes.get(name, [])
 
-        self._aabb_mins[name] = center - glm.vec3(max_distance)
-        self._aabb_maxs[name] = center + glm.vec3(max_distance)
+    def meshlets(self, name: str) -> np.ndarray | None:
+        return self._meshlets.get(name)
 
-        self._bounding_sphere_radius[name] = max_distance
-        self._bounding_sphere_center[name] = center
+    def index_type(self, name: str) -> int:
+        return self._index_types.get(name, GL_UNSIGNED_INT)
 
     def bind_mesh(self, name: str) -> int:
         glBindVertexArray(self._vaos.get(name))
         return self._indices_count.get(name)
+
+    def draw(self, name: str, instance_count: int = 0) -> None:
+        """Draw a mesh with the VAO currently bound (the VAO of the mesh or an instance VAO using its buffers).
+
+        Args:
+            name (str): Name of the mesh
+            instance_count (int, optional): Number of instances to draw, 0 for a non instanced draw. Defaults to 0.
+
+        """
+        mesh_range = self._ranges.get(name)
+        self._mark_used(name)
+
+        if instance_count:
+            glDrawElementsInstancedBaseVertex(
+                GL_TRIANGLES,
+                mesh_range.index_count,
+                mesh_range.index_type,
+                mesh_range.index_offset,
+                instance_count,
+                mesh_range.base_vertex,
+            )
+        else:
+            glDrawElementsBaseVertex(
+                GL_TRIANGLES,
+                mesh_range.index_count,
+                mesh_range.index_type,
+                mesh_range.index_offset,
+                mesh_range.base_vertex,
+            )
+
+    def draw_ranges(self, name: str, first_indices: np.ndarray, index_counts: np.ndarray) -> None:
+        """Draw ranges of the indices of a mesh in a single call, with the VAO currently bound.
+
+        Args:
+            name (str): Name of the mesh
+            first_indices (np.ndarray): First index of every range, relative to the first index of the mesh
+            index_counts (np.ndarray): Number of indices of every range
+
+        """
+        mesh_range = self._ranges.get(name)
+        draw_count = len(index_counts)
+        self._mark_used(name)
+
+        if draw_count == 0:
+            return
+
+        # byte offsets of the ranges in the index buffer
+        index_size = INDEX_SIZES[mesh_range.index_type]
+        offsets = (np.asarray(first_indices, dtype=np.int64) + mesh_range.first_index) * index_size
+
+        glMultiDrawElementsBaseVertex(
+            GL_TRIANGLES,
+            np.ascontiguousarray(index_counts, dtype=np.int32),
+            mesh_range.index_type,
+            (ctypes.c_void_p * draw_count)(*offsets.tolist()),
+            draw_count,
+            np.full(draw_count, mesh_range.base_vertex, dtype=np.int32),
+        )
+
+    def draw_commands(
+        self, name: str, base_instance: int, first_indices: np.ndarray = None, index_counts: np.ndarray = None
+    ) -> list[tuple[int, int, int, int, int]]:
+        """Indirect draw commands (DRAW_COMMAND_DTYPE) drawing a mesh, or ranges of its indices, once.
+
+        Args:
+            name (str): Name of the mesh
+            base_instance (int): Base instance of the commands, read by the shaders to find the data of the draw
+            first_indices (np.ndarray, optional): First index of every range, relative to the first index of the
+                mesh. Defaults to None to draw the whole mesh.
+            index_counts (np.ndarray, optional): Number of indices of every range. Defaults to None.
+
+        Returns:
+            list[tuple[int, int, int, int, int]]: Fields of every command
+
+        """
+        mesh_range = self._ranges.get(name)
+        self._mark_used(name)
+
+        if first_indices is None:
+            return [(mesh_range.index_count, 1, mesh_range.first_index, mesh_range.base_vertex, base_instance)]
+
+        return [
+            (count, 1, mesh_range.first_index + first, mesh_range.base_vertex, base_instance)
+            for first, count in zip(np.asarray(first_indices).tolist(), np.asarray(index_counts).tolist())
+        ]
+
+    def _mark_used(self, name: str) -> None:
+        # the meshes sharing their data keep it resident
+        self._last_used[self._owners.get(name, name)] = self._frame
+
+        # the mesh is needed again, stream it back in (drawn with the placeholder until then)
+        if name in self._evicted:
+            self._restream(name)
+
+    def remove_mesh(self, name: str) -> None:
+        """Remove a mesh, freeing its range of the arena or its own buffers unless other meshes share them.
+
+        Args:
+            name (str): Name of the mesh
+
+        """
+        if not self._detach_data(name):
+            self._remove_lods(name)
+            self._release_buffers(name)
+
+        self._forget_content(name)
+
+        for dictionary in (
+            self._vbos,
+            self._layouts,
+            self._ebos,
+            self._ranges,
+            self._vaos,
+            self._vertices_count,
+            self._indices_count,
+            self._index_types,
+            self._aabb_mins,
+            self._aabb_maxs,
+            self._bounding_sphere_radius,
+            self._bounding_sphere_center,
+            self._obbs,
+            self._submeshes,
+            self._meshlets,
+            self._quantization,
+            self._memory,
+        ):
+            dictionary.pop(name, None)
+
+    def _remove_lods(self, name: str) -> None:
+        # remove the levels of detail of the previous data of the mesh
+        for lod in self._lods.pop(name, [name])[1:]:
+            self.remove_mesh(lod)
+
+    def compact_arena(self) -> None:
+        """Remove the holes left in the arena by the removed meshes."""
+        if self.arena is not None:
+            self.arena.compact()
+
+    def _release_buffers(self, name: str) -> None:
+        # free the data currently stored for the mesh, before it's replaced or removed
+        if self.arena is not None and name in self.arena:
+            self.arena.remove(name)
+            return
+
+        vao = self._vaos.get(name)
+        if vao is None or (self.arena is not None and vao == self.arena.vao):
+            return
+
+        # aliased meshes share the buffers of their target, keep them while they are in use
+        if any(other != name and other_vao == vao for other, other_vao in self._vaos.items()):
+            return
+
+        glDeleteVertexArrays(1, [vao])
+        glDeleteBuffers(len(self._vbos.get(name, [])) + 1, [*self._vbos.get(name, []), self._ebos.get(name)])
+
+        self._vbos.pop(name, None)
+        self._ebos.pop(name, None)
@@ -28,8 +28,17 @@ def new_model(self, name, mesh, shader, texture, material, count) -> None:
             name = original_name + str(i)
 
         # create a new model object
-        self.models[name] = Model(name, mesh, texture, shader, material)
+        self.models[name] = Model(
+            name,
+            mesh=mesh,
+            texture=texture,
+            shader=shader,
+            material=material,
+            texture_slot=self.texture_array_manager.slot_index(texture),
+        )
         self.materials[material].add_model(self.models[name])
+        # keep the mesh loaded while the model uses it
+        self.mesh_manager.acquire_mesh(mesh)
 
         self.single_render_models.append(self.models[name])
 
@@ -40,10 +49,29 @@ def new_model(self, name, mesh, shader, texture, material, count) -> None:
         self.model_matrices[name] = glm.mat4(1.0)
         self.ogl_model_matrices[name] = get_ogl_matrix(glm.mat4(1.0))
 
-        self.model_bounding_sphere_center[name] = (
-            self.mesh_manager._bounding_sphere_center[self.models[name].mesh] + self.positions[name]
-        )
-        self.model_bounding_sphere_radius[name] = self.mesh_manager._bounding_sphere_radius[self.models[name].mesh]
+        update_model_bounds(self, name)
+
+
+# method to change the mesh of a model
+def set_model_mesh(self, name, mesh) -> None:
+    model = self.models[name]
+    if mesh == model.mesh:
+        return
+
+    # move the reference of the model to the new mesh
+    self.mesh_manager.release_mesh(model.mesh)
+    self.mesh_manager.acquire_mesh(mesh)
+    model.mesh = mesh
+
+    # the bounds of the model change with its mesh
+    self.changed_models[name] = True
+
+
+# method to change the texture of a model
+def set_model_texture(self, name, texture) -> None:
+    model = self.models[name]
+    model.texture = texture
+    model.texture_slot = self.texture_array_manager.slot_index(texture)
 
 
 # method to place the mesh in a specific spot
@@ -121,15 +149,20 @@ def calculate_model_matrix(self, name) -> None:
     self.model_matrices[name] = glm.scale(self.model_matrices[name], scale)
     self.ogl_model_matrices[name] = get_ogl_matrix(self.model_matrices[name])
 
-    max_scale = max(max(scale.x, scale.y), scale.z)
+    update_model_bounds(self, name)
 
-    self.model_bounding_sphere_center[name] = (
-        self.mesh_manager._bounding_sphere_center[self.models[name].mesh] + self.positions[name]
-    )
-    self.model_bounding_sphere_radius[name] = (
-        self.mesh_manager._bounding_sphere_radius[self.models[name].mesh] * max_scale
+
+# method to calculate the world space bounds of a model from the bounds of its mesh and its model matrix
+def update_model_bounds(self, name) -> None:
+    center, radius, aabb_min, aabb_max = self.mesh_manager.transform_bounds(
+        self.models[name].mesh, self.model_matrices[name]
     )
 
+    self.model_bounding_sphere_center[name] = center
+    self.model_bounding_sphere_radius[name] = radius
+    self.model_aabb_mins[name] = aabb_min
+    self.model_aabb_maxs[name] = aabb_max
+
 
 # method to check if an instance should be updated after a transformation
 def check_instance_update(self, name: str) -> None:
@@ -0,0 +1,223 @@
+import math
+import threading
+from collections.abc import Callable, Generator
+from dataclasses import dataclass
+
+import glm
+
+from utils import Singleton, print_error, print_info
+from utils.config import Config
+
+
+@dataclass
+class _StreamRequest:
+    kind: str
+    name: str
+    path: str
+    # function reading the asset data (called from a worker thread, it must not use OpenGL)
+    read: Callable[[str], any]
+    # function returning a generator that uploads the data a chunk at a time, yielding the bytes of every chunk
+    upload_steps: Callable[[str, any, int], Generator[int, None, None]]
+    # distance of the closest model using the asset from the camera (lower is loaded first)
+    priority: float = math.inf
+    data: any = None
+    steps: Generator[int, None, None] = None
+
+
+class StreamingManager(metaclass=Singleton):
+    def __init__(
+        self,
+        enabled: bool = None,
+        upload_budget: int = None,
+        chunk_size: int = None,
+        workers: int = None,
+    ) -> None:
+        """Service loading assets in the background while the game loop keeps running.
+
+        The asset files are read by worker threads, closest assets to the camera first, and the resulting data is
+        uploaded on the main thread in update(), without going over a fixed amount of bytes per frame.
+
+        Args:
+            enabled (bool, optional): Stream the assets requested through the managers by default. Defaults to False.
+            upload_budget (int, optional): Maximum number of bytes uploaded to the GPU every frame. Defaults to 4MB.
+            chunk_size (int, optional): Maximum number of bytes of a single upload. Defaults to 1MB.
+            workers (int, optional): Number of threads reading the asset files. Defaults to 2.
+
+        """
+        default_config = {
+            'enabled': False,
+            'upload_budget': 4 * 1024 * 1024,
+            'chunk_size': 1024 * 1024,
+            'workers': 2,
+        }
+
+        Config().initialize_parameters(
+            self,
+            'streaming',
+            default_config,
+            enabled=enabled,
+            upload_budget=upload_budget,
+            chunk_size=chunk_size,
+            workers=workers,
+        )
+
+        # a single chunk should never go over the budget of a frame
+        self.chunk_size = max(min(self.chunk_size, self.upload_budget), 1)
+
+        # requests waiting to be read, requests read and waiting to be uploaded, request being uploaded
+        self._pending: dict[str, _StreamRequest] = {}
+        self._ready: dict[str, _StreamRequest] = {}
+        self._uploading: _StreamRequest = None
+        self._reading: int = 0
+
+        self._condition = threading.Condition()
+        self._threads: list[threading.Thread] = []
+
+        self.stats: dict[str, int] = {
+            'pending': 0,
+            'reading': 0,
+            'ready': 0,
+            'uploading': 0,
+            'bytes_uploaded': 0,
+            'total_bytes_uploaded': 0,
+            'completed': 0,
+            'failed': 0,
+        }
+
+    def request(
+        self,
+        kind: str,
+        name: str,
+        path: str,
+        read: Callable[[str], any],
+        upload_steps: Callable[[str, any, int], Generator[int, None, None]],
+    ) -> None:
+        """Queue an asset to be streamed in.
+
+        Args:
+            kind (str): Kind of asset ('mesh' or 'texture'), used to find the models using it
+            name (str): Name of the asset
+            path (str): Path of the asset file
+            read (Callable[[str], any]): Function reading the asset file, called from a worker thread
+            upload_steps (Callable[[str, any, int], Generator[int, None, None]]): Function called with the name, the
+                read data and the chunk size, returning a generator uploading a chunk at every step
+
+        """
+        # start the workers on the first request
+        if not self._threads:
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'streaming_{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+        with self._condition:
+            self._pending[f'{kind}:{name}'] = _StreamRequest(kind, name, path, read, upload_steps)
+            self._condition.notify()
+
+    def update(self, rm: any) -> None:
+        """Upload the read assets, closest to the camera first, until the upload budget of the frame is used.
+
+        Args:
+            rm (RendererManager): RendererManager object reference
+
+        """
+        self.stats['bytes_uploaded'] = 0
+
+        if self._pending or self._ready or self._uploading is not None:
+            self._update_priorities(rm)
+
+            budget = self.upload_budget
+
+            # a step uploads up to a chunk, stop as soon as the next one might not fit in what's left of the budget
+            while budget >= self.chunk_size:
+                # pick the next asset to upload
+                if self._uploading is None:
+                    with self._condition:
+                        if not self._ready:
+                            break
+
+                        key = min(self._ready, key=lambda key: self._ready[key].priority)
+                        self._uploading = self._ready.pop(key)
+
+                    request = self._uploading
+                    request.steps = request.upload_steps(request.name, request.data, self.chunk_size)
+
+                # upload the next chunk of the asset
+                try:
+                    uploaded = next(self._uploading.steps)
+                except StopIteration:
+                    self._complete(rm, self._uploading)
+                    self._uploading = None
+                    continue
+
+                budget -= uploaded
+                self.stats['bytes_uploaded'] += uploaded
+
+        self.stats['total_bytes_uploaded'] += self.stats['bytes_uploaded']
+        self.stats['pending'] = len(self._pending)
+        self.stats['reading'] = self._reading
+        self.stats['ready'] = len(self._ready)
+        self.stats['uploading'] = 0 if self._uploading is None else 1
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requested assets that are not resident yet."""
+        return len(self._pending) + self._reading + len(self._ready) + (0 if self._uploading is None else 1)
+
+    def _work(self) -> None:
+        while True:
+            # take the pending request closest to the camera
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+
+                key = min(self._pending, key=lambda key: self._pending[key].priority)
+                request = self._pending.pop(key)
+                self._reading += 1
+
+            try:
+                request.data = request.read(request.path)
+            except Exception as e:  # noqa: BLE001
+                print_error(f'Failed to stream {request.kind} {request.name} ({request.path}): {e}')
+                request = None
+
+            with self._condition:
+                self._reading -= 1
+
+                if request is None:
+                    self.stats['failed'] += 1
+                # a newer request for the same asset wins over this one
+                elif key not in self._pending:
+                    self._ready[key] = request
+
+    def _update_priorities(self, rm: any) -> None:
+        camera = rm.camera.position
+
+        # find the distance of the closest model using each asset
+        distances: dict[str, float] = {}
+        for name, model in rm.models.items():
+            center = rm.model_bounding_sphere_center.get(name)
+            if center is None:
+                continue
+
+            distance = max(glm.distance(camera, center) - rm.model_bounding_sphere_radius.get(name, 0.0), 0.0)
+
+            for key in (f'mesh:{model.mesh}', f'texture:{model.texture}'):
+                if distance < distances.get(key, math.inf):
+                    distances[key] = distance
+
+        with self._condition:
+            for requests in (self._pending, self._ready):
+                for key, request in requests.items():
+                    request.priority = distances.get(key, math.inf)
+
+    def _complete(self, rm: any, request: _StreamRequest) -> None:
+        self.stats['completed'] += 1
+
+        # the bounds of the models using the mesh changed with it
+        if request.kind == 'mesh':
+            for name, model in rm.models.items():
+                if model.mesh == request.name:
+                    rm.changed_models[name] = True
+
+        print_info(f'Streamed {request.kind}: {request.name}')
@@ -0,0 +1,327 @@
+# ruff: noqa: F403, F405
+
+from collections import defaultdict
+from dataclasses import dataclass
+
+from OpenGL.GL import *
+
+from renderer.model.model import Model
+from renderer.renderer_manager.managers.texture_manager import COMPRESSED_FORMATS, TextureManager
+from renderer.shader.shader import Shader
+from utils import Singleton
+from utils.bc_encoder import compressed_level_size
+from utils.config import Config
+from utils.texture_atlas import pack_rectangles
+
+# slot of the models drawn without a texture, with the color of their material only
+NO_TEXTURE = -1
+
+
+@dataclass
+class TextureSlot:
+    """Place of a texture inside the texture arrays."""
+
+    # OpenGL texture array, and layer of the array holding the texture
+    array: int
+    layer: int
+    # offset and scale of the UVs of the texture inside the layer (0, 0, 1, 1 when it fills the whole layer)
+    rect: tuple[float, float, float, float]
+    # OpenGL texture the slot was copied from
+    source: int
+
+
+class TextureArrayManager(metaclass=Singleton):
+    def __init__(
+        self,
+        min_layers: int = None,
+        atlas_size: int = None,
+        atlas_padding: int = None,
+        atlas_levels: int = None,
+    ) -> None:
+        """Packing of the textures of the models into a few 2D texture arrays, so that one bind serves many draws.
+
+        The textures sharing the same size, number of levels and compression become the layers of a texture array.
+        The remaining RGBA8 textures are packed into the pages of an atlas (the layers of another texture array),
+        and the textures that fit nowhere get an array of their own. The textures are copied on the GPU with
+        glCopyImageSubData, and the arrays are built again when the textures change.
+
+        Every model carries the index of its slot (Model.texture_slot): the array, the layer and the rect of its
+        texture. The shaders sample the layer through a sampler2DArray, remapping the UVs inside the rect.
+
+        Args:
+            min_layers (int, optional): Minimum number of textures of the same size to build an array of that size,
+                the others go to the atlas. Defaults to 2.
+            atlas_size (int, optional): Width and height of the pages of the atlas. Defaults to 2048.
+            atlas_padding (int, optional): Free texels around every texture of the atlas. Defaults to 8.
+            atlas_levels (int, optional): Number of mip levels of the atlas. Defaults to 4.
+
+        """
+        default_config = {
+            'min_layers': 2,
+            'atlas_size': 2048,
+            'atlas_padding': 8,
+            'atlas_levels': 4,
+        }
+
+        Config().initialize_parameters(
+            self,
+            'texture_arrays',
+            default_config,
+            min_layers=min_layers,
+            atlas_size=atlas_size,
+            atlas_padding=atlas_padding,
+            atlas_levels=atlas_levels,
+        )
+
+        # place of every texture in the arrays, indexed by the slot of the models
+        self.slots: list[TextureSlot] = []
+        # slot of every texture name
+        self._slot_indices: dict[str, int] = {}
+        # OpenGL texture arrays holding the slots, and the GPU memory they use
+        self.arrays: list[int] = []
+        self._bytes: int = 0
+        # version of the textures the arrays were built from
+        self._version: int = None
+
+        # array, slot and shader of the last draw of the current pass
+        self._bound_array: int = None
+        self._bound_slot: int = None
+        self._bound_shader: Shader = None
+
+        # draws, texture changes and array binds of every pass in the frame being drawn
+        self._frame_stats: dict[str, dict[str, int]] = {}
+        # draws, texture changes and array binds of every pass in the last complete frame
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def slot_index(self, name: str) -> int:
+        """Slot of a texture, NO_TEXTURE for the default texture and the textures that are not packed (yet).
+
+        Args:
+            name (str): Name of the texture
+
+        Returns:
+            int: Index of the slot of the texture
+
+        """
+        return self._slot_indices.get(name, NO_TEXTURE)
+
+    def slot(self, slot_index: int) -> TextureSlot | None:
+        """Place of the texture of a slot in the arrays, None for NO_TEXTURE and the slots that don't exist."""
+        return self.slots[slot_index] if 0 <= slot_index < len(self.slots) else None
+
+    def update(self, models: dict[str, Model]) -> None:
+        """Build the arrays again if the textures changed, and give the models the new slots of their textures.
+
+        Args:
+            models (dict[str, Model]): Models sampling the textures
+
+        """
+        texture_manager = TextureManager()
+        if texture_manager.version == self._version:
+            return
+
+        self.build()
+
+        for model in models.values():
+            model.texture_slot = self.slot_index(model.texture)
+
+    def build(self) -> None:
+        """Copy every texture of the texture manager into the texture arrays, replacing the previous arrays."""
+        texture_manager = TextureManager()
+        self._version = texture_manager.version
+
+        if self.arrays:
+            glDeleteTextures(len(self.arrays), self.arrays)
+
+        self.slots = []
+        self._slot_indices = {}
+        self.arrays = []
+        self._bytes = 0
+
+        # the default texture is only a placeholder, the names sharing a texture share its slot
+        default_texture = texture_manager.textures.get('default')
+        names: dict[int, list[str]] = defaultdict(list)
+        for name, texture_id in texture_manager.textures.items():
+            if texture_id != default_texture and texture_manager.texture_format(texture_id) is not None:
+                names[texture_id].append(name)
+
+        # group the textures by size, number of levels and compression
+        groups: dict[tuple[int, int, int, str], list[int]] = defaultdict(list)
+        for texture_id in names:
+            groups[texture_manager.texture_format(texture_id)].append(texture_id)
+
+        atlas_textures = []
+        for texture_format, texture_ids in groups.items():
+            width, height, _, compression = texture_format
+
+            if len(texture_ids) >= self.min_layers:
+                self._build_array(texture_format, texture_ids)
+            elif not compression and max(width, height) + 2 * self.atlas_padding <= self.atlas_size:
+                atlas_textures.extend(texture_ids)
+            else:
+                for texture_id in texture_ids:
+                    self._build_array(texture_format, [texture_id])
+
+        if atlas_textures:
+            self._build_atlas(atlas_textures)
+
+        for slot_index, slot in enumerate(self.slots):
+            for name in names[slot.source]:
+                self._slot_indices[name] = slot_index
+
+    def _create_array(self, width: int, height: int, layers: int, levels: int, compression: str) -> int:
+        array = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, array)
+        internal_format = COMPRESSED_FORMATS[compression] if compression else GL_RGBA8
+        glTexStorage3D(GL_TEXTURE_2D_ARRAY, levels, internal_format, width, height, layers)
+        TextureManager().set_sampling(GL_TEXTURE_2D_ARRAY, levels)
+
+        self.arrays.append(array)
+        self._bytes += layers * sum(
+            compressed_level_size(max(width >> level, 1), max(height >> level, 1), compression)
+            if compression
+            else max(width >> level, 1) * max(height >> level, 1) * 4
+            for level in range(levels)
+        )
+
+        return array
+
+    def _build_array(self, texture_format: tuple[int, int, int, str], texture_ids: list[int]) -> None:
+        # one layer per texture, every level copied as is
+        width, height, levels, compression = texture_format
+        array = self._create_array(width, height, len(texture_ids), levels, compression)
+
+        for layer, texture_id in enumerate(texture_ids):
+            for level in range(levels):
+                glCopyImageSubData(
+                    texture_id,
+                    GL_TEXTURE_2D,
+                    level,
+                    0,
+                    0,
+                    0,
+                    array,
+                    GL_TEXTURE_2D_ARRAY,
+                    level,
+                    0,
+                    0,
+                    layer,
+                    max(width >> level, 1),
+                    max(height >> level, 1),
+                    1,
+                )
+
+            self.slots.append(TextureSlot(array, layer, (0.0, 0.0, 1.0, 1.0), texture_id))
+
+    def _build_atlas(self, texture_ids: list[int]) -> None:
+        texture_manager = TextureManager()
+        formats = [texture_manager.texture_format(texture_id) for texture_id in texture_ids]
+
+        # the positions are aligned to stay on whole texels down to the smallest level of the atlas
+        levels = max(min(self.atlas_levels, self.atlas_size.bit_length()), 1)
+        sizes = [(width, height) for width, height, _, _ in formats]
+        page_size = self.atlas_size
+        positions, pages = pack_rectangles(sizes, page_size, self.atlas_padding, 1 << (levels - 1))
+
+        # shrink a single page as long as every texture still fits in it
+        while pages == 1 and page_size > 1:
+            try:
+                smaller_positions, smaller_pages = pack_rectangles(
+                    sizes, page_size // 2, self.atlas_padding, 1 << (levels - 1)
+                )
+            except ValueError:
+                break
+
+            if smaller_pages > 1:
+                break
+
+            page_size //= 2
+            positions = smaller_positions
+
+        array = self._create_array(page_size, page_size, pages, levels, '')
+
+        for texture_id, (width, height, texture_levels, _), (page, x, y) in zip(texture_ids, formats, positions):
+            # the textures with fewer levels leave the smallest levels of their rect empty
+            for level in range(min(levels, texture_levels)):
+                glCopyImageSubData(
+                    texture_id,
+                    GL_TEXTURE_2D,
+                    level,
+                    0,
+                    0,
+                    0,
+                    array,
+                    GL_TEXTURE_2D_ARRAY,
+                    level,
+                    x >> level,
+                    y >> level,
+                    page,
+                    max(width >> level, 1),
+                    max(height >> level, 1),
+                    1,
+                )
+
+            rect = (x / page_size, y / page_size, width / page_size, height / page_size)
+            self.slots.append(TextureSlot(array, page, rect, texture_id))
+
+    @property
+    def memory_stats(self) -> dict[str, int]:
+        """GPU memory used by the texture arrays."""
+        return {'bytes': self._bytes, 'arrays': len(self.arrays), 'slots': len(self.slots)}
+
+    def begin_frame(self) -> None:
+        """Start counting the draws and the binds of the next frame."""
+        self.stats = self._frame_stats
+        self._frame_stats = {}
+
+    def begin_pass(self) -> None:
+        """Forget the array bound by the previous pass, other code may have bound another one since."""
+        self._bound_array = None
+        self._bound_slot = None
+        self._bound_shader = None
+
+    def bind(self, render_pass: str, shader: Shader, slot_index: int) -> None:
+        """Bind the array of the texture of a model if it's not bound yet, and point the shader to its layer and rect.
+
+        The array is bound to the texture unit 0, the shader samples it as the textures uniform.
+
+        Args:
+            render_pass (str): Name of the pass drawing the model
+            shader (Shader): Shader drawing the model, with the textures, texture_layer and texture_rect uniforms
+            slot_index (int): Slot of the texture of the model
+
+        """
+        stats = self._frame_stats.get(render_pass)
+        if stats is None:
+            stats = self._frame_stats[render_pass] = {'draws': 0, 'texture_changes': 0, 'binds': 0, 'binds_saved': 0}
+
+        stats['draws'] += 1
+
+        if slot_index == self._bound_slot and shader is self._bound_shader:
+            return
+
+        slot = self.slots[slot_index] if 0 <= slot_index < len(self.slots) else None
+
+        # binding the 2D texture of every model would have needed a bind every time the texture changes
+        if slot is not None:
+            previous = self.slots[self._bound_slot] if self._bound_slot is not None and self._bound_slot >= 0 else None
+            if previous is None or previous.source != slot.source:
+                stats['texture_changes'] += 1
+
+                if slot.array != self._bound_array:
+                    glActiveTexture(GL_TEXTURE0)
+                    glBindTexture(GL_TEXTURE_2D_ARRAY, slot.array)
+                    self._bound_array = slot.array
+                    stats['binds'] += 1
+                else:
+                    stats['binds_saved'] += 1
+
+        self._bound_slot = slot_index
+        self._bound_shader = shader
+
+        if slot is None:
+            shader.bind_uniform('texture_layer', NO_TEXTURE)
+            return
+
+        shader.bind_uniform('texture_layer', slot.layer)
+        shader.bind_uniform('texture_rect', slot.rect)
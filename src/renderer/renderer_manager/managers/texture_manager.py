@@ -0,0 +1,430 @@
+# ruff: noqa: F403, F405
+
+import threading
+import time
+from collections.abc import Generator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from OpenGL.GL import *
+from OpenGL.GL.EXT.texture_compression_s3tc import (
+    GL_COMPRESSED_RGBA_S3TC_DXT1_EXT,
+    GL_COMPRESSED_RGBA_S3TC_DXT5_EXT,
+)
+
+from renderer.renderer_manager.managers.streaming_manager import StreamingManager
+from utils import Singleton, print_error, print_warning
+from utils.asset_baker import AssetManifest, cache_texture
+from utils.bc_encoder import compressed_level_size
+from utils.config import Config
+from utils.dds_file import find_compressed_sibling, read_dds
+from utils.texture_file import TextureData, read_binary_texture, read_image_texture
+
+# minification (with mips) and magnification filters of every filtering mode
+FILTERS = {
+    'nearest': (GL_NEAREST_MIPMAP_NEAREST, GL_NEAREST),
+    'bilinear': (GL_LINEAR_MIPMAP_NEAREST, GL_LINEAR),
+    'trilinear': (GL_LINEAR_MIPMAP_LINEAR, GL_LINEAR),
+}
+
+# OpenGL internal format of every block compression
+COMPRESSED_FORMATS = {
+    'bc1': GL_COMPRESSED_RGBA_S3TC_DXT1_EXT,
+    'bc3': GL_COMPRESSED_RGBA_S3TC_DXT5_EXT,
+    'bc5': GL_COMPRESSED_RG_RGTC2,
+    'bc7': GL_COMPRESSED_RGBA_BPTC_UNORM,
+}
+
+
+def texture_memory(texture: TextureData) -> tuple[int, int]:
+    """GPU memory used by every level of a texture, and by the same levels stored as RGBA8.
+
+    Args:
+        texture (TextureData): Texture data
+
+    Returns:
+        tuple[int, int]: Bytes of the texture, bytes of its RGBA8 equivalent
+
+    """
+    uncompressed_size = sum(width * height * 4 for width, height, _ in texture.levels)
+    if not texture.compression:
+        return uncompressed_size, uncompressed_size
+
+    size = sum(compressed_level_size(width, height, texture.compression) for width, height, _ in texture.levels)
+    return size, uncompressed_size
+
+
+class TextureManager(metaclass=Singleton):
+    def __init__(
+        self,
+        mipmaps: bool = None,
+        filtering: str = None,
+        anisotropy: float = None,
+        cache: bool = None,
+        workers: int = None,
+        compressed: bool = None,
+    ) -> None:
+        """Manager of the 2D textures sampled by the models.
+
+        The image files are decoded, flipped and reduced into their mip chain by a pool of threads. The result is
+        stored as the baked version of the image, so that the next loads only map the texels from disk. The textures
+        are allocated with immutable storage and filled one level at a time.
+
+        An image with a DDS file next to it, with the same name (grass.dds for grass.jpg), is replaced by that block
+        compressed version, uploaded as is: it takes 4 to 8 times less GPU memory than RGBA8 and isn't decoded at all.
+        The DDS files are written by `python src/assets.py compress`.
+
+        Args:
+            mipmaps (bool, optional): Generate the mip chain of the decoded images. Defaults to True.
+            filtering (str, optional): Filtering of the textures ('nearest', 'bilinear' or 'trilinear').
+                Defaults to 'trilinear'.
+            anisotropy (float, optional): Maximum anisotropy of the filtering, 1 to disable it (clamped to the
+                maximum supported by the driver). Defaults to 8.
+            cache (bool, optional): Store the decoded images as their baked version. Defaults to True.
+            workers (int, optional): Number of threads decoding the images. Defaults to 4.
+            compressed (bool, optional): Load the block compressed DDS version of the images when there is one.
+                Defaults to True.
+
+        """
+        default_config = {
+            'mipmaps': True,
+            'filtering': 'trilinear',
+            'anisotropy': 8.0,
+            'cache': True,
+            'workers': 4,
+            'compressed': True,
+        }
+
+        Config().initialize_parameters(
+            self,
+            'textures',
+            default_config,
+            mipmaps=mipmaps,
+            filtering=filtering,
+            anisotropy=anisotropy,
+            cache=cache,
+            workers=workers,
+            compressed=compressed,
+        )
+
+        if self.filtering not in FILTERS:
+            print_warning(f'Unknown texture filtering {self.filtering}, using trilinear')
+            self.filtering = 'trilinear'
+
+        # dictionary of OpenGL textures, the streamed textures use the texture of the placeholder until they are ready
+        self.textures: dict[str, int] = {}
+
+        # threads decoding the images, started with the first batch of textures
+        self._executor: ThreadPoolExecutor = None
+        # maximum anisotropy supported by the driver, queried with the first texture
+        self._max_anisotropy: float = None
+
+        # textures decoded from their image, mapped from their cached version or from their compressed version,
+        # and the time spent on them
+        self._stats_lock: threading.Lock = threading.Lock()
+        self.stats: dict[str, float] = {
+            'decoded': 0,
+            'decoded_time': 0.0,
+            'cached': 0,
+            'cached_time': 0.0,
+            'compressed': 0,
+            'compressed_time': 0.0,
+            'upload_time': 0.0,
+        }
+
+        # GPU memory used by every OpenGL texture, and by the same texture stored as RGBA8
+        self._memory: dict[int, tuple[int, int]] = {}
+        # width, height, number of levels and compression of every OpenGL texture
+        self._formats: dict[int, tuple[int, int, int, str]] = {}
+
+        # increased every time a texture is replaced or removed, so that the copies of the textures are updated
+        self.version: int = 0
+
+    def texture_format(self, texture_id: int) -> tuple[int, int, int, str] | None:
+        """Width, height, number of levels and compression of an OpenGL texture created by the manager."""
+        return self._formats.get(texture_id)
+
+    def saved_bytes(self, name: str) -> int:
+        """Bytes of GPU memory saved by the block compression of a texture, compared to RGBA8 texels."""
+        size, uncompressed_size = self._memory.get(self.textures.get(name), (0, 0))
+        return uncompressed_size - size
+
+    @property
+    def memory_stats(self) -> dict[str, int]:
+        """GPU memory used by the texels of every texture."""
+        size = sum(memory[0] for memory in self._memory.values())
+        uncompressed_size = sum(memory[1] for memory in self._memory.values())
+
+        return {
+            'bytes': size,
+            'uncompressed_bytes': uncompressed_size,
+            'saved_bytes': uncompressed_size - size,
+            'textures': len(self._memory),
+            'compressed_textures': sum(memory[0] < memory[1] for memory in self._memory.values()),
+        }
+
+    def new_texture(self, name: str, file_path: str, stream: bool = None) -> None:
+        """Load a texture, in the background unless specified otherwise by the streaming settings or the argument.
+
+        Args:
+            name (str): Name of the texture
+            file_path (str): Path of the image file
+            stream (bool, optional): Stream the texture in the background. Defaults to the streaming settings.
+
+        """
+        streaming_manager = StreamingManager()
+
+        if streaming_manager.enabled if stream is None else stream:
+            # render with the placeholder texture until the texture data is resident
+            if name not in self.textures and 'default' in self.textures:
+                self.textures[name] = self.textures['default']
+
+            streaming_manager.request('texture', name, file_path, self.read_texture, self.upload_texture_steps)
+            return
+
+        self.upload_texture(name, self.read_texture(file_path))
+
+    def new_textures(self, file_paths: dict[str, str]) -> None:
+        """Load several textures at once, decoding them in parallel and uploading each one as soon as it's ready.
+
+        Args:
+            file_paths (dict[str, str]): Path of the image file of every texture name
+
+        """
+        futures: dict[Future, str] = {
+            self._pool().submit(self.read_texture, file_path): name for name, file_path in file_paths.items()
+        }
+
+        for future in as_completed(futures):
+            name = futures[future]
+
+            try:
+                texture = future.result()
+            except Exception as e:  # noqa: BLE001
+                print_error(f'Failed to load texture {name} ({file_paths[name]}): {e}')
+                continue
+
+            self.upload_texture(name, texture)
+
+    def read_textures(self, file_paths: list[str], flip: bool = True, mipmaps: bool = None) -> list[TextureData]:
+        """Decode several image files in parallel, without touching OpenGL.
+
+        Args:
+            file_paths (list[str]): Paths of the image files
+            flip (bool, optional): Store the rows bottom to top. Defaults to True.
+            mipmaps (bool, optional): Generate the mip chains. Defaults to the mipmaps setting.
+
+        Returns:
+            list[TextureData]: Texture data of every file, in the same order
+
+        """
+        return list(self._pool().map(lambda file_path: self.read_texture(file_path, flip, mipmaps), file_paths))
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='texture_decoder')
+
+        return self._executor
+
+    def read_texture(self, file_path: str, flip: bool = True, mipmaps: bool = None) -> TextureData:
+        """Read a texture, from its cached version if it's up to date (safe to call from worker threads).
+
+        Args:
+            file_path (str): Path of the image file
+            flip (bool, optional): Store the rows bottom to top. Defaults to True.
+            mipmaps (bool, optional): Generate the mip chain. Defaults to the mipmaps setting.
+
+        Returns:
+            TextureData: Texture data, ready to be passed to upload_texture
+
+        """
+        mipmaps = self.mipmaps if mipmaps is None else mipmaps
+        start = time.perf_counter()
+
+        # map the block compressed version of the image if there is one (with the mips it was compressed with)
+        texture = self._read_compressed_texture(file_path, flip) if self.compressed else None
+        if texture is not None:
+            self._count('compressed', time.perf_counter() - start)
+            return texture
+
+        # map the baked version of the texture if it's available (already flipped, converted to RGBA and with mips)
+        texture = self._read_cached_texture(file_path, flip, mipmaps)
+        if texture is not None:
+            self._count('cached', time.perf_counter() - start)
+            return texture
+
+        # decode the image, and keep the result for the next time
+        texture = read_image_texture(file_path, flip, mipmaps)
+        self._count('decoded', time.perf_counter() - start)
+
+        if self.cache and flip:
+            try:
+                cache_texture(file_path, texture)
+            except OSError as e:
+                print_warning(f'Could not cache the decoded version of {file_path}: {e}')
+
+        return texture
+
+    @staticmethod
+    def _read_compressed_texture(file_path: str, flip: bool) -> TextureData | None:
+        compressed_path = find_compressed_sibling(file_path)
+        if compressed_path is None:
+            return None
+
+        try:
+            texture = read_dds(compressed_path, flip)
+        except ValueError as e:
+            print_warning(f'{e}, decoding {file_path} instead')
+            return None
+
+        if texture.flipped != flip:
+            print_warning(f'The blocks of {compressed_path} can not be flipped, decoding {file_path} instead')
+            return None
+
+        return texture
+
+    @staticmethod
+    def _read_cached_texture(file_path: str, flip: bool, mipmaps: bool) -> TextureData | None:
+        baked_path = AssetManifest().baked_path(file_path)
+        if baked_path is None:
+            return None
+
+        try:
+            texture = read_binary_texture(baked_path)
+        except ValueError as e:
+            print_warning(f'{e}, decoding {file_path} instead')
+            return None
+
+        # the cached version must match the requested orientation and mip chain
+        complete = len(texture.levels) > 1 or (texture.width == 1 and texture.height == 1)
+        if texture.flipped != flip or (mipmaps and not complete):
+            return None
+
+        return texture
+
+    def _count(self, kind: str, duration: float) -> None:
+        with self._stats_lock:
+            self.stats[kind] += 1
+            self.stats[f'{kind}_time'] += duration
+
+    def upload_texture(self, name: str, texture: TextureData) -> None:
+        """Upload texture data to the GPU (must be called from the thread owning the OpenGL context).
+
+        Args:
+            name (str): Name of the texture
+            texture (TextureData): Texture data, as returned by read_texture
+
+        """
+        start = time.perf_counter()
+        texture_id = self._create_texture(texture)
+
+        # fill every level of the immutable storage
+        for level, (width, height, data) in enumerate(texture.levels):
+            self._upload_rows(texture, level, 0, width, height, data)
+
+        self._set_texture(name, texture_id)
+        self.stats['upload_time'] += time.perf_counter() - start
+
+    def upload_texture_steps(self, name: str, texture: TextureData, chunk_size: int) -> Generator[int, None, None]:
+        """Upload texture data to the GPU a chunk of rows at a time, replacing the texture only once it's complete.
+
+        Args:
+            name (str): Name of the texture
+            texture (TextureData): Texture data, as returned by read_texture
+            chunk_size (int): Maximum number of bytes uploaded in a single step
+
+        Yields:
+            int: Number of bytes uploaded by the last step
+
+        """
+        texture_id = self._create_texture(texture)
+
+        # fill the levels from the smallest to the biggest
+        for level, (width, height, data) in reversed(list(enumerate(texture.levels))):
+            # the compressed levels are uploaded by whole rows of blocks of 4 texels
+            row_size = compressed_level_size(width, 4, texture.compression) // 4 if texture.compression else width * 4
+            step = 4 if texture.compression else 1
+            rows = max(chunk_size // (row_size * step), 1) * step
+
+            for y in range(0, height, rows):
+                chunk = data[y * row_size : (y + rows) * row_size]
+
+                # the texture is bound again every step, since other code can bind other textures in between
+                glBindTexture(GL_TEXTURE_2D, texture_id)
+                self._upload_rows(texture, level, y, width, min(rows, height - y), chunk)
+
+                yield chunk.nbytes
+
+        # swap the complete texture in
+        self._set_texture(name, texture_id)
+
+    @staticmethod
+    def _upload_rows(texture: TextureData, level: int, y: int, width: int, height: int, data: any) -> None:
+        # upload rows of texels of a level of the bound texture, as is when they are compressed (PyOpenGL computes
+        # the image size of the compressed data itself)
+        if texture.compression:
+            glCompressedTexSubImage2D(
+                GL_TEXTURE_2D, level, 0, y, width, height, COMPRESSED_FORMATS[texture.compression], data
+            )
+        else:
+            glTexSubImage2D(GL_TEXTURE_2D, level, 0, y, width, height, GL_RGBA, GL_UNSIGNED_BYTE, data)
+
+    def _create_texture(self, texture: TextureData) -> int:
+        # generate a new OpenGL texture, with immutable storage for every level
+        texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+        internal_format = COMPRESSED_FORMATS[texture.compression] if texture.compression else GL_RGBA8
+        glTexStorage2D(GL_TEXTURE_2D, len(texture.levels), internal_format, texture.width, texture.height)
+        self._memory[texture_id] = texture_memory(texture)
+        self._formats[texture_id] = (texture.width, texture.height, len(texture.levels), texture.compression)
+
+        self.set_sampling(GL_TEXTURE_2D, len(texture.levels))
+
+        return texture_id
+
+    def set_sampling(self, target: int, levels: int) -> None:
+        """Set the wrapping and the filtering of the bound texture from the texture settings.
+
+        Args:
+            target (int): Target the texture is bound to
+            levels (int): Number of levels of the texture
+
+        """
+        # setup the texture parameters, sampling the mips if there are any
+        min_filter, mag_filter = FILTERS[self.filtering]
+        glTexParameteri(target, GL_TEXTURE_WRAP_S, GL_REPEAT)
+        glTexParameteri(target, GL_TEXTURE_WRAP_T, GL_REPEAT)
+        glTexParameteri(target, GL_TEXTURE_MIN_FILTER, min_filter if levels > 1 else mag_filter)
+        glTexParameteri(target, GL_TEXTURE_MAG_FILTER, mag_filter)
+
+        if self.anisotropy > 1.0 and levels > 1:
+            if self._max_anisotropy is None:
+                self._max_anisotropy = float(glGetFloatv(GL_MAX_TEXTURE_MAX_ANISOTROPY))
+
+            glTexParameterf(target, GL_TEXTURE_MAX_ANISOTROPY, min(self.anisotropy, self._max_anisotropy))
+
+    def _set_texture(self, name: str, texture_id: int) -> None:
+        # replace the texture, deleting the previous one unless other names still use it
+        previous = self.textures.get(name)
+        self.textures[name] = texture_id
+        self.version += 1
+
+        if previous is not None and previous not in self.textures.values():
+            self._delete_texture(previous)
+
+    def _delete_texture(self, texture_id: int) -> None:
+        glDeleteTextures(1, [texture_id])
+        self._memory.pop(texture_id, None)
+        self._formats.pop(texture_id, None)
+
+    def remove_texture(self, name: str) -> None:
+        """Remove a texture, deleting it unless other names still use it.
+
+        Args:
+            name (str): Name of the texture
+
+        """
+        texture_id = self.textures.pop(name, None)
+        self.version += 1
+
+        if texture_id is not None and texture_id not in self.textures.values():
+            self._delete_texture(texture_id)
@@ -0,0 +1,139 @@
+# ruff: noqa: F403, F405
+
+import numpy as np
+from OpenGL.GL import *
+
+from renderer.shader.shader import uniform_stats
+from utils import Singleton
+from utils.uniform_blocks import MAX_LIGHTS, UNIFORM_BLOCK_BINDINGS, UNIFORM_BLOCK_DTYPES
+
+
+class UniformBufferManager(metaclass=Singleton):
+    def __init__(self) -> None:
+        """Uniform buffers holding the frame, light and shadow data shared by the shaders (see utils.uniform_blocks).
+
+        Every block is filled in a std140 structured array, and uploaded only when its content changed since its last
+        upload, at most once per frame. The buffers stay bound to the binding points of their blocks, and the shaders
+        point their blocks to these binding points when they are compiled.
+        """
+        # content of every block, and content of its last upload
+        self._blocks: dict[str, np.ndarray] = {name: np.zeros(1, dtype) for name, dtype in UNIFORM_BLOCK_DTYPES.items()}
+        self._uploaded: dict[str, bytes] = {}
+
+        # OpenGL buffer of every block
+        self.buffers: dict[str, int] = {}
+        for name, block in self._blocks.items():
+            buffer = glGenBuffers(1)
+            glBindBuffer(GL_UNIFORM_BUFFER, buffer)
+            glBufferData(GL_UNIFORM_BUFFER, block.nbytes, None, GL_DYNAMIC_DRAW)
+            glBindBufferBase(GL_UNIFORM_BUFFER, UNIFORM_BLOCK_BINDINGS[name], buffer)
+            self.buffers[name] = buffer
+
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+
+        # uploads of the buffers in the frame being drawn
+        self._frame_uploads: int = 0
+        # uniform calls, skipped uniform calls, buffer uploads and uniforms read from the buffers in the last frame
+        self.stats: dict[str, int] = {}
+
+    def update_frame(self, view: any, projection: any, eye: any, time: float) -> None:
+        """Update the frame data.
+
+        Args:
+            view (any): View matrix of the camera (glm.mat4 or array in the OpenGL order)
+            projection (any): Projection matrix of the camera (glm.mat4 or array in the OpenGL order)
+            eye (any): Position of the camera
+            time (float): Time of the frame, read by the animated shaders
+
+        """
+        block = self._blocks['FrameData'][0]
+        block['view'] = _ogl_matrices([view])
+        block['projection'] = _ogl_matrices([projection])
+        block['eye'] = np.asarray(eye, dtype=np.float32)[:3]
+        block['time'] = time
+
+        self._upload('FrameData')
+
+    def update_lights(
+        self,
+        positions: any,
+        colors: any,
+        strengths: any,
+        count: int,
+        ambient: any,
+        diffuse: any,
+        specular: any,
+    ) -> None:
+        """Update the light data.
+
+        Args:
+            positions (any): Positions of the lights, 3 floats per light
+            colors (any): Colors of the lights, 3 floats per light
+            strengths (any): Strengths of the lights, 1 float per light
+            count (int): Number of lights, at most MAX_LIGHTS are stored
+            ambient (any): Ambient component of the light material
+            diffuse (any): Diffuse component of the light material
+            specular (any): Specular component of the light material
+
+        """
+        count = min(count, MAX_LIGHTS)
+
+        block = self._blocks['LightData'][0]
+        block['lights'][:count, :3] = np.asarray(positions, dtype=np.float32)[: count * 3].reshape(count, 3)
+        block['light_colors'][:count, :3] = np.asarray(colors, dtype=np.float32)[: count * 3].reshape(count, 3)
+        block['light_strengths'][:count, 0] = np.asarray(strengths, dtype=np.float32)[:count]
+        block['lights_count'] = count
+        block['light_ambient'] = np.asarray(ambient, dtype=np.float32)[:3]
+        block['light_diffuse'] = np.asarray(diffuse, dtype=np.float32)[:3]
+        block['light_specular'] = np.asarray(specular, dtype=np.float32)[:3]
+
+        self._upload('LightData')
+
+    def update_shadow(self, cube_matrices: list, light: any, far_plane: float) -> None:
+        """Update the shadow data.
+
+        Args:
+            cube_matrices (list): View projection matrices of the 6 faces of the shadow cubemap
+            light (any): Position of the light casting the shadows
+            far_plane (float): Far plane of the shadow
+
+        """
+        block = self._blocks['ShadowData'][0]
+        if len(cube_matrices) == 6:
+            block['cube_matrices'] = _ogl_matrices(cube_matrices)
+        block['light'] = np.asarray(light, dtype=np.float32)[:3]
+        block['far_plane'] = far_plane
+
+        self._upload('ShadowData')
+
+    def _upload(self, name: str) -> None:
+        # upload the block only if its content changed
+        data = self._blocks[name].tobytes()
+        if data == self._uploaded.get(name):
+            return
+
+        glBindBuffer(GL_UNIFORM_BUFFER, self.buffers[name])
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, len(data), data)
+        glBindBuffer(GL_UNIFORM_BUFFER, 0)
+
+        self._uploaded[name] = data
+        self._frame_uploads += 1
+
+    def begin_frame(self) -> None:
+        """Start counting the uniform calls and the buffer uploads of the next frame."""
+        self.stats = {
+            'uniform_calls': uniform_stats['uploads'] + self._frame_uploads,
+            'skipped_calls': uniform_stats['skipped'],
+            'buffer_uploads': self._frame_uploads,
+            # every uniform read from the buffers by a shader in use was a uniform call of its own before
+            'calls_without_buffers': uniform_stats['uploads'] + uniform_stats['block_uniforms'],
+        }
+
+        self._frame_uploads = 0
+        for key in uniform_stats:
+            uniform_stats[key] = 0
+
+
+def _ogl_matrices(matrices: list) -> np.ndarray:
+    # glm matrices are read in the order of their memory (column by column), like the arrays in the OpenGL order
+    return np.stack([np.asarray(matrix, dtype=np.float32).ravel(order='K').reshape(4, 4) for matrix in matrices])
@@ -2,6 +2,7 @@
 
 # main libraries imports
 import os
+from collections.abc import Generator
 
 import glm
 import numpy as np
@@ -9,11 +10,24 @@ import OpenGL
 import pyrr
 from icecream import ic
 from OpenGL.GL import *  # noqa: F403
-from PIL import Image
 
 from renderer.camera.camera import Camera
 from renderer.material.material import Material
-from renderer.renderer_manager.managers import MeshManager, instance_manager, light_manager, model_manager
+from renderer.renderer_manager.managers import (
+    ClusterManager,
+    IndirectDrawManager,
+    InstanceBatchManager,
+    LodManager,
+    MaterialBufferManager,
+    MeshManager,
+    StreamingManager,
+    TextureArrayManager,
+    TextureManager,
+    UniformBufferManager,
+    instance_manager,
+    light_manager,
+    model_manager,
+)
 from renderer.shader.shader import Shader
 
 # custom modules imports
@@ -26,6 +40,7 @@ from utils import (
     print_error,
     timeit,
 )
+from utils.texture_file import TextureData
 
 OpenGL.ERROR_CHECKING = False
 
@@ -59,6 +74,10 @@ class RendererManager(metaclass=Singleton):
         self.render_states['shadow_map'] = True
         self.render_states['bloom'] = True
         self.render_states['profile'] = True
+        # submit the models of the deferred pass with indirect draws instead of drawing them one by one
+        self.render_states['indirect_draws'] = False
+        # draw the visible models sharing their mesh with instanced draws
+        self.render_states['auto_instancing'] = True
 
         self.irradiance_map_size = 32
         self.skybox_resolution = 512
@@ -84,6 +103,15 @@ class RendererManager(metaclass=Singleton):
         self.scales = {}
 
         self.mesh_manager = MeshManager()
+        self.streaming_manager = StreamingManager()
+        # selection of the level of detail of the models
+        self.lod_manager = LodManager()
+        # culling of the meshlets of the full detail meshes
+        self.cluster_manager = ClusterManager()
+        # submission of the models with glMultiDrawElementsIndirect
+        self.indirect_draw_manager = IndirectDrawManager()
+        # instanced draws of the models sharing their mesh
+        self.instance_batch_manager = InstanceBatchManager()
 
         # self.aabb_mins = {}
         # self.aabb_maxs = {}
@@ -91,6 +119,8 @@ class RendererManager(metaclass=Singleton):
         # self.bounding_sphere_center = {}
         self.model_bounding_sphere_center = {}
         self.model_bounding_sphere_radius = {}
+        self.model_aabb_mins = {}
+        self.model_aabb_maxs = {}
 
         # # ----------------------------- Meshes -----------------------------
         # # dictionaries of OpenGL VBOs for vertex data (vertex, normal, uv)
@@ -115,14 +145,22 @@ class RendererManager(metaclass=Singleton):
         self.available_post_processing_shaders = []
 
         # ----------------------------- Textures -----------------------------
-        # dictionary of textures
-        self.textures = {}
+        # textures decoded on a pool of threads, with their mip chains
+        self.texture_manager = TextureManager()
+        # dictionary of textures, shared with the texture manager
+        self.textures = self.texture_manager.textures
+        # copies of the textures packed into a few texture arrays, bound once for many models
+        self.texture_array_manager = TextureArrayManager()
+        # uniform buffers of the frame, light and shadow data shared by the shaders
+        self.uniform_buffer_manager = UniformBufferManager()
 
         self.equirect_skybox = None
 
         # ----------------------------- Materials -----------------------------
         # dictionary of material objects
         self.materials = {}
+        # table of the materials in a shader storage buffer, read by the shaders through the index of the materials
+        self.material_buffer_manager = MaterialBufferManager()
 
         # ----------------------------- Lights -----------------------------
         # dictionary to keep track of the light sources
@@ -218,13 +256,14 @@ class RendererManager(metaclass=Singleton):
 
     # method to setup entities required for the rendering pipeline
     def _setup_entities(self) -> None:
-        self.mesh_manager.new_json_mesh('screen_quad', 'assets/models/default/quad.json')
-        self.mesh_manager.new_json_mesh('default', 'assets/models/default/box.json')
+        # the placeholder assets are never streamed
+        self.mesh_manager.new_json_mesh('screen_quad', 'assets/models/default/quad.json', stream=False)
+        self.mesh_manager.new_json_mesh('default', 'assets/models/default/box.json', stream=False)
 
         self.new_material('default', *(0.2, 0.2, 0.2), *(0.6, 0.6, 0.6), *(1.0, 1.0, 1.0), 1.0)
         self.new_material('light_color', *(0.2, 0.2, 0.2), *(1.0, 1.0, 1.0), *(1.0, 1.0, 1.0), 1.0)
 
-        self.new_texture('default', 'assets/textures/uv-maptemplate.jpg')
+        self.new_texture('default', 'assets/textures/uv-maptemplate.jpg', stream=False)
 
         # creation of a camera object
         self.camera = Camera()
@@ -309,45 +348,21 @@ class RendererManager(metaclass=Singleton):
     ) -> None:
         light_manager.new_light(self, name, light_position, light_color, light_strength)
 
-    # method to generate a new texture (needs double checking if it's correct)
-    def new_texture(self, name: str, filepath: str) -> None:
-        # generate a new OpenGL texture
-        self.textures[name] = glGenTextures(1)
-        # bind the newly created texture
-        glBindTexture(GL_TEXTURE_2D, self.textures[name])
-
-        # setup the texture parameters
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
-        glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
-
-        # load the texture image
-        image = Image.open(filepath)
-        # convert to RGBA
-        convert = image.convert('RGBA')
-        # flip the image and store the image into byte data
-        image_data = convert.transpose(Image.FLIP_TOP_BOTTOM).tobytes()
-        # store the size of the texture
-        width = image.width
-        height = image.height
-        # close the image
-        image.close()
-
-        # bind the newly created texture
-        glBindTexture(GL_TEXTURE_2D, self.textures[name])
-        # store the data into the texture
-        glTexImage2D(
-            GL_TEXTURE_2D,
-            0,
-            GL_RGBA8,
-            width,
-            height,
-            0,
-            GL_RGBA,
-            GL_UNSIGNED_BYTE,
-            image_data,
-        )
+    # method to load a new texture, decoded in the background
+    def new_texture(self, name: str, filepath: str, stream: bool = None) -> None:
+        self.texture_manager.new_texture(name, filepath, stream)
+
+    # method to decode a texture file without touching OpenGL (safe to call from worker threads)
+    def read_texture(self, filepath: str) -> TextureData:
+        return self.texture_manager.read_texture(filepath)
+
+    # method to upload decoded texture data into a new texture
+    def upload_texture(self, name: str, texture: TextureData) -> None:
+        self.texture_manager.upload_texture(name, texture)
+
+    # method to upload decoded texture data a chunk of rows at a time, replacing the texture once it's complete
+    def upload_texture_steps(self, name: str, texture: TextureData, chunk_size: int) -> Generator[int, None, None]:
+        return self.texture_manager.upload_texture_steps(name, texture, chunk_size)
 
     # method to create a new material, composed of ambient, diffuse, specular colors and shininess value
     def new_material(
@@ -400,6 +415,8 @@ class RendererManager(metaclass=Singleton):
             roughness,
             metallic,
         )
+        # give the material its row in the material table
+        self.material_buffer_manager.add(self.materials[name])
 
     # method to create a new model
     def new_model(
@@ -500,6 +517,14 @@ class RendererManager(metaclass=Singleton):
 
     # ---------------------------- Modify Models -------------------------------------
 
+    # method to change the mesh of a model
+    def set_model_mesh(self, name: str, mesh: str) -> None:
+        model_manager.set_model_mesh(self, name, mesh)
+
+    # method to change the texture of a model
+    def set_model_texture(self, name: str, texture: str) -> None:
+        model_manager.set_model_texture(self, name, texture)
+
     # method to place the mesh in a specific spot
     def place(self, name: str, x: float, y: float, z: float) -> None:
         model_manager.place(self, name, x, y, z)
@@ -531,26 +556,32 @@ class RendererManager(metaclass=Singleton):
 
     def set_ambient(self, name: str, r: int, g: int, b: int) -> None:
         self.materials[name].set_ambient(r, g, b)
+        self.material_buffer_manager.update(self.materials[name])
         self._check_instance_material_update(name, 'ambients')
 
     def set_diffuse(self, name: str, r: int, g: int, b: int) -> None:
         self.materials[name].set_diffuse(r, g, b)
+        self.material_buffer_manager.update(self.materials[name])
         self._check_instance_material_update(name, 'diffuses')
 
     def set_specular(self, name: str, r: int, g: int, b: int) -> None:
         self.materials[name].set_specular(r, g, b)
+        self.material_buffer_manager.update(self.materials[name])
         self._check_instance_material_update(name, 'speculars')
 
     def set_shininess(self, name: str, shininess: float) -> None:
         self.materials[name].set_shininess(shininess)
+        self.material_buffer_manager.update(self.materials[name])
         self._check_instance_material_update(name, 'shininesses')
 
     def set_roughness(self, name: str, roughness: float) -> None:
         self.materials[name].set_roughness(roughness)
+        self.material_buffer_manager.update(self.materials[name])
         self._check_instance_material_update(name, 'roughnesses')
 
     def set_metallic(self, name: str, metallicness: float) -> None:
         self.materials[name].set_metallic(metallicness)
+        self.material_buffer_manager.update(self.materials[name])
         self._check_instance_material_update(name, 'metallicnesses')
 
     def set_light_color(self, name: str, r: int, g: int, b: int) -> None:
@@ -672,6 +703,13 @@ class RendererManager(metaclass=Singleton):
 
     # update method to update components of the rendering manager
     def update(self) -> None:
+        # upload the streamed assets that are ready, within the budget of the frame
+        self.streaming_manager.update(self)
+        # evict the meshes that haven't been drawn for a while if they go over the VRAM budget
+        self.mesh_manager.update()
+        # pack the new textures into the texture arrays
+        self.texture_array_manager.update(self.models)
+
         for model in self.changed_models:
             self._calculate_model_matrix(model)
             self._check_instance_update(model)
@@ -737,7 +775,33 @@ class RendererManager(metaclass=Singleton):
 
         self.changed_models = {}
 
+        # select the level of detail of the models from their size on the screen
+        self.lod_manager.select(
+            self.single_render_models,
+            self.mesh_manager,
+            self.camera,
+            self.model_bounding_sphere_center,
+            self.model_bounding_sphere_radius,
+            glm.radians(self.fov),
+        )
+
+        # cull the meshlets of the next frame against the current camera
+        self.cluster_manager.begin_frame(self.camera)
+        # and count the texture binds of the next frame
+        self.texture_array_manager.begin_frame()
+        # and the uniform calls
+        self.uniform_buffer_manager.begin_frame()
+        # and the material uploads
+        self.material_buffer_manager.begin_frame()
+        # and the indirect draws
+        self.indirect_draw_manager.begin_frame()
+        # and the instanced draws
+        self.instance_batch_manager.begin_frame()
+
     def update_instances(self) -> None:
+        # link the instance VAOs to the current buffers of their mesh, in case the mesh arena was compacted
+        instance_manager.update_instance_buffers(self)
+
         # update the instances
         for name, instance in self.instances.items():
             instance.previous_models_to_render = instance.models_to_render
@@ -830,22 +894,15 @@ class RendererManager(metaclass=Singleton):
         center = self.model_bounding_sphere_center[model]
         radius = self.model_bounding_sphere_radius[model]
 
-        # return(True)
-
-        if not self.is_on_forward_plane(self.camera.frustum.near, center, radius):
-            return False
-        if not self.is_on_forward_plane(self.camera.frustum.bottom, center, radius):
-            return False
-        if not self.is_on_forward_plane(self.camera.frustum.far, center, radius):
-            return False
-        if not self.is_on_forward_plane(self.camera.frustum.left, center, radius):
-            return False
-        if not self.is_on_forward_plane(self.camera.frustum.right, center, radius):
-            return False
-        if not self.is_on_forward_plane(self.camera.frustum.top, center, radius):  # noqa: SIM103
+        if not self.camera.frustum.check_visibility(center, radius):
             return False
 
-        return True
+        # the bounding box is tighter than the sphere for elongated models
+        aabb_min = self.model_aabb_mins.get(model)
+        if aabb_min is None:
+            return True
+
+        return self.camera.frustum.check_box_visibility(aabb_min, self.model_aabb_maxs[model])
 
     def is_on_forward_plane(self, plane: any, center: any, radius: float) -> any:
         return glm.dot(plane.normal, center) - plane.distance > -radius
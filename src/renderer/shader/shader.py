@@ -1,20 +1,56 @@
-import glm
+from collections.abc import Callable
+
 import numpy as np
 from OpenGL.GL import (
+    GL_ACTIVE_UNIFORMS,
+    GL_BOOL,
+    GL_BOOL_VEC2,
+    GL_BOOL_VEC3,
+    GL_BOOL_VEC4,
     GL_FALSE,
+    GL_FLOAT,
+    GL_FLOAT_MAT2,
+    GL_FLOAT_MAT3,
+    GL_FLOAT_MAT4,
+    GL_FLOAT_VEC2,
+    GL_FLOAT_VEC3,
+    GL_FLOAT_VEC4,
     GL_FRAGMENT_SHADER,
     GL_GEOMETRY_SHADER,
+    GL_INT,
+    GL_INT_VEC2,
+    GL_INT_VEC3,
+    GL_INT_VEC4,
+    GL_INVALID_INDEX,
+    GL_SHADER_STORAGE_BLOCK,
+    GL_UNSIGNED_INT,
+    GL_UNSIGNED_INT_VEC2,
+    GL_UNSIGNED_INT_VEC3,
+    GL_UNSIGNED_INT_VEC4,
     GL_VERTEX_SHADER,
+    glGetActiveUniform,
+    glGetProgramiv,
+    glGetProgramResourceIndex,
+    glGetUniformBlockIndex,
     glGetUniformLocation,
+    glShaderStorageBlockBinding,
     glUniform1f,
+    glUniform1fv,
     glUniform1i,
-    glUniform2f,
+    glUniform1iv,
+    glUniform1ui,
+    glUniform1uiv,
     glUniform2fv,
-    glUniform2i,
-    glUniform3f,
+    glUniform2iv,
+    glUniform2uiv,
     glUniform3fv,
-    glUniform3i,
+    glUniform3iv,
+    glUniform3uiv,
     glUniform4fv,
+    glUniform4iv,
+    glUniform4uiv,
+    glUniformBlockBinding,
+    glUniformMatrix2fv,
     glUniformMatrix3fv,
     glUniformMatrix4fv,
     glUseProgram,
@@ -22,6 +58,7 @@ from OpenGL.GL import (
 from OpenGL.GL.shaders import compileProgram, compileShader
 
 from utils import print_info, print_success, timeit
+from utils.uniform_blocks import STORAGE_BLOCK_BINDINGS, UNIFORM_BLOCK_BINDINGS
 
 
 # class to represent a shader object
@@ -65,8 +102,11 @@ class Shader:
                 compileShader(fragment_src, GL_FRAGMENT_SHADER),
             )
 
-        # create a dictionary containing all the uniforms in the shader
+        # create a dictionary containing all the uniforms in the shader, and one with their setters
         self.uniforms = {}
+        self.setters = {}
+        # uniforms read from the uniform buffers
+        self.block_uniforms = []
         self.user_uniforms = {}
         # check for uniforms in the shader
         self._check_uniforms()
@@ -113,6 +153,8 @@ class Shader:
         # self.program = compileProgram(compileShader(vertex_src, GL_VERTEX_SHADER), compileShader(fragment_src, GL_FRAGMENT_SHADER))
 
         self.uniforms = {}
+        self.setters = {}
+        self.block_uniforms = []
         self.user_uniforms = {}
         self._check_uniforms()
 
@@ -121,287 +163,231 @@ class Shader:
     # function to use this program for rendering
     def use(self) -> None:
         glUseProgram(self.program)
+        # the uniforms read from the uniform buffers would have been bound one by one for every use
+        uniform_stats['block_uniforms'] += len(self.block_uniforms)
+
+    def setter(self, uniform: str) -> Callable[[any, int], None]:
+        """Get the setter of a uniform, to call it directly in the loops binding it many times.
+
+        Args:
+            uniform (str): String identifier of the uniform
+
+        Returns:
+            Callable[[any, int], None]: Setter taking the value and optionally the amount of elements to load, doing
+                nothing if the uniform is not active in the shader
+
+        """
+        return self.setters.get(uniform, _skip_uniform)
 
     def bind_uniform(self, uniform: str, value: any, count: int = None) -> None:
         """Bind an OpenGL uniform value to its location in the shader.
 
+        The value is converted to the type of the uniform in the shader, and is not uploaded again if it didn't change
+        since the last time it was bound.
+
         Args:
             uniform (str): String identifier of the uniform
             value (any): Value to set to the uniform
-            count (int, optional): Amount of vectors to load. Defaults to 1
+            count (int, optional): Amount of elements to load in an array. Defaults to the length of the value
 
         Raises:
-            TypeError: In case the value is not any of the supported values
+            TypeError: In case the value doesn't hold enough components for the uniform
 
         """
-        # print(uniform)
-        # print(value)
-        # print(type(value))
-        # get the uniform location id
-        uniform_location: int = self.uniforms.get(uniform)
+        # get the setter of the uniform
+        setter = self.setters.get(uniform)
 
         # stop the execution if the specified uniform doesn't exist
-        if uniform_location is None:
+        if setter is None:
             return
 
-        if isinstance(value, int):
-            glUniform1i(uniform_location, value)
-
-        elif isinstance(value, float):
-            glUniform1f(uniform_location, value)
-
-        elif isinstance(value, np.ndarray):
-            if value.shape == (2,):
-                glUniform2fv(uniform_location, 1, value)
-            elif value.shape == (3,):
-                glUniform3fv(uniform_location, 1, value)
-            elif value.shape == (4,):
-                glUniform4fv(uniform_location, 1, value)
-            elif value.shape == (3, 3):
-                glUniformMatrix3fv(uniform_location, 1, GL_FALSE, value)
-            elif value.shape == (4, 4):
-                glUniformMatrix4fv(uniform_location, 1, GL_FALSE, value)
-            else:
-                raise TypeError('Unsupported ndarray shape')
-
-        elif isinstance(value, (list, tuple)) and len(value) == 2:
-            if isinstance(value[0], int):
-                glUniform2i(uniform_location, value[0], value[1])
-
-            elif isinstance(value[0], float):
-                glUniform2f(uniform_location, value[0], value[1])
-
-        elif isinstance(value, (list, tuple)) and len(value) == 3:
-            if isinstance(value[0], int):
-                glUniform3i(uniform_location, value[0], value[1], value[2])
-
-            elif isinstance(value[0], float):
-                glUniform3f(uniform_location, value[0], value[1], value[2])
-
-        elif isinstance(value, glm.vec2):
-            glUniform2fv(uniform_location, count if count else 1, glm.value_ptr(value))
-
-        elif isinstance(value, glm.vec3):
-            glUniform3fv(uniform_location, count if count else 1, glm.value_ptr(value))
-
-        elif isinstance(value, glm.vec4):
-            glUniform4fv(uniform_location, count if count else 1, glm.value_ptr(value))
-
-        elif isinstance(value, glm.mat3):
-            glUniformMatrix3fv(uniform_location, count if count else 1, GL_FALSE, glm.value_ptr(value))
-
-        elif isinstance(value, glm.mat4):
-            glUniformMatrix4fv(uniform_location, count if count else 1, GL_FALSE, glm.value_ptr(value))
-
-        else:
-            raise TypeError(f'Unsupported uniform type: {type(value)}')
+        setter(value, count)
 
     def bind_uniform_float(self, uniform: str, value: any, count: int = None) -> None:
         """Bind an OpenGL uniform value to its location in the shader.
 
+        Kept for compatibility, the setters already convert the values to the type of the uniform.
+
         Args:
             uniform (str): String identifier of the uniform
             value (any): Value to set to the uniform
-            count (int, optional): Amount of vectors to load. Defaults to 1.
+            count (int, optional): Amount of elements to load in an array. Defaults to the length of the value
 
         Raises:
-            TypeError: In case the value is not any of the supported values
+            TypeError: In case the value doesn't hold enough components for the uniform
 
         """
-        # get the uniform location id
-        uniform_location: int = self.uniforms.get(uniform)
+        self.bind_uniform(uniform, value, count)
 
-        # stop the execution if the specified uniform doesn't exist
-        if uniform_location is None:
+    # function to find the active uniforms of the program and create their setters
+    def _check_uniforms(self) -> None:
+        for index in range(int(glGetProgramiv(self.program, GL_ACTIVE_UNIFORMS))):
+            name, size, gl_type = glGetActiveUniform(self.program, index)
+            name = name.decode()
+            location = glGetUniformLocation(self.program, name)
+
+            # the uniforms in uniform blocks have no location, they are set through their buffer
+            if location == -1:
+                self.block_uniforms.append(name[:-3] if name.endswith('[0]') else name)
+                continue
+
+            # arrays are reported by their first element, their elements can be located one by one too
+            if name.endswith('[0]'):
+                name = name[:-3]
+                for i in range(size):
+                    self.uniforms[f'{name}[{i}]'] = glGetUniformLocation(self.program, f'{name}[{i}]')
+
+            self.uniforms[name] = location
+            self.setters[name] = _create_setter(location, int(gl_type), size)
+
+            # parameters of the post processing effects editable from the UI
+            if name in USER_UNIFORMS:
+                self.user_uniforms[name] = USER_UNIFORMS[name]
+
+        # read the uniform blocks from the buffers bound to their binding points
+        for name, binding in UNIFORM_BLOCK_BINDINGS.items():
+            index = glGetUniformBlockIndex(self.program, name)
+            if index != GL_INVALID_INDEX:
+                glUniformBlockBinding(self.program, index, binding)
+
+        # and the shader storage blocks from the buffers bound to theirs
+        for name, binding in STORAGE_BLOCK_BINDINGS.items():
+            index = glGetProgramResourceIndex(self.program, GL_SHADER_STORAGE_BLOCK, name)
+            if index != GL_INVALID_INDEX:
+                glShaderStorageBlockBinding(self.program, index, binding)
+
+
+# uploads and skipped uploads of the setters, and uniforms of the shaders in use read from the uniform buffers, since
+# the last reset (UniformBufferManager.begin_frame)
+uniform_stats = {'uploads': 0, 'skipped': 0, 'block_uniforms': 0}
+
+# default values of the user uniforms of the post processing effects
+USER_UNIFORMS = {
+    'user_min': 0,
+    'user_max': 0,
+    'user_distance': 10,
+    'user_range': 5,
+    'user_parameter_0': 1,
+    'user_parameter_1': 1,
+    'user_parameter_2': 1,
+    'user_parameter_3': 1,
+}
+
+# upload function for single values, and the conversion of the values
+_SCALAR_UPLOADS = {
+    GL_FLOAT: (glUniform1f, float),
+    GL_INT: (glUniform1i, int),
+    GL_UNSIGNED_INT: (glUniform1ui, int),
+    GL_BOOL: (glUniform1i, int),
+}
+
+# upload function of arrays, components of every element and type of the components
+_VECTOR_UPLOADS = {
+    GL_FLOAT: (glUniform1fv, 1, np.float32),
+    GL_FLOAT_VEC2: (glUniform2fv, 2, np.float32),
+    GL_FLOAT_VEC3: (glUniform3fv, 3, np.float32),
+    GL_FLOAT_VEC4: (glUniform4fv, 4, np.float32),
+    GL_INT: (glUniform1iv, 1, np.int32),
+    GL_INT_VEC2: (glUniform2iv, 2, np.int32),
+    GL_INT_VEC3: (glUniform3iv, 3, np.int32),
+    GL_INT_VEC4: (glUniform4iv, 4, np.int32),
+    GL_UNSIGNED_INT: (glUniform1uiv, 1, np.uint32),
+    GL_UNSIGNED_INT_VEC2: (glUniform2uiv, 2, np.uint32),
+    GL_UNSIGNED_INT_VEC3: (glUniform3uiv, 3, np.uint32),
+    GL_UNSIGNED_INT_VEC4: (glUniform4uiv, 4, np.uint32),
+    GL_BOOL: (glUniform1iv, 1, np.int32),
+    GL_BOOL_VEC2: (glUniform2iv, 2, np.int32),
+    GL_BOOL_VEC3: (glUniform3iv, 3, np.int32),
+    GL_BOOL_VEC4: (glUniform4iv, 4, np.int32),
+}
+
+_MATRIX_UPLOADS = {
+    GL_FLOAT_MAT2: (glUniformMatrix2fv, 4),
+    GL_FLOAT_MAT3: (glUniformMatrix3fv, 9),
+    GL_FLOAT_MAT4: (glUniformMatrix4fv, 16),
+}
+
+
+def _skip_uniform(value: any, count: int = None) -> None:
+    # setter of the uniforms that are not active in the shader
+    pass
+
+
+def _scalar_setter(upload: Callable, location: int, convert: Callable) -> Callable[[any, int], None]:
+    last = None
+
+    def setter(value: any, count: int = None) -> None:
+        nonlocal last
+        value = convert(value)
+
+        # skip the upload if the uniform already holds the value
+        if value == last:
+            uniform_stats['skipped'] += 1
             return
 
-        if isinstance(value, (int, float)):
-            glUniform1f(uniform_location, value)
-
-        elif isinstance(value, np.ndarray):
-            if value.shape == (2,):
-                glUniform2fv(uniform_location, 1, value)
-            elif value.shape == (3,):
-                glUniform3fv(uniform_location, 1, value)
-            elif value.shape == (4,):
-                glUniform4fv(uniform_location, 1, value)
-            elif value.shape == (3, 3):
-                glUniformMatrix3fv(uniform_location, 1, GL_FALSE, value)
-            elif value.shape == (4, 4):
-                glUniformMatrix4fv(uniform_location, 1, GL_FALSE, value)
-            else:
-                raise TypeError('Unsupported ndarray shape')
-
-        elif isinstance(value, (list, tuple)) and len(value) == 2:
-            glUniform2f(uniform_location, value[0], value[1])
+        last = value
+        upload(location, value)
+        uniform_stats['uploads'] += 1
 
-        elif isinstance(value, (list, tuple)) and len(value) == 3:
-            glUniform3f(uniform_location, value[0], value[1], value[2])
+    return setter
 
-        elif isinstance(value, glm.vec2):
-            glUniform2fv(uniform_location, count if count else 1, glm.value_ptr(value))
 
-        elif isinstance(value, glm.vec3):
-            glUniform3fv(uniform_location, count if count else 1, glm.value_ptr(value))
-
-        elif isinstance(value, glm.vec4):
-            glUniform4fv(uniform_location, count if count else 1, glm.value_ptr(value))
-
-        elif isinstance(value, glm.mat3):
-            glUniformMatrix3fv(uniform_location, count if count else 1, GL_FALSE, glm.value_ptr(value))
-
-        elif isinstance(value, glm.mat4):
-            glUniformMatrix4fv(uniform_location, count if count else 1, GL_FALSE, glm.value_ptr(value))
+def _array_setter(
+    upload: Callable, location: int, components: int, size: int, dtype: type, matrix: bool
+) -> Callable[[any, int], None]:
+    last = None
 
+    def setter(value: any, count: int = None) -> None:
+        nonlocal last
+        # glm vectors and matrices, numpy arrays and sequences all become a flat array in the memory order of OpenGL
+        # (glm matrices are stored column by column, and are read in the order of their memory)
+        if matrix and isinstance(value, (list, tuple)):
+            data = np.concatenate([np.asarray(item, dtype=dtype).ravel(order='K') for item in value])
         else:
-            raise TypeError(f'Unsupported uniform type: {type(value)}')
-
-    # function to check the presence of specific uniforms
-    def _check_uniforms(self) -> None:
-        # model matrix uniform (mat4)
-        if glGetUniformLocation(self.program, 'model') != -1:
-            self.uniforms['model'] = glGetUniformLocation(self.program, 'model')
-        # view matrix uniform (mat4)
-        if glGetUniformLocation(self.program, 'view') != -1:
-            self.uniforms['view'] = glGetUniformLocation(self.program, 'view')
-
-        if glGetUniformLocation(self.program, 'skybox_view') != -1:
-            self.uniforms['skybox_view'] = glGetUniformLocation(self.program, 'skybox_view')
-
-        # projection matrix uniform (mat4)
-        if glGetUniformLocation(self.program, 'projection') != -1:
-            self.uniforms['projection'] = glGetUniformLocation(self.program, 'projection')
-        # light source position uniform (vec3)
-        if glGetUniformLocation(self.program, 'light') != -1:
-            self.uniforms['light'] = glGetUniformLocation(self.program, 'light')
-        # camera position uniform (vec3)
-        if glGetUniformLocation(self.program, 'eye') != -1:
-            self.uniforms['eye'] = glGetUniformLocation(self.program, 'eye')
-        # material ambient component
-        if glGetUniformLocation(self.program, 'ambient') != -1:
-            self.uniforms['ambient'] = glGetUniformLocation(self.program, 'ambient')
-        # material diffuse component
-        if glGetUniformLocation(self.program, 'diffuse') != -1:
-            self.uniforms['diffuse'] = glGetUniformLocation(self.program, 'diffuse')
-        # material specular component
-        if glGetUniformLocation(self.program, 'specular') != -1:
-            self.uniforms['specular'] = glGetUniformLocation(self.program, 'specular')
-        # material shininess component
-        if glGetUniformLocation(self.program, 'shininess') != -1:
-            self.uniforms['shininess'] = glGetUniformLocation(self.program, 'shininess')
-        # light ambient component
-        if glGetUniformLocation(self.program, 'light_ambient') != -1:
-            self.uniforms['light_ambient'] = glGetUniformLocation(self.program, 'light_ambient')
-        # light diffuse component
-        if glGetUniformLocation(self.program, 'light_diffuse') != -1:
-            self.uniforms['light_diffuse'] = glGetUniformLocation(self.program, 'light_diffuse')
-        # light specular component
-        if glGetUniformLocation(self.program, 'light_specular') != -1:
-            self.uniforms['light_specular'] = glGetUniformLocation(self.program, 'light_specular')
-
-        if glGetUniformLocation(self.program, 'time') != -1:
-            self.uniforms['time'] = glGetUniformLocation(self.program, 'time')
-
-        if glGetUniformLocation(self.program, 'screen_texture') != -1:
-            self.uniforms['screen_texture'] = glGetUniformLocation(self.program, 'screen_texture')
-
-        if glGetUniformLocation(self.program, 'blurred_texture') != -1:
-            self.uniforms['blurred_texture'] = glGetUniformLocation(self.program, 'blurred_texture')
-
-        if glGetUniformLocation(self.program, 'depth_texture') != -1:
-            self.uniforms['depth_texture'] = glGetUniformLocation(self.program, 'depth_texture')
-
-        if glGetUniformLocation(self.program, 'user_min') != -1:
-            self.uniforms['user_min'] = glGetUniformLocation(self.program, 'user_min')
-            self.user_uniforms['user_min'] = 0
-        if glGetUniformLocation(self.program, 'user_max') != -1:
-            self.uniforms['user_max'] = glGetUniformLocation(self.program, 'user_max')
-            self.user_uniforms['user_max'] = 0
-
-        if glGetUniformLocation(self.program, 'user_distance') != -1:
-            self.uniforms['user_distance'] = glGetUniformLocation(self.program, 'user_distance')
-            self.user_uniforms['user_distance'] = 10
-        if glGetUniformLocation(self.program, 'user_range') != -1:
-            self.uniforms['user_range'] = glGetUniformLocation(self.program, 'user_range')
-            self.user_uniforms['user_range'] = 5
-
-        if glGetUniformLocation(self.program, 'user_parameter_0') != -1:
-            self.uniforms['user_parameter_0'] = glGetUniformLocation(self.program, 'user_parameter_0')
-            self.user_uniforms['user_parameter_0'] = 1
-
-        if glGetUniformLocation(self.program, 'user_parameter_1') != -1:
-            self.uniforms['user_parameter_1'] = glGetUniformLocation(self.program, 'user_parameter_1')
-            self.user_uniforms['user_parameter_1'] = 1
-
-        if glGetUniformLocation(self.program, 'user_parameter_2') != -1:
-            self.uniforms['user_parameter_2'] = glGetUniformLocation(self.program, 'user_parameter_2')
-            self.user_uniforms['user_parameter_2'] = 1
-
-        if glGetUniformLocation(self.program, 'user_parameter_3') != -1:
-            self.uniforms['user_parameter_3'] = glGetUniformLocation(self.program, 'user_parameter_3')
-            self.user_uniforms['user_parameter_3'] = 1
-
-        if glGetUniformLocation(self.program, 'samples') != -1:
-            self.uniforms['samples'] = glGetUniformLocation(self.program, 'samples')
-
-        if glGetUniformLocation(self.program, 'albedo') != -1:
-            self.uniforms['albedo'] = glGetUniformLocation(self.program, 'albedo')
-
-        if glGetUniformLocation(self.program, 'metallic') != -1:
-            self.uniforms['metallic'] = glGetUniformLocation(self.program, 'metallic')
-
-        if glGetUniformLocation(self.program, 'roughness') != -1:
-            self.uniforms['roughness'] = glGetUniformLocation(self.program, 'roughness')
-
-        if glGetUniformLocation(self.program, 'light_color') != -1:
-            self.uniforms['light_color'] = glGetUniformLocation(self.program, 'light_color')
-
-        if glGetUniformLocation(self.program, 'light_strength') != -1:
-            self.uniforms['light_strength'] = glGetUniformLocation(self.program, 'light_strength')
-
-        if glGetUniformLocation(self.program, 'lights') != -1:
-            self.uniforms['lights'] = glGetUniformLocation(self.program, 'lights')
-
-        if glGetUniformLocation(self.program, 'light_colors') != -1:
-            self.uniforms['light_colors'] = glGetUniformLocation(self.program, 'light_colors')
-
-        if glGetUniformLocation(self.program, 'light_strengths') != -1:
-            self.uniforms['light_strengths'] = glGetUniformLocation(self.program, 'light_strengths')
-
-        if glGetUniformLocation(self.program, 'lights_count') != -1:
-            self.uniforms['lights_count'] = glGetUniformLocation(self.program, 'lights_count')
-
-        if glGetUniformLocation(self.program, 'cube_matrices') != -1:
-            self.uniforms['cube_matrices'] = glGetUniformLocation(self.program, 'cube_matrices')
-
-            for i in range(6):
-                self.uniforms['cube_matrices[' + str(i) + ']'] = glGetUniformLocation(
-                    self.program, 'cube_matrices[' + str(i) + ']'
-                )
-
-        if glGetUniformLocation(self.program, 'far_plane') != -1:
-            self.uniforms['far_plane'] = glGetUniformLocation(self.program, 'far_plane')
+            data = np.asarray(value, dtype=dtype).ravel(order='K')
+        length = data.size
+        elements = min(count if count is not None else max(length // components, 1), size)
+
+        # only the elements to load are compared and uploaded
+        needed = elements * components
+        if length != needed:
+            if length < needed:
+                raise TypeError(f'Expected {needed} components for the uniform, got {length}')
+
+            data = data[:needed]
+
+        # skip the upload if the uniform already holds the values
+        key = data.tobytes()
+        if key == last:
+            uniform_stats['skipped'] += 1
+            return
 
-        if glGetUniformLocation(self.program, 'depth_map') != -1:
-            self.uniforms['depth_map'] = glGetUniformLocation(self.program, 'depth_map')
+        last = key
+        if matrix:
+            upload(location, elements, GL_FALSE, data)
+        else:
+            upload(location, elements, data)
+        uniform_stats['uploads'] += 1
 
-        if glGetUniformLocation(self.program, 'irradiance_map') != -1:
-            self.uniforms['irradiance_map'] = glGetUniformLocation(self.program, 'irradiance_map')
+    return setter
 
-        if glGetUniformLocation(self.program, 'reflection_map') != -1:
-            self.uniforms['reflection_map'] = glGetUniformLocation(self.program, 'reflection_map')
 
-        if glGetUniformLocation(self.program, 'brdf_integration') != -1:
-            self.uniforms['brdf_integration'] = glGetUniformLocation(self.program, 'brdf_integration')
+def _create_setter(location: int, gl_type: int, size: int) -> Callable[[any, int], None]:
+    # create the setter of a uniform from its type and its amount of elements
+    if gl_type in _MATRIX_UPLOADS:
+        upload, components = _MATRIX_UPLOADS[gl_type]
+        return _array_setter(upload, location, components, size, np.float32, True)
 
-        if glGetUniformLocation(self.program, 'src_resolution') != -1:
-            self.uniforms['src_resolution'] = glGetUniformLocation(self.program, 'src_resolution')
+    if size == 1 and gl_type in _SCALAR_UPLOADS:
+        upload, convert = _SCALAR_UPLOADS[gl_type]
+        return _scalar_setter(upload, location, convert)
 
-        if glGetUniformLocation(self.program, 'radius') != -1:
-            self.uniforms['radius'] = glGetUniformLocation(self.program, 'radius')
+    if gl_type in _VECTOR_UPLOADS:
+        upload, components, dtype = _VECTOR_UPLOADS[gl_type]
+        return _array_setter(upload, location, components, size, dtype, False)
 
-        if glGetUniformLocation(self.program, 'gaussian_kernel') != -1:
-            self.uniforms['gaussian_kernel'] = glGetUniformLocation(self.program, 'gaussian_kernel')
+    # samplers and images are set to the index of their unit
+    if size == 1:
+        return _scalar_setter(glUniform1i, location, int)
 
-        if glGetUniformLocation(self.program, 'mip_level') != -1:
-            self.uniforms['mip_level'] = glGetUniformLocation(self.program, 'mip_level')
+    return _array_setter(glUniform1iv, location, 1, size, np.int32, False)
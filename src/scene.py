@@ -7,6 +7,7 @@ from engine.engine import Engine
 from physics.physics_world import PhysicsWorld
 from renderer.renderer_manager.renderer_manager import RendererManager
 from utils import timeit
+from utils.asset_loader import AssetLoader
 from utils.config import Config
 
 
@@ -19,8 +20,13 @@ def setup() -> None:
     pw = PhysicsWorld()
     engine = Engine()
 
-    _initialize_meshes(rm, scene.get('meshes'))
-    _initialize_textures(rm, scene.get('textures'))
+    # read the meshes and textures in parallel, uploading them as soon as they are ready
+    loader = AssetLoader()
+    _initialize_meshes(rm, loader, scene.get('meshes'))
+    _initialize_textures(rm, loader, scene.get('textures'))
+    loader.load()
+    loader.print_report()
+
     _initialize_materials(rm, scene.get('materials'))
     _initialize_models(rm, scene.get('models'))
     _initialize_physics(pw, scene.get('physics_bodies'))
@@ -73,24 +79,24 @@ def update(dt: float) -> None:
     # rm.place_light("moon", *rm.positions["moon"])
 
 
-def _initialize_meshes(rm: RendererManager, meshes: dict) -> None:
-    """Initialize all the meshes passed as an argument.
+def _initialize_meshes(rm: RendererManager, loader: AssetLoader, meshes: dict) -> None:
+    """Queue all the meshes passed as an argument in the asset loader.
 
     Args:
     ----
     rm (RendererManager): RendererManager object reference
+    loader (AssetLoader): Loader that reads the meshes in parallel
     meshes (dict): dictionary of paths to mesh files
 
     """
     for key, value in meshes.items():
-        rm.mesh_manager.new_json_mesh(key, value)
+        # keep track of the file of the mesh, so that it can be evicted and loaded again
+        rm.mesh_manager.track_source(key, value)
+        loader.add(key, 'mesh', value, rm.mesh_manager.read_mesh, rm.mesh_manager.upload_mesh)
 
 
-def _initialize_textures(rm: RendererManager, textures: dict) -> None:
-    rm.new_texture(
-        'test',
-        'assets/textures/uv-maptemplate.png',
-    )
+def _initialize_textures(rm: RendererManager, loader: AssetLoader, textures: dict) -> None:
+    loader.add('test', 'texture', 'assets/textures/uv-maptemplate.png', rm.read_texture, rm.upload_texture)
 
 
 def _initialize_materials(rm: RendererManager, materials: dict) -> None:
@@ -25,7 +25,7 @@ class Components:
             clicked, selected_mesh = imgui.combo('###combo_mesh', meshes.index(rm.models[selected_model].mesh), meshes)
 
             if clicked:
-                rm.models[selected_model].mesh = meshes[selected_mesh]
+                rm.set_model_mesh(selected_model, meshes[selected_mesh])
 
             imgui.text('Shader')
             clicked, selected_shader = imgui.combo(
@@ -49,7 +49,7 @@ class Components:
             )
 
             if clicked:
-                rm.models[selected_model].texture = textures[selected_texture]
+                rm.set_model_texture(selected_model, textures[selected_texture])
 
             imgui.pop_item_width()
 
@@ -98,6 +98,54 @@ class FpsWindow(ResizableWindow):
 
                 # self.othertimegraph.draw(remaining_time)
 
+            # triangles drawn with the selected levels of detail, out of the triangles of the full detail meshes
+            for render_pass, stats in RendererManager().lod_manager.stats.items():
+                imgui.text(f'{render_pass}: {stats["lod_triangles"]:,} / {stats["triangles"]:,} triangles')
+
+            # triangles of the full detail meshes rejected by the cluster culling
+            for render_pass, stats in RendererManager().cluster_manager.stats.items():
+                imgui.text(
+                    f'{render_pass}: {stats["culled_triangles"]:,} / {stats["triangles"]:,} triangles culled '
+                    f'({stats["culled_meshlets"]:,} / {stats["meshlets"]:,} meshlets)'
+                )
+
+            # texture changes between the models served by an already bound texture array
+            for render_pass, stats in RendererManager().texture_array_manager.stats.items():
+                imgui.text(
+                    f'{render_pass}: {stats["binds"]:,} texture binds, {stats["binds_saved"]:,} saved '
+                    f'({stats["draws"]:,} draws)'
+                )
+
+            # models of the passes submitted with indirect draws, and the draw calls that submitted them
+            for render_pass, stats in RendererManager().indirect_draw_manager.stats.items():
+                imgui.text(
+                    f'{render_pass}: {stats["models"]:,} models in {stats["calls"]:,} indirect draws '
+                    f'({stats["commands"]:,} commands)'
+                )
+
+            # models of the passes drawn with the instanced draws of the models sharing their mesh
+            for render_pass, stats in RendererManager().instance_batch_manager.stats.items():
+                imgui.text(
+                    f'{render_pass}: {stats["instanced_models"]:,} / {stats["models"]:,} models in '
+                    f'{stats["draws"]:,} instanced draws ({stats["uploaded_instances"]:,} instances uploaded)'
+                )
+
+            # uniform calls of the last frame, and the calls it would have taken without the uniform buffers
+            stats = RendererManager().uniform_buffer_manager.stats
+            if stats:
+                imgui.text(
+                    f'uniforms: {stats["uniform_calls"]:,} calls / {stats["calls_without_buffers"]:,} without buffers '
+                    f'({stats["skipped_calls"]:,} skipped, {stats["buffer_uploads"]:,} buffer uploads)'
+                )
+
+            # materials of the material table uploaded in the last frame
+            stats = RendererManager().material_buffer_manager.stats
+            if stats:
+                imgui.text(
+                    f'materials: {stats["uploaded_materials"]:,} / {stats["materials"]:,} uploaded '
+                    f'({stats["uploaded_bytes"]:,} bytes)'
+                )
+
             self.ui_time_graph.draw(ui_time)
             self.swaptime_graph.draw(swaptime)
             self.control_graph.draw(controltime)
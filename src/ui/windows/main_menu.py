@@ -70,6 +70,20 @@ class MainMenu:
                     '###shadows_checkbox', rm.render_states['shadow_map']
                 )
 
+                imgui.align_text_to_frame_padding()
+                imgui.text('Indirect draws ')
+                imgui.same_line()
+                _, rm.render_states['indirect_draws'] = imgui.checkbox(
+                    '###indirect_draws_checkbox', rm.render_states['indirect_draws']
+                )
+
+                imgui.align_text_to_frame_padding()
+                imgui.text('Auto instancing')
+                imgui.same_line()
+                _, rm.render_states['auto_instancing'] = imgui.checkbox(
+                    '###auto_instancing_checkbox', rm.render_states['auto_instancing']
+                )
+
                 imgui.align_text_to_frame_padding()
                 imgui.text('MSAA')
                 imgui.same_line()
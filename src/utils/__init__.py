@@ -19,7 +19,7 @@ from utils.messages import (
     print_time,
     print_warning,
 )
-from utils.opengl import get_query_time
+from utils.opengl import download_texture_levels, get_query_time, upload_buffer_chunks, upload_texture_levels
 from utils.profiler import profile
 
 # from utils.printer import * # causes a circular import
@@ -30,6 +30,7 @@ from utils.vbo_indexer import (
     index_vertices,
     index_vertices_multi_thread,
     index_vertices_st_worker,
+    index_vertices_vectorized,
 )
 
 __all__ = [
@@ -49,6 +50,7 @@ __all__ = [
     'index_vertices',
     'index_vertices_multi_thread',
     'index_vertices_st_worker',
+    'index_vertices_vectorized',
     'check_framebuffer_status',
     'create_framebuffer',
     'create_multisample_framebuffer',
@@ -59,4 +61,7 @@ __all__ = [
     'create_view_cubemap_matrices',
     'create_g_buffer',
     'get_query_time',
+    'upload_buffer_chunks',
+    'download_texture_levels',
+    'upload_texture_levels',
 ]
@@ -0,0 +1,676 @@
+"""Offline conversion of the source assets into their runtime formats.
+
+Every source asset is baked into a file under BAKED_DIRECTORY, mirroring its path inside the assets folder:
+- meshes (.obj, .json) become indexed binary meshes with bounds (utils.mesh_file), optimized for the vertex cache
+  (utils.mesh_optimizer), with simplified levels of detail (utils.mesh_simplifier)
+- textures become RGBA8 binary textures with mips (utils.texture_file), skybox images are stored without mips
+
+The textures can also be block compressed (utils.bc_encoder) into DDS files (utils.dds_file) stored next to their
+source, which are then loaded instead of the source.
+
+The manifest keeps the content hash of every baked source, so that only the changed sources are baked again,
+and it's used at runtime to find the baked version of a source asset.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+
+import numpy as np
+from PIL import Image
+
+from utils.bc_encoder import compress_texture
+from utils.bounds import calculate_bounds, calculate_oriented_box
+from utils.config import Config
+from utils.dds_file import DDS_FILE_EXTENSION, find_compressed_sibling, write_dds
+from utils.mesh_file import MESH_FILE_EXTENSION, MeshData, write_binary_mesh
+from utils.mesh_optimizer import optimize_mesh, optimize_vertex_cache
+from utils.mesh_simplifier import generate_lods
+from utils.meshlet_builder import build_meshlets
+from utils.messages import print_error, print_info, print_success, print_warning
+from utils.obj_loader import read_obj
+from utils.singleton import Singleton
+from utils.texture_file import (
+    TEXTURE_FILE_EXTENSION,
+    TextureData,
+    build_texture,
+    write_binary_texture,
+    write_texture_data,
+)
+
+ASSETS_DIRECTORY = 'assets'
+BAKED_DIRECTORY = 'assets/baked'
+MANIFEST_PATH = 'assets/baked/manifest.json'
+MANIFEST_VERSION = 1
+
+# version of the output of every kind of bake, increase it to invalidate the baked files of that kind
+BAKE_VERSIONS = {'mesh': 6, 'texture': 1, 'skybox': 1}
+
+MESH_SOURCES = {'models': ('.obj', '.json')}
+TEXTURE_SOURCES = {'textures': ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tga')}
+SKYBOX_DIRECTORY = 'textures/skybox'
+CUBEMAP_FACES = ('left', 'right', 'top', 'bottom', 'back', 'front')
+
+
+def normalize_asset_path(file_path: str) -> str:
+    """Normalize a path so that the same asset always has the same manifest key ('./assets/a.png' -> 'assets/a.png').
+
+    Args:
+        file_path (str): Path relative to the working directory
+
+    Returns:
+        str: Normalized path, with forward slashes
+
+    """
+    return os.path.normpath(file_path).replace(os.sep, '/')
+
+
+def baked_output_path(source_path: str, output_extension: str, assets_directory: str = ASSETS_DIRECTORY) -> str:
+    """Get the path of the baked version of a source asset, mirroring its path inside the assets folder.
+
+    Args:
+        source_path (str): Path of the source asset
+        output_extension (str): Extension of the baked format
+        assets_directory (str, optional): Root of the assets. Defaults to ASSETS_DIRECTORY.
+
+    Returns:
+        str: Path of the baked file
+
+    """
+    relative_path = os.path.relpath(source_path, assets_directory)
+
+    # keep the source extension, so that box.obj and box.json don't bake to the same file
+    return normalize_asset_path(os.path.join(BAKED_DIRECTORY, relative_path + output_extension))
+
+
+def mesh_optimization_settings() -> tuple[bool, bool]:
+    """Get the mesh optimization settings from the meshes section of the configuration.
+
+    Returns:
+        tuple[bool, bool]: Optimize the meshes for the vertex cache, also sort the triangles to reduce overdraw
+
+    """
+    settings = Config().setup.get('meshes') or {}
+    return settings.get('optimize', True), settings.get('optimize_overdraw', False)
+
+
+def mesh_lod_settings() -> tuple[int, float]:
+    """Get the level of detail settings from the meshes section of the configuration.
+
+    Returns:
+        tuple[int, float]: Number of levels generated after the full detail mesh, fraction of the triangles of the
+            previous level kept by every level
+
+    """
+    settings = Config().setup.get('meshes') or {}
+    return settings.get('lod_levels', 3), settings.get('lod_ratio', 0.5)
+
+
+def add_mesh_lods(mesh: MeshData, levels: int, ratio: float) -> tuple[MeshData, str]:
+    """Simplify a mesh into its levels of detail, each one optimized for the vertex cache.
+
+    Args:
+        mesh (MeshData): Mesh data, already optimized
+        levels (int): Maximum number of levels generated after the full detail mesh
+        ratio (float): Fraction of the triangles of the previous level kept by every level
+
+    Returns:
+        tuple[MeshData, str]: Mesh data with its levels of detail, triangles of every level
+
+    """
+    if levels <= 0:
+        return mesh, ''
+
+    vertex_count = len(mesh.vertices) // 3
+    lods = [optimize_vertex_cache(lod, vertex_count) for lod in generate_lods(mesh, levels, ratio)]
+
+    if not lods:
+        return mesh, ''
+
+    mesh = replace(mesh, lods=lods)
+
+    return mesh, 'LODs ' + ' / '.join(str(len(indices) // 3) for indices in [mesh.indices, *mesh.lods])
+
+
+def mesh_meshlet_settings() -> tuple[bool, int, int]:
+    """Get the meshlet settings from the meshes section of the configuration.
+
+    Returns:
+        tuple[bool, int, int]: Split the meshes into meshlets, maximum number of vertices and of triangles of a meshlet
+
+    """
+    settings = Config().setup.get('meshes') or {}
+    return (
+        settings.get('meshlets', True),
+        settings.get('meshlet_vertices', 64),
+        settings.get('meshlet_triangles', 124),
+    )
+
+
+def add_mesh_meshlets(mesh: MeshData, max_vertices: int, max_triangles: int) -> tuple[MeshData, str]:
+    """Split the full detail triangles of a mesh into meshlets, for cluster culling.
+
+    Args:
+        mesh (MeshData): Mesh data, already optimized (the meshlets follow the order of its indices)
+        max_vertices (int): Maximum number of vertices of a meshlet
+        max_triangles (int): Maximum number of triangles of a meshlet
+
+    Returns:
+        tuple[MeshData, str]: Mesh data with its meshlets, number of meshlets
+
+    """
+    meshlets = build_meshlets(mesh, max_vertices, max_triangles)
+
+    # a single meshlet can't be culled more precisely than the whole mesh
+    if len(meshlets) <= 1:
+        return replace(mesh, meshlets=None), ''
+
+    return replace(mesh, meshlets=meshlets), f'{len(meshlets)} meshlets'
+
+
+def hash_file(file_path: str, kind: str) -> str:
+    """Calculate the content hash of a source asset, combined with the bake version of its kind.
+
+    Args:
+        file_path (str): Path of the source asset
+        kind (str): Kind of bake (mesh, texture or skybox)
+
+    Returns:
+        str: Hex digest of the hash
+
+    """
+    digest = hashlib.sha256(f'{kind}:{BAKE_VERSIONS[kind]}:'.encode())
+
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class AssetManifest(metaclass=Singleton):
+    """Manifest of the baked assets, mapping every source path to its baked output."""
+
+    def __init__(self, file_path: str = MANIFEST_PATH) -> None:
+        """Load the manifest from disk, if it exists.
+
+        Args:
+            file_path (str, optional): Path of the manifest. Defaults to MANIFEST_PATH.
+
+        """
+        self.file_path: str = file_path
+        self.entries: dict[str, dict] = {}
+        # assets can be recorded from the loading threads
+        self._lock: threading.Lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """(Re)load the manifest from disk."""
+        self.entries = {}
+
+        if not os.path.isfile(self.file_path):
+            return
+
+        try:
+            with open(self.file_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print_error(f'Could not read the asset manifest {self.file_path}: {e}')
+            return
+
+        if data.get('version') == MANIFEST_VERSION:
+            self.entries = data.get('assets', {})
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+
+        with self._lock:
+            tmp_path = self.file_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': MANIFEST_VERSION, 'assets': self.entries}, f, indent=2, sort_keys=True)
+
+            os.replace(tmp_path, self.file_path)
+
+    def record(self, source_path: str, kind: str, output_path: str) -> None:
+        """Add the baked version of a source asset, baked outside of bake_assets, and save the manifest.
+
+        Args:
+            source_path (str): Path of the source asset
+            kind (str): Kind of bake (mesh, texture or skybox)
+            output_path (str): Path of the baked file
+
+        """
+        stat = os.stat(source_path)
+        entry = {
+            'kind': kind,
+            'version': BAKE_VERSIONS[kind],
+            'hash': hash_file(source_path, kind),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'output': output_path,
+        }
+
+        with self._lock:
+            self.entries[normalize_asset_path(source_path)] = entry
+
+        self.save()
+
+    def baked_path(self, source_path: str) -> str | None:
+        """Get the path of the baked version of a source asset.
+
+        The baked file is only returned if it exists, it was baked with the current bake version and the source didn't
+        change since it was baked (checked through its size and modification time, to avoid hashing it at runtime).
+
+        Args:
+            source_path (str): Path of the source asset
+
+        Returns:
+            str | None: Path of the baked file, or None if there is no up to date baked version
+
+        """
+        entry = self.entries.get(normalize_asset_path(source_path))
+
+        # the entry must have been baked with the current version of the format
+        if entry is None or entry.get('version') != BAKE_VERSIONS.get(entry['kind']):
+            return None
+
+        if not os.path.isfile(entry['output']):
+            return None
+
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            # the source is gone, but the baked file is still valid
+            return entry['output']
+
+        if stat.st_size != entry['size'] or stat.st_mtime_ns != entry['mtime_ns']:
+            return None
+
+        return entry['output']
+
+
+def read_source_mesh(source_path: str) -> MeshData:
+    """Read a source mesh (.obj or .json) into indexed mesh data.
+
+    Args:
+        source_path (str): Path of the source mesh
+
+    Returns:
+        MeshData: Indexed mesh data with bounds
+
+    """
+    if source_path.lower().endswith('.obj'):
+        return read_obj(source_path).mesh
+
+    with open(source_path) as f:
+        data = json.load(f)
+
+    indices = np.array(data['indices'], dtype=np.uint32)
+    vertices = np.array(data['vertices'], dtype=np.float32)
+    normals = np.array(data['normals'], dtype=np.float32)
+    uvs = np.array(data['uvs'], dtype=np.float32)
+
+    return MeshData(
+        indices, vertices, normals, uvs, *calculate_bounds(vertices), obb=calculate_oriented_box(vertices)
+    )
+
+
+def write_mesh(output_path: str, mesh: MeshData) -> None:
+    """Write mesh data to a binary mesh file, with its bounds and submeshes.
+
+    Args:
+        output_path (str): Path of the binary mesh file
+        mesh (MeshData): Mesh data
+
+    """
+    write_binary_mesh(
+        output_path,
+        mesh.indices,
+        mesh.vertices,
+        mesh.normals,
+        mesh.uvs,
+        (mesh.aabb_min, mesh.aabb_max, mesh.center, mesh.radius),
+        mesh.submeshes,
+        mesh.lods,
+        mesh.obb,
+        mesh.meshlets,
+    )
+
+
+def cache_optimized_mesh(source_path: str, mesh: MeshData) -> str | None:
+    """Store a mesh optimized at load time as the baked version of its source, so it's only optimized once.
+
+    Args:
+        source_path (str): Path of the source mesh, inside the assets folder
+        mesh (MeshData): Optimized mesh data, with its levels of detail
+
+    Returns:
+        str | None: Path of the baked file, None if the source is not inside the assets folder
+
+    """
+    source_path = normalize_asset_path(source_path)
+    if not source_path.startswith(ASSETS_DIRECTORY + '/'):
+        return None
+
+    output_path = baked_output_path(source_path, MESH_FILE_EXTENSION)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    write_mesh(output_path, mesh)
+    AssetManifest().record(source_path, 'mesh', output_path)
+
+    return output_path
+
+
+def cache_texture(source_path: str, texture: TextureData) -> str | None:
+    """Store a texture decoded at load time as the baked version of its source, so it's only decoded once.
+
+    Args:
+        source_path (str): Path of the source image, inside the assets folder
+        texture (TextureData): Flipped texture data, with its mip chain
+
+    Returns:
+        str | None: Path of the baked file, None if the source is not inside the assets folder
+
+    """
+    source_path = normalize_asset_path(source_path)
+    if not source_path.startswith(ASSETS_DIRECTORY + '/'):
+        return None
+
+    # the skybox images are baked without mips, they are never replaced by a texture
+    if source_path.startswith(f'{ASSETS_DIRECTORY}/{SKYBOX_DIRECTORY}/'):
+        return None
+
+    output_path = baked_output_path(source_path, TEXTURE_FILE_EXTENSION)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    write_texture_data(output_path, texture)
+    AssetManifest().record(source_path, 'texture', output_path)
+
+    return output_path
+
+
+def _bake_mesh(source_path: str, output_path: str, optimize: bool, overdraw: bool, lods: int) -> str:
+    mesh = read_source_mesh(source_path)
+
+    report = ''
+    if optimize:
+        mesh, report = optimize_mesh(mesh, overdraw=overdraw)
+
+    mesh, lod_report = add_mesh_lods(mesh, lods, mesh_lod_settings()[1])
+
+    meshlet_report = ''
+    meshlets, max_vertices, max_triangles = mesh_meshlet_settings()
+    if meshlets:
+        mesh, meshlet_report = add_mesh_meshlets(mesh, max_vertices, max_triangles)
+
+    write_mesh(output_path, mesh)
+
+    return ', '.join(str(details) for details in (report, lod_report, meshlet_report) if details)
+
+
+def _texture_orientation(source_path: str, skybox: bool) -> tuple[bool, bool]:
+    # skybox images are never sampled with mips, and the cubemap faces are uploaded without flipping
+    cubemap_face = os.path.splitext(os.path.basename(source_path))[0] in CUBEMAP_FACES
+    return not (skybox and cubemap_face), not skybox
+
+
+def _bake_texture(source_path: str, output_path: str, skybox: bool) -> None:
+    with Image.open(source_path) as image:
+        write_binary_texture(output_path, image, *_texture_orientation(source_path, skybox))
+
+
+def _bake(
+    kind: str, source_path: str, output_path: str, optimize: bool, overdraw: bool, lods: int
+) -> tuple[float, str]:
+    """Bake a single asset (runs in a worker process).
+
+    Returns:
+        tuple[float, str]: time spent baking the asset in seconds, details about the bake
+
+    """
+    start = time.perf_counter()
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    details = ''
+    if kind == 'mesh':
+        details = _bake_mesh(source_path, output_path, optimize, overdraw, lods)
+    else:
+        _bake_texture(source_path, output_path, kind == 'skybox')
+
+    return time.perf_counter() - start, details
+
+
+def find_sources(assets_directory: str = ASSETS_DIRECTORY) -> list[tuple[str, str, str]]:
+    """Walk the asset folders and list every source asset that can be baked.
+
+    Args:
+        assets_directory (str, optional): Root of the assets. Defaults to ASSETS_DIRECTORY.
+
+    Returns:
+        list[tuple[str, str, str]]: (kind, source path, output path) of every source asset
+
+    """
+    sources = []
+    skybox_directory = normalize_asset_path(os.path.join(assets_directory, SKYBOX_DIRECTORY))
+
+    for kind, directories, output_extension in (
+        ('mesh', MESH_SOURCES, MESH_FILE_EXTENSION),
+        ('texture', TEXTURE_SOURCES, TEXTURE_FILE_EXTENSION),
+    ):
+        for directory, extensions in directories.items():
+            for root, _, files in os.walk(os.path.join(assets_directory, directory)):
+                for file in sorted(files):
+                    if not file.lower().endswith(extensions):
+                        continue
+
+                    source_path = normalize_asset_path(os.path.join(root, file))
+                    output_path = baked_output_path(source_path, output_extension, assets_directory)
+
+                    source_kind = 'skybox' if source_path.startswith(skybox_directory + '/') else kind
+                    sources.append((source_kind, source_path, output_path))
+
+    return sources
+
+
+def bake_assets(
+    assets_directory: str = ASSETS_DIRECTORY,
+    force: bool = False,
+    workers: int = None,
+    optimize: bool = None,
+    overdraw: bool = None,
+    lods: int = None,
+) -> dict[str, float]:
+    """Bake every changed source asset into its runtime format, in parallel, and update the manifest.
+
+    Args:
+        assets_directory (str, optional): Root of the assets. Defaults to ASSETS_DIRECTORY.
+        force (bool, optional): Bake every asset, even the unchanged ones. Defaults to False.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        optimize (bool, optional): Optimize the meshes for the vertex cache. Defaults to the meshes settings.
+        overdraw (bool, optional): Also sort the triangles to reduce overdraw. Defaults to the meshes settings.
+        lods (int, optional): Number of levels of detail generated for every mesh. Defaults to the meshes settings.
+
+    Returns:
+        dict[str, float]: time spent baking every baked asset, in seconds
+
+    """
+    manifest = AssetManifest()
+    manifest.load()
+
+    default_optimize, default_overdraw = mesh_optimization_settings()
+    optimize = default_optimize if optimize is None else optimize
+    overdraw = default_overdraw if overdraw is None else overdraw
+    lods = mesh_lod_settings()[0] if lods is None else lods
+
+    # find the sources that changed since the last bake
+    jobs = {}
+    for kind, source_path, output_path in find_sources(assets_directory):
+        stat = os.stat(source_path)
+        entry = manifest.entries.get(source_path)
+
+        if (
+            not force
+            and entry is not None
+            and entry['kind'] == kind
+            and entry.get('version') == BAKE_VERSIONS[kind]
+            and os.path.isfile(entry['output'])
+        ):
+            # the size and modification time didn't change, no need to hash the source
+            if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                continue
+
+            # the file was touched, but the content is still the same
+            content_hash = hash_file(source_path, kind)
+            if entry['hash'] == content_hash:
+                entry['size'] = stat.st_size
+                entry['mtime_ns'] = stat.st_mtime_ns
+                continue
+        else:
+            content_hash = hash_file(source_path, kind)
+
+        jobs[source_path] = {
+            'kind': kind,
+            'version': BAKE_VERSIONS[kind],
+            'hash': content_hash,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'output': output_path,
+        }
+
+    timings = {}
+
+    if not jobs:
+        print_success('Every asset is up to date')
+        manifest.save()
+        return timings
+
+    print_info(f'Baking {len(jobs)} assets')
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_bake, entry['kind'], source_path, entry['output'], optimize, overdraw, lods): source_path
+            for source_path, entry in jobs.items()
+        }
+
+        for future in as_completed(futures):
+            source_path = futures[future]
+
+            try:
+                timings[source_path], details = future.result()
+            except Exception as e:  # noqa: BLE001
+                print_error(f'Failed to bake {source_path}: {e}')
+                continue
+
+            manifest.entries[source_path] = jobs[source_path]
+            print_info(
+                f'{source_path} -> {jobs[source_path]["output"]} ({timings[source_path] * 1000:.1f}ms)'
+                + (f' {details}' if details else '')
+            )
+
+    manifest.save()
+    print_success(f'Baked {len(timings)}/{len(jobs)} assets')
+
+    return timings
+
+
+def _compress(source_path: str, output_path: str, skybox: bool, compression: str) -> tuple[float, str, int, int]:
+    """Block compress a single texture (runs in a worker process).
+
+    Returns:
+        tuple[float, str, int, int]: time spent compressing the texture in seconds, compression of the texture,
+            bytes of the texture as RGBA8 and compressed
+
+    """
+    start = time.perf_counter()
+
+    with Image.open(source_path) as image:
+        texture = build_texture(image, *_texture_orientation(source_path, skybox))
+
+    compressed = compress_texture(texture, None if compression == 'auto' else compression)
+    write_dds(output_path, compressed)
+
+    return (
+        time.perf_counter() - start,
+        compressed.compression,
+        sum(data.nbytes for _, _, data in texture.levels),
+        sum(data.nbytes for _, _, data in compressed.levels),
+    )
+
+
+def compress_textures(
+    assets_directory: str = ASSETS_DIRECTORY,
+    compression: str = 'auto',
+    force: bool = False,
+    workers: int = None,
+) -> dict[str, tuple[int, int]]:
+    """Block compress every texture and skybox image into a DDS file next to it, in parallel.
+
+    Args:
+        assets_directory (str, optional): Root of the assets. Defaults to ASSETS_DIRECTORY.
+        compression (str, optional): Block compression ('bc1' or 'bc3'), 'auto' to use BC1 for the opaque images
+            and BC3 for the others. Defaults to 'auto'.
+        force (bool, optional): Compress every texture, even the ones with an up to date DDS file. Defaults to False.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        dict[str, tuple[int, int]]: GPU memory used by every compressed texture as RGBA8 and compressed, in bytes
+
+    """
+    jobs = {}
+    for kind, source_path, _ in find_sources(assets_directory):
+        if kind == 'mesh':
+            continue
+
+        # images with the same name in different formats share their compressed version
+        output_path = os.path.splitext(source_path)[0] + DDS_FILE_EXTENSION
+        shared = [path for path, (_, job_output) in jobs.items() if job_output == output_path]
+        if shared:
+            print_warning(f'{source_path} shares its compressed version with {shared[0]}, skipping it')
+            continue
+
+        if force or find_compressed_sibling(source_path) is None:
+            jobs[source_path] = (kind, output_path)
+
+    sizes = {}
+
+    if not jobs:
+        print_success('Every texture is up to date')
+        return sizes
+
+    print_info(f'Compressing {len(jobs)} textures')
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_compress, source_path, output_path, kind == 'skybox', compression): source_path
+            for source_path, (kind, output_path) in jobs.items()
+        }
+
+        for future in as_completed(futures):
+            source_path = futures[future]
+
+            try:
+                duration, used_compression, uncompressed_size, size = future.result()
+            except Exception as e:  # noqa: BLE001
+                print_error(f'Failed to compress {source_path}: {e}')
+                continue
+
+            sizes[source_path] = (uncompressed_size, size)
+            print_info(
+                f'{source_path} -> {jobs[source_path][1]} ({used_compression.upper()}, '
+                f'{uncompressed_size / 2**20:.2f}MiB -> {size / 2**20:.2f}MiB, {duration * 1000:.1f}ms)'
+            )
+
+    uncompressed_total = sum(uncompressed_size for uncompressed_size, _ in sizes.values())
+    total = sum(size for _, size in sizes.values())
+    print_success(
+        f'Compressed {len(sizes)}/{len(jobs)} textures: {total / 2**20:.2f}MiB of GPU memory instead of '
+        f'{uncompressed_total / 2**20:.2f}MiB, {(uncompressed_total - total) / 2**20:.2f}MiB saved'
+    )
+
+    return sizes
@@ -0,0 +1,127 @@
+"""Parallel loading of assets.
+
+The CPU side work of every asset (file parsing, indexing, image decoding) runs in a thread pool, while the
+OpenGL uploads run on the calling thread, the only one owning the context, as soon as each asset is ready.
+"""
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable
+
+from utils.colors import Colors
+from utils.messages import print_error, print_time
+
+
+@dataclass
+class AssetTiming:
+    """Timing information of a loaded asset, in seconds."""
+
+    kind: str
+    path: str
+    # time spent reading the asset in the worker thread
+    read: float = 0.0
+    # time spent uploading the asset on the main thread
+    upload: float = 0.0
+    # time between the start of the load and the end of the upload
+    ready: float = 0.0
+
+
+@dataclass
+class _AssetJob:
+    name: str
+    kind: str
+    path: str
+    read: Callable[[str], any]
+    upload: Callable[[str, any], None]
+    timing: AssetTiming = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.timing = AssetTiming(self.kind, self.path)
+
+    def run_read(self) -> any:
+        start = time.perf_counter()
+        data = self.read(self.path)
+        self.timing.read = time.perf_counter() - start
+        return data
+
+
+class AssetLoader:
+    """Loader that reads a batch of assets in parallel and uploads them on the calling thread."""
+
+    def __init__(self, workers: int = None) -> None:
+        """Create an empty loader.
+
+        Args:
+            workers (int, optional): Number of worker threads. Defaults to the ThreadPoolExecutor default.
+
+        """
+        self.workers: int = workers
+        self._jobs: list[_AssetJob] = []
+        self.timings: dict[str, AssetTiming] = {}
+        self.wall_time: float = 0.0
+
+    def add(
+        self,
+        name: str,
+        kind: str,
+        path: str,
+        read: Callable[[str], any],
+        upload: Callable[[str, any], None],
+    ) -> None:
+        """Queue an asset to be loaded.
+
+        Args:
+            name (str): Name of the asset
+            kind (str): Kind of asset, only used for the report
+            path (str): Path of the asset file
+            read (Callable[[str], any]): Function called from a worker thread with the path, returning the asset data
+                (it must not use OpenGL)
+            upload (Callable[[str, any], None]): Function called on the calling thread with the name and the data
+
+        """
+        self._jobs.append(_AssetJob(name, kind, path, read, upload))
+
+    def load(self) -> None:
+        """Read every queued asset in parallel and upload each one as soon as it's ready."""
+        jobs, self._jobs = self._jobs, []
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='asset_loader') as executor:
+            futures: dict[Future, _AssetJob] = {executor.submit(job.run_read): job for job in jobs}
+
+            # upload the assets in the order in which they become ready
+            for future in as_completed(futures):
+                job = futures[future]
+
+                try:
+                    data = future.result()
+                except Exception as e:  # noqa: BLE001
+                    print_error(f'Failed to load {job.kind} {job.name} ({job.path}): {e}')
+                    continue
+
+                upload_start = time.perf_counter()
+                job.upload(job.name, data)
+                job.timing.upload = time.perf_counter() - upload_start
+                job.timing.ready = time.perf_counter() - start
+
+                self.timings[f'{job.kind}:{job.name}'] = job.timing
+
+        self.wall_time += time.perf_counter() - start
+
+    def print_report(self) -> None:
+        """Print the timing of every loaded asset and the speedup over loading them one after the other."""
+        if not self.timings:
+            return
+
+        print_time(f'{Colors.GREY}Asset{Colors.ENDC}{" " * 26}read      upload    ready')
+
+        for key, timing in sorted(self.timings.items(), key=lambda item: item[1].read + item[1].upload, reverse=True):
+            print_time(f'{key:<31}{timing.read:.4f}s   {timing.upload:.4f}s   {timing.ready:.4f}s')
+
+        sequential = sum(timing.read + timing.upload for timing in self.timings.values())
+        print_time(
+            f'{Colors.GREY}Sequential{Colors.ENDC}: {sequential:.4f}s '
+            f'{Colors.GREY}Parallel{Colors.ENDC}: {self.wall_time:.4f}s '
+            f'{Colors.GREY}Speedup{Colors.ENDC}: {sequential / max(self.wall_time, 1e-9):.2f}x'
+        )
@@ -0,0 +1,250 @@
+"""Block compression of RGBA8 textures into BC1 (DXT1) and BC3 (DXT5), without any external tool.
+
+Every block of 4x4 texels is encoded independently and all the blocks of a level are processed at once with NumPy:
+- the two color endpoints are the extremes of the texels along the principal axis of their colors, refined once by
+  least squares with the palette indices of the texels, and stored as RGB565
+- every texel picks the nearest of the 4 colors of the palette (the endpoints and 2 interpolated colors)
+- BC3 also stores an alpha block (BC4): the minimum and maximum alpha and the nearest of the 8 interpolated values
+
+The levels whose size is not a multiple of 4 are padded by repeating their last row and column.
+"""
+
+import numpy as np
+
+from utils.texture_file import TextureData
+
+# bytes of a block of 4x4 texels of every compression
+BLOCK_BYTES = {'bc1': 8, 'bc3': 16, 'bc5': 16, 'bc7': 16}
+
+# compressions supported by the encoder
+ENCODED_COMPRESSIONS = ('bc1', 'bc3')
+
+# power iterations computing the principal axis of the colors of every block
+_AXIS_ITERATIONS = 4
+
+# weight of the first endpoint of every index of a BC1 block in 4 colors mode
+_COLOR_WEIGHTS = np.array([1.0, 0.0, 2.0 / 3.0, 1.0 / 3.0], dtype=np.float32)
+# weight of the first endpoint of every index of a BC4 block in 8 values mode
+_ALPHA_WEIGHTS = np.array([1.0, 0.0, 6 / 7, 5 / 7, 4 / 7, 3 / 7, 2 / 7, 1 / 7], dtype=np.float32)
+
+
+def compressed_level_size(width: int, height: int, compression: str) -> int:
+    """Bytes of a level of a block compressed texture.
+
+    Args:
+        width (int): Width of the level
+        height (int): Height of the level
+        compression (str): Block compression ('bc1', 'bc3', 'bc5' or 'bc7')
+
+    Returns:
+        int: Size of the level, in bytes
+
+    """
+    return ((width + 3) // 4) * ((height + 3) // 4) * BLOCK_BYTES[compression]
+
+
+def _split_blocks(pixels: np.ndarray, width: int, height: int) -> np.ndarray:
+    # pad the level to whole blocks, then gather the 16 texels of every block in rows, block by block
+    image = pixels.reshape(height, width, 4)
+    padded_height = (height + 3) // 4 * 4
+    padded_width = (width + 3) // 4 * 4
+    image = np.pad(image, ((0, padded_height - height), (0, padded_width - width), (0, 0)), mode='edge')
+
+    blocks = image.reshape(padded_height // 4, 4, padded_width // 4, 4, 4).transpose(0, 2, 1, 3, 4)
+    return blocks.reshape(-1, 16, 4).astype(np.float32)
+
+
+def _quantize_565(colors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # RGB565 value of the colors, and the RGB888 colors the GPU expands them to
+    red = np.rint(np.clip(colors[:, 0], 0, 255) * (31 / 255)).astype(np.uint16)
+    green = np.rint(np.clip(colors[:, 1], 0, 255) * (63 / 255)).astype(np.uint16)
+    blue = np.rint(np.clip(colors[:, 2], 0, 255) * (31 / 255)).astype(np.uint16)
+
+    packed = (red << 11) | (green << 5) | blue
+    expanded = np.stack(((red << 3) | (red >> 2), (green << 2) | (green >> 4), (blue << 3) | (blue >> 2)), axis=1)
+
+    return packed, expanded.astype(np.float32)
+
+
+def _nearest(values: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    # index of the nearest palette entry of every texel of every block
+    differences = values[:, :, None] - palette[:, None]
+    if differences.ndim == 4:
+        return np.argmin((differences * differences).sum(axis=3), axis=2)
+
+    return np.argmin(np.abs(differences), axis=2)
+
+
+def _color_palette(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    weights = _COLOR_WEIGHTS[None, :, None]
+    return weights * first[:, None] + (1.0 - weights) * second[:, None]
+
+
+def _principal_endpoints(colors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # extremes of the colors of every block along their principal axis
+    mean = colors.mean(axis=1)
+    centered = colors - mean[:, None]
+    covariance = np.einsum('nki,nkj->nij', centered, centered)
+
+    # start from the diagonal of the bounding box, which is already close to the axis
+    axis = colors.max(axis=1) - colors.min(axis=1) + 1e-3
+    for _ in range(_AXIS_ITERATIONS):
+        axis = np.einsum('nij,nj->ni', covariance, axis)
+        axis /= np.maximum(np.linalg.norm(axis, axis=1), 1e-12)[:, None]
+
+    projections = np.einsum('nki,ni->nk', centered, axis)
+    first = mean + axis * projections.max(axis=1)[:, None]
+    second = mean + axis * projections.min(axis=1)[:, None]
+
+    return first, second
+
+
+def _refine_endpoints(
+    colors: np.ndarray, indices: np.ndarray, first: np.ndarray, second: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    # endpoints minimizing the squared error of the texels with their current palette indices
+    weights = _COLOR_WEIGHTS[indices]
+    others = 1.0 - weights
+
+    aa = (weights * weights).sum(axis=1)
+    ab = (weights * others).sum(axis=1)
+    bb = (others * others).sum(axis=1)
+    ax = np.einsum('nk,nki->ni', weights, colors)
+    bx = np.einsum('nk,nki->ni', others, colors)
+
+    # the blocks using a single weight keep their endpoints
+    determinant = aa * bb - ab * ab
+    solvable = np.abs(determinant) > 1e-6
+    safe = np.where(solvable, determinant, 1.0)[:, None]
+
+    refined_first = (ax * bb[:, None] - bx * ab[:, None]) / safe
+    refined_second = (bx * aa[:, None] - ax * ab[:, None]) / safe
+
+    return (
+        np.where(solvable[:, None], refined_first, first),
+        np.where(solvable[:, None], refined_second, second),
+    )
+
+
+def _swap(swap: np.ndarray, first: np.ndarray, second: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    return np.where(swap, second, first), np.where(swap, first, second)
+
+
+def _encode_color_blocks(blocks: np.ndarray) -> np.ndarray:
+    colors = blocks[:, :, :3]
+    first, second = _principal_endpoints(colors)
+
+    # pick the indices with the quantized endpoints, then fit the endpoints to them
+    _, first_expanded = _quantize_565(first)
+    _, second_expanded = _quantize_565(second)
+    indices = _nearest(colors, _color_palette(first_expanded, second_expanded))
+    first, second = _refine_endpoints(colors, indices, first, second)
+
+    first_packed, first_expanded = _quantize_565(first)
+    second_packed, second_expanded = _quantize_565(second)
+
+    # the 4 colors mode requires the first endpoint to be the greater one
+    swap = first_packed < second_packed
+    first_packed, second_packed = _swap(swap, first_packed, second_packed)
+    first_expanded, second_expanded = _swap(swap[:, None], first_expanded, second_expanded)
+
+    indices = _nearest(colors, _color_palette(first_expanded, second_expanded)).astype(np.uint32)
+    # equal endpoints select the 3 colors mode, where only the first index is the endpoint color
+    indices[first_packed == second_packed] = 0
+
+    encoded = np.zeros(len(blocks), dtype=[('first', '<u2'), ('second', '<u2'), ('indices', '<u4')])
+    encoded['first'] = first_packed
+    encoded['second'] = second_packed
+    encoded['indices'] = (indices << (2 * np.arange(16, dtype=np.uint32))).sum(axis=1, dtype=np.uint32)
+
+    return encoded.view(np.uint8).reshape(-1, 8)
+
+
+def _encode_alpha_blocks(blocks: np.ndarray) -> np.ndarray:
+    alphas = blocks[:, :, 3]
+    first = alphas.max(axis=1)
+    second = alphas.min(axis=1)
+
+    # 8 values mode, the first endpoint being the greater one (equal endpoints only use the first index)
+    weights = _ALPHA_WEIGHTS[None]
+    palette = np.floor((weights * first[:, None] + (1.0 - weights) * second[:, None]) + 0.5)
+    indices = _nearest(alphas, palette).astype(np.uint64)
+
+    packed = (indices << (3 * np.arange(16, dtype=np.uint64))).sum(axis=1, dtype=np.uint64)
+
+    encoded = np.zeros((len(blocks), 8), dtype=np.uint8)
+    encoded[:, 0] = first
+    encoded[:, 1] = second
+    encoded[:, 2:] = packed[:, None].view(np.uint8).reshape(-1, 8)[:, :6]
+
+    return encoded
+
+
+def encode_level(pixels: np.ndarray, width: int, height: int, compression: str) -> np.ndarray:
+    """Compress a level of RGBA8 pixels into blocks.
+
+    Args:
+        pixels (np.ndarray): RGBA8 pixels of the level
+        width (int): Width of the level
+        height (int): Height of the level
+        compression (str): Block compression ('bc1' or 'bc3')
+
+    Raises:
+        ValueError: In case the compression is not supported by the encoder
+
+    Returns:
+        np.ndarray: Compressed blocks, row by row
+
+    """
+    if compression not in ENCODED_COMPRESSIONS:
+        raise ValueError(f'Unsupported block compression: {compression}')
+
+    blocks = _split_blocks(pixels, width, height)
+    color_blocks = _encode_color_blocks(blocks)
+
+    if compression == 'bc1':
+        return color_blocks.reshape(-1)
+
+    return np.hstack((_encode_alpha_blocks(blocks), color_blocks)).reshape(-1)
+
+
+def choose_compression(texture: TextureData) -> str:
+    """Choose the compression of a texture: BC1 when it's opaque, BC3 otherwise.
+
+    Args:
+        texture (TextureData): RGBA8 texture data
+
+    Returns:
+        str: Block compression ('bc1' or 'bc3')
+
+    """
+    _, _, pixels = texture.levels[0]
+    return 'bc1' if pixels.reshape(-1, 4)[:, 3].min(initial=255) == 255 else 'bc3'
+
+
+def compress_texture(texture: TextureData, compression: str = None) -> TextureData:
+    """Compress every level of a RGBA8 texture.
+
+    Args:
+        texture (TextureData): RGBA8 texture data
+        compression (str, optional): Block compression ('bc1' or 'bc3'). Defaults to the one chosen by
+            choose_compression.
+
+    Returns:
+        TextureData: Compressed texture data, with the same orientation and levels
+
+    """
+    compression = compression or choose_compression(texture)
+
+    levels = [
+        (width, height, encode_level(pixels, width, height, compression))
+        for width, height, pixels in texture.levels
+    ]
+
+    return TextureData(
+        width=texture.width,
+        height=texture.height,
+        flipped=texture.flipped,
+        levels=levels,
+        compression=compression,
+    )
@@ -0,0 +1,255 @@
+"""Bounding volumes of meshes.
+
+The bounds of a mesh are calculated once at import time, with vectorized operations over all its positions:
+- a tight axis aligned bounding box
+- a near minimal bounding sphere, from Ritter's algorithm followed by a few shrink and grow refinement passes
+- an oriented bounding box, along the principal axes of the positions when that's smaller than the aligned box
+
+The transform functions return the world space bounds of a model from the bounds of its mesh and its model matrix,
+staying correct under rotations and non uniform scales.
+"""
+
+from dataclasses import dataclass
+
+import glm
+import numpy as np
+
+# directions along which the initial diameter of the sphere is searched (axes and diagonals of a cube)
+_DIRECTIONS = np.array(
+    [
+        [1, 0, 0],
+        [0, 1, 0],
+        [0, 0, 1],
+        [1, 1, 1],
+        [1, 1, -1],
+        [1, -1, 1],
+        [1, -1, -1],
+    ],
+    dtype=np.float64,
+)
+
+# number of shrink and grow passes refining the sphere found by Ritter's algorithm
+REFINEMENT_STEPS = 8
+
+# maximum number of points the sphere is grown towards in a single pass
+_MAX_GROW_STEPS = 256
+
+
+@dataclass
+class OrientedBox:
+    """Box aligned to an arbitrary orthonormal basis."""
+
+    center: np.ndarray
+    # unit axes of the box, one per row
+    axes: np.ndarray
+    # half sizes of the box along each axis
+    extents: np.ndarray
+
+
+def _positions(vertices: np.ndarray) -> np.ndarray:
+    return np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+
+
+def calculate_aabb(vertices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Calculate the axis aligned bounding box of a list of positions.
+
+    Args:
+        vertices (np.ndarray): Flat list of positions (x, y, z)
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Minimum and maximum corners of the box
+
+    """
+    positions = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+
+    if len(positions) == 0:
+        return (np.zeros(3, np.float32), np.zeros(3, np.float32))
+
+    return (positions.min(axis=0), positions.max(axis=0))
+
+
+def _grow_sphere(positions: np.ndarray, center: np.ndarray, radius: float) -> tuple[np.ndarray, float]:
+    # grow the sphere towards the farthest point left outside of it, until it contains every point
+    for _ in range(_MAX_GROW_STEPS):
+        offsets = positions - center
+        distances = np.einsum('ij,ij->i', offsets, offsets)
+        farthest = int(distances.argmax())
+        distance = float(np.sqrt(distances[farthest]))
+
+        if distance <= radius:
+            break
+
+        # the side of the sphere opposite to the point stays in place
+        new_radius = (radius + distance) * 0.5
+        center = center + offsets[farthest] * ((new_radius - radius) / distance)
+        radius = new_radius
+
+    # the exact radius around the final center, so that no point is left outside because of rounding errors
+    offsets = positions - center
+    return center, float(np.sqrt(np.einsum('ij,ij->i', offsets, offsets).max()))
+
+
+def calculate_bounding_sphere(
+    vertices: np.ndarray, refinement_steps: int = REFINEMENT_STEPS
+) -> tuple[np.ndarray, float]:
+    """Calculate a near minimal bounding sphere of a list of positions.
+
+    Args:
+        vertices (np.ndarray): Flat list of positions (x, y, z)
+        refinement_steps (int, optional): Number of shrink and grow passes refining the sphere.
+            Defaults to REFINEMENT_STEPS.
+
+    Returns:
+        tuple[np.ndarray, float]: Center and radius of the sphere
+
+    """
+    positions = _positions(vertices)
+
+    if len(positions) == 0:
+        return (np.zeros(3, np.float32), 0.0)
+
+    # start from the two most distant extreme points along a few directions
+    projections = positions @ _DIRECTIONS.T
+    lows = positions[projections.argmin(axis=0)]
+    highs = positions[projections.argmax(axis=0)]
+    diameter = int(((highs - lows) ** 2).sum(axis=1).argmax())
+
+    center = (lows[diameter] + highs[diameter]) * 0.5
+    radius = float(np.linalg.norm(highs[diameter] - lows[diameter])) * 0.5
+    center, radius = _grow_sphere(positions, center, radius)
+
+    # shrink the sphere and grow it back towards the points left outside, which moves its center towards the
+    # center of the minimal sphere, keeping the smallest one
+    for step in range(refinement_steps):
+        shrink = 1.0 - 0.5 ** (step + 2)
+        refined_center, refined_radius = _grow_sphere(positions, center, radius * shrink)
+
+        if refined_radius < radius:
+            center, radius = refined_center, refined_radius
+
+    # the sphere around the center of the bounding box is sometimes smaller for boxy meshes
+    box_center = (positions.min(axis=0) + positions.max(axis=0)) * 0.5
+    box_radius = float(np.sqrt(((positions - box_center) ** 2).sum(axis=1).max()))
+    if box_radius < radius:
+        center, radius = box_center, box_radius
+
+    # store the center in single precision, with the radius measured from the rounded center
+    center = center.astype(np.float32)
+    radius = float(np.sqrt(((positions - center) ** 2).sum(axis=1).max()))
+
+    return (center, radius)
+
+
+def calculate_oriented_box(vertices: np.ndarray) -> OrientedBox:
+    """Calculate an oriented bounding box of a list of positions, along their principal axes.
+
+    Args:
+        vertices (np.ndarray): Flat list of positions (x, y, z)
+
+    Returns:
+        OrientedBox: Oriented box, aligned to the world axes when that's smaller
+
+    """
+    positions = _positions(vertices)
+
+    if len(positions) == 0:
+        return OrientedBox(np.zeros(3, np.float32), np.eye(3, dtype=np.float32), np.zeros(3, np.float32))
+
+    # principal axes of the positions, as a right handed basis
+    covariance = np.cov(positions - positions.mean(axis=0), rowvar=False) if len(positions) > 1 else np.eye(3)
+    axes = np.linalg.eigh(covariance)[1].T[::-1]
+    axes[2] = np.cross(axes[0], axes[1])
+
+    candidates = []
+    for basis in (axes, np.eye(3)):
+        projections = positions @ basis.T
+        low = projections.min(axis=0)
+        high = projections.max(axis=0)
+        candidates.append((float(np.prod(high - low)), basis, (low + high) * 0.5 @ basis, (high - low) * 0.5))
+
+    # keep the box with the smallest volume, the aligned one when the principal axes don't help
+    _, basis, center, extents = min(candidates, key=lambda candidate: candidate[0])
+
+    return OrientedBox(center.astype(np.float32), basis.astype(np.float32), extents.astype(np.float32))
+
+
+def calculate_bounds(vertices: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+    """Calculate the bounding box and a near minimal bounding sphere of a list of positions.
+
+    Args:
+        vertices (np.ndarray): Flat list of positions (x, y, z)
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, float]: aabb min, aabb max, sphere center and sphere radius
+
+    """
+    aabb_min, aabb_max = calculate_aabb(vertices)
+    center, radius = calculate_bounding_sphere(vertices)
+
+    return (aabb_min, aabb_max, center, radius)
+
+
+def transform_sphere(center: glm.vec3, radius: float, matrix: glm.mat4) -> tuple[glm.vec3, float]:
+    """Transform a bounding sphere by a model matrix.
+
+    The radius is scaled by the longest axis of the matrix, which is exact for any combination of translations,
+    rotations and (non uniform) scales.
+
+    Args:
+        center (glm.vec3): Center of the sphere
+        radius (float): Radius of the sphere
+        matrix (glm.mat4): Model matrix
+
+    Returns:
+        tuple[glm.vec3, float]: Center and radius of the transformed sphere
+
+    """
+    scale = max(glm.length(glm.vec3(matrix[0])), glm.length(glm.vec3(matrix[1])), glm.length(glm.vec3(matrix[2])))
+
+    return (glm.vec3(matrix * glm.vec4(center, 1.0)), radius * scale)
+
+
+def transform_aabb(aabb_min: glm.vec3, aabb_max: glm.vec3, matrix: glm.mat4) -> tuple[glm.vec3, glm.vec3]:
+    """Calculate the axis aligned box containing a transformed axis aligned box.
+
+    Args:
+        aabb_min (glm.vec3): Minimum corner of the box
+        aabb_max (glm.vec3): Maximum corner of the box
+        matrix (glm.mat4): Model matrix
+
+    Returns:
+        tuple[glm.vec3, glm.vec3]: Minimum and maximum corners of the transformed box
+
+    """
+    center = glm.vec3(matrix * glm.vec4((aabb_min + aabb_max) * 0.5, 1.0))
+    half_size = (aabb_max - aabb_min) * 0.5
+
+    # every axis of the box contributes to the size of the transformed box with the absolute value of its image
+    extents = (
+        glm.abs(glm.vec3(matrix[0])) * half_size.x
+        + glm.abs(glm.vec3(matrix[1])) * half_size.y
+        + glm.abs(glm.vec3(matrix[2])) * half_size.z
+    )
+
+    return (center - extents, center + extents)
+
+
+def transform_oriented_box(box: OrientedBox, matrix: glm.mat4) -> tuple[glm.vec3, glm.vec3]:
+    """Calculate the axis aligned box containing a transformed oriented box.
+
+    Args:
+        box (OrientedBox): Oriented box
+        matrix (glm.mat4): Model matrix
+
+    Returns:
+        tuple[glm.vec3, glm.vec3]: Minimum and maximum corners of the transformed box
+
+    """
+    linear = glm.mat3(matrix)
+    center = glm.vec3(matrix * glm.vec4(glm.vec3(*box.center.tolist()), 1.0))
+
+    extents = glm.vec3(0.0)
+    for axis, extent in zip(box.axes.tolist(), box.extents.tolist()):
+        extents += glm.abs(linear * glm.vec3(*axis)) * extent
+
+    return (center - extents, center + extents)
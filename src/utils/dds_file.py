@@ -0,0 +1,272 @@
+"""DirectDraw Surface (DDS) container of block compressed textures.
+
+A DDS file stores a 2D texture already compressed for the GPU, with its whole mip chain:
+- magic (b'DDS ') and header (DDS_HEADER_DTYPE)
+- DX10 header (DX10_HEADER_DTYPE), only when the four character code of the pixel format is b'DX10'
+- the blocks of every mip level, from the biggest to the smallest
+
+The BC1 (DXT1), BC3 (DXT5), BC5 (ATI2) and BC7 compressions are read, the BC1 and BC3 ones are written by the encoder
+of utils.bc_encoder. DDS files store the rows top to bottom: the BC1, BC3 and BC5 blocks are flipped on load for
+OpenGL, unless the file carries DDS_FLIPPED_MARKER, which marks the files written bottom to top by write_dds.
+"""
+
+import os
+
+import numpy as np
+
+from utils.bc_encoder import BLOCK_BYTES, compressed_level_size
+from utils.texture_file import MAX_LEVELS, TextureData
+
+DDS_FILE_EXTENSION = '.dds'
+DDS_MAGIC = b'DDS '
+
+# marker stored in the reserved words of the header by write_dds, the rows are already stored bottom to top
+DDS_FLIPPED_MARKER = b'PYFL'
+
+# flags of the header and of its pixel format
+DDSD_CAPS = 0x1
+DDSD_HEIGHT = 0x2
+DDSD_WIDTH = 0x4
+DDSD_PIXELFORMAT = 0x1000
+DDSD_MIPMAPCOUNT = 0x20000
+DDSD_LINEARSIZE = 0x80000
+DDPF_FOURCC = 0x4
+DDSCAPS_COMPLEX = 0x8
+DDSCAPS_TEXTURE = 0x1000
+DDSCAPS_MIPMAP = 0x400000
+
+DDS_HEADER_DTYPE = np.dtype(
+    [
+        ('magic', 'S4'),
+        ('size', '<u4'),
+        ('flags', '<u4'),
+        ('height', '<u4'),
+        ('width', '<u4'),
+        ('pitch_or_linear_size', '<u4'),
+        ('depth', '<u4'),
+        ('mip_map_count', '<u4'),
+        ('reserved1', 'S4', 11),
+        ('pixel_format_size', '<u4'),
+        ('pixel_format_flags', '<u4'),
+        ('four_cc', 'S4'),
+        ('rgb_bit_count', '<u4'),
+        ('bit_masks', '<u4', 4),
+        ('caps', '<u4', 4),
+        ('reserved2', '<u4'),
+    ]
+)
+
+DX10_HEADER_DTYPE = np.dtype(
+    [
+        ('dxgi_format', '<u4'),
+        ('resource_dimension', '<u4'),
+        ('misc_flag', '<u4'),
+        ('array_size', '<u4'),
+        ('misc_flags2', '<u4'),
+    ]
+)
+
+# compression of every four character code, and of every DXGI format of the DX10 header (UNORM and SRGB)
+FOUR_CC_COMPRESSIONS = {b'DXT1': 'bc1', b'DXT5': 'bc3', b'ATI2': 'bc5', b'BC5U': 'bc5'}
+DXGI_COMPRESSIONS = {71: 'bc1', 72: 'bc1', 77: 'bc3', 78: 'bc3', 83: 'bc5', 98: 'bc7', 99: 'bc7'}
+COMPRESSION_FOUR_CCS = {'bc1': b'DXT1', 'bc3': b'DXT5'}
+
+
+def find_compressed_sibling(file_path: str) -> str | None:
+    """Find the DDS file next to an image file, with the same name, unless it's older than the image.
+
+    Args:
+        file_path (str): Path of the image file
+
+    Returns:
+        str | None: Path of the DDS file, None if there is no up to date one
+
+    """
+    sibling_path = os.path.splitext(file_path)[0] + DDS_FILE_EXTENSION
+
+    try:
+        sibling_time = os.stat(sibling_path).st_mtime_ns
+    except OSError:
+        return None
+
+    try:
+        if os.stat(file_path).st_mtime_ns > sibling_time:
+            return None
+    except OSError:
+        # the compressed texture is shipped without its source
+        pass
+
+    return sibling_path
+
+
+def _flip_rows(rows: np.ndarray, height: int) -> np.ndarray:
+    # order of the 4 rows of the blocks, the rows past the height of the level are padding and stay in place
+    if height >= 4:
+        return rows[..., ::-1]
+
+    order = list(range(height - 1, -1, -1)) + list(range(height, 4))
+    return rows[..., order]
+
+
+def _flip_color_blocks(blocks: np.ndarray, height: int) -> None:
+    # BC1 block: 2 endpoints of 2 bytes, then a byte of 2 bits indices per row
+    blocks[:, 4:8] = _flip_rows(blocks[:, 4:8], height)
+
+
+def _flip_alpha_blocks(blocks: np.ndarray, height: int) -> None:
+    # BC4 block: 2 endpoints of 1 byte, then 48 bits of 3 bits indices, 12 bits per row
+    packed = np.zeros(len(blocks), dtype=np.uint64)
+    for i in range(6):
+        packed |= blocks[:, 2 + i].astype(np.uint64) << np.uint64(8 * i)
+
+    shifts = np.arange(4, dtype=np.uint64) * np.uint64(12)
+    rows = _flip_rows((packed[:, None] >> shifts) & np.uint64(0xFFF), height)
+    packed = (rows << shifts).sum(axis=1, dtype=np.uint64)
+
+    for i in range(6):
+        blocks[:, 2 + i] = (packed >> np.uint64(8 * i)) & np.uint64(0xFF)
+
+
+def flip_compressed_level(data: np.ndarray, width: int, height: int, compression: str) -> np.ndarray | None:
+    """Flip a level of compressed blocks vertically, moving the blocks and the rows of texels inside of them.
+
+    Args:
+        data (np.ndarray): Compressed blocks of the level
+        width (int): Width of the level
+        height (int): Height of the level
+        compression (str): Block compression of the level
+
+    Returns:
+        np.ndarray | None: Flipped blocks, None if the level can't be flipped (BC7 blocks, or a height that is not
+            a multiple of 4 spanning more than one row of blocks)
+
+    """
+    if compression == 'bc7' or (height > 4 and height % 4):
+        return None
+
+    block_bytes = BLOCK_BYTES[compression]
+    blocks = np.array(data).reshape((height + 3) // 4, (width + 3) // 4, block_bytes)[::-1]
+    blocks = np.ascontiguousarray(blocks).reshape(-1, block_bytes)
+
+    if compression == 'bc1':
+        _flip_color_blocks(blocks, height)
+    elif compression == 'bc3':
+        _flip_alpha_blocks(blocks[:, :8], height)
+        _flip_color_blocks(blocks[:, 8:], height)
+    else:
+        # BC5: a BC4 block for each of the 2 channels
+        _flip_alpha_blocks(blocks[:, :8], height)
+        _flip_alpha_blocks(blocks[:, 8:], height)
+
+    return blocks.reshape(-1)
+
+
+def write_dds(file_path: str, texture: TextureData) -> None:
+    """Write compressed texture data, with all its levels, to a DDS file.
+
+    Args:
+        file_path (str): Path of the file to write
+        texture (TextureData): Texture data, compressed with BC1 or BC3
+
+    Raises:
+        ValueError: In case the texture is not compressed with BC1 or BC3
+
+    """
+    if texture.compression not in COMPRESSION_FOUR_CCS:
+        raise ValueError(f'Unsupported DDS compression: {texture.compression or "none"}')
+
+    header = np.zeros(1, dtype=DDS_HEADER_DTYPE)
+    header['magic'] = DDS_MAGIC
+    header['size'] = DDS_HEADER_DTYPE.itemsize - len(DDS_MAGIC)
+    header['flags'] = DDSD_CAPS | DDSD_HEIGHT | DDSD_WIDTH | DDSD_PIXELFORMAT | DDSD_MIPMAPCOUNT | DDSD_LINEARSIZE
+    header['height'] = texture.height
+    header['width'] = texture.width
+    header['pitch_or_linear_size'] = compressed_level_size(texture.width, texture.height, texture.compression)
+    header['mip_map_count'] = len(texture.levels)
+    header['pixel_format_size'] = 32
+    header['pixel_format_flags'] = DDPF_FOURCC
+    header['four_cc'] = COMPRESSION_FOUR_CCS[texture.compression]
+    header['caps'][0, 0] = DDSCAPS_TEXTURE | ((DDSCAPS_COMPLEX | DDSCAPS_MIPMAP) if len(texture.levels) > 1 else 0)
+
+    if texture.flipped:
+        header['reserved1'][0, -1] = DDS_FLIPPED_MARKER
+
+    # write to a temporary file first, so that a mapped file is never overwritten while in use
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header.tobytes())
+        for _, _, data in texture.levels:
+            f.write(np.ascontiguousarray(data).data)
+
+    os.replace(tmp_path, file_path)
+
+
+def read_dds(file_path: str, flip: bool = True) -> TextureData:
+    """Memory map a DDS file.
+
+    Args:
+        file_path (str): Path of the DDS file
+        flip (bool, optional): Store the rows bottom to top. Defaults to True.
+
+    Raises:
+        ValueError: In case the file is not a supported DDS file
+
+    Returns:
+        TextureData: Compressed texture data, backed by the mapped file unless the levels had to be flipped
+
+    """
+    data = np.memmap(file_path, dtype=np.uint8, mode='r')
+
+    if len(data) < DDS_HEADER_DTYPE.itemsize:
+        raise ValueError(f'{file_path} is not a DDS file')
+
+    header = data[: DDS_HEADER_DTYPE.itemsize].view(DDS_HEADER_DTYPE)[0]
+    if header['magic'] != DDS_MAGIC:
+        raise ValueError(f'{file_path} is not a DDS file')
+
+    offset = DDS_HEADER_DTYPE.itemsize
+    four_cc = bytes(header['four_cc'])
+
+    if four_cc == b'DX10':
+        dx10_header = data[offset : offset + DX10_HEADER_DTYPE.itemsize].view(DX10_HEADER_DTYPE)[0]
+        offset += DX10_HEADER_DTYPE.itemsize
+        compression = DXGI_COMPRESSIONS.get(int(dx10_header['dxgi_format']))
+
+        if int(dx10_header['array_size']) > 1:
+            raise ValueError(f'{file_path} is a texture array, only 2D textures are supported')
+    else:
+        compression = FOUR_CC_COMPRESSIONS.get(four_cc)
+
+    if compression is None:
+        raise ValueError(f'{file_path} has an unsupported pixel format: {four_cc}')
+
+    width = int(header['width'])
+    height = int(header['height'])
+    level_count = min(max(int(header['mip_map_count']), 1), MAX_LEVELS)
+    stored_flipped = bytes(header['reserved1'][-1]) == DDS_FLIPPED_MARKER
+
+    levels = []
+    for i in range(level_count):
+        level_width = max(width >> i, 1)
+        level_height = max(height >> i, 1)
+        size = compressed_level_size(level_width, level_height, compression)
+
+        if offset + size > len(data):
+            raise ValueError(f'{file_path} is truncated')
+
+        levels.append((level_width, level_height, data[offset : offset + size]))
+        offset += size
+
+    flipped = stored_flipped
+    if flip != stored_flipped:
+        flipped_levels = [
+            (level_width, level_height, flip_compressed_level(level, level_width, level_height, compression))
+            for level_width, level_height, level in levels
+        ]
+
+        # keep the original orientation when a level can't be flipped
+        if all(level is not None for _, _, level in flipped_levels):
+            levels = flipped_levels
+            flipped = flip
+
+    return TextureData(width=width, height=height, flipped=flipped, levels=levels, compression=compression)
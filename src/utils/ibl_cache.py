@@ -0,0 +1,205 @@
+"""Persistent cache of the image based lighting maps precomputed on the GPU.
+
+The skybox cubemap converted from an equirect image, the irradiance cubemap, the levels of the prefiltered reflection
+cubemap and the BRDF integration LUT only depend on their sources, their sizes and the shaders drawing them. They are
+read back once and stored in a file under IBL_CACHE_DIRECTORY named after their key, so that the next runs upload
+them directly instead of drawing them again:
+- header (IBL_HEADER_DTYPE), holding the key
+- one entry (IBL_ENTRY_DTYPE) per level of every map
+- the texels of every level, aligned to BLOCK_ALIGNMENT bytes, face by face and bottom row first like OpenGL reads them
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+from utils.config import Config
+from utils.texture_file import BLOCK_ALIGNMENT
+
+IBL_CACHE_DIRECTORY = 'assets/baked/ibl'
+IBL_FILE_EXTENSION = '.pibl'
+IBL_FILE_MAGIC = b'PYLLIBLC'
+IBL_FILE_VERSION = 1
+
+IBL_HEADER_DTYPE = np.dtype(
+    [
+        ('magic', 'S8'),
+        ('version', '<u4'),
+        ('entry_count', '<u4'),
+        ('key', 'S64'),
+    ]
+)
+
+IBL_ENTRY_DTYPE = np.dtype(
+    [
+        ('name', 'S16'),
+        ('level', '<u4'),
+        ('faces', '<u4'),
+        ('width', '<u4'),
+        ('height', '<u4'),
+        ('channels', '<u4'),
+        ('dtype', 'S4'),
+        ('offset', '<u8'),
+    ]
+)
+
+
+def _align(offset: int) -> int:
+    return (offset + BLOCK_ALIGNMENT - 1) // BLOCK_ALIGNMENT * BLOCK_ALIGNMENT
+
+
+def ibl_settings() -> tuple[bool, str]:
+    """Get the image based lighting settings from the ibl section of the configuration.
+
+    Returns:
+        tuple[bool, str]: Store the precomputed maps and read them back on the next runs, representation of the
+            diffuse irradiance ('sh' for spherical harmonics, 'cubemap' for the irradiance cubemap)
+
+    """
+    settings = Config().setup.get('ibl') or {}
+    return settings.get('cache', True), settings.get('irradiance', 'sh')
+
+
+def ibl_cache_key(file_paths: list[str], **parameters: any) -> str:
+    """Calculate the key of precomputed maps, from the content of the files they depend on and their parameters.
+
+    Args:
+        file_paths (list[str]): Sources and shaders of the maps
+        **parameters (any): Sizes and any other setting changing the maps
+
+    Raises:
+        OSError: In case a file can't be read
+
+    Returns:
+        str: Hex digest of the key
+
+    """
+    digest = hashlib.sha256(f'ibl:{IBL_FILE_VERSION}:'.encode())
+
+    for name in sorted(parameters):
+        digest.update(f'{name}={parameters[name]};'.encode())
+
+    for file_path in file_paths:
+        digest.update(file_path.encode())
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def ibl_cache_path(key: str) -> str:
+    """Path of the cache file of a key.
+
+    Args:
+        key (str): Key of the maps
+
+    Returns:
+        str: Path of the cache file
+
+    """
+    return os.path.join(IBL_CACHE_DIRECTORY, key + IBL_FILE_EXTENSION)
+
+
+def write_ibl_cache(key: str, maps: dict[str, list[np.ndarray]]) -> str:
+    """Write precomputed maps to the cache file of their key.
+
+    Args:
+        key (str): Key of the maps
+        maps (dict[str, list[np.ndarray]]): Levels of every map, each of shape (faces, height, width, channels)
+
+    Returns:
+        str: Path of the cache file
+
+    """
+    entries = np.zeros(sum(len(levels) for levels in maps.values()), dtype=IBL_ENTRY_DTYPE)
+    offset = _align(IBL_HEADER_DTYPE.itemsize + entries.nbytes)
+
+    blocks = []
+    i = 0
+    for name, levels in maps.items():
+        for level, data in enumerate(levels):
+            faces, height, width, channels = data.shape
+            entries[i] = (name.encode(), level, faces, width, height, channels, data.dtype.str[1:].encode(), offset)
+            blocks.append((offset, data))
+            offset = _align(offset + data.nbytes)
+            i += 1
+
+    header = np.zeros(1, dtype=IBL_HEADER_DTYPE)
+    header['magic'] = IBL_FILE_MAGIC
+    header['version'] = IBL_FILE_VERSION
+    header['entry_count'] = len(entries)
+    header['key'] = key.encode()
+
+    file_path = ibl_cache_path(key)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    # write to a temporary file first, so that a mapped file is never overwritten while in use
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(entries.tobytes())
+        for block_offset, data in blocks:
+            f.seek(block_offset)
+            f.write(np.ascontiguousarray(data).data)
+        f.truncate(offset)
+
+    os.replace(tmp_path, file_path)
+
+    return file_path
+
+
+def read_ibl_cache(key: str) -> dict[str, list[np.ndarray]] | None:
+    """Memory map the cache file of a key.
+
+    Args:
+        key (str): Key of the maps
+
+    Raises:
+        ValueError: In case the file is not a valid cache file of the key
+
+    Returns:
+        dict[str, list[np.ndarray]] | None: Levels of every map, backed by the mapped file, None if there is no cache
+            file for the key
+
+    """
+    file_path = ibl_cache_path(key)
+    if not os.path.exists(file_path):
+        return None
+
+    data = np.memmap(file_path, dtype=np.uint8, mode='r')
+
+    if len(data) < IBL_HEADER_DTYPE.itemsize:
+        raise ValueError(f'{file_path} is not an IBL cache file')
+
+    header = data[: IBL_HEADER_DTYPE.itemsize].view(IBL_HEADER_DTYPE)[0]
+
+    if header['magic'] != IBL_FILE_MAGIC:
+        raise ValueError(f'{file_path} is not an IBL cache file')
+    if header['version'] != IBL_FILE_VERSION:
+        raise ValueError(f'{file_path} has an unsupported version: {header["version"]}')
+    if header['key'].decode() != key:
+        raise ValueError(f'{file_path} holds the maps of another key')
+
+    entries_end = IBL_HEADER_DTYPE.itemsize + int(header['entry_count']) * IBL_ENTRY_DTYPE.itemsize
+    if len(data) < entries_end:
+        raise ValueError(f'{file_path} is truncated')
+
+    maps: dict[str, list[np.ndarray]] = {}
+    for entry in data[IBL_HEADER_DTYPE.itemsize : entries_end].view(IBL_ENTRY_DTYPE):
+        dtype = np.dtype(entry['dtype'].decode())
+        shape = (int(entry['faces']), int(entry['height']), int(entry['width']), int(entry['channels']))
+        offset = int(entry['offset'])
+        size = int(np.prod(shape)) * dtype.itemsize
+
+        if offset + size > len(data):
+            raise ValueError(f'{file_path} is truncated')
+
+        levels = maps.setdefault(entry['name'].decode(), [])
+        if int(entry['level']) != len(levels):
+            raise ValueError(f'{file_path} has its levels out of order')
+
+        levels.append(data[offset : offset + size].view(dtype).reshape(shape))
+
+    return maps
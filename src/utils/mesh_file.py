@@ -0,0 +1,298 @@
+"""Binary mesh file format.
+
+A binary mesh file is made of a fixed size header followed by the vertex data, stored in separate
+blocks aligned to BLOCK_ALIGNMENT bytes, so that they can be memory mapped and passed to OpenGL
+without intermediate copies:
+- header (MESH_HEADER_DTYPE)
+- positions (float32, 3 per vertex)
+- normals (float32, 3 per vertex)
+- uvs (float32, 2 per vertex)
+- indices (uint16 if every index fits, uint32 otherwise), followed by the indices of the levels of detail
+- submeshes (SUBMESH_DTYPE), the ranges of indices drawn with each material
+- levels of detail (LOD_DTYPE), the ranges of the indices of the simplified versions of the mesh, which share the
+  vertices of the full detail mesh
+- meshlets (MESHLET_DTYPE), the clusters of triangles of the full detail mesh with their bounds (see
+  utils.meshlet_builder)
+
+The header also stores the bounds of the mesh calculated at import time (see utils.bounds): its bounding box, a near
+minimal bounding sphere and an oriented bounding box.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from utils.bounds import OrientedBox, calculate_bounds, calculate_oriented_box
+
+MESH_FILE_EXTENSION = '.pmesh'
+MESH_FILE_MAGIC = b'PYLLMESH'
+MESH_FILE_VERSION = 5
+
+BLOCK_ALIGNMENT = 64
+
+# flags of the header
+INDICES_UINT16 = 1
+
+MESH_HEADER_DTYPE = np.dtype(
+    [
+        ('magic', 'S8'),
+        ('version', '<u4'),
+        ('flags', '<u4'),
+        ('vertex_count', '<u4'),
+        ('index_count', '<u4'),
+        ('positions_offset', '<u8'),
+        ('normals_offset', '<u8'),
+        ('uvs_offset', '<u8'),
+        ('indices_offset', '<u8'),
+        ('aabb_min', '<f4', 3),
+        ('aabb_max', '<f4', 3),
+        ('center', '<f4', 3),
+        ('radius', '<f4'),
+        ('submesh_count', '<u4'),
+        ('submeshes_offset', '<u8'),
+        ('lod_count', '<u4'),
+        ('lods_offset', '<u8'),
+        ('obb_center', '<f4', 3),
+        ('obb_axes', '<f4', (3, 3)),
+        ('obb_extents', '<f4', 3),
+        ('meshlet_count', '<u4'),
+        ('meshlets_offset', '<u8'),
+    ]
+)
+
+SUBMESH_DTYPE = np.dtype(
+    [
+        ('material', 'S64'),
+        ('first_index', '<u4'),
+        ('index_count', '<u4'),
+    ]
+)
+
+LOD_DTYPE = np.dtype(
+    [
+        ('first_index', '<u4'),
+        ('index_count', '<u4'),
+    ]
+)
+
+MESHLET_DTYPE = np.dtype(
+    [
+        ('first_index', '<u4'),
+        ('index_count', '<u4'),
+        ('center', '<f4', 3),
+        ('radius', '<f4'),
+        ('cone_apex', '<f4', 3),
+        ('cone_axis', '<f4', 3),
+        ('cone_cutoff', '<f4'),
+    ]
+)
+
+
+@dataclass
+class Submesh:
+    """Range of indices of a mesh drawn with a single material."""
+
+    material: str
+    first_index: int
+    index_count: int
+
+
+@dataclass
+class MeshData:
+    """Indexed mesh data ready to be uploaded (memory mapped views when read from a binary mesh file)."""
+
+    indices: np.ndarray
+    vertices: np.ndarray
+    normals: np.ndarray
+    uvs: np.ndarray
+    aabb_min: np.ndarray
+    aabb_max: np.ndarray
+    center: np.ndarray
+    radius: float
+    submeshes: list[Submesh] = field(default_factory=list)
+    # indices of the levels of detail after the full detail mesh, referencing the same vertices
+    lods: list[np.ndarray] = field(default_factory=list)
+    # oriented bounding box, calculated at import time
+    obb: OrientedBox = None
+    # clusters of triangles of the full detail mesh (MESHLET_DTYPE), None if the mesh wasn't split into meshlets
+    meshlets: np.ndarray = None
+
+
+def _align(offset: int) -> int:
+    return (offset + BLOCK_ALIGNMENT - 1) // BLOCK_ALIGNMENT * BLOCK_ALIGNMENT
+
+
+def write_binary_mesh(
+    file_path: str,
+    indices: np.ndarray,
+    vertices: np.ndarray,
+    normals: np.ndarray,
+    uvs: np.ndarray,
+    bounds: tuple[np.ndarray, np.ndarray, np.ndarray, float] = None,
+    submeshes: list[Submesh] = None,
+    lods: list[np.ndarray] = None,
+    obb: OrientedBox = None,
+    meshlets: np.ndarray = None,
+) -> None:
+    """Write an indexed mesh to a binary mesh file.
+
+    Args:
+        file_path (str): Path of the file to write
+        indices (np.ndarray): List of indices
+        vertices (np.ndarray): Flat list of positions (x, y, z)
+        normals (np.ndarray): Flat list of normals (x, y, z)
+        uvs (np.ndarray): Flat list of texture coordinates (u, v)
+        bounds (tuple, optional): aabb min, aabb max, sphere center and radius. Calculated if not provided
+        submeshes (list[Submesh], optional): Ranges of indices drawn with each material. Defaults to None.
+        lods (list[np.ndarray], optional): Indices of the levels of detail, referencing the same vertices.
+            Defaults to None.
+        obb (OrientedBox, optional): Oriented bounding box. Calculated if not provided
+        meshlets (np.ndarray, optional): Meshlets of the full detail mesh (MESHLET_DTYPE). Defaults to None.
+
+    """
+    vertices = np.ascontiguousarray(vertices, dtype='<f4').ravel()
+    normals = np.ascontiguousarray(normals, dtype='<f4').ravel()
+    uvs = np.ascontiguousarray(uvs, dtype='<f4').ravel()
+    indices = np.asarray(indices).ravel()
+    lods = [np.asarray(lod).ravel() for lod in lods or []]
+
+    vertex_count = len(vertices) // 3
+
+    # use 16 bit indices whenever every vertex can be addressed with them
+    flags = 0
+    index_dtype = '<u4'
+    if vertex_count <= np.iinfo(np.uint16).max + 1:
+        index_dtype = '<u2'
+        flags |= INDICES_UINT16
+
+    # the indices of the levels of detail are stored after the ones of the full detail mesh
+    lod_table = np.zeros(len(lods), dtype=LOD_DTYPE)
+    first_index = len(indices)
+    for i, lod in enumerate(lods):
+        lod_table[i] = (first_index, len(lod))
+        first_index += len(lod)
+
+    index_count = len(indices)
+    indices = np.ascontiguousarray(np.concatenate([indices, *lods]), dtype=index_dtype)
+
+    if bounds is None:
+        bounds = calculate_bounds(vertices)
+    if obb is None:
+        obb = calculate_oriented_box(vertices)
+
+    submesh_table = np.zeros(len(submeshes or []), dtype=SUBMESH_DTYPE)
+    for i, submesh in enumerate(submeshes or []):
+        submesh_table[i] = (submesh.material.encode()[:64], submesh.first_index, submesh.index_count)
+
+    meshlet_table = np.ascontiguousarray(meshlets if meshlets is not None else [], dtype=MESHLET_DTYPE)
+
+    # calculate the position of each block in the file
+    header = np.zeros(1, dtype=MESH_HEADER_DTYPE)
+    offset = _align(MESH_HEADER_DTYPE.itemsize)
+
+    blocks = []
+    for offset_field, block in (
+        ('positions_offset', vertices),
+        ('normals_offset', normals),
+        ('uvs_offset', uvs),
+        ('indices_offset', indices),
+        ('submeshes_offset', submesh_table),
+        ('lods_offset', lod_table),
+        ('meshlets_offset', meshlet_table),
+    ):
+        header[offset_field] = offset
+        blocks.append((offset, block))
+        offset = _align(offset + block.nbytes)
+
+    header['magic'] = MESH_FILE_MAGIC
+    header['version'] = MESH_FILE_VERSION
+    header['flags'] = flags
+    header['vertex_count'] = vertex_count
+    header['index_count'] = index_count
+    header['aabb_min'] = bounds[0]
+    header['aabb_max'] = bounds[1]
+    header['center'] = bounds[2]
+    header['radius'] = bounds[3]
+    header['submesh_count'] = len(submesh_table)
+    header['lod_count'] = len(lod_table)
+    header['obb_center'] = obb.center
+    header['obb_axes'] = obb.axes
+    header['obb_extents'] = obb.extents
+    header['meshlet_count'] = len(meshlet_table)
+
+    # write to a temporary file first, so that a mapped file is never overwritten while in use
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header.tobytes())
+        for block_offset, block in blocks:
+            f.seek(block_offset)
+            f.write(block.tobytes())
+        f.truncate(offset)
+
+    os.replace(tmp_path, file_path)
+
+
+def read_binary_mesh(file_path: str) -> MeshData:
+    """Memory map a binary mesh file.
+
+    Args:
+        file_path (str): Path of the binary mesh file
+
+    Raises:
+        ValueError: In case the file is not a valid binary mesh file
+
+    Returns:
+        MeshData: Mesh data, backed by the mapped file
+
+    """
+    data = np.memmap(file_path, dtype=np.uint8, mode='r')
+
+    if len(data) < MESH_HEADER_DTYPE.itemsize:
+        raise ValueError(f'{file_path} is not a binary mesh file')
+
+    header = data[: MESH_HEADER_DTYPE.itemsize].view(MESH_HEADER_DTYPE)[0]
+
+    if header['magic'] != MESH_FILE_MAGIC:
+        raise ValueError(f'{file_path} is not a binary mesh file')
+    if header['version'] != MESH_FILE_VERSION:
+        raise ValueError(f'{file_path} has an unsupported version: {header["version"]}')
+
+    vertex_count = int(header['vertex_count'])
+    index_count = int(header['index_count'])
+    index_dtype = np.dtype('<u2') if header['flags'] & INDICES_UINT16 else np.dtype('<u4')
+
+    def block(offset: int, dtype: np.dtype, count: int) -> np.ndarray:
+        offset = int(offset)
+        return data[offset : offset + count * dtype.itemsize].view(dtype)
+
+    submeshes = [
+        Submesh(entry['material'].decode(), int(entry['first_index']), int(entry['index_count']))
+        for entry in block(header['submeshes_offset'], SUBMESH_DTYPE, int(header['submesh_count']))
+    ]
+
+    lod_table = block(header['lods_offset'], LOD_DTYPE, int(header['lod_count']))
+    meshlet_count = int(header['meshlet_count'])
+    lod_index_count = int(lod_table['index_count'].sum())
+
+    # the indices of the levels of detail follow the ones of the full detail mesh
+    all_indices = block(header['indices_offset'], index_dtype, index_count + lod_index_count)
+    lods = [
+        all_indices[int(entry['first_index']) : int(entry['first_index']) + int(entry['index_count'])]
+        for entry in lod_table
+    ]
+
+    return MeshData(
+        indices=all_indices[:index_count],
+        vertices=block(header['positions_offset'], np.dtype('<f4'), vertex_count * 3),
+        normals=block(header['normals_offset'], np.dtype('<f4'), vertex_count * 3),
+        uvs=block(header['uvs_offset'], np.dtype('<f4'), vertex_count * 2),
+        aabb_min=np.array(header['aabb_min']),
+        aabb_max=np.array(header['aabb_max']),
+        center=np.array(header['center']),
+        radius=float(header['radius']),
+        submeshes=submeshes,
+        lods=lods,
+        obb=OrientedBox(np.array(header['obb_center']), np.array(header['obb_axes']), np.array(header['obb_extents'])),
+        meshlets=block(header['meshlets_offset'], MESHLET_DTYPE, meshlet_count) if meshlet_count else None,
+    )
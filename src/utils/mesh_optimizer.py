@@ -0,0 +1,356 @@
+"""Import time optimization of indexed meshes.
+
+The optimizer reorders the data of a mesh without changing what is drawn:
+- triangles are reordered for the post transform vertex cache (Tom Forsyth's linear speed vertex cache optimization)
+- optionally, clusters of triangles are sorted so that the triangles facing outwards are drawn first, to reduce
+  overdraw without losing the cache locality inside every cluster
+- vertices are reordered in the order they are first used by the indices, for vertex fetch locality
+
+The triangles of every submesh are only reordered inside the submesh, so the material ranges stay valid.
+The efficiency of the vertex cache is measured with a FIFO cache simulation:
+- ACMR (average cache miss ratio): transformed vertices per triangle, from 3.0 (no reuse) down to ~0.5
+- ATVR (average transformed vertex ratio): transformed vertices per vertex of the mesh, 1.0 is optimal
+"""
+
+import time
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from utils.mesh_file import MeshData, Submesh
+
+# size of the cache simulated by the optimizer and by the analysis
+CACHE_SIZE = 32
+
+# parameters of the vertex scoring function of Forsyth's algorithm
+_CACHE_DECAY_POWER = 1.5
+_LAST_TRIANGLE_SCORE = 0.75
+_VALENCE_BOOST_SCALE = 2.0
+_VALENCE_BOOST_POWER = 0.5
+_MAX_VALENCE = 64
+
+
+@dataclass
+class CacheStats:
+    """Vertex cache efficiency of a mesh."""
+
+    # average cache miss ratio (transformed vertices per triangle)
+    acmr: float
+    # average transformed vertex ratio (transformed vertices per vertex)
+    atvr: float
+
+
+@dataclass
+class OptimizationReport:
+    """Vertex cache efficiency of a mesh before and after the optimization."""
+
+    before: CacheStats
+    after: CacheStats
+    # time spent optimizing the mesh in seconds
+    time: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f'ACMR {self.before.acmr:.3f} -> {self.after.acmr:.3f}, '
+            f'ATVR {self.before.atvr:.3f} -> {self.after.atvr:.3f} ({self.time:.3f}s)'
+        )
+
+
+def analyze_vertex_cache(indices: np.ndarray, vertex_count: int, cache_size: int = CACHE_SIZE) -> CacheStats:
+    """Simulate a FIFO post transform vertex cache over a list of triangles.
+
+    Args:
+        indices (np.ndarray): Indices of the triangles
+        vertex_count (int): Number of vertices of the mesh
+        cache_size (int, optional): Number of entries of the simulated cache. Defaults to CACHE_SIZE.
+
+    Returns:
+        CacheStats: ACMR and ATVR of the triangle order
+
+    """
+    if len(indices) == 0:
+        return CacheStats(0.0, 0.0)
+
+    # a vertex is in the FIFO cache if less than cache_size misses happened since it was loaded
+    timestamps = [-cache_size - 1] * vertex_count
+    misses = 0
+
+    for index in indices.tolist():
+        if misses - timestamps[index] > cache_size:
+            timestamps[index] = misses
+            misses += 1
+
+    used_vertices = int(np.count_nonzero(np.bincount(indices, minlength=vertex_count)))
+
+    return CacheStats(misses / (len(indices) // 3), misses / max(used_vertices, 1))
+
+
+def _score_tables(cache_size: int) -> tuple[list[float], list[float]]:
+    # score of a vertex depending on its position in the cache (-1 is outside of the cache, the last entry)
+    cache_scores = [0.0] * (cache_size + 1)
+    for position in range(cache_size):
+        if position < 3:
+            # the vertices of the last triangle get a fixed score, to avoid using the same triangle strip forever
+            cache_scores[position] = _LAST_TRIANGLE_SCORE
+        else:
+            cache_scores[position] = (1.0 - (position - 3) / (cache_size - 3)) ** _CACHE_DECAY_POWER
+
+    # bonus of the vertices with few triangles left, so that the lone triangles are not left behind
+    valence_scores = [0.0] + [
+        _VALENCE_BOOST_SCALE * valence**-_VALENCE_BOOST_POWER for valence in range(1, _MAX_VALENCE + 1)
+    ]
+
+    return cache_scores, valence_scores
+
+
+def optimize_vertex_cache(indices: np.ndarray, vertex_count: int, cache_size: int = CACHE_SIZE) -> np.ndarray:
+    """Reorder the triangles of a mesh for the post transform vertex cache, with Forsyth's algorithm.
+
+    At every step the triangle with the highest score is emitted, the score of a triangle being the sum of the scores
+    of its vertices (higher when they are recently used and when they have few triangles left to draw).
+    Only the triangles using the vertices in the simulated cache are scored again after each step.
+
+    Args:
+        indices (np.ndarray): Indices of the triangles
+        vertex_count (int): Number of vertices of the mesh
+        cache_size (int, optional): Number of entries of the simulated LRU cache. Defaults to CACHE_SIZE.
+
+    Returns:
+        np.ndarray: Reordered indices, with the same type
+
+    """
+    triangle_count = len(indices) // 3
+    if triangle_count == 0:
+        return indices.copy()
+
+    triangles = indices.reshape(-1, 3).tolist()
+    cache_scores, valence_scores = _score_tables(cache_size)
+
+    # triangles using every vertex, not emitted yet
+    adjacency: list[list[int]] = [[] for _ in range(vertex_count)]
+    for triangle, vertices in enumerate(triangles):
+        # degenerate triangles must only appear once per vertex
+        for vertex in set(vertices):
+            adjacency[vertex].append(triangle)
+
+    def vertex_score(vertex: int, position: int) -> float:
+        valence = len(adjacency[vertex])
+        if valence == 0:
+            return -1.0
+
+        return cache_scores[position] + valence_scores[min(valence, _MAX_VALENCE)]
+
+    vertex_scores = [vertex_score(vertex, -1) for vertex in range(vertex_count)]
+
+    emitted = bytearray(triangle_count)
+    output = []
+    cache: list[int] = []
+    # next triangle to emit in file order, when none of the triangles in the cache can be used
+    cursor = 0
+
+    # start from the triangle with the highest score
+    best = max(range(triangle_count), key=lambda i: sum(vertex_scores[vertex] for vertex in triangles[i]))
+
+    while True:
+        # emit the best triangle and remove it from the triangles left for its vertices
+        emitted[best] = 1
+        output.append(best)
+
+        triangle = triangles[best]
+        for vertex in set(triangle):
+            adjacency[vertex].remove(best)
+
+        # move the vertices of the triangle to the front of the LRU cache
+        new_cache = list(dict.fromkeys(triangle)) + [vertex for vertex in cache if vertex not in triangle]
+
+        # update the scores of the vertices in the cache and of the ones pushed out of it
+        for position, vertex in enumerate(new_cache):
+            vertex_scores[vertex] = vertex_score(vertex, position if position < cache_size else -1)
+
+        cache = new_cache[:cache_size]
+
+        # score the triangles using the vertices in the cache again, and pick the best one
+        best = -1
+        best_score = -1.0
+        for vertex in new_cache:
+            for triangle in adjacency[vertex]:
+                a, b, c = triangles[triangle]
+                score = vertex_scores[a] + vertex_scores[b] + vertex_scores[c]
+                if score > best_score:
+                    best = triangle
+                    best_score = score
+
+        if best < 0:
+            # none of the triangles in the cache is left, continue from the next triangle in file order
+            while cursor < triangle_count and emitted[cursor]:
+                cursor += 1
+
+            if cursor == triangle_count:
+                break
+
+            best = cursor
+
+    return indices.reshape(-1, 3)[output].reshape(-1)
+
+
+def optimize_overdraw(
+    indices: np.ndarray,
+    positions: np.ndarray,
+    vertex_count: int,
+    threshold: float = 1.05,
+    cache_size: int = CACHE_SIZE,
+) -> np.ndarray:
+    """Sort clusters of cache optimized triangles so that the triangles facing outwards are drawn first.
+
+    The triangle list is split into clusters where the cache is restarting anyway (a triangle with only new vertices),
+    or where splitting keeps the ACMR of the cluster below threshold times the ACMR of the whole list.
+    The clusters are then sorted by how much they face away from the center of the mesh.
+
+    Args:
+        indices (np.ndarray): Indices of the triangles, already optimized for the vertex cache
+        positions (np.ndarray): Flat array of vertex positions
+        vertex_count (int): Number of vertices of the mesh
+        threshold (float, optional): Maximum ACMR increase allowed by the clusters. Defaults to 1.05.
+        cache_size (int, optional): Number of entries of the simulated FIFO cache. Defaults to CACHE_SIZE.
+
+    Returns:
+        np.ndarray: Reordered indices, with the same type
+
+    """
+    triangle_count = len(indices) // 3
+    if triangle_count < 2:
+        return indices.copy()
+
+    # simulate the cache over the triangles, counting the misses of every triangle
+    timestamps = [-cache_size - 1] * vertex_count
+    misses = 0
+    triangle_misses = []
+    for a, b, c in indices.reshape(-1, 3).tolist():
+        start = misses
+        for vertex in (a, b, c):
+            if misses - timestamps[vertex] > cache_size:
+                timestamps[vertex] = misses
+                misses += 1
+        triangle_misses.append(misses - start)
+
+    target_acmr = misses / triangle_count * threshold
+
+    # split at the hard boundaries (3 misses), or where the cluster is already efficient enough
+    cluster_starts = [0]
+    cluster_misses = 0
+    for triangle in range(triangle_count):
+        cluster_size = triangle - cluster_starts[-1]
+        if triangle_misses[triangle] == 3 and cluster_size > 0 and cluster_misses / cluster_size <= target_acmr:
+            cluster_starts.append(triangle)
+            cluster_misses = 0
+
+        cluster_misses += triangle_misses[triangle]
+
+    if len(cluster_starts) < 2:
+        return indices.copy()
+
+    # centroid and area weighted normal of every cluster
+    triangle_positions = positions.reshape(-1, 3)[indices.reshape(-1, 3)].astype(np.float64)
+    centroids = triangle_positions.mean(axis=1)
+    normals = np.cross(
+        triangle_positions[:, 1] - triangle_positions[:, 0], triangle_positions[:, 2] - triangle_positions[:, 0]
+    )
+    areas = np.linalg.norm(normals, axis=1)
+
+    starts = np.array(cluster_starts)
+    cluster_areas = np.maximum(np.add.reduceat(areas, starts), 1e-12)
+    cluster_centroids = np.add.reduceat(centroids * areas[:, None], starts) / cluster_areas[:, None]
+    cluster_normals = np.add.reduceat(normals, starts)
+    cluster_normals /= np.maximum(np.linalg.norm(cluster_normals, axis=1, keepdims=True), 1e-12)
+
+    mesh_center = (centroids * areas[:, None]).sum(axis=0) / max(areas.sum(), 1e-12)
+
+    # the clusters facing away from the center are drawn first, they are the most likely to occlude the others
+    keys = ((cluster_centroids - mesh_center) * cluster_normals).sum(axis=1)
+    order = np.argsort(-keys, kind='stable')
+
+    ends = np.append(starts[1:], triangle_count)
+    triangle_order = np.concatenate([np.arange(starts[i], ends[i]) for i in order])
+
+    return indices.reshape(-1, 3)[triangle_order].reshape(-1)
+
+
+def optimize_vertex_fetch(indices: np.ndarray, vertex_count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Reorder the vertices in the order they are first used by the indices, dropping the unused ones.
+
+    Args:
+        indices (np.ndarray): Indices of the triangles
+        vertex_count (int): Number of vertices of the mesh
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Remapped indices, old index of every new vertex
+
+    """
+    # first position of every used vertex in the index list
+    used, first_use = np.unique(indices, return_index=True)
+    order = used[np.argsort(first_use)]
+
+    remap = np.zeros(vertex_count, dtype=np.int64)
+    remap[order] = np.arange(len(order))
+
+    return remap[indices].astype(indices.dtype), order
+
+
+def optimize_mesh(
+    mesh: MeshData,
+    overdraw: bool = False,
+    overdraw_threshold: float = 1.05,
+    cache_size: int = CACHE_SIZE,
+) -> tuple[MeshData, OptimizationReport]:
+    """Optimize a mesh for the vertex cache, vertex fetch and optionally overdraw.
+
+    Args:
+        mesh (MeshData): Indexed mesh
+        overdraw (bool, optional): Also sort the triangles to reduce overdraw. Defaults to False.
+        overdraw_threshold (float, optional): Maximum ACMR increase allowed by the overdraw sort. Defaults to 1.05.
+        cache_size (int, optional): Number of entries of the simulated vertex cache. Defaults to CACHE_SIZE.
+
+    Returns:
+        tuple[MeshData, OptimizationReport]: Optimized mesh and vertex cache efficiency before and after
+
+    """
+    start = time.perf_counter()
+
+    vertex_count = len(mesh.vertices) // 3
+    indices = np.asarray(mesh.indices)
+    before = analyze_vertex_cache(indices, vertex_count, cache_size)
+
+    # optimize the triangles of every submesh separately, so that their ranges don't change
+    ranges = [(submesh.first_index, submesh.index_count) for submesh in mesh.submeshes] or [(0, len(indices))]
+
+    optimized = indices.copy()
+    for first_index, index_count in ranges:
+        block = optimize_vertex_cache(indices[first_index : first_index + index_count], vertex_count, cache_size)
+
+        if overdraw:
+            block = optimize_overdraw(block, mesh.vertices, vertex_count, overdraw_threshold, cache_size)
+
+        optimized[first_index : first_index + index_count] = block
+
+    # reorder the vertices for fetch locality
+    optimized, order = optimize_vertex_fetch(optimized, vertex_count)
+
+    # the levels of detail only use vertices of the full detail mesh, follow them to their new position
+    new_positions = np.zeros(vertex_count, dtype=np.uint32)
+    new_positions[order] = np.arange(len(order), dtype=np.uint32)
+
+    optimized_mesh = replace(
+        mesh,
+        indices=optimized,
+        vertices=np.ascontiguousarray(mesh.vertices.reshape(-1, 3)[order]).reshape(-1),
+        normals=np.ascontiguousarray(mesh.normals.reshape(-1, 3)[order]).reshape(-1),
+        uvs=np.ascontiguousarray(mesh.uvs.reshape(-1, 2)[order]).reshape(-1),
+        submeshes=[Submesh(submesh.material, submesh.first_index, submesh.index_count) for submesh in mesh.submeshes],
+        lods=[new_positions[np.asarray(lod)] for lod in mesh.lods],
+        # the triangles moved, the meshlets have to be built again from the new order
+        meshlets=None,
+    )
+
+    after = analyze_vertex_cache(optimized, len(order), cache_size)
+
+    return optimized_mesh, OptimizationReport(before, after, time.perf_counter() - start)
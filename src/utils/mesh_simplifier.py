@@ -0,0 +1,308 @@
+"""Mesh simplification and generation of levels of detail.
+
+Meshes are simplified with quadric error metrics (Garland and Heckbert): every vertex accumulates the planes of the
+triangles around it in a 4x4 quadric, and moving it to a position costs the sum of the squared distances of that
+position from the planes. Half edge collapses are used (a vertex is merged into one of its neighbours), so the
+simplified triangles only reference vertices of the original mesh and every level of detail shares its vertex data.
+
+The collapses are done in vectorized rounds: the cost of every edge is calculated at once, then the cheapest edges
+whose neighbourhoods don't overlap are collapsed together, skipping the ones that would flip a triangle.
+Vertices sharing the same position (uv or normal seams) are simplified as a single vertex, and the edges on the
+borders of the mesh are kept in place by extra planes perpendicular to their triangles.
+"""
+
+from dataclasses import replace
+
+import numpy as np
+
+from utils.mesh_file import MeshData
+from utils.mesh_optimizer import optimize_vertex_fetch
+
+# weight of the planes keeping the borders of the mesh in place
+BORDER_WEIGHT = 10.0
+# minimum cosine between the normal of a triangle before and after a collapse
+_FLIP_THRESHOLD = 0.2
+# maximum number of collapse rounds for a single simplification
+_MAX_ROUNDS = 64
+
+
+def _plane_quadrics(normals: np.ndarray, points: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    # quadric of the plane with the given unit normal going through the point, scaled by the weight
+    planes = np.concatenate((normals, -(normals * points).sum(axis=1, keepdims=True)), axis=1)
+    return planes[:, :, None] * planes[:, None, :] * weights[:, None, None]
+
+
+def _vertex_quadrics(triangles: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    # accumulate the planes of the triangles around every vertex
+    corners = positions[triangles]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+
+    # degenerate triangles have no plane
+    valid = lengths > 1e-12
+    normals = normals[valid] / lengths[valid, None]
+
+    quadrics = np.zeros((len(positions), 4, 4))
+    triangle_quadrics = _plane_quadrics(normals, corners[valid, 0], np.ones(len(normals)))
+    for corner in range(3):
+        np.add.at(quadrics, triangles[valid, corner], triangle_quadrics)
+
+    # find the border edges, used by a single triangle
+    edges = np.concatenate((triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]))
+    edge_triangles = np.tile(np.arange(len(triangles)), 3)
+    keys = np.sort(edges, axis=1)
+    _, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    border = (counts[inverse.ravel()] == 1) & valid[edge_triangles]
+
+    if border.any():
+        # plane containing the border edge, perpendicular to its triangle
+        start = positions[edges[border, 0]]
+        direction = positions[edges[border, 1]] - start
+        face_normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])[edge_triangles[border]]
+        border_normals = np.cross(direction, face_normals)
+        border_lengths = np.maximum(np.linalg.norm(border_normals, axis=1, keepdims=True), 1e-12)
+
+        border_quadrics = _plane_quadrics(border_normals / border_lengths, start, np.full(len(start), BORDER_WEIGHT))
+        np.add.at(quadrics, edges[border, 0], border_quadrics)
+        np.add.at(quadrics, edges[border, 1], border_quadrics)
+
+    return quadrics
+
+
+def _collapse_costs(
+    quadrics: np.ndarray, positions: np.ndarray, sources: np.ndarray, targets: np.ndarray
+) -> np.ndarray:
+    # error of moving the source vertex onto the target vertex, with the planes of both
+    points = np.concatenate((positions[targets], np.ones((len(targets), 1))), axis=1)
+    combined = quadrics[sources] + quadrics[targets]
+    return np.maximum(np.einsum('ei,eij,ej->e', points, combined, points), 0.0)
+
+
+def _attribute_matches(
+    mesh: MeshData, groups: list[np.ndarray], welded_sources: np.ndarray, welded_targets: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    # pick, for every vertex at a collapsed position, the vertex at the target position with the closest attributes
+    # (the same side of a uv seam, the same face of a hard edge)
+    normals = np.asarray(mesh.normals, dtype=np.float64).reshape(-1, 3)
+    uvs = np.asarray(mesh.uvs, dtype=np.float64).reshape(-1, 2)
+
+    sources = []
+    targets = []
+    for welded_source, welded_target in zip(welded_sources.tolist(), welded_targets.tolist()):
+        source_vertices = groups[welded_source]
+        target_vertices = groups[welded_target]
+
+        if len(target_vertices) == 1:
+            sources.append(source_vertices)
+            targets.append(np.repeat(target_vertices, len(source_vertices)))
+            continue
+
+        distances = (
+            ((normals[source_vertices, None] - normals[None, target_vertices]) ** 2).sum(axis=2)
+            + ((uvs[source_vertices, None] - uvs[None, target_vertices]) ** 2).sum(axis=2)
+        )
+        sources.append(source_vertices)
+        targets.append(target_vertices[distances.argmin(axis=1)])
+
+    return np.concatenate(sources), np.concatenate(targets)
+
+
+def simplify_indices(mesh: MeshData, indices: np.ndarray, target_index_count: int) -> tuple[np.ndarray, float]:
+    """Simplify a list of triangles of a mesh, keeping its vertices.
+
+    Args:
+        mesh (MeshData): Mesh owning the vertices referenced by the indices
+        indices (np.ndarray): Triangles to simplify
+        target_index_count (int): Number of indices to reach (the result can be bigger if the mesh can't be
+            simplified without flipping triangles)
+
+    Returns:
+        tuple[np.ndarray, float]: Simplified indices referencing the vertices of the mesh, maximum distance of the
+            simplified surface from the collapsed vertices, relative to the radius of the mesh
+
+    """
+    positions = np.asarray(mesh.vertices, dtype=np.float64).reshape(-1, 3)
+    triangles = np.asarray(indices, dtype=np.int64).reshape(-1, 3)
+
+    # simplify the positions, the vertices split by seams follow the position they belong to
+    welded_positions, welded = np.unique(positions, axis=0, return_inverse=True)
+    welded = welded.ravel()
+
+    order = np.argsort(welded, kind='stable')
+    groups = np.split(order, np.flatnonzero(np.diff(welded[order])) + 1)
+
+    welded_triangles = welded[triangles]
+    alive = (
+        (welded_triangles[:, 0] != welded_triangles[:, 1])
+        & (welded_triangles[:, 1] != welded_triangles[:, 2])
+        & (welded_triangles[:, 2] != welded_triangles[:, 0])
+    )
+    triangles = triangles[alive]
+
+    quadrics = _vertex_quadrics(welded[triangles], welded_positions)
+    target_triangles = max(target_index_count // 3, 1)
+    max_cost = 0.0
+
+    for _ in range(_MAX_ROUNDS):
+        if len(triangles) <= target_triangles:
+            break
+
+        welded_triangles = welded[triangles]
+
+        # unique undirected edges, collapsed in the cheapest direction
+        edges = np.concatenate((welded_triangles[:, [0, 1]], welded_triangles[:, [1, 2]], welded_triangles[:, [2, 0]]))
+        edges = np.unique(np.sort(edges, axis=1), axis=0)
+
+        forward = _collapse_costs(quadrics, welded_positions, edges[:, 0], edges[:, 1])
+        backward = _collapse_costs(quadrics, welded_positions, edges[:, 1], edges[:, 0])
+        swap = backward < forward
+        sources = np.where(swap, edges[:, 1], edges[:, 0])
+        targets = np.where(swap, edges[:, 0], edges[:, 1])
+        costs = np.minimum(forward, backward)
+
+        # neighbours of every vertex
+        neighbour_edges = np.concatenate((edges, edges[:, ::-1]))
+        neighbour_edges = neighbour_edges[np.argsort(neighbour_edges[:, 0], kind='stable')]
+        neighbour_starts = np.searchsorted(neighbour_edges[:, 0], np.arange(len(welded_positions) + 1))
+        neighbours = neighbour_edges[:, 1]
+
+        # every collapse removes two triangles, only consider the cheapest edges needed to reach the target
+        needed = (len(triangles) - target_triangles + 1) // 2
+        candidates = np.argsort(costs, kind='stable')[: max(needed * 4, 64)]
+
+        # pick collapses whose neighbourhoods don't overlap, so that every triangle is moved by one collapse at most
+        locked = np.zeros(len(welded_positions), dtype=bool)
+        removed = np.zeros(len(welded_positions), dtype=bool)
+        selected = []
+        for edge in candidates.tolist():
+            source = int(sources[edge])
+            target = int(targets[edge])
+            if locked[source] or removed[target]:
+                continue
+
+            selected.append(edge)
+            locked[source] = True
+            removed[source] = True
+            locked[neighbours[neighbour_starts[source] : neighbour_starts[source + 1]]] = True
+
+            if len(selected) >= needed:
+                break
+
+        if not selected:
+            break
+
+        selected = np.array(selected)
+        remap = np.arange(len(welded_positions))
+        remap[sources[selected]] = targets[selected]
+
+        # skip the collapses that would flip a triangle around the removed vertex
+        moved = removed[welded_triangles].any(axis=1)
+        before = welded_positions[welded_triangles[moved]]
+        after = welded_positions[remap[welded_triangles[moved]]]
+        normals_before = np.cross(before[:, 1] - before[:, 0], before[:, 2] - before[:, 0])
+        normals_after = np.cross(after[:, 1] - after[:, 0], after[:, 2] - after[:, 0])
+
+        # only the triangles that survive the collapse can flip
+        moved_after = remap[welded_triangles[moved]]
+        degenerate = (
+            (moved_after[:, 0] == moved_after[:, 1])
+            | (moved_after[:, 1] == moved_after[:, 2])
+            | (moved_after[:, 2] == moved_after[:, 0])
+        )
+        flipped = ~degenerate & (
+            (normals_before * normals_after).sum(axis=1)
+            <= _FLIP_THRESHOLD * np.linalg.norm(normals_before, axis=1) * np.linalg.norm(normals_after, axis=1)
+        )
+
+        if flipped.any():
+            # the removed vertex of a flipped triangle identifies its collapse
+            flipped_vertices = welded_triangles[moved][flipped]
+            rejected = flipped_vertices[removed[flipped_vertices]]
+            remap[rejected] = rejected
+            removed[rejected] = False
+
+        accepted = removed[sources[selected]]
+        if not accepted.any():
+            break
+
+        welded_sources = sources[selected][accepted]
+        welded_targets = targets[selected][accepted]
+        max_cost = max(max_cost, float(costs[selected][accepted].max()))
+
+        # move the vertices at the collapsed positions onto the vertices at the target positions
+        vertex_remap = np.arange(len(positions))
+        vertex_sources, vertex_targets = _attribute_matches(mesh, groups, welded_sources, welded_targets)
+        vertex_remap[vertex_sources] = vertex_targets
+        triangles = vertex_remap[triangles]
+
+        quadrics[welded_targets] += quadrics[welded_sources]
+
+        # drop the triangles that became degenerate
+        welded_triangles = welded[triangles]
+        triangles = triangles[
+            (welded_triangles[:, 0] != welded_triangles[:, 1])
+            & (welded_triangles[:, 1] != welded_triangles[:, 2])
+            & (welded_triangles[:, 2] != welded_triangles[:, 0])
+        ]
+
+    error = float(np.sqrt(max_cost)) / max(float(mesh.radius), 1e-12)
+
+    return triangles.astype(np.uint32).ravel(), error
+
+
+def generate_lods(mesh: MeshData, levels: int, ratio: float = 0.5, min_triangles: int = 32) -> list[np.ndarray]:
+    """Generate the indices of the levels of detail of a mesh, each one simplified from the previous one.
+
+    Args:
+        mesh (MeshData): Mesh to simplify (level 0)
+        levels (int): Maximum number of levels generated after the full detail mesh
+        ratio (float, optional): Fraction of the triangles of the previous level kept by every level. Defaults to 0.5.
+        min_triangles (int, optional): Don't simplify levels with fewer triangles than this. Defaults to 32.
+
+    Returns:
+        list[np.ndarray]: Indices of every level, referencing the vertices of the mesh. The list is shorter than
+            the requested levels when the mesh can't be simplified further
+
+    """
+    lods = []
+    indices = np.asarray(mesh.indices)
+
+    for _ in range(levels):
+        if len(indices) // 3 < min_triangles:
+            break
+
+        simplified, _ = simplify_indices(mesh, indices, int(len(indices) * ratio) // 3 * 3)
+
+        # stop when the simplification is blocked (every remaining collapse would flip a triangle)
+        if len(simplified) > len(indices) * 0.9:
+            break
+
+        lods.append(simplified)
+        indices = simplified
+
+    return lods
+
+
+def extract_lod(mesh: MeshData, level: int) -> MeshData:
+    """Build a standalone mesh from a level of detail, with only the vertices it uses.
+
+    Args:
+        mesh (MeshData): Mesh with levels of detail
+        level (int): Level of detail, from 1 to len(mesh.lods)
+
+    Returns:
+        MeshData: Mesh data of the level of detail, with the bounds of the full detail mesh
+
+    """
+    indices, order = optimize_vertex_fetch(np.asarray(mesh.lods[level - 1]), len(mesh.vertices) // 3)
+
+    return replace(
+        mesh,
+        indices=indices,
+        vertices=np.ascontiguousarray(np.asarray(mesh.vertices).reshape(-1, 3)[order]).reshape(-1),
+        normals=np.ascontiguousarray(np.asarray(mesh.normals).reshape(-1, 3)[order]).reshape(-1),
+        uvs=np.ascontiguousarray(np.asarray(mesh.uvs).reshape(-1, 2)[order]).reshape(-1),
+        submeshes=[],
+        lods=[],
+        meshlets=None,
+    )
@@ -0,0 +1,133 @@
+"""Decomposition of meshes into meshlets (small clusters of triangles) for cluster culling.
+
+The meshlets are built at import time by scanning the triangles in the order of the index buffer, already optimized
+for the vertex cache and therefore local, and starting a new meshlet when the current one would exceed its vertex or
+triangle budget. Every meshlet is a contiguous range of the indices of the mesh, so the surviving meshlets of a mesh
+can be drawn with a single glMultiDrawElementsBaseVertex call, without any change to its index buffer.
+
+Every meshlet stores a bounding sphere for frustum culling and a normal cone for back-face culling: a meshlet is
+back-facing from every position such that dot(normalize(cone_apex - position), cone_axis) >= cone_cutoff.
+"""
+
+import numpy as np
+
+from utils.bounds import calculate_bounding_sphere
+from utils.mesh_file import MESHLET_DTYPE, MeshData
+
+# default budgets of a meshlet, matching the limits of mesh shaders
+MAX_VERTICES = 64
+MAX_TRIANGLES = 124
+
+# cutoff of the meshlets whose triangles face too many directions to ever be back-facing
+CONE_DISABLED = 1.0
+
+# refinement passes of the bounding sphere of every meshlet
+_SPHERE_REFINEMENT_STEPS = 2
+
+
+def _split_triangles(triangles: np.ndarray, max_vertices: int, max_triangles: int) -> list[int]:
+    # first triangle of every meshlet of a range of triangles
+    starts = [0]
+    vertices = set()
+
+    for i, triangle in enumerate(triangles.tolist()):
+        new_vertices = vertices.union(triangle)
+
+        if i - starts[-1] >= max_triangles or len(new_vertices) > max_vertices:
+            starts.append(i)
+            new_vertices = set(triangle)
+
+        vertices = new_vertices
+
+    return starts
+
+
+def _normal_cones(
+    positions: np.ndarray, triangles: np.ndarray, starts: np.ndarray, counts: np.ndarray, centers: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # only the triangles covered by the meshlets, packed in the order of the meshlets
+    triangles = triangles[np.concatenate([np.arange(start, start + count) for start, count in zip(starts, counts)])]
+    starts = np.cumsum(counts) - counts
+    corners = positions[triangles]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+
+    # degenerate triangles don't face any direction, they are ignored by the cones
+    degenerate = lengths <= 1e-12
+    normals = normals / np.where(degenerate, 1.0, lengths)[:, None]
+    normals[degenerate] = 0.0
+
+    # the axis of the cone is the average normal of the triangles of the meshlet
+    axes = np.add.reduceat(normals, starts, axis=0)
+    axis_lengths = np.linalg.norm(axes, axis=1)
+    axes /= np.maximum(axis_lengths, 1e-12)[:, None]
+
+    meshlet_ids = np.repeat(np.arange(len(starts)), counts)
+    dots = np.einsum('ij,ij->i', normals, axes[meshlet_ids])
+    dots[degenerate] = 1.0
+    min_dots = np.minimum.reduceat(dots, starts)
+
+    # the apex is the point along the axis, behind the center, that lies behind the plane of every triangle
+    offsets = np.einsum('ij,ij->i', centers[meshlet_ids] - corners[:, 0], normals)
+    distances = np.where(degenerate, 0.0, offsets / np.maximum(dots, 1e-6))
+    apexes = centers - axes * np.maximum(np.maximum.reduceat(distances, starts), 0.0)[:, None]
+
+    # sine of the half angle of the cone, which is also the cosine of the half angle of the back-facing cone
+    facing = (min_dots > 0.0) & (axis_lengths > 1e-12)
+    cutoffs = np.where(facing, np.sqrt(np.maximum(1.0 - min_dots * min_dots, 0.0)), CONE_DISABLED)
+
+    return apexes, axes, cutoffs
+
+
+def build_meshlets(mesh: MeshData, max_vertices: int = MAX_VERTICES, max_triangles: int = MAX_TRIANGLES) -> np.ndarray:
+    """Split the full detail triangles of a mesh into meshlets.
+
+    Args:
+        mesh (MeshData): Indexed mesh, already optimized for the vertex cache
+        max_vertices (int, optional): Maximum number of vertices of a meshlet. Defaults to MAX_VERTICES.
+        max_triangles (int, optional): Maximum number of triangles of a meshlet. Defaults to MAX_TRIANGLES.
+
+    Returns:
+        np.ndarray: Meshlets (MESHLET_DTYPE), covering the indices of the mesh in order
+
+    """
+    positions = np.asarray(mesh.vertices, dtype=np.float64).reshape(-1, 3)
+    triangles = np.asarray(mesh.indices, dtype=np.int64).reshape(-1, 3)
+
+    if len(triangles) == 0:
+        return np.zeros(0, dtype=MESHLET_DTYPE)
+
+    # meshlets never cross the boundary between two submeshes, which are drawn with different materials
+    ranges = [(submesh.first_index // 3, submesh.index_count // 3) for submesh in mesh.submeshes]
+    ranges = [(first, count) for first, count in ranges if count > 0] or [(0, len(triangles))]
+
+    starts = []
+    counts = []
+    for first, count in ranges:
+        local_starts = _split_triangles(triangles[first : first + count], max_vertices, max_triangles)
+        starts.extend(first + start for start in local_starts)
+        counts.extend(np.diff(local_starts + [count]).tolist())
+
+    starts = np.array(starts, dtype=np.int64)
+    counts = np.array(counts, dtype=np.int64)
+
+    meshlets = np.zeros(len(starts), dtype=MESHLET_DTYPE)
+    meshlets['first_index'] = starts * 3
+    meshlets['index_count'] = counts * 3
+
+    # bounding sphere of the vertices used by every meshlet
+    centers = np.zeros((len(starts), 3))
+    for i, (start, count) in enumerate(zip(starts.tolist(), counts.tolist())):
+        vertices = positions[np.unique(triangles[start : start + count])]
+        center, radius = calculate_bounding_sphere(vertices, _SPHERE_REFINEMENT_STEPS)
+        centers[i] = center
+        meshlets['radius'][i] = radius
+
+    meshlets['center'] = centers
+
+    apexes, axes, cutoffs = _normal_cones(positions, triangles, starts, counts, centers)
+    meshlets['cone_apex'] = apexes
+    meshlets['cone_axis'] = axes
+    meshlets['cone_cutoff'] = cutoffs
+
+    return meshlets
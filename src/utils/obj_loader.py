@@ -0,0 +1,309 @@
+"""Wavefront OBJ and MTL loading.
+
+The OBJ file is tokenized in bulk: the lines are classified by their keyword (v, vn, vt, f, usemtl) with NumPy,
+and the arguments of every kind of statement are converted to numbers with a single NumPy call. Polygons are triangulated with a vectorized fan,
+and the (position, uv, normal) index triplets of the corners are deduplicated as integers, so the indexed buffers
+are produced without any per vertex Python code.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from utils.bounds import calculate_bounds, calculate_oriented_box
+from utils.mesh_file import MeshData, Submesh
+from utils.vbo_indexer import index_vertices_vectorized
+
+_WHITESPACE = np.frombuffer(b' \t\r\n\v\f', dtype=np.uint8)
+_BLANK = np.frombuffer(b' \t', dtype=np.uint8)
+
+
+@dataclass
+class ObjMaterial:
+    """Material read from an MTL file."""
+
+    name: str
+    ambient: tuple[float, float, float] = (0.2, 0.2, 0.2)
+    diffuse: tuple[float, float, float] = (0.8, 0.8, 0.8)
+    specular: tuple[float, float, float] = (1.0, 1.0, 1.0)
+    shininess: float = 1.0
+    # path of the diffuse texture, relative to the working directory
+    diffuse_texture: str = None
+
+
+@dataclass
+class ObjFile:
+    """Content of an OBJ file."""
+
+    mesh: MeshData
+    materials: dict[str, ObjMaterial] = field(default_factory=dict)
+    # size of the OBJ file in bytes
+    file_size: int = 0
+    # time spent parsing the OBJ file in seconds
+    parse_time: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Parse throughput in MB/s."""
+        return self.file_size / 1_000_000 / max(self.parse_time, 1e-9)
+
+
+def _parse_floats(lines: list[bytes], width: int) -> np.ndarray:
+    if not lines:
+        return np.zeros((0, width), dtype=np.float32)
+
+    # number of values stored in every line (a w component or vertex colors can follow the required values)
+    stride = len(lines[0].split())
+    values = np.fromstring(b' '.join(lines), dtype=np.float32, sep=' ')
+
+    # fall back to parsing line by line if the lines don't all have the same number of values
+    if stride < width or values.size != len(lines) * stride:
+        return np.array([(line.split() + [b'0'] * width)[:width] for line in lines], dtype=np.float32)
+
+    return values.reshape(-1, stride)[:, :width]
+
+
+def _count_tokens(lines: list[bytes]) -> np.ndarray:
+    # count the whitespace separated tokens of every line, scanning all the lines at once
+    text = np.frombuffer(b'\n'.join(lines) + b'\n', dtype=np.uint8)
+
+    is_space = np.isin(text, _WHITESPACE)
+    token_starts = ~is_space & np.concatenate(([True], is_space[:-1]))
+    line_ids = np.cumsum(text == ord('\n')) - (text == ord('\n'))
+
+    return np.bincount(line_ids[token_starts], minlength=len(lines))
+
+
+def _parse_corners(lines: list[bytes]) -> np.ndarray:
+    # parse every token of the face lines (v, v/vt, v//vn or v/vt/vn) into a (position, uv, normal) triplet,
+    # using 0 for the missing elements
+    text = b' '.join(lines)
+    first = lines[0].split()[0]
+
+    if b'//' in first:
+        text = text.replace(b'//', b'/0/')
+        components = 3
+    else:
+        components = first.count(b'/') + 1
+
+    values = np.fromstring(text.replace(b'/', b' '), dtype=np.int64, sep=' ')
+    token_count = len(text.split())
+
+    if values.size == token_count * components:
+        corners = np.zeros((token_count, 3), dtype=np.int64)
+        corners[:, :components] = values.reshape(-1, components)
+        return corners
+
+    # the faces mix different formats, parse them token by token
+    corners = [
+        ([int(index) if index else 0 for index in token.split(b'/')] + [0, 0])[:3]
+        for line in lines
+        for token in line.split()
+    ]
+    return np.array(corners, dtype=np.int64).reshape(-1, 3)
+
+
+def _triangulate(lines: list[bytes]) -> np.ndarray:
+    """Triangulate the faces of a block of face lines with a fan around their first corner.
+
+    Returns:
+        np.ndarray: (position, uv, normal) triplets of the triangle corners, 3 per triangle
+
+    """
+    corners = _parse_corners(lines)
+    counts = _count_tokens(lines)
+
+    # every polygon with n corners becomes n - 2 triangles (first, i, i + 1)
+    triangle_counts = np.maximum(counts - 2, 0)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    face_ids = np.repeat(np.arange(len(lines)), triangle_counts)
+    first_triangles = np.concatenate(([0], np.cumsum(triangle_counts)[:-1]))
+    fan_ids = np.arange(len(face_ids)) - np.repeat(first_triangles, triangle_counts) + 1
+
+    first = starts[face_ids]
+    triangles = np.stack((first, first + fan_ids, first + fan_ids + 1), axis=1)
+
+    return corners[triangles.ravel()]
+
+
+def _gather(elements: np.ndarray, ids: np.ndarray, width: int) -> np.ndarray:
+    # pick the elements at the given ids, using zeros for the missing ones (negative ids)
+    gathered = np.zeros((len(ids), width), dtype=np.float32)
+    if len(elements):
+        present = ids >= 0
+        gathered[present] = elements[ids[present]]
+
+    return gathered
+
+
+def _resolve(indices: np.ndarray, count: int) -> np.ndarray:
+    # convert 1 based indices to 0 based, negative indices count back from the end of the list (-1 is the last one)
+    return np.where(indices < 0, indices + count, indices - 1)
+
+
+def read_mtl(file_path: str) -> dict[str, ObjMaterial]:
+    """Read the materials of an MTL file.
+
+    Args:
+        file_path (str): Path of the MTL file
+
+    Returns:
+        dict[str, ObjMaterial]: Materials by name
+
+    """
+    materials = {}
+    material = None
+
+    with open(file_path) as f:
+        for line in f:
+            tokens = line.split()
+            if not tokens or tokens[0].startswith('#'):
+                continue
+
+            keyword, arguments = tokens[0], tokens[1:]
+
+            if keyword == 'newmtl':
+                material = ObjMaterial(' '.join(arguments))
+                materials[material.name] = material
+            elif material is None:
+                continue
+            elif keyword in ('Ka', 'Kd', 'Ks') and len(arguments) >= 3:
+                color = tuple(float(value) for value in arguments[:3])
+                setattr(material, {'Ka': 'ambient', 'Kd': 'diffuse', 'Ks': 'specular'}[keyword], color)
+            elif keyword == 'Ns' and arguments:
+                material.shininess = float(arguments[0])
+            elif keyword == 'map_Kd' and arguments:
+                # the texture path is the last argument, after the options
+                material.diffuse_texture = os.path.join(os.path.dirname(file_path), arguments[-1])
+
+    return materials
+
+
+def read_obj(file_path: str) -> ObjFile:
+    """Read an OBJ file (and its MTL libraries) into an indexed mesh.
+
+    The triangles are grouped by material, every group is described by a submesh.
+    Relative (negative) indices are resolved against the whole list of elements of the file.
+
+    Args:
+        file_path (str): Path of the OBJ file
+
+    Returns:
+        ObjFile: Indexed mesh, materials and parse statistics
+
+    """
+    start = time.perf_counter()
+
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    lines = data.split(b'\n')
+
+    # classify every line by its first characters, all at once
+    text = np.frombuffer(data + b'\n\n\n', dtype=np.uint8)
+    starts = np.concatenate(([0], np.flatnonzero(text[: len(data)] == ord('\n')) + 1))
+    first, second, third = text[starts], text[starts + 1], text[starts + 2]
+
+    def select(ids: np.ndarray, skip: int) -> list[bytes]:
+        # arguments of the selected lines, without their keyword
+        return [lines[i][skip:] for i in ids.tolist()]
+
+    is_vertex = first == ord('v')
+    position_lines = np.flatnonzero(is_vertex & np.isin(second, _BLANK))
+    normal_lines = np.flatnonzero(is_vertex & (second == ord('n')) & np.isin(third, _BLANK))
+    uv_lines = np.flatnonzero(is_vertex & (second == ord('t')) & np.isin(third, _BLANK))
+    face_lines = np.flatnonzero((first == ord('f')) & np.isin(second, _BLANK))
+
+    # read the vertex elements of the whole file
+    positions = _parse_floats(select(position_lines, 2), 3)
+    normals = _parse_floats(select(normal_lines, 3), 3)
+    uvs = _parse_floats(select(uv_lines, 3), 2)
+
+    # find the material of every face, the last one selected before it
+    material_lines = [i for i in np.flatnonzero(first == ord('u')).tolist() if lines[i].startswith(b'usemtl')]
+    material_names = [''] + [lines[i][6:].strip().decode() for i in material_lines]
+    face_materials = np.searchsorted(np.array(material_lines, dtype=np.int64), face_lines)
+
+    # group the faces by material, in order of appearance
+    material_corners: dict[str, np.ndarray] = {}
+    for material in dict.fromkeys(material_names[i] for i in np.unique(face_materials).tolist()):
+        selected = [i for i, name in enumerate(material_names) if name == material]
+        faces = face_lines[np.isin(face_materials, selected)]
+        material_corners[material] = _triangulate(select(faces, 2))
+
+    # every material is drawn with a range of indices
+    submeshes = []
+    first_index = 0
+    for material, corners in material_corners.items():
+        submeshes.append(Submesh(material, first_index, len(corners)))
+        first_index += len(corners)
+
+    corners = np.concatenate(list(material_corners.values())) if material_corners else np.zeros((0, 3), np.int64)
+
+    # convert the corner indices to 0 based indices (-1 for the missing elements)
+    position_ids = _resolve(corners[:, 0], len(positions))
+    uv_ids = np.where(corners[:, 1] == 0, -1, _resolve(corners[:, 1], len(uvs)))
+    normal_ids = np.where(corners[:, 2] == 0, -1, _resolve(corners[:, 2], len(normals)))
+
+    if len(corners) and normal_ids.min() < 0:
+        # some corners have no normal, use the normal of their triangle and deduplicate the resulting vertices
+        triangle_positions = positions[position_ids].reshape(-1, 3, 3)
+        face_normals = np.cross(
+            triangle_positions[:, 1] - triangle_positions[:, 0], triangle_positions[:, 2] - triangle_positions[:, 0]
+        )
+        face_normals /= np.maximum(np.linalg.norm(face_normals, axis=1, keepdims=True), 1e-12)
+
+        corner_normals = np.repeat(face_normals, 3, axis=0).astype(np.float32)
+        corner_normals[normal_ids >= 0] = normals[normal_ids[normal_ids >= 0]]
+
+        indices, vertex_data, normal_data, uv_data = index_vertices_vectorized(
+            positions[position_ids].ravel(),
+            corner_normals.ravel(),
+            _gather(uvs, uv_ids, 2).ravel(),
+        )
+    else:
+        # every corner is fully described by its index triplet, deduplicate the triplets
+        keys = (position_ids * (len(uvs) + 1) + (uv_ids + 1)) * (len(normals) + 1) + normal_ids
+        _, first_ids, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        # keep the unique corners in order of first appearance
+        order = np.argsort(first_ids)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+
+        unique = first_ids[order]
+        indices = rank[inverse.ravel()].astype(np.uint32)
+
+        vertex_data = np.ascontiguousarray(positions[position_ids[unique]]).ravel()
+        normal_data = np.ascontiguousarray(normals[normal_ids[unique]]).ravel()
+        uv_data = _gather(uvs, uv_ids[unique], 2).ravel()
+
+    # read the materials used by the file
+    materials = {}
+    for i in np.flatnonzero(first == ord('m')).tolist():
+        if not lines[i].startswith(b'mtllib'):
+            continue
+
+        library_path = os.path.join(os.path.dirname(file_path), lines[i][6:].strip().decode())
+        if os.path.isfile(library_path):
+            materials.update(read_mtl(library_path))
+
+    aabb_min, aabb_max, center, radius = calculate_bounds(vertex_data)
+
+    mesh = MeshData(
+        indices,
+        vertex_data,
+        normal_data,
+        uv_data,
+        aabb_min,
+        aabb_max,
+        center,
+        radius,
+        submeshes=submeshes,
+        obb=calculate_oriented_box(vertex_data),
+    )
+
+    return ObjFile(mesh, materials, len(data), time.perf_counter() - start)
@@ -2,6 +2,9 @@
 
 # ruff: noqa: F403, F405
 
+from collections.abc import Generator
+
+import numpy as np
 from OpenGL.GL import *
 
 
@@ -21,3 +24,93 @@ def get_query_time(opengl_query: int) -> float:
         available = glGetQueryObjectiv(opengl_query, GL_QUERY_RESULT_AVAILABLE)
 
     return glGetQueryObjectuiv(opengl_query, GL_QUERY_RESULT) / 1000000
+
+
+def upload_buffer_chunks(buffer: int, data: np.ndarray, chunk_size: int) -> Generator[int, None, None]:
+    """Upload data into an allocated buffer a chunk at a time.
+
+    Args:
+        buffer (int): OpenGL buffer, already allocated with at least data.nbytes bytes
+        data (np.ndarray): Contiguous data to upload
+        chunk_size (int): Maximum number of bytes uploaded in a single step
+
+    Yields:
+        int: Number of bytes uploaded by the last step
+
+    """
+    raw = np.ascontiguousarray(data).reshape(-1).view(np.uint8)
+
+    for offset in range(0, raw.nbytes, chunk_size):
+        chunk = raw[offset : offset + chunk_size]
+
+        # the buffer is bound again every step, since other code can bind other buffers in between
+        glBindBuffer(GL_COPY_WRITE_BUFFER, buffer)
+        glBufferSubData(GL_COPY_WRITE_BUFFER, offset, chunk.nbytes, chunk)
+
+        yield chunk.nbytes
+
+
+def _texture_faces(target: int) -> list[int]:
+    # a cubemap is read and written face by face, any other texture as a single image
+    if target == GL_TEXTURE_CUBE_MAP:
+        return [GL_TEXTURE_CUBE_MAP_POSITIVE_X + i for i in range(6)]
+
+    return [target]
+
+
+def download_texture_levels(
+    target: int, texture: int, width: int, height: int, levels: int, dtype: type = np.uint8
+) -> list[np.ndarray]:
+    """Read the RGB texels of the first levels of a 2D texture or a cubemap back from the GPU.
+
+    Args:
+        target (int): GL_TEXTURE_2D or GL_TEXTURE_CUBE_MAP
+        texture (int): OpenGL texture
+        width (int): Width of the base level
+        height (int): Height of the base level
+        levels (int): Number of levels to read
+        dtype (type, optional): np.uint8 or np.float32 texels. Defaults to np.uint8.
+
+    Returns:
+        list[np.ndarray]: Texels of every level, of shape (faces, height, width, 3)
+
+    """
+    faces = _texture_faces(target)
+    data_type = GL_FLOAT if dtype == np.float32 else GL_UNSIGNED_BYTE
+
+    glBindTexture(target, texture)
+    glPixelStorei(GL_PACK_ALIGNMENT, 1)
+
+    texels = []
+    for level in range(levels):
+        data = np.empty((len(faces), max(height >> level, 1), max(width >> level, 1), 3), dtype=dtype)
+
+        for i, face in enumerate(faces):
+            glGetTexImage(face, level, GL_RGB, data_type, data[i])
+
+        texels.append(data)
+
+    return texels
+
+
+def upload_texture_levels(target: int, texture: int, texels: list[np.ndarray]) -> None:
+    """Write RGB texels into the first levels of an allocated 2D texture or cubemap.
+
+    Args:
+        target (int): GL_TEXTURE_2D or GL_TEXTURE_CUBE_MAP
+        texture (int): OpenGL texture, with storage for every level
+        texels (list[np.ndarray]): Texels of every level, of shape (faces, height, width, 3), as returned by
+            download_texture_levels
+
+    """
+    faces = _texture_faces(target)
+
+    glBindTexture(target, texture)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+
+    for level, data in enumerate(texels):
+        data_type = GL_FLOAT if data.dtype == np.float32 else GL_UNSIGNED_BYTE
+        _, height, width, _ = data.shape
+
+        for i, face in enumerate(faces):
+            glTexSubImage2D(face, level, 0, 0, width, height, GL_RGB, data_type, np.ascontiguousarray(data[i]))
@@ -0,0 +1,115 @@
+"""Diffuse irradiance of an environment as 9 RGB coefficients of L2 spherical harmonics.
+
+The radiance of every texel of a cubemap is projected onto the 9 real spherical harmonics of bands 0 to 2, weighted
+by the solid angle of the texel, then convolved with the clamped cosine lobe (Ramamoorthi and Hanrahan, "An Efficient
+Representation for Irradiance Environment Maps"). The irradiance in the direction of a normal is the sum of the
+coefficients times the harmonics of the normal, like the irradiance cubemap it's already divided by PI, so that it
+only has to be multiplied by the albedo.
+
+The shaders evaluate the harmonics with the constants of SH_BASIS, in the same order as the coefficients.
+"""
+
+import numpy as np
+
+# constant factor of the 9 harmonics: 1, y, z, x, xy, yz, 3z^2 - 1, xz, x^2 - y^2
+SH_BASIS = np.array(
+    [0.282095, 0.488603, 0.488603, 0.488603, 1.092548, 1.092548, 0.315392, 1.092548, 0.546274], dtype=np.float32
+)
+
+# convolution of every band with the clamped cosine lobe (PI, 2PI/3, PI/4), divided by PI
+SH_COSINE_LOBE = np.array([1.0, 2 / 3, 2 / 3, 2 / 3, 0.25, 0.25, 0.25, 0.25, 0.25], dtype=np.float32)
+
+
+def evaluate_basis(directions: np.ndarray) -> np.ndarray:
+    """Evaluate the 9 harmonics in some directions.
+
+    Args:
+        directions (np.ndarray): Unit directions, of shape (..., 3)
+
+    Returns:
+        np.ndarray: Value of every harmonic in every direction, of shape (..., 9)
+
+    """
+    x, y, z = directions[..., 0], directions[..., 1], directions[..., 2]
+
+    return (
+        np.stack((np.ones_like(x), y, z, x, x * y, y * z, 3.0 * z * z - 1.0, x * z, x * x - y * y), axis=-1)
+        * SH_BASIS
+    )
+
+
+def _downsample(faces: np.ndarray, max_size: int) -> np.ndarray:
+    # average blocks of texels until the faces are no bigger than max_size, the low bands don't need the details
+    size = faces.shape[1]
+    factor = 1
+    while size // factor > max_size and size % (factor * 2) == 0:
+        factor *= 2
+
+    if factor == 1:
+        return faces.astype(np.float32)
+
+    # sum the rows of every block first, over contiguous runs of texels, then the columns
+    reduced = size // factor
+    rows = faces.reshape(6, reduced, factor, reduced, factor * 3).sum(axis=2, dtype=np.float32)
+    return rows.reshape(6, reduced, reduced, factor, 3).sum(axis=3) / (factor * factor)
+
+
+def _cubemap_directions(size: int) -> tuple[np.ndarray, np.ndarray]:
+    # direction and solid angle of the center of every texel of the 6 faces, in the order of the OpenGL faces
+    coordinates = (np.arange(size, dtype=np.float32) + 0.5) / size * 2.0 - 1.0
+    t, s = np.meshgrid(coordinates, coordinates, indexing='ij')
+    one = np.ones_like(s)
+
+    # +X, -X, +Y, -Y, +Z, -Z, with the rows of every face going down the face like OpenGL stores them
+    directions = np.stack(
+        (
+            np.stack((one, -t, -s), axis=-1),
+            np.stack((-one, -t, s), axis=-1),
+            np.stack((s, one, t), axis=-1),
+            np.stack((s, -one, -t), axis=-1),
+            np.stack((s, -t, one), axis=-1),
+            np.stack((-s, -t, -one), axis=-1),
+        )
+    )
+
+    lengths = np.linalg.norm(directions, axis=-1)
+    solid_angles = (2.0 / size) ** 2 / lengths**3
+
+    return directions / lengths[..., None], solid_angles
+
+
+def project_cubemap(faces: np.ndarray, max_size: int = 64) -> np.ndarray:
+    """Calculate the irradiance coefficients of a cubemap.
+
+    Args:
+        faces (np.ndarray): Texels of the 6 faces, of shape (6, size, size, 3), 8 bit or float
+        max_size (int, optional): Faces bigger than this are averaged down first. Defaults to 64.
+
+    Returns:
+        np.ndarray: 9 RGB coefficients of the irradiance, of shape (9, 3)
+
+    """
+    radiance = _downsample(faces, max_size)
+    if faces.dtype == np.uint8:
+        radiance /= 255.0
+
+    directions, solid_angles = _cubemap_directions(radiance.shape[1])
+
+    weighted = evaluate_basis(directions) * solid_angles[..., None]
+    coefficients = np.einsum('fhwk,fhwc->kc', weighted, radiance)
+
+    return (coefficients * SH_COSINE_LOBE[:, None]).astype(np.float32)
+
+
+def evaluate_irradiance(coefficients: np.ndarray, normals: np.ndarray) -> np.ndarray:
+    """Evaluate the irradiance in the direction of some normals, like the shaders do.
+
+    Args:
+        coefficients (np.ndarray): 9 RGB coefficients of the irradiance, of shape (9, 3)
+        normals (np.ndarray): Unit normals, of shape (..., 3)
+
+    Returns:
+        np.ndarray: RGB irradiance, of shape (..., 3)
+
+    """
+    return np.maximum(evaluate_basis(normals) @ coefficients, 0.0)
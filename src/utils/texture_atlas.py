@@ -0,0 +1,91 @@
+"""Packing of rectangles (textures of different sizes) into square atlas pages.
+
+The rectangles are sorted from the tallest to the shortest and placed on shelves: rows as tall as their first
+rectangle, filled from left to right. A rectangle goes on the first shelf with enough room, then on a new shelf of the
+first page with enough height left, then on a new page.
+
+Every rectangle is surrounded by padding, so that the filtering of a rectangle never reads the texels of its
+neighbours, and its position is aligned so that it stays on whole texels in the smaller levels of the atlas.
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class _Shelf:
+    y: int
+    height: int
+    x: int = 0
+
+
+@dataclass
+class _Page:
+    height: int = 0
+    shelves: list[_Shelf] = field(default_factory=list)
+
+
+def _align(value: int, alignment: int) -> int:
+    return (value + alignment - 1) // alignment * alignment
+
+
+def pack_rectangles(
+    sizes: list[tuple[int, int]], page_size: int, padding: int = 0, alignment: int = 1
+) -> tuple[list[tuple[int, int, int]], int]:
+    """Pack rectangles into square pages.
+
+    Args:
+        sizes (list[tuple[int, int]]): Width and height of every rectangle
+        page_size (int): Width and height of the pages
+        padding (int, optional): Free texels around every rectangle. Defaults to 0.
+        alignment (int, optional): Multiple of the positions of the rectangles. Defaults to 1.
+
+    Raises:
+        ValueError: In case a rectangle doesn't fit in a page
+
+    Returns:
+        tuple[list[tuple[int, int, int]], int]: Page, x and y of every rectangle, in the order of the sizes, and number
+            of pages used
+
+    """
+    padding = _align(padding, alignment)
+    positions: list[tuple[int, int, int]] = [None] * len(sizes)
+    pages: list[_Page] = []
+
+    for i in sorted(range(len(sizes)), key=lambda i: (sizes[i][1], sizes[i][0]), reverse=True):
+        width = _align(sizes[i][0] + 2 * padding, alignment)
+        height = _align(sizes[i][1] + 2 * padding, alignment)
+
+        if width > page_size or height > page_size:
+            raise ValueError(f'A rectangle of {sizes[i][0]}x{sizes[i][1]} does not fit in a page of {page_size}')
+
+        placement = None
+
+        # first shelf with enough room
+        for page_index, page in enumerate(pages):
+            for shelf in page.shelves:
+                if shelf.height >= height and shelf.x + width <= page_size:
+                    placement = (page_index, shelf)
+                    break
+
+            if placement is not None:
+                break
+
+        # otherwise a new shelf, in the first page tall enough
+        if placement is None:
+            page_index = next(
+                (index for index, page in enumerate(pages) if page.height + height <= page_size), len(pages)
+            )
+            if page_index == len(pages):
+                pages.append(_Page())
+
+            page = pages[page_index]
+            shelf = _Shelf(page.height, height)
+            page.shelves.append(shelf)
+            page.height += height
+            placement = (page_index, shelf)
+
+        page_index, shelf = placement
+        positions[i] = (page_index, shelf.x + padding, shelf.y + padding)
+        shelf.x += width
+
+    return positions, len(pages)
@@ -0,0 +1,211 @@
+"""Binary texture file format.
+
+A binary texture file stores RGBA8 pixel data ready to be uploaded level by level with glTexSubImage2D, with its whole
+mip chain:
+- header (TEXTURE_HEADER_DTYPE)
+- one block per mip level, aligned to BLOCK_ALIGNMENT bytes, from the biggest to the smallest
+
+The rows are stored bottom to top when the TEXTURE_FLIPPED flag is set, like OpenGL expects them.
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+TEXTURE_FILE_EXTENSION = '.ptex'
+TEXTURE_FILE_MAGIC = b'PYLLTEXT'
+TEXTURE_FILE_VERSION = 1
+
+BLOCK_ALIGNMENT = 64
+MAX_LEVELS = 16
+
+# flags of the header
+TEXTURE_FLIPPED = 1
+
+TEXTURE_HEADER_DTYPE = np.dtype(
+    [
+        ('magic', 'S8'),
+        ('version', '<u4'),
+        ('flags', '<u4'),
+        ('width', '<u4'),
+        ('height', '<u4'),
+        ('level_count', '<u4'),
+        ('level_offsets', '<u8', MAX_LEVELS),
+    ]
+)
+
+
+@dataclass
+class TextureData:
+    """Texture data ready to be uploaded (memory mapped views when read from a binary texture file)."""
+
+    width: int
+    height: int
+    flipped: bool
+    # list of (width, height, RGBA8 pixels or compressed blocks) for every mip level
+    levels: list[tuple[int, int, np.ndarray]]
+    # block compression of the levels ('bc1', 'bc3', 'bc5' or 'bc7'), empty for RGBA8 pixels
+    compression: str = ''
+
+
+def _align(offset: int) -> int:
+    return (offset + BLOCK_ALIGNMENT - 1) // BLOCK_ALIGNMENT * BLOCK_ALIGNMENT
+
+
+def generate_mip_levels(image: Image.Image, mipmaps: bool = True) -> list[Image.Image]:
+    """Generate the mip chain of an image, halving its size down to 1x1.
+
+    Args:
+        image (Image.Image): Base level of the chain
+        mipmaps (bool, optional): If False, only the base level is returned. Defaults to True.
+
+    Returns:
+        list[Image.Image]: Images of every level, from the biggest to the smallest
+
+    """
+    levels = [image]
+
+    while mipmaps and len(levels) < MAX_LEVELS and (levels[-1].width > 1 or levels[-1].height > 1):
+        previous = levels[-1]
+        factor = (2 if previous.width > 1 else 1, 2 if previous.height > 1 else 1)
+
+        # average blocks of 2x2 texels, dropping the last row or column of odd sizes like the OpenGL mip sizes
+        box = (0, 0, previous.width // factor[0] * factor[0], previous.height // factor[1] * factor[1])
+        levels.append(previous.reduce(factor, box))
+
+    return levels
+
+
+def build_texture(image: Image.Image, flip: bool = True, mipmaps: bool = True) -> TextureData:
+    """Convert an image to RGBA8 texture data, with its mip chain.
+
+    Args:
+        image (Image.Image): Source image
+        flip (bool, optional): Store the rows bottom to top. Defaults to True.
+        mipmaps (bool, optional): Generate the whole mip chain. Defaults to True.
+
+    Returns:
+        TextureData: Texture data
+
+    """
+    image = image.convert('RGBA')
+    if flip:
+        image = image.transpose(Image.FLIP_TOP_BOTTOM)
+
+    levels = [
+        (level.width, level.height, np.frombuffer(level.tobytes(), dtype=np.uint8))
+        for level in generate_mip_levels(image, mipmaps)
+    ]
+
+    return TextureData(width=image.width, height=image.height, flipped=flip, levels=levels)
+
+
+def write_binary_texture(file_path: str, image: Image.Image, flip: bool = True, mipmaps: bool = True) -> None:
+    """Convert an image to RGBA8 and write it to a binary texture file.
+
+    Args:
+        file_path (str): Path of the file to write
+        image (Image.Image): Source image
+        flip (bool, optional): Store the rows bottom to top. Defaults to True.
+        mipmaps (bool, optional): Store the whole mip chain. Defaults to True.
+
+    """
+    write_texture_data(file_path, build_texture(image, flip, mipmaps))
+
+
+def write_texture_data(file_path: str, texture: TextureData) -> None:
+    """Write RGBA8 texture data, with all its levels, to a binary texture file.
+
+    Args:
+        file_path (str): Path of the file to write
+        texture (TextureData): Texture data
+
+    """
+    # calculate the position of each level in the file
+    header = np.zeros(1, dtype=TEXTURE_HEADER_DTYPE)
+    offset = _align(TEXTURE_HEADER_DTYPE.itemsize)
+
+    blocks = []
+    for i, (_, _, data) in enumerate(texture.levels):
+        header['level_offsets'][0, i] = offset
+        blocks.append((offset, data))
+        offset = _align(offset + data.nbytes)
+
+    header['magic'] = TEXTURE_FILE_MAGIC
+    header['version'] = TEXTURE_FILE_VERSION
+    header['flags'] = TEXTURE_FLIPPED if texture.flipped else 0
+    header['width'] = texture.width
+    header['height'] = texture.height
+    header['level_count'] = len(texture.levels)
+
+    # write to a temporary file first, so that a mapped file is never overwritten while in use
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header.tobytes())
+        for block_offset, data in blocks:
+            f.seek(block_offset)
+            f.write(np.ascontiguousarray(data).data)
+        f.truncate(offset)
+
+    os.replace(tmp_path, file_path)
+
+
+def read_binary_texture(file_path: str) -> TextureData:
+    """Memory map a binary texture file.
+
+    Args:
+        file_path (str): Path of the binary texture file
+
+    Raises:
+        ValueError: In case the file is not a valid binary texture file
+
+    Returns:
+        TextureData: Texture data, backed by the mapped file
+
+    """
+    data = np.memmap(file_path, dtype=np.uint8, mode='r')
+
+    if len(data) < TEXTURE_HEADER_DTYPE.itemsize:
+        raise ValueError(f'{file_path} is not a binary texture file')
+
+    header = data[: TEXTURE_HEADER_DTYPE.itemsize].view(TEXTURE_HEADER_DTYPE)[0]
+
+    if header['magic'] != TEXTURE_FILE_MAGIC:
+        raise ValueError(f'{file_path} is not a binary texture file')
+    if header['version'] != TEXTURE_FILE_VERSION:
+        raise ValueError(f'{file_path} has an unsupported version: {header["version"]}')
+
+    width = int(header['width'])
+    height = int(header['height'])
+
+    levels = []
+    for i in range(int(header['level_count'])):
+        level_width = max(width >> i, 1)
+        level_height = max(height >> i, 1)
+        offset = int(header['level_offsets'][i])
+        levels.append((level_width, level_height, data[offset : offset + level_width * level_height * 4]))
+
+    return TextureData(
+        width=width,
+        height=height,
+        flipped=bool(header['flags'] & TEXTURE_FLIPPED),
+        levels=levels,
+    )
+
+
+def read_image_texture(file_path: str, flip: bool = True, mipmaps: bool = False) -> TextureData:
+    """Decode an image file into an RGBA8 texture.
+
+    Args:
+        file_path (str): Path of the image
+        flip (bool, optional): Store the rows bottom to top. Defaults to True.
+        mipmaps (bool, optional): Generate the whole mip chain. Defaults to False.
+
+    Returns:
+        TextureData: Texture data
+
+    """
+    with Image.open(file_path) as image:
+        return build_texture(image, flip, mipmaps)
@@ -0,0 +1,174 @@
+"""std140 layouts of the uniform blocks shared by the shaders, and std430 layouts of the shader storage blocks.
+
+The data that is the same for every shader drawing a frame lives in uniform buffers, bound once to fixed binding
+points (UNIFORM_BLOCK_BINDINGS) and uploaded at most once per frame:
+- FrameData: view and projection matrices of the camera, its position and the time
+- LightData: positions, colors and strengths of the lights, and the light material of the Blinn-Phong shaders
+- ShadowData: view projection matrices of the faces of the shadow cubemap, position of the light casting the shadows
+  and far plane of the shadow
+
+The shaders declare the blocks with the same members in the same order, without an instance name, so that the
+members are read like plain uniforms:
+
+    layout (std140) uniform FrameData {
+        mat4 view;
+        mat4 projection;
+        vec3 eye;
+        float time;
+    };
+
+    layout (std140) uniform LightData {
+        vec3 lights[100];
+        vec3 light_colors[100];
+        float light_strengths[100];
+        vec3 light_ambient;
+        float lights_count;
+        vec3 light_diffuse;
+        vec3 light_specular;
+    };
+
+    layout (std140) uniform ShadowData {
+        mat4 cube_matrices[6];
+        vec3 light;
+        float far_plane;
+    };
+
+In std140 every element of an array takes 16 bytes, so the vec3 and float arrays are stored as vec4 arrays, and a
+vec3 followed by a float shares the same 16 bytes. Matrices are stored column by column, like glm.
+
+The materials are stored in a shader storage buffer (STORAGE_BLOCK_BINDINGS), read by their index:
+
+    struct Material {
+        vec3 ambient;
+        float shininess;
+        vec3 diffuse;
+        float roughness;
+        vec3 specular;
+        float metallic;
+    };
+
+    layout (std430) buffer MaterialData {
+        Material materials[];
+    };
+
+The models submitted with indirect draws find their data in another shader storage buffer, indexed by the base
+instance of their draw command:
+
+    struct Draw {
+        mat4 model;
+        vec4 texture_rect;
+        vec3 position_offset;
+        int material_index;
+        vec3 position_scale;
+        int texture_layer;
+        int compressed_vertices;
+    };
+
+    layout (std430) buffer DrawData {
+        Draw draws[];
+    };
+"""
+
+import numpy as np
+
+# maximum number of lights in LightData
+MAX_LIGHTS = 100
+
+# binding point of every uniform block
+UNIFORM_BLOCK_BINDINGS = {
+    'FrameData': 0,
+    'LightData': 1,
+    'ShadowData': 2,
+}
+
+# binding point of every shader storage block (the binding point 1 is used by the raytracer)
+STORAGE_BLOCK_BINDINGS = {
+    'MaterialData': 2,
+    'DrawData': 3,
+}
+
+FRAME_DATA_DTYPE = np.dtype(
+    {
+        'names': ['view', 'projection', 'eye', 'time'],
+        'formats': [('<f4', (4, 4)), ('<f4', (4, 4)), ('<f4', 3), '<f4'],
+        'offsets': [0, 64, 128, 140],
+        'itemsize': 144,
+    }
+)
+
+LIGHT_DATA_DTYPE = np.dtype(
+    {
+        'names': [
+            'lights',
+            'light_colors',
+            'light_strengths',
+            'light_ambient',
+            'lights_count',
+            'light_diffuse',
+            'light_specular',
+        ],
+        'formats': [
+            ('<f4', (MAX_LIGHTS, 4)),
+            ('<f4', (MAX_LIGHTS, 4)),
+            ('<f4', (MAX_LIGHTS, 4)),
+            ('<f4', 3),
+            '<f4',
+            ('<f4', 3),
+            ('<f4', 3),
+        ],
+        'offsets': [
+            0,
+            MAX_LIGHTS * 16,
+            MAX_LIGHTS * 32,
+            MAX_LIGHTS * 48,
+            MAX_LIGHTS * 48 + 12,
+            MAX_LIGHTS * 48 + 16,
+            MAX_LIGHTS * 48 + 32,
+        ],
+        'itemsize': MAX_LIGHTS * 48 + 48,
+    }
+)
+
+SHADOW_DATA_DTYPE = np.dtype(
+    {
+        'names': ['cube_matrices', 'light', 'far_plane'],
+        'formats': [('<f4', (6, 4, 4)), ('<f4', 3), '<f4'],
+        'offsets': [0, 384, 396],
+        'itemsize': 400,
+    }
+)
+
+# layout of every uniform block
+UNIFORM_BLOCK_DTYPES = {
+    'FrameData': FRAME_DATA_DTYPE,
+    'LightData': LIGHT_DATA_DTYPE,
+    'ShadowData': SHADOW_DATA_DTYPE,
+}
+
+# layout of a material in MaterialData
+MATERIAL_DTYPE = np.dtype(
+    {
+        'names': ['ambient', 'shininess', 'diffuse', 'roughness', 'specular', 'metallic'],
+        'formats': [('<f4', 3), '<f4', ('<f4', 3), '<f4', ('<f4', 3), '<f4'],
+        'offsets': [0, 12, 16, 28, 32, 44],
+        'itemsize': 48,
+    }
+)
+
+# layout of the data of a draw in DrawData
+DRAW_DATA_DTYPE = np.dtype(
+    {
+        'names': [
+            'model',
+            'texture_rect',
+            'position_offset',
+            'material_index',
+            'position_scale',
+            'texture_layer',
+            'compressed_vertices',
+        ],
+        'formats': [('<f4', (4, 4)), ('<f4', 4), ('<f4', 3), '<i4', ('<f4', 3), '<i4', '<i4'],
+        'offsets': [0, 64, 80, 92, 96, 108, 112],
+        'itemsize': 128,
+    }
+)
@@ -1,7 +1,12 @@
+import itertools
 import multiprocessing
 from threading import Thread
 
 import glm
+import numpy as np
+
+# layout of a packed vertex, used to deduplicate vertices in bulk
+PACKED_VERTEX_DTYPE = np.dtype([('position', np.float32, 3), ('normal', np.float32, 3), ('uv', np.float32, 2)])
 
 
 # function to create an indexed version of the vertices of a model
@@ -57,6 +62,104 @@ def index_vertices(vertices: list[float], normals: list[float], uvs: list[float]
     return (out_indices, out_vertices, out_normals, out_uvs)
 
 
+# function to create an indexed version of the vertices of a model, vectorized with numpy
+def index_vertices_vectorized(
+    vertices: list[float] | np.ndarray,
+    normals: list[float] | np.ndarray,
+    uvs: list[float] | np.ndarray,
+    weld: bool = False,
+    epsilon: float = 0.001,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Create an indexed version of the vertices of a model in O(n log n).
+
+    The vertices are packed into a structured array (position, normal, uv) and deduplicated with
+    np.unique. The unique vertices keep the order of their first occurrence, so the output matches
+    the one of index_vertices.
+
+    Args:
+        vertices (list[float] | np.ndarray): Flat list of positions (x, y, z)
+        normals (list[float] | np.ndarray): Flat list of normals (x, y, z)
+        uvs (list[float] | np.ndarray): Flat list of texture coordinates (u, v)
+        weld (bool, optional): Also merge every vertex into the first vertex whose components are all closer than
+            epsilon, as PackedVertex.is_near would. Defaults to False.
+        epsilon (float, optional): Tolerance used when welding. Defaults to 0.001.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: indices (uint32), vertices, normals and uvs (float32)
+
+    """
+    # pack the input data into a structured array, one record per vertex
+    positions = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    packed = np.empty(len(positions), dtype=PACKED_VERTEX_DTYPE)
+    packed['position'] = positions
+    packed['normal'] = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+    packed['uv'] = np.asarray(uvs, dtype=np.float32).reshape(-1, 2)
+
+    # nothing to index, the rows of an empty array can't be viewed as keys
+    if len(packed) == 0:
+        empty = np.empty(0, dtype=np.float32)
+        return (np.empty(0, dtype=np.uint32), empty, empty.copy(), empty.copy())
+
+    # view the records as plain rows of floats, adding 0 turns -0.0 into 0.0 so that they compare equal byte-wise
+    rows = np.ascontiguousarray(packed.view(np.float32).reshape(len(packed), -1) + np.float32(0.0))
+
+    # view every row as a single opaque byte key to compare whole vertices at once
+    keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+
+    # find the unique vertices, the first index where they appear and the mapping from each input vertex
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    # reorder the unique vertices by first occurrence (np.unique returns them sorted by key)
+    order = np.argsort(first, kind='stable')
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
+
+    out_indices = remap[inverse.ravel()]
+    unique_vertices = packed[first[order]]
+
+    if weld:
+        # merge the unique vertices into the first one near them, and number the remaining ones in order
+        targets = _weld_targets(rows[first[order]], epsilon)
+        kept = np.flatnonzero(targets == np.arange(len(targets)))
+        out_indices = np.searchsorted(kept, targets)[out_indices]
+        unique_vertices = unique_vertices[kept]
+
+    # return the output arrays
+    return (
+        out_indices.astype(np.uint32),
+        np.ascontiguousarray(unique_vertices['position']).ravel(),
+        np.ascontiguousarray(unique_vertices['normal']).ravel(),
+        np.ascontiguousarray(unique_vertices['uv']).ravel(),
+    )
+
+
+def _weld_targets(rows: np.ndarray, epsilon: float) -> np.ndarray:
+    # index of the first row every row is merged into (itself when no previous row is near it), the rows being
+    # near when all their components are closer than epsilon
+    targets = np.arange(len(rows))
+
+    # near rows have positions in the same or neighbouring cells of a grid of size epsilon, so only the kept rows
+    # of the 27 cells around a row are compared with it
+    cells = np.floor(rows[:, :3] / epsilon).astype(np.int64).tolist()
+    values = rows.tolist()
+    neighbours = list(itertools.product((-1, 0, 1), repeat=3))
+    kept: dict[tuple[int, int, int], list[int]] = {}
+
+    for i, ((x, y, z), row) in enumerate(zip(cells, values)):
+        target = i
+        for dx, dy, dz in neighbours:
+            for j in kept.get((x + dx, y + dy, z + dz), ()):
+                if j < target and all(abs(a - b) < epsilon for a, b in zip(values[j], row)):
+                    target = j
+
+        if target == i:
+            kept.setdefault((x, y, z), []).append(i)
+        else:
+            targets[i] = target
+
+    return targets
+
+
 def index_vertices_st_worker(
     vertices: list[float], normals: list[float], uvs: list[float], procnum: bool, return_dict: dict
 ) -> None:
@@ -0,0 +1,243 @@
+"""Vertex layout descriptors.
+
+A vertex layout declares, once, how the vertex data of a mesh is stored in its VBOs and how the attributes are
+read by the shaders (location, number of components, OpenGL type):
+- split layout: one tightly packed VBO per attribute (position, normal, uv)
+- interleaved layout: a single VBO storing every attribute of a vertex next to each other
+- compressed layout: interleaved 16 byte vertices, with positions quantized to 16 bits inside the bounding box of the
+  mesh, octahedral normals in two 16 bit components and half float uvs (dequantized by the vertex shaders)
+
+Every piece of code setting up a VAO for a mesh (MeshManager, instances) goes through VertexLayout.bind, so the
+attribute setup is the same everywhere.
+"""
+
+# ruff: noqa: F403, F405
+
+import ctypes
+from dataclasses import dataclass
+
+import numpy as np
+from OpenGL.GL import *
+
+
+@dataclass(frozen=True)
+class VertexAttribute:
+    """Attribute of a vertex, as read by the shaders."""
+
+    # name of the MeshData field storing the attribute
+    name: str
+    # location of the attribute in the shaders
+    location: int
+    # number of components of the attribute
+    size: int
+    # type of every component in the VBO
+    dtype: np.dtype = np.dtype(np.float32)
+    # convert integer components to [0, 1] or [-1, 1] when read by the shaders
+    normalized: bool = False
+    # encoding of the mesh data into the components ('position' or 'octahedral'), None to store it as it is
+    encoding: str = None
+
+    @property
+    def gl_type(self) -> int:
+        """OpenGL type of the components of the attribute."""
+        return _GL_TYPES[np.dtype(self.dtype)]
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes of the attribute of a single vertex."""
+        return np.dtype(self.dtype).itemsize * self.size
+
+
+_GL_TYPES = {
+    np.dtype(np.float32): GL_FLOAT,
+    np.dtype(np.float16): GL_HALF_FLOAT,
+    np.dtype(np.int8): GL_BYTE,
+    np.dtype(np.uint8): GL_UNSIGNED_BYTE,
+    np.dtype(np.int16): GL_SHORT,
+    np.dtype(np.uint16): GL_UNSIGNED_SHORT,
+    np.dtype(np.int32): GL_INT,
+    np.dtype(np.uint32): GL_UNSIGNED_INT,
+}
+
+
+class VertexLayout:
+    """Description of how the vertex attributes of a mesh are stored in its VBOs."""
+
+    def __init__(self, name: str, attributes: list[VertexAttribute], interleaved: bool = False) -> None:
+        """Create a vertex layout.
+
+        Args:
+            name (str): Name of the layout
+            attributes (list[VertexAttribute]): Attributes of a vertex, in the order they are stored
+            interleaved (bool, optional): Store every attribute in a single VBO. Defaults to False.
+
+        """
+        self.name: str = name
+        self.attributes: tuple[VertexAttribute, ...] = tuple(attributes)
+        self.interleaved: bool = interleaved
+
+        # byte offset of every attribute inside an interleaved vertex
+        self.offsets: tuple[int, ...] = tuple(
+            int(offset) for offset in np.cumsum([0] + [attribute.nbytes for attribute in self.attributes[:-1]])
+        )
+        # size in bytes of a whole vertex
+        self.stride: int = sum(attribute.nbytes for attribute in self.attributes)
+
+    def __repr__(self) -> str:
+        return f'VertexLayout({self.name})'
+
+    @property
+    def buffer_count(self) -> int:
+        """Number of VBOs used by a mesh with this layout."""
+        return 1 if self.interleaved else len(self.attributes)
+
+    @property
+    def compressed(self) -> bool:
+        """True if the shaders have to decode the attributes (see quantization)."""
+        return any(attribute.encoding is not None for attribute in self.attributes)
+
+    @staticmethod
+    def quantization(mesh: any) -> tuple[np.ndarray, np.ndarray]:
+        """Get the transformation from the quantized positions of a mesh ([0, 1] in every axis) to its positions.
+
+        Args:
+            mesh (MeshData): Mesh data
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Offset and scale of the positions, position = offset + quantized * scale
+
+        """
+        offset = np.asarray(mesh.aabb_min, dtype=np.float32)
+        scale = np.asarray(mesh.aabb_max, dtype=np.float32) - offset
+
+        return offset, scale
+
+    def pack(self, mesh: any) -> list[np.ndarray]:
+        """Convert the vertex data of a mesh into the contents of its VBOs.
+
+        Args:
+            mesh (MeshData): Mesh with flat vertices, normals and uvs arrays
+
+        Returns:
+            list[np.ndarray]: Data of every VBO, in the order expected by bind
+
+        """
+        vertex_count = len(mesh.vertices) // 3
+
+        # reshape every attribute to one row per vertex, converting it to the type stored in the VBO
+        columns = []
+        for attribute in self.attributes:
+            data = np.asarray(getattr(mesh, attribute.name)).reshape(vertex_count, -1)
+
+            if attribute.encoding is not None:
+                data = _ENCODERS[attribute.encoding](data, mesh, attribute)
+
+            columns.append(data.astype(attribute.dtype))
+
+        if not self.interleaved:
+            return [np.ascontiguousarray(column).reshape(-1) for column in columns]
+
+        # copy every attribute into its slot of the interleaved vertices
+        packed = np.empty((vertex_count, self.stride), dtype=np.uint8)
+        for attribute, offset, column in zip(self.attributes, self.offsets, columns):
+            packed[:, offset : offset + attribute.nbytes] = np.ascontiguousarray(column).view(np.uint8)
+
+        return [packed.reshape(-1)]
+
+    def bind(self, vbos: list[int]) -> None:
+        """Set up the attributes of the currently bound VAO to read the VBOs of a mesh.
+
+        Args:
+            vbos (list[int]): VBOs of the mesh, as returned by pack
+
+        """
+        for i, (attribute, offset) in enumerate(zip(self.attributes, self.offsets)):
+            # every attribute reads from the same VBO with a stride in the interleaved layout
+            if self.interleaved:
+                glBindBuffer(GL_ARRAY_BUFFER, vbos[0])
+                stride, pointer = self.stride, offset
+            else:
+                glBindBuffer(GL_ARRAY_BUFFER, vbos[i])
+                stride, pointer = 0, 0
+
+            glEnableVertexAttribArray(attribute.location)
+            glVertexAttribPointer(
+                attribute.location,
+                attribute.size,
+                attribute.gl_type,
+                GL_TRUE if attribute.normalized else GL_FALSE,
+                stride,
+                ctypes.c_void_p(pointer),
+            )
+
+
+def _encode_positions(positions: np.ndarray, mesh: any, attribute: VertexAttribute) -> np.ndarray:
+    # quantize the positions to the full range of the integer type, inside the bounding box of the mesh
+    offset, scale = VertexLayout.quantization(mesh)
+    maximum = np.iinfo(attribute.dtype).max
+
+    quantized = np.zeros((len(positions), attribute.size), dtype=np.float64)
+    quantized[:, :3] = (positions - offset) / np.where(scale > 0.0, scale, 1.0)
+
+    return np.rint(np.clip(quantized, 0.0, 1.0) * maximum)
+
+
+def _encode_octahedral(normals: np.ndarray, mesh: any, attribute: VertexAttribute) -> np.ndarray:
+    # project the unit normals on the octahedron, then fold the lower half over the upper one
+    normals = normals.astype(np.float64)
+    normals /= np.maximum(np.abs(normals).sum(axis=1, keepdims=True), 1e-12)
+
+    encoded = normals[:, :2].copy()
+    lower = normals[:, 2] < 0.0
+    signs = np.where(encoded[lower] >= 0.0, 1.0, -1.0)
+    encoded[lower] = (1.0 - np.abs(normals[lower][:, [1, 0]])) * signs
+
+    return np.rint(np.clip(encoded, -1.0, 1.0) * np.iinfo(attribute.dtype).max)
+
+
+_ENCODERS = {
+    'position': _encode_positions,
+    'octahedral': _encode_octahedral,
+}
+
+
+# position, normal and uv read as floats at the locations 0, 1 and 2
+_FLOAT_ATTRIBUTES = [
+    VertexAttribute('vertices', 0, 3),
+    VertexAttribute('normals', 1, 3),
+    VertexAttribute('uvs', 2, 2),
+]
+
+# quantized position (padded to 4 components to keep the attributes aligned), octahedral normal and half float uv
+_COMPRESSED_ATTRIBUTES = [
+    VertexAttribute('vertices', 0, 4, np.dtype(np.uint16), normalized=True, encoding='position'),
+    VertexAttribute('normals', 1, 2, np.dtype(np.int16), normalized=True, encoding='octahedral'),
+    VertexAttribute('uvs', 2, 2, np.dtype(np.float16)),
+]
+
+SPLIT_LAYOUT = VertexLayout('split', _FLOAT_ATTRIBUTES)
+INTERLEAVED_LAYOUT = VertexLayout('interleaved', _FLOAT_ATTRIBUTES, interleaved=True)
+COMPRESSED_LAYOUT = VertexLayout('compressed', _COMPRESSED_ATTRIBUTES, interleaved=True)
+
+VERTEX_LAYOUTS: dict[str, VertexLayout] = {
+    layout.name: layout for layout in (SPLIT_LAYOUT, INTERLEAVED_LAYOUT, COMPRESSED_LAYOUT)
+}
+
+
+def get_vertex_layout(name: str) -> VertexLayout:
+    """Get a vertex layout by name.
+
+    Args:
+        name (str): Name of the layout ('split', 'interleaved' or 'compressed')
+
+    Raises:
+        ValueError: In case the layout doesn't exist
+
+    Returns:
+        VertexLayout: Vertex layout
+
+    """
+    if name not in VERTEX_LAYOUTS:
+        raise ValueError(f'Unknown vertex layout: {name} (available: {", ".join(VERTEX_LAYOUTS)})')
+
+    return VERTEX_LAYOUTS[name]
@@ -0,0 +1,51 @@
+import os
+from collections.abc import Callable
+from types import ModuleType
+
+import pytest
+
+from utils.singleton import Singleton
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def repository_root(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Run every test from the root of the repository, where the config and the assets are read from."""
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def singletons(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Create new instances of the singletons in the test, and forget them afterwards."""
+    monkeypatch.setattr(Singleton, '_instances', {})
+
+
+@pytest.fixture
+def fake_gl(monkeypatch: pytest.MonkeyPatch) -> Callable[..., list[tuple[str, tuple]]]:
+    """Replace the OpenGL functions imported by modules with recorders, to run them without a context.
+
+    Returns:
+        Callable[..., list[tuple[str, tuple]]]: Function patching the given modules, returning the list the calls
+            are recorded in (name and arguments of every call)
+
+    """
+    calls = []
+
+    def recorder(name: str) -> Callable[..., int]:
+        def call(*args: any) -> int:
+            calls.append((name, args))
+            # every generated object gets the same name
+            return 1
+
+        return call
+
+    def patch(*modules: ModuleType) -> list[tuple[str, tuple]]:
+        for module in modules:
+            for name in dir(module):
+                if name.startswith('gl') and name[2:3].isupper() and callable(getattr(module, name)):
+                    monkeypatch.setattr(module, name, recorder(name))
+
+        return calls
+
+    return patch
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+import pytest
+from OpenGL.GL import GL_ELEMENT_ARRAY_BUFFER
+
+from renderer import instance
+from renderer.renderer_manager.managers import instance_manager, mesh_arena, mesh_manager
+from renderer.renderer_manager.managers.mesh_manager import MeshManager
+from utils import vertex_layout
+
+
+@pytest.mark.usefixtures('singletons')
+def test_instance_vao_follows_the_compacted_arena(fake_gl: callable) -> None:
+    calls = fake_gl(mesh_manager, mesh_arena, vertex_layout, instance_manager, instance)
+    manager = MeshManager(use_arena=True, arena_vertices=64, arena_indices=256)
+    manager.upload_mesh('sphere', MeshManager.read_mesh('assets/models/default/sphere.json'))
+
+    rm = SimpleNamespace(mesh_manager=manager, instances={}, model_matrices={}, materials={})
+    rm._initialize_instance = lambda name: instance_manager.initialize_instance(rm, name)
+    instance_manager.new_instance(rm, 'spheres', 'sphere', 'instanced')
+
+    assert manager.in_arena('sphere')
+    assert rm.instances['spheres'].buffers_generation == manager.arena.generation
+
+    # compacting the arena replaces its buffers (as when a new mesh doesn't fit in it)
+    manager.compact_arena()
+    assert rm.instances['spheres'].buffers_generation != manager.arena.generation
+
+    del calls[:]
+    instance_manager.update_instance_buffers(rm)
+
+    assert rm.instances['spheres'].buffers_generation == manager.arena.generation
+    assert ('glBindVertexArray', (rm.instances['spheres'].vao,)) in calls
+    assert ('glBindBuffer', (GL_ELEMENT_ARRAY_BUFFER, manager.arena.ebo)) in calls
+
+    # the instance VAO is only linked again after the next compaction
+    del calls[:]
+    instance_manager.update_instance_buffers(rm)
+    assert calls == []
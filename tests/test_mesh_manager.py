@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from OpenGL.GL import GL_COPY_WRITE_BUFFER, GL_UNSIGNED_INT, GL_UNSIGNED_SHORT
+
+from renderer.renderer_manager.managers import mesh_arena, mesh_manager
+from renderer.renderer_manager.managers.mesh_manager import DEDICATED_MESHES, MeshManager
+from utils import vertex_layout
+
+MESH_FILES = {'default': 'assets/models/default/box.json', 'screen_quad': 'assets/models/default/quad.json'}
+
+
+@pytest.mark.usefixtures('singletons')
+@pytest.mark.parametrize('small_indices', [True, False])
+@pytest.mark.parametrize('name', DEDICATED_MESHES)
+def test_dedicated_mesh_index_type_matches_its_indices(fake_gl: callable, name: str, small_indices: bool) -> None:
+    calls = fake_gl(mesh_manager, mesh_arena, vertex_layout)
+    manager = MeshManager(small_indices=small_indices)
+
+    manager.upload_mesh(name, MeshManager.read_mesh(MESH_FILES[name]))
+
+    # the last buffer uploaded for the mesh holds its indices
+    indices = [args[2] for call, args in calls if call == 'glBufferData' and args[0] == GL_COPY_WRITE_BUFFER][-1]
+    expected = GL_UNSIGNED_SHORT if indices.dtype == np.uint16 else GL_UNSIGNED_INT
+
+    # the full screen passes and the skybox draw the dedicated meshes with the index type reported by the manager
+    assert manager.index_type(name) == expected
+    assert (expected == GL_UNSIGNED_SHORT) == small_indices
+    assert not manager.in_arena(name)
+
+
+@pytest.mark.usefixtures('singletons')
+@pytest.mark.parametrize('name', DEDICATED_MESHES)
+def test_dedicated_mesh_keeps_float_attributes_with_compressed_layout(fake_gl: callable, name: str) -> None:
+    fake_gl(mesh_manager, mesh_arena, vertex_layout)
+    manager = MeshManager(vertex_layout='compressed')
+
+    manager.upload_mesh(name, MeshManager.read_mesh(MESH_FILES[name]))
+
+    # the full screen passes, the skybox and the IBL shaders read float positions, normals and uvs
+    assert manager.default_layout is vertex_layout.COMPRESSED_LAYOUT
+    assert manager.layout(name) is vertex_layout.SPLIT_LAYOUT
+    assert not manager.layout(name).compressed
+    assert manager.quantization(name) is None
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import glm
+
+from renderer.model.model import Model
+from renderer.renderer_manager.managers import model_manager
+
+
+class _TextureArrayManager:
+    def slot_index(self, texture: str) -> int:
+        return 4 if texture == 'bricks' else -1
+
+
+class _MeshManager:
+    def __init__(self) -> None:
+        self.acquired = []
+
+    def acquire_mesh(self, name: str) -> None:
+        self.acquired.append(name)
+
+    def transform_bounds(self, name: str, matrix: glm.mat4) -> tuple:
+        return glm.vec3(0.0), 1.0, glm.vec3(-1.0), glm.vec3(1.0)
+
+
+class _Material:
+    def __init__(self) -> None:
+        self.models = []
+
+    def add_model(self, model: Model) -> None:
+        self.models.append(model)
+
+
+def _renderer_manager() -> SimpleNamespace:
+    return SimpleNamespace(
+        models={},
+        materials={'default': _Material(), 'gold': _Material()},
+        single_render_models=[],
+        texture_array_manager=_TextureArrayManager(),
+        mesh_manager=_MeshManager(),
+        positions={},
+        rotations={},
+        scales={},
+        model_matrices={},
+        ogl_model_matrices={},
+        model_bounding_sphere_center={},
+        model_bounding_sphere_radius={},
+        model_aabb_mins={},
+        model_aabb_maxs={},
+    )
+
+
+def test_model_fields_keep_their_positional_order() -> None:
+    model = Model('sphere', 'sphere_mesh', 'bricks', 'pbr', 'gold')
+
+    assert (model.mesh, model.texture, model.shader, model.material) == ('sphere_mesh', 'bricks', 'pbr', 'gold')
+    assert model.texture_slot == -1
+
+
+def test_new_model_maps_every_field() -> None:
+    rm = _renderer_manager()
+
+    model_manager.new_model(rm, 'sphere', 'sphere_mesh', 'pbr', 'bricks', 'gold', 1)
+
+    model = rm.models['sphere']
+    assert model.mesh == 'sphere_mesh'
+    assert model.texture == 'bricks'
+    assert model.shader == 'pbr'
+    assert model.material == 'gold'
+    assert model.texture_slot == 4
+    assert rm.materials['gold'].models == [model]
+    assert rm.mesh_manager.acquired == ['sphere_mesh']
+
+
+def test_new_model_defaults() -> None:
+    rm = _renderer_manager()
+
+    model_manager.new_model(rm, 'box', None, None, None, None, 2)
+
+    assert [model.name for model in rm.single_render_models] == ['box0', 'box1']
+    for model in rm.single_render_models:
+        assert (model.mesh, model.texture, model.shader, model.material) == ('default',) * 4
+        assert model.texture_slot == -1
@@ -0,0 +1,41 @@
+from collections.abc import Generator
+from types import SimpleNamespace
+
+import glm
+import numpy as np
+import pytest
+
+from renderer.renderer_manager.managers.streaming_manager import StreamingManager, _StreamRequest
+from utils import opengl
+from utils.opengl import upload_buffer_chunks
+
+# sizes in bytes of the buffers of the streamed assets, not multiples of the chunk sizes
+BUFFER_SIZES = [100_000, 30_000, 1_500_000, 3_000_000, 70_000, 5_000_001]
+
+
+def upload_buffers(name: str, buffers: list[np.ndarray], chunk_size: int) -> Generator[int, None, None]:
+    # uploads every buffer a chunk at a time, like the mesh upload steps
+    for buffer in buffers:
+        yield from upload_buffer_chunks(1, buffer, chunk_size)
+
+
+@pytest.mark.usefixtures('singletons')
+@pytest.mark.parametrize(('upload_budget', 'chunk_size'), [(65536, 65536), (4 * 1024 * 1024, 1024 * 1024)])
+def test_frame_uploads_stay_within_budget(fake_gl: callable, upload_budget: int, chunk_size: int) -> None:
+    fake_gl(opengl)
+    manager = StreamingManager(upload_budget=upload_budget, chunk_size=chunk_size)
+    rm = SimpleNamespace(camera=SimpleNamespace(position=glm.vec3(0.0)), models={})
+
+    # assets already read by the workers, waiting to be uploaded
+    for i in range(3):
+        buffers = [np.zeros(size, np.uint8) for size in BUFFER_SIZES]
+        manager._ready[f'mesh:mesh_{i}'] = _StreamRequest('mesh', f'mesh_{i}', '', None, upload_buffers, data=buffers)
+
+    frames = []
+    while manager.queue_depth:
+        manager.update(rm)
+        frames.append(manager.stats['bytes_uploaded'])
+
+    assert max(frames) <= upload_budget
+    assert sum(frames) == 3 * sum(BUFFER_SIZES)
+    assert manager.stats['completed'] == 3
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from OpenGL.GL import images
+from OpenGL.raw.GL.VERSION import GL_1_3
+
+from renderer.renderer_manager.managers import texture_manager
+from renderer.renderer_manager.managers.texture_manager import COMPRESSED_FORMATS, TextureManager
+
+DDS_TEXTURE = 'assets/textures/grass.jpg'
+
+
+class _RecordedOperation:
+    """Stand-in for the ctypes function of glCompressedTexSubImage2D, recording the arguments it's called with."""
+
+    def __init__(self, operation: any) -> None:
+        self.argNames = list(operation.argNames)
+        self.argtypes = operation.argtypes
+        self.__name__ = operation.__name__
+        self.calls = []
+
+    def __call__(self, *args: any) -> None:
+        self.calls.append(args)
+
+
+@pytest.fixture
+def compressed_uploads(monkeypatch: pytest.MonkeyPatch, fake_gl: callable) -> list[tuple]:
+    """Fake the OpenGL calls of the texture manager, except glCompressedTexSubImage2D which keeps the PyOpenGL
+    wrapper converting its arguments, and only replaces the call into the driver.
+
+    Returns:
+        list[tuple]: Arguments of every compressed upload, as passed to the driver
+
+    """
+    fake_gl(texture_manager)
+    operation = _RecordedOperation(GL_1_3.glCompressedTexSubImage2D)
+    monkeypatch.setattr(texture_manager, 'glCompressedTexSubImage2D', images.compressedImageFunction(operation))
+
+    return operation.calls
+
+
+@pytest.mark.usefixtures('singletons')
+def test_upload_dds_texture(compressed_uploads: list[tuple]) -> None:
+    manager = TextureManager(compressed=True, cache=False)
+    texture = manager.read_texture(DDS_TEXTURE)
+    assert texture.compression is not None
+
+    manager.upload_texture('grass', texture)
+
+    # every level is uploaded whole, with the size of its blocks
+    assert len(compressed_uploads) == len(texture.levels)
+    for args, (width, height, data) in zip(compressed_uploads, texture.levels):
+        assert args[4:8] == (width, height, COMPRESSED_FORMATS[texture.compression], np.asarray(data).nbytes)
+
+
+@pytest.mark.usefixtures('singletons')
+def test_upload_dds_texture_steps(compressed_uploads: list[tuple]) -> None:
+    manager = TextureManager(compressed=True, cache=False)
+    texture = manager.read_texture(DDS_TEXTURE)
+
+    uploaded = sum(manager.upload_texture_steps('grass', texture, 4096))
+
+    # the rows of blocks of every level add up to the whole texture
+    assert uploaded == sum(np.asarray(data).nbytes for _, _, data in texture.levels)
+    assert sum(args[7] for args in compressed_uploads) == uploaded
+    assert len(compressed_uploads) > len(texture.levels)
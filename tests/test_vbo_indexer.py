@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from utils.vbo_indexer import index_vertices, index_vertices_vectorized
+
+
+def _vertices(count: int, distinct: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # vertices picked among a few distinct ones, so that most of them are repeated
+    rng = np.random.default_rng(seed)
+    choices = rng.integers(0, distinct, count)
+    positions = rng.random((distinct, 3), dtype=np.float32)[choices]
+    normals = rng.random((distinct, 3), dtype=np.float32)[choices]
+    uvs = rng.random((distinct, 2), dtype=np.float32)[choices]
+
+    return positions.ravel(), normals.ravel(), uvs.ravel()
+
+
+def _weld_reference(
+    vertices: np.ndarray, normals: np.ndarray, uvs: np.ndarray, epsilon: float
+) -> tuple[list[int], list[np.ndarray]]:
+    # every vertex goes to the first kept vertex whose components are all closer than epsilon (PackedVertex.is_near)
+    rows = np.hstack((vertices.reshape(-1, 3), normals.reshape(-1, 3), uvs.reshape(-1, 2))).astype(np.float32)
+    kept = []
+    indices = []
+    for row in rows:
+        for index, other in enumerate(kept):
+            if np.all(np.abs(other - row) < epsilon):
+                indices.append(index)
+                break
+        else:
+            indices.append(len(kept))
+            kept.append(row)
+
+    return indices, kept
+
+
+@pytest.mark.parametrize(('count', 'distinct'), [(1, 1), (50, 50), (300, 40)])
+def test_vectorized_matches_loop(count: int, distinct: int) -> None:
+    vertices, normals, uvs = _vertices(count, distinct)
+
+    expected = index_vertices(vertices.tolist(), normals.tolist(), uvs.tolist())
+    result = index_vertices_vectorized(vertices, normals, uvs)
+
+    assert result[0].dtype == np.uint32
+    assert result[0].tolist() == expected[0]
+    for values, expected_values in zip(result[1:], expected[1:]):
+        np.testing.assert_array_equal(values, np.asarray(expected_values, dtype=np.float32))
+
+
+def test_vectorized_merges_signed_zeros() -> None:
+    vertices = [0.0, 1.0, 2.0, -0.0, 1.0, 2.0]
+    normals = [0.0, 0.0, 1.0] * 2
+    uvs = [0.5, -0.0, 0.5, 0.0]
+
+    expected = index_vertices(vertices, normals, uvs)
+    result = index_vertices_vectorized(vertices, normals, uvs)
+
+    assert result[0].tolist() == expected[0] == [0, 0]
+
+
+@pytest.mark.parametrize('weld', [False, True])
+def test_vectorized_empty(weld: bool) -> None:
+    expected = index_vertices([], [], [])
+    result = index_vertices_vectorized([], [], [], weld=weld)
+
+    assert expected == ([], [], [], [])
+    assert [len(values) for values in result] == [0, 0, 0, 0]
+    assert result[0].dtype == np.uint32
+
+
+def test_weld_uses_the_tolerance() -> None:
+    # 0.0004 and 0.0006 are closer than epsilon but fall in different cells of an epsilon grid, 0.0015 is too far
+    vertices = [0.0004, 0.0, 0.0, 0.0006, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0015, 0.0, 0.0]
+    normals = [0.0, 1.0, 0.0] * 4
+    uvs = [0.0, 0.0] * 4
+
+    indices, positions, _, _ = index_vertices_vectorized(vertices, normals, uvs, weld=True, epsilon=0.001)
+
+    assert indices.tolist() == [0, 0, 0, 1]
+    np.testing.assert_array_equal(positions, np.float32([0.0004, 0.0, 0.0, 0.0015, 0.0, 0.0]))
+
+
+def test_weld_matches_reference() -> None:
+    # jitter repeated vertices by less than epsilon, some jittered copies also land near other vertices
+    vertices, normals, uvs = _vertices(400, 60, seed=1)
+    rng = np.random.default_rng(2)
+    vertices = vertices + rng.uniform(-0.0004, 0.0004, vertices.shape).astype(np.float32)
+    normals = np.round(normals, 2)
+    uvs = np.round(uvs, 2)
+
+    expected_indices, expected_rows = _weld_reference(vertices, normals, uvs, 0.001)
+    indices, positions, result_normals, result_uvs = index_vertices_vectorized(
+        vertices, normals, uvs, weld=True, epsilon=0.001
+    )
+
+    assert indices.tolist() == expected_indices
+    rows = np.hstack((positions.reshape(-1, 3), result_normals.reshape(-1, 3), result_uvs.reshape(-1, 2)))
+    np.testing.assert_array_equal(rows, np.asarray(expected_rows))